@@ -0,0 +1,128 @@
+"""
+对比批量分类器与逐条判断函数的耗时
+
+用法: python -m benchmarks.magnet_classifier_benchmark [候选数量] [重复次数]
+"""
+import random
+import sys
+import time
+from typing import Callable, List
+
+from cilisousuo_cli import (
+    SearchResult,
+    _build_code_regex,
+    _extract_code_parts,
+    _find_all_codes,
+    _looks_like_collection,
+    filter_irrelevant,
+    is_4k_resource,
+    is_relevant,
+    result_has_chinese_subtitle,
+)
+from modules.common.magnet_classifier import classify_candidates
+
+
+PREFIXES = ["ABP", "IPX", "SSIS", "MIDA", "DASS", "STARS", "FC2-PPV", "JUL"]
+DECORATIONS = [
+    "",
+    " 中文字幕",
+    " 4K",
+    " UHD 2160p",
+    "-C",
+    " ch",
+    " [合集]",
+    " 高清",
+    " chinese sub",
+    " 1080p",
+    " 破解版",
+    " collection pack",
+]
+
+
+def build_results(count: int, seed: int = 7) -> List[SearchResult]:
+    rng = random.Random(seed)
+    results: List[SearchResult] = []
+    for _ in range(count):
+        prefix = rng.choice(PREFIXES)
+        number = rng.randint(1, 999)
+        title = f"{prefix}-{number:03d}{rng.choice(DECORATIONS)}"
+        if rng.random() < 0.1:
+            title += f" {rng.choice(PREFIXES)}-{rng.randint(1, 999)}"
+        filename = f"{prefix.lower()}{number:03d}{rng.choice(DECORATIONS)}.mp4"
+        size = f"{rng.uniform(0.5, 20):.2f}GB"
+        results.append(SearchResult(title=title, filename=filename, size=size, detail_url="", detail_path=""))
+    return results
+
+
+def per_candidate(results: List[SearchResult], query: str) -> dict:
+    parts = _extract_code_parts(query)
+    code_re = _build_code_regex(*parts) if parts else None
+    return {
+        "code_match": [code_re is None or bool(code_re.search(f"{r.title}\n{r.filename}")) for r in results],
+        "is_4k": [is_4k_resource(r.title, r.filename) for r in results],
+        "has_subtitle": [result_has_chinese_subtitle(r) for r in results],
+        "is_collection": [
+            _looks_like_collection(r.title) or len(_find_all_codes(r.title) | _find_all_codes(r.filename)) >= 2
+            for r in results
+        ],
+        "relevant": [is_relevant(r, query, allow_chinese_subtitles=True) for r in results],
+    }
+
+
+def batched(results: List[SearchResult], query: str) -> dict:
+    tags = classify_candidates([r.title for r in results], [r.filename for r in results], query)
+    return {
+        "is_4k": tags.is_4k,
+        "has_subtitle": tags.has_subtitle,
+        "is_collection": tags.is_collection,
+        "code_match": tags.code_match,
+    }
+
+
+def check_parity(results: List[SearchResult], queries: List[str]) -> str:
+    """逐个番号对比两种实现的各列结果与过滤结果，返回第一个不一致的字段，全部一致时返回空字符串"""
+    for query in queries:
+        expected = per_candidate(results, query)
+        actual = batched(results, query)
+        for key in ("is_4k", "has_subtitle", "is_collection", "code_match"):
+            if expected[key] != actual[key]:
+                return f"{query} {key}"
+        kept = {id(r) for r in filter_irrelevant(results, query, allow_chinese_subtitles=True)}
+        if expected["relevant"] != [id(r) in kept for r in results]:
+            return f"{query} relevant"
+    return ""
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv: List[str]) -> int:
+    count = int(argv[0]) if argv else 5000
+    repeat = int(argv[1]) if len(argv) > 1 else 5
+    query = "ABP-123"
+    results = build_results(count)
+
+    # 随机标题几乎不含 ABP-123，另取部分候选自身的番号，保证番号匹配与过滤两条分支都被覆盖
+    queries = [query] + sorted({r.title.split(" ")[0].removesuffix("-C") for r in results[:20]})
+    mismatch = check_parity(results, queries)
+    if mismatch:
+        print(f"结果不一致: {mismatch}", file=sys.stderr)
+        return 1
+
+    per_candidate_seconds = measure(lambda: per_candidate(results, query), repeat)
+    batched_seconds = measure(lambda: batched(results, query), repeat)
+    print(f"候选数量: {count}, 重复: {repeat}, 一致性检查番号: {len(queries)} 个")
+    print(f"逐条函数: {per_candidate_seconds * 1000:.1f} ms")
+    print(f"批量分类: {batched_seconds * 1000:.1f} ms")
+    print(f"加速比: {per_candidate_seconds / batched_seconds:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
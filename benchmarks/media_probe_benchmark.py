@@ -0,0 +1,97 @@
+"""
+对比 MP4/Matroska 文件头解析与 ffprobe 的探测耗时，并核对两者结果是否一致
+
+用法: python -m benchmarks.media_probe_benchmark <目录或视频文件>... [--repeat 次数]
+"""
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from modules.movies.media_headers import HEADER_EXTENSIONS, read_media_header
+from modules.movies.media_probe import _metadata_from_payload, run_ffprobe
+
+
+COMPARED_FIELDS = ("width", "height", "codec", "container", "duration_seconds", "bitrate")
+# 码率按文件大小与时长估算，允许与 ffprobe 有少量偏差
+BITRATE_TOLERANCE = 0.02
+
+
+def collect_files(targets: List[str]) -> List[Path]:
+    files: List[Path] = []
+    for target in targets:
+        path = Path(target)
+        if path.is_dir():
+            for directory, _dirnames, filenames in os.walk(path):
+                files.extend(Path(directory) / name for name in filenames if Path(name).suffix.lower() in HEADER_EXTENSIONS)
+        elif path.suffix.lower() in HEADER_EXTENSIONS:
+            files.append(path)
+    return sorted(files)
+
+
+def native_probe(path: Path) -> dict:
+    payload = read_media_header(path)
+    return _metadata_from_payload(payload, path) if payload is not None else {}
+
+
+def measure(fn: Callable[[Path], object], files: List[Path], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for path in files:
+            fn(path)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def mismatches(native: dict, ffprobe: dict) -> List[str]:
+    fields = []
+    for field in COMPARED_FIELDS:
+        left, right = native.get(field), ffprobe.get(field)
+        if field == "bitrate" and left and right and abs(left - right) <= right * BITRATE_TOLERANCE:
+            continue
+        if left != right:
+            fields.append(f"{field}: {left} != {right}")
+    return fields
+
+
+def main(argv: List[str]) -> int:
+    repeat = 3
+    if "--repeat" in argv:
+        index = argv.index("--repeat")
+        repeat = int(argv[index + 1])
+        argv = argv[:index] + argv[index + 2:]
+    files = collect_files(argv)
+    if not files:
+        print("没有找到 MP4/Matroska 文件", file=sys.stderr)
+        return 1
+    if shutil.which("ffprobe") is None:
+        print("ffprobe 不可用，无法对比", file=sys.stderr)
+        return 1
+
+    unsupported = 0
+    different = 0
+    for path in files:
+        native = native_probe(path)
+        if not native:
+            unsupported += 1
+            continue
+        fields = mismatches(native, run_ffprobe(path) or {})
+        if fields:
+            different += 1
+            print(f"结果不一致 {path}: {'; '.join(fields)}", file=sys.stderr)
+
+    native_seconds = measure(native_probe, files, repeat)
+    ffprobe_seconds = measure(run_ffprobe, files, repeat)
+    print(f"文件数量: {len(files)}, 重复: {repeat}")
+    print(f"文件头解析: {native_seconds * 1000:.1f} ms（回退 ffprobe {unsupported} 个）")
+    print(f"ffprobe: {ffprobe_seconds * 1000:.1f} ms")
+    print(f"加速比: {ffprobe_seconds / max(native_seconds, 1e-9):.2f}x")
+    print(f"结果不一致: {different} 个")
+    return 1 if different else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
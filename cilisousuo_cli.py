@@ -3,6 +3,8 @@ import json
 import logging
 import re
 import sys
+import time
+from collections import OrderedDict
 from dataclasses import dataclass, asdict
 from html import unescape as html_unescape
 from typing import List, Optional, Pattern, Tuple
@@ -10,10 +12,22 @@ from typing import List, Optional, Pattern, Tuple
 import httpx
 from bs4 import BeautifulSoup
 
+from modules.common.magnet_classifier import (
+    build_code_regex,
+    classify_candidates,
+    extract_code_parts,
+    normalize_code,
+)
 from modules.common.subtitles import has_chinese_subtitle
 
 
 BASE_URL = "https://cilisousuo.cc"
+DETAIL_TOP_K = 5
+DETAIL_HEDGE_STAGGER_SECONDS = 0.3
+DETAIL_CACHE_EXPIRE_SECONDS = 3600
+# 详情页暂时没有磁力（页面未更新或被限流返回空页）时只短暂缓存，避免整整一小时拿不到磁力
+DETAIL_CACHE_MISS_EXPIRE_SECONDS = 60
+DETAIL_CACHE_MAX_SIZE = 1000
 
 
 # ===================== 相关性过滤逻辑 =====================
@@ -33,12 +47,7 @@ def _extract_code_parts(query: str) -> Optional[Tuple[str, str]]:
     """
     从查询中提取番号前缀和编号，例如 'dass-739' -> ('dass', '739')
     """
-    m = re.search(r"([A-Za-z]{2,})[-_\s]*0*(\d{2,})", query)
-    if not m:
-        return None
-    prefix = m.group(1)
-    number = m.group(2)
-    return prefix, number
+    return extract_code_parts(query)
 
 
 def _build_code_regex(prefix: str, number: str) -> Pattern:
@@ -49,8 +58,7 @@ def _build_code_regex(prefix: str, number: str) -> Pattern:
       - 编号允许前导0
       - 可选后缀（如 ch、C、UHD 等）不作为必要条件
     """
-    pattern = rf"(?<![A-Za-z0-9]){re.escape(prefix)}[-_\s]*0*{re.escape(number)}(?![A-Za-z0-9])"
-    return re.compile(pattern, re.IGNORECASE)
+    return build_code_regex(prefix, number)
 
 
 _COLLECTION_KEYWORDS = (
@@ -71,11 +79,7 @@ def _normalize_code(prefix: str, number: str) -> str:
     """
     规范化番号表示，例如 (dass, 0739) -> DASS-739
     """
-    try:
-        norm_num = str(int(number))  # 去除前导0
-    except ValueError:
-        norm_num = number
-    return f"{prefix.upper()}-{norm_num}"
+    return normalize_code(prefix, number)
 
 
 def _find_all_codes(text: str) -> set:
@@ -170,7 +174,27 @@ def _get_size_bytes_safe(result: 'SearchResult') -> Optional[float]:
 
 
 def filter_irrelevant(results: List['SearchResult'], query: str, allow_chinese_subtitles: bool = False) -> List['SearchResult']:
-    filtered = [r for r in results if is_relevant(r, query, allow_chinese_subtitles)]
+    """
+    批量版 is_relevant：整批候选一次分类后按列判断，规则与 is_relevant 一致
+    """
+    if not _FILTER_ENABLED:
+        return list(results)
+    tags = classify_candidates([r.title for r in results], [r.filename for r in results], query)
+    if not tags.query_has_code:
+        return list(results)
+
+    filtered: List['SearchResult'] = []
+    for index, result in enumerate(results):
+        if not tags.code_match[index]:
+            continue
+        if not _ALLOW_COLLECTIONS and tags.is_collection[index]:
+            continue
+        size_bytes = parse_size_to_bytes(result.size)
+        if size_bytes is not None and size_bytes > 15 * (1024 ** 3) and not tags.is_4k[index]:
+            continue
+        if not allow_chinese_subtitles and tags.has_subtitle[index]:
+            continue
+        filtered.append(result)
     dropped = len(results) - len(filtered)
     if dropped:
         logging.info("已过滤明显无关结果: %d", dropped)
@@ -206,6 +230,105 @@ async def fetch_text(client: httpx.AsyncClient, url: str) -> str:
     return resp.text
 
 
+# ===================== 详情页缓存与对冲抓取 =====================
+_detail_magnet_cache: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+
+
+def _get_cached_detail_magnet(detail_path: str) -> Tuple[bool, Optional[str]]:
+    """
+    按 detail_path 读取详情页解析结果，返回 (是否命中, 磁力链接)
+    """
+    entry = _detail_magnet_cache.pop(detail_path, None)
+    if entry is None:
+        return False, None
+    magnet, timestamp = entry
+    expire_seconds = DETAIL_CACHE_EXPIRE_SECONDS if magnet else DETAIL_CACHE_MISS_EXPIRE_SECONDS
+    if time.monotonic() - timestamp >= expire_seconds:
+        return False, None
+    _detail_magnet_cache[detail_path] = entry
+    return True, magnet
+
+
+def _set_cached_detail_magnet(detail_path: str, magnet: Optional[str]) -> None:
+    if not detail_path:
+        return
+    if detail_path in _detail_magnet_cache:
+        _detail_magnet_cache.pop(detail_path)
+    elif len(_detail_magnet_cache) >= DETAIL_CACHE_MAX_SIZE:
+        _detail_magnet_cache.popitem(last=False)
+    _detail_magnet_cache[detail_path] = (magnet, time.monotonic())
+
+
+def clear_detail_cache() -> None:
+    _detail_magnet_cache.clear()
+
+
+async def resolve_detail_magnet(client: httpx.AsyncClient, result: 'SearchResult') -> Optional[str]:
+    """
+    抓取详情页并解析磁力链接，结果按 detail_path 缓存，未解析到磁力时只短暂缓存
+    网络异常不缓存，由调用方决定是否记录日志
+    """
+    hit, magnet = _get_cached_detail_magnet(result.detail_path)
+    if not hit:
+        detail_html = await fetch_text(client, result.detail_url)
+        magnet = parse_detail_for_magnet(detail_html)
+        _set_cached_detail_magnet(result.detail_path, magnet)
+    result.magnet = magnet
+    return magnet
+
+
+async def fetch_first_resolved_detail(
+    client: httpx.AsyncClient,
+    candidates: List['SearchResult'],
+    stagger_seconds: float = DETAIL_HEDGE_STAGGER_SECONDS,
+) -> Optional['SearchResult']:
+    """
+    对冲抓取候选详情页：按排名错峰并发启动，返回排名最高且解析到磁力的候选，
+    其余尚未完成的请求会被取消
+    :param candidates: 已按优先级排序的候选
+    :param stagger_seconds: 相邻候选之间的启动间隔
+    """
+    if not candidates:
+        return None
+
+    async def fetch(index: int, result: 'SearchResult') -> Optional[str]:
+        hit, magnet = _get_cached_detail_magnet(result.detail_path)
+        if hit:
+            result.magnet = magnet
+            return magnet
+        if index and stagger_seconds > 0:
+            await asyncio.sleep(index * stagger_seconds)
+        return await resolve_detail_magnet(client, result)
+
+    tasks = [asyncio.create_task(fetch(index, result)) for index, result in enumerate(candidates)]
+    try:
+        # 按排名顺序等待：高排名失败后才轮到低排名，低排名请求已在后台提前启动
+        for result, task in zip(candidates, tasks):
+            try:
+                magnet = await task
+            except Exception as e:
+                logging.warning("获取详情失败 %s: %s", result.detail_path, e)
+                continue
+            if magnet:
+                return result
+        return None
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+def _rank_detail_candidates(results: List['SearchResult']) -> List['SearchResult']:
+    """
+    仅用列表页解析到的文件大小做预选，避免对所有结果抓详情
+    """
+    sized_results = [r for r in results if _get_size_bytes_safe(r) is not None]
+    sized_results.sort(key=lambda r: _get_size_bytes_safe(r) or -1, reverse=True)
+    return sized_results[:DETAIL_TOP_K] if sized_results else results[:DETAIL_TOP_K]
+
+
 def parse_list_html(html: str) -> List[SearchResult]:
     soup = BeautifulSoup(html, "html.parser")
     items = soup.find_all("li", class_="item")
@@ -328,7 +451,8 @@ def filter_4k_results(results: List[SearchResult]) -> List[SearchResult]:
     :param results: 搜索结果列表
     :return: 过滤后的结果列表
     """
-    filtered = [r for r in results if not is_4k_resource(r.title, r.filename)]
+    tags = classify_candidates([r.title for r in results], [r.filename for r in results])
+    filtered = [r for r, is_4k in zip(results, tags.is_4k) if not is_4k]
     dropped = len(results) - len(filtered)
     if dropped:
         logging.info("已过滤4K资源: %d", dropped)
@@ -352,7 +476,8 @@ def filter_results_by_subtitle(results: List[SearchResult], has_subtitle_filter:
         return results
 
     expected = has_subtitle_filter == "true"
-    filtered = [r for r in results if result_has_chinese_subtitle(r) == expected]
+    tags = classify_candidates([r.title for r in results], [r.filename for r in results])
+    filtered = [r for r, has_subtitle in zip(results, tags.has_subtitle) if has_subtitle == expected]
     logging.info("按字幕条件筛选后剩余 %d 个结果", len(filtered))
     return filtered
 
@@ -414,23 +539,11 @@ async def search_cilisousuo(query: str, resolve_detail: bool = True, limit: Opti
 
         # 如果只需要最佳结果，优先基于列表页文件大小选出少量候选，再抓详情
         if best_only:
-            # 仅用列表页解析到的文件大小做预选，避免对所有结果抓详情
-            sized_results = [r for r in results if _get_size_bytes_safe(r) is not None]
-            sized_results.sort(key=lambda r: _get_size_bytes_safe(r) or -1, reverse=True)
-
-            # 选择前若干名作为候选，按顺序依次抓详情，找到首个有效磁力立即返回
-            TOP_K = 5
-            candidates = sized_results[:TOP_K] if sized_results else results[:TOP_K]
-
-            for r in candidates:
-                try:
-                    detail_html = await fetch_text(client, r.detail_url)
-                    r.magnet = parse_detail_for_magnet(detail_html)
-                    if r.magnet:
-                        logging.info(f"已选择最佳源: {r.title} ({r.size})")
-                        return [r]
-                except Exception as e:
-                    logging.warning("获取详情失败 %s: %s", r.detail_path, e)
+            # 选择前若干名作为候选，错峰并发抓详情，返回排名最高的有效磁力
+            best = await fetch_first_resolved_detail(client, _rank_detail_candidates(results))
+            if best:
+                logging.info("已选择最佳源: %s (%s)", best.title, best.size)
+                return [best]
 
             logging.warning("未在候选中找到有效的磁力链接")
             return []
@@ -438,8 +551,7 @@ async def search_cilisousuo(query: str, resolve_detail: bool = True, limit: Opti
         # 返回全部结果时，才并发抓取所有详情
         async def fetch_detail(r: SearchResult) -> None:
             try:
-                detail_html = await fetch_text(client, r.detail_url)
-                r.magnet = parse_detail_for_magnet(detail_html)
+                await resolve_detail_magnet(client, r)
             except Exception as e:
                 logging.warning("获取详情失败 %s: %s", r.detail_path, e)
 
@@ -474,20 +586,11 @@ async def get_best_result(query: str, has_subtitle_filter: Optional[str] = None,
     if not results:
         return None
 
-    sized_results = [r for r in results if _get_size_bytes_safe(r) is not None]
-    sized_results.sort(key=lambda r: _get_size_bytes_safe(r) or -1, reverse=True)
-    candidates = sized_results[:5] if sized_results else results[:5]
-
     async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-        for result in candidates:
-            try:
-                detail_html = await fetch_text(client, result.detail_url)
-                result.magnet = parse_detail_for_magnet(detail_html)
-                if result.magnet:
-                    logging.info("已选择最佳源: %s (%s)", result.title, result.size)
-                    return result
-            except Exception as e:
-                logging.warning("获取详情失败 %s: %s", result.detail_path, e)
+        best = await fetch_first_resolved_detail(client, _rank_detail_candidates(results))
+    if best:
+        logging.info("已选择最佳源: %s (%s)", best.title, best.size)
+        return best
 
     logging.warning("未在候选中找到有效的磁力链接")
     return None
@@ -63,6 +63,9 @@ const {
 const Icon = ({ as: Component }) => Component ? <Component /> : null;
 
 const HEADER_BRAND_NAME = 'JavJaeger';
+// 浏览页封面卡片按该宽度请求缩略图
+const BROWSE_COVER_IMAGE_WIDTH = 480;
+const HISTORY_PAGE_LIMIT = 50;
 const HEADER_SLOGAN = '"人类的一切痛苦，都是因为性欲得不到满足" --弗洛伊德 峰';
 const HEADER_SLOGAN_QUOTE = '"人类的一切痛苦，都是因为性欲得不到满足"';
 const HEADER_SLOGAN_AUTHOR = ' --弗洛伊德 峰';
@@ -122,6 +125,10 @@ export default function JavPage() {
     const [movieDetailMap, setMovieDetailMap] = React.useState({});
     const [webdavConnected, setWebdavConnected] = React.useState(false);
     const [historyData, setHistoryData] = React.useState(null);
+    const [historyKeyword, setHistoryKeyword] = React.useState('');
+    const [historyPage, setHistoryPage] = React.useState({ keyword: '', nextCursor: null, matchedCount: 0, totalCount: 0 });
+    const [historyPageLoading, setHistoryPageLoading] = React.useState(false);
+    const historyRequestVersionRef = React.useRef(0);
     const [checkingHistoryLibrary, setCheckingHistoryLibrary] = React.useState(false);
     const [currentPage, setCurrentPage] = React.useState(1);
     const [lastFilterValues, setLastFilterValues] = React.useState(null);
@@ -1160,13 +1167,45 @@ export default function JavPage() {
         }
     };
 
-    const fetchHistory = async () => {
+    // 历史记录按下载时间倒序分页加载，关键字交给服务端检索
+    const fetchHistoryPage = async (keyword, cursor) => {
+        const queryParams = new URLSearchParams();
+        queryParams.set('limit', String(HISTORY_PAGE_LIMIT));
+        if (keyword) {
+            queryParams.set('q', keyword);
+        }
+        if (cursor) {
+            queryParams.set('cursor', cursor);
+        }
+        return fetchWithRetry(`/api/history/records?${queryParams.toString()}`);
+    };
+
+    const applyHistoryPage = (keyword, data, append) => {
+        const records = Array.isArray(data?.records) ? data.records : [];
+        setHistoryData(prev => (append ? [...(prev || []), ...records] : records));
+        setHistoryPage({
+            keyword,
+            nextCursor: data?.next_cursor || null,
+            matchedCount: Number(data?.matched_count) || 0,
+            totalCount: Number(data?.total_count) || 0,
+        });
+    };
+
+    const fetchHistory = async (keyword = '') => {
+        const normalizedKeyword = String(keyword || '').trim();
+        const requestVersion = historyRequestVersionRef.current + 1;
+        historyRequestVersionRef.current = requestVersion;
         setLoading(true);
         setViewMode('history');
         try {
-            const data = await fetchWithRetry('/api/history');
-            setHistoryData(data);
-            message.success('已加载历史记录');
+            const data = await fetchHistoryPage(normalizedKeyword, '');
+            if (historyRequestVersionRef.current !== requestVersion) {
+                return;
+            }
+            applyHistoryPage(normalizedKeyword, data, false);
+            if (!normalizedKeyword) {
+                message.success('已加载历史记录');
+            }
         } catch (error) {
             message.error('获取历史记录失败');
         } finally {
@@ -1174,6 +1213,25 @@ export default function JavPage() {
         }
     };
 
+    const loadMoreHistory = async () => {
+        const { keyword, nextCursor } = historyPage;
+        if (!nextCursor || historyPageLoading) {
+            return;
+        }
+        const requestVersion = historyRequestVersionRef.current;
+        setHistoryPageLoading(true);
+        try {
+            const data = await fetchHistoryPage(keyword, nextCursor);
+            if (historyRequestVersionRef.current === requestVersion) {
+                applyHistoryPage(keyword, data, true);
+            }
+        } catch (error) {
+            message.error('加载更多历史记录失败');
+        } finally {
+            setHistoryPageLoading(false);
+        }
+    };
+
     const handleClearHistory = async () => {
         setLoading(true);
         try {
@@ -1182,6 +1240,7 @@ export default function JavPage() {
             if (result.success) {
                 message.success('历史记录已清空');
                 setHistoryData([]);
+                setHistoryPage({ keyword: '', nextCursor: null, matchedCount: 0, totalCount: 0 });
             } else {
                 message.error('清空历史记录失败: ' + (result.message || '未知错误'));
             }
@@ -1234,7 +1293,10 @@ export default function JavPage() {
             if (result.success) {
                 const checkedRecords = result.records || [];
                 const missingRecords = result.missing_records || checkedRecords.filter((record) => record.needs_reselect);
+                historyRequestVersionRef.current += 1;
                 setHistoryData(checkedRecords);
+                setHistoryKeyword('');
+                setHistoryPage({ keyword: '', nextCursor: null, matchedCount: checkedRecords.length, totalCount: checkedRecords.length });
                 if (missingRecords.length === 0) {
                     message.success(result.message || '历史记录均已入库');
                     return;
@@ -1433,14 +1495,23 @@ export default function JavPage() {
     };
 
     const renderHistory = () => {
+        const historyEmpty = !historyData || (historyData.length === 0 && !historyPage.totalCount);
         return (
             <div>
                 <div className="jav-section-header">
                     <Title level={4} style={{ margin: 0 }}>历史下载记录</Title>
                     <Space>
+                        <Input.Search
+                            allowClear
+                            placeholder="搜索番号、标题、演员或来源"
+                            value={historyKeyword}
+                            onChange={(event) => setHistoryKeyword(event.target.value)}
+                            onSearch={(value) => fetchHistory(value)}
+                            style={{ width: 240 }}
+                        />
                         <Button
                             icon={<Icon as={SafetyCertificateOutlined} />}
-                            disabled={!historyData || historyData.length === 0}
+                            disabled={historyEmpty}
                             loading={checkingHistoryLibrary}
                             onClick={handleCheckHistoryLocalLibrary}
                         >
@@ -1452,7 +1523,7 @@ export default function JavPage() {
                             okText="确定"
                             cancelText="取消"
                         >
-                            <Button danger disabled={!historyData || historyData.length === 0} loading={loading}>清空历史记录</Button>
+                            <Button danger disabled={historyEmpty} loading={loading}>清空历史记录</Button>
                         </Popconfirm>
                         <Button icon={<Icon as={ArrowLeftOutlined} />} onClick={() => setViewMode('search')}>返回查询</Button>
                     </Space>
@@ -1557,6 +1628,17 @@ export default function JavPage() {
                         }
                     ]}
                 />
+                {historyData && (
+                    <div style={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', marginTop: 12 }}>
+                        <Text type="secondary">
+                            已加载 {historyData.length}/{historyPage.matchedCount || historyData.length} 条
+                            {historyPage.keyword ? `，共 ${historyPage.totalCount} 条历史记录` : ''}
+                        </Text>
+                        {historyPage.nextCursor && (
+                            <Button loading={historyPageLoading} onClick={loadMoreHistory}>加载更多</Button>
+                        )}
+                    </div>
+                )}
             </div>
         );
     };
@@ -1606,7 +1688,7 @@ export default function JavPage() {
         const isMovieDownloaded = movie.status === 'local_exists' || movie.status === 'already_downloaded' || movie.is_downloaded || movie.in_local_library;
         const rawMovieImage = (movie && movie.img) || (detail && detail.img) || '';
         const movieImage = rawMovieImage && /^https?:/i.test(rawMovieImage)
-            ? `/api/image-proxy?url=${encodeURIComponent(rawMovieImage)}`
+            ? `/api/image-proxy?url=${encodeURIComponent(rawMovieImage)}&w=${BROWSE_COVER_IMAGE_WIDTH}`
             : rawMovieImage;
         const showImage = movieImage && !movieImageLoadErrorMap[movie.id];
         const stars = detail && detail.stars ? detail.stars.map(s => s.name || s).filter(Boolean) : [];
@@ -2349,7 +2431,7 @@ export default function JavPage() {
                                     type="default"
                                     block
                                     icon={<Icon as={HistoryOutlined} />}
-                                    onClick={fetchHistory}
+                                    onClick={() => fetchHistory(historyKeyword)}
                                     className="jav-sidebar-action"
                                 >
                                     查看历史记录
@@ -47,6 +47,12 @@ const INFORMATION_CHECK_STORAGE_KEY = "javjaeger.localLibrary.informationCheckFi
 const LOCAL_LIBRARY_THEME_STORAGE_KEY = "javjaeger.localLibrary.theme";
 const LOCAL_LIBRARY_GRID_PAGE_SIZE = 30;
 const LOCAL_LIBRARY_LIST_DEFAULT_PAGE_SIZE = 20;
+// 排序与筛选都在服务端完成；首屏只取一页轻量列表行，滚动或翻页接近已加载末尾时再按游标取下一页
+const LOCAL_LIBRARY_FIRST_PAGE_LIMIT = 120;
+const LOCAL_LIBRARY_NEXT_PAGE_LIMIT = 120;
+const LOCAL_LIBRARY_FILTER_KEYS = ["genres", "stars", "studios", "publishers", "series", "years", "roots"];
+// 卡片与列表封面按显示宽度请求缩略图，后端按宽度档位生成 WebP/JPEG
+const LOCAL_LIBRARY_CARD_IMAGE_WIDTH = 320;
 const LOCAL_LIBRARY_SORT_OPTIONS = [
     { label: "发行日期 新到旧", value: "date_desc" },
     { label: "发行日期 旧到新", value: "date_asc" },
@@ -193,78 +199,6 @@ const primaryMediaInfo = (record) => {
     }, {});
 };
 
-const sortableText = (value) => String(value || "").trim().toLowerCase();
-const sortableTime = (value) => {
-    const time = Date.parse(String(value || ""));
-    return Number.isFinite(time) ? time : 0;
-};
-const compareText = (left, right, direction = "asc") => {
-    const result = sortableText(left).localeCompare(sortableText(right), "zh-CN", { numeric: true, sensitivity: "base" });
-    return direction === "desc" ? -result : result;
-};
-const compareNumber = (left, right, direction = "desc") => {
-    const leftNumber = Number(left) || 0;
-    const rightNumber = Number(right) || 0;
-    if (leftNumber === rightNumber) return 0;
-    if (leftNumber === 0) return 1;
-    if (rightNumber === 0) return -1;
-    return direction === "asc" ? leftNumber - rightNumber : rightNumber - leftNumber;
-};
-const recordResolutionPixels = (record) => {
-    const mediaInfo = primaryMediaInfo(record);
-    return Number(mediaInfo?.resolution_pixels || 0) || Number(mediaInfo?.width || 0) * Number(mediaInfo?.height || 0);
-};
-
-const sortLocalLibraryRecords = (records, sortRule) => {
-    const comparator = (left, right) => {
-        let result = 0;
-        switch (sortRule) {
-            case "date_asc":
-                result = compareNumber(sortableTime(left.date), sortableTime(right.date), "asc");
-                break;
-            case "updated_desc":
-                result = compareNumber(sortableTime(left.updated_at), sortableTime(right.updated_at), "desc");
-                break;
-            case "first_seen_desc":
-                result = compareNumber(sortableTime(left.first_seen_at), sortableTime(right.first_seen_at), "desc");
-                break;
-            case "movie_id_asc":
-                result = compareText(left.movie_id, right.movie_id, "asc");
-                break;
-            case "movie_id_desc":
-                result = compareText(left.movie_id, right.movie_id, "desc");
-                break;
-            case "title_asc":
-                result = compareText(left.title || left.movie_id, right.title || right.movie_id, "asc");
-                break;
-            case "size_desc":
-                result = compareNumber(left.total_size, right.total_size, "desc");
-                break;
-            case "size_asc":
-                result = compareNumber(left.total_size, right.total_size, "asc");
-                break;
-            case "file_count_desc":
-                result = compareNumber(left.file_count, right.file_count, "desc");
-                break;
-            case "resolution_desc":
-                result = compareNumber(recordResolutionPixels(left), recordResolutionPixels(right), "desc");
-                break;
-            case "bitrate_desc":
-                result = compareNumber(primaryMediaInfo(left)?.bitrate, primaryMediaInfo(right)?.bitrate, "desc");
-                break;
-            case "date_desc":
-            default:
-                result = compareNumber(sortableTime(left.date), sortableTime(right.date), "desc");
-                break;
-        }
-        return result || compareText(left.movie_id, right.movie_id, "asc");
-    };
-    return records
-        .map((record, index) => ({ record, index }))
-        .sort((left, right) => comparator(left.record, right.record) || left.index - right.index)
-        .map((item) => item.record);
-};
-
 const renderMediaTags = (mediaInfo) => {
     const resolution = formatResolution(mediaInfo);
     const bitrate = formatBitrate(mediaInfo?.bitrate);
@@ -283,34 +217,10 @@ const renderMediaTags = (mediaInfo) => {
     );
 };
 
-const countedOptions = (records, getter) => {
-    const counts = new Map();
-    records.forEach((record) => {
-        const value = getter(record);
-        const values = Array.isArray(value) ? value : [value];
-        values.filter(Boolean).forEach((item) => {
-            const key = String(item).trim();
-            if (!key) return;
-            counts.set(key, (counts.get(key) || 0) + 1);
-        });
-    });
-    return Array.from(counts.entries())
-        .sort((a, b) => b[1] - a[1] || a[0].localeCompare(b[0]))
-        .slice(0, 80)
-        .map(([value, count]) => ({
-            label: `${value} (${count})`,
-            value,
-        }));
-};
-
-const matchesAny = (recordValues, selectedValues) => {
-    if (!selectedValues || selectedValues.length === 0) {
-        return true;
-    }
-    const values = Array.isArray(recordValues) ? recordValues : [recordValues].filter(Boolean);
-    const normalized = new Set(values.map((value) => String(value)));
-    return selectedValues.some((value) => normalized.has(String(value)));
-};
+const facetOptions = (facets) => (facets || []).map((item) => ({
+    label: `${item.value} (${item.count})`,
+    value: item.value,
+}));
 
 const posterSource = (record) => {
     if (record?.poster_url) {
@@ -329,6 +239,14 @@ const proxiedImageSource = (url) => {
         : `/api/image-proxy?url=${encodeURIComponent(url)}`;
 };
 
+const sizedImageSource = (url, width) => {
+    if (!url || !width || !url.startsWith("/api/")) {
+        return url;
+    }
+    const pixelWidth = Math.round(width * Math.min(window.devicePixelRatio || 1, 2));
+    return `${url}${url.includes("?") ? "&" : "?"}w=${pixelWidth}`;
+};
+
 const thumbnailSource = (record) => {
     const thumbnailUrl = record?.thumbnail_url || "";
     if (thumbnailUrl.startsWith("/api/")) {
@@ -381,7 +299,8 @@ const actorAvatarSources = (record, actor) => {
 };
 
 const MoviePoster = ({ record, compact = false, width = null, variant = "poster", onRatio = null }) => {
-    const src = variant === "thumbnail" ? thumbnailSource(record) || posterSource(record) : posterSource(record);
+    const baseSrc = variant === "thumbnail" ? thumbnailSource(record) || posterSource(record) : posterSource(record);
+    const src = variant === "thumbnail" ? sizedImageSource(baseSrc, width || LOCAL_LIBRARY_CARD_IMAGE_WIDTH) : baseSrc;
     const [failed, setFailed] = React.useState(false);
     const [imageLoading, setImageLoading] = React.useState(!!src);
     const style = width ? { width, height: compact ? Math.round(width * 1.5) : undefined } : undefined;
@@ -511,6 +430,8 @@ export default function LocalLibraryPage() {
     });
     const [informationCheckForm] = Form.useForm();
     const [informationDownloadForm] = Form.useForm();
+    const libraryLoadIdRef = React.useRef(0);
+    const libraryPageLoadingRef = React.useRef(false);
     const gridPageLoadingTimerRef = React.useRef(null);
     const listPageLoadingTimerRef = React.useRef(null);
     const gridAutoLoadSentinelRef = React.useRef(null);
@@ -569,15 +490,16 @@ export default function LocalLibraryPage() {
         }, {});
     }, [informationCheck]);
 
-    const filterOptions = React.useMemo(() => ({
-        genres: countedOptions(records, (record) => record.genres),
-        stars: countedOptions(records, (record) => record.stars),
-        studios: countedOptions(records, (record) => record.studio),
-        publishers: countedOptions(records, (record) => record.publisher),
-        series: countedOptions(records, (record) => record.series),
-        years: countedOptions(records, (record) => String(record.date || "").slice(0, 4)),
-        roots: countedOptions(records, (record) => record.scan_roots),
-    }), [records]);
+    // 筛选项统计由服务端按整个影视库计算，只随首页返回
+    const filterOptions = React.useMemo(() => (library.facets ? {
+        genres: facetOptions(library.facets.genres),
+        stars: facetOptions(library.facets.stars),
+        studios: facetOptions(library.facets.studios),
+        publishers: facetOptions(library.facets.publishers),
+        series: facetOptions(library.facets.series),
+        years: facetOptions(library.facets.years),
+        roots: facetOptions(library.facets.roots),
+    } : {}), [library.facets]);
 
     const activeFilterCount = React.useMemo(() => (
         Object.entries(filters).reduce((count, [key, value]) => {
@@ -588,40 +510,31 @@ export default function LocalLibraryPage() {
         }, 0)
     ), [filters]);
 
-    const filteredRecords = React.useMemo(() => {
-        const keyword = filters.keyword.trim().toLowerCase();
-        return records.filter((record) => {
-            if (keyword) {
-                const text = `${record.movie_id || ""}\n${record.title || ""}\n${record.full_text || ""}`.toLowerCase();
-                if (!text.includes(keyword)) {
-                    return false;
-                }
-            }
-            return (
-                matchesAny(record.genres, filters.genres) &&
-                matchesAny(record.stars, filters.stars) &&
-                matchesAny(record.studio, filters.studios) &&
-                matchesAny(record.publisher, filters.publishers) &&
-                matchesAny(record.series, filters.series) &&
-                matchesAny(String(record.date || "").slice(0, 4), filters.years) &&
-                matchesAny(record.scan_roots, filters.roots)
-            );
-        });
-    }, [records, filters]);
-    const sortedRecords = React.useMemo(() => sortLocalLibraryRecords(filteredRecords, sortRule), [filteredRecords, sortRule]);
-    const maxGridPage = Math.max(1, Math.ceil(sortedRecords.length / LOCAL_LIBRARY_GRID_PAGE_SIZE));
+    // 关键词（含全文）、筛选项与排序都交给服务端，列表行按返回顺序展示
+    const libraryQuery = React.useMemo(() => ({
+        keyword: filters.keyword.trim(),
+        sort: sortRule,
+        filters: LOCAL_LIBRARY_FILTER_KEYS.reduce((result, key) => ({ ...result, [key]: filters[key] || [] }), {}),
+    }), [filters, sortRule]);
+    const sortedRecords = records;
+    const matchedCount = Math.max(Number(library.matched_count) || 0, sortedRecords.length);
+    const maxGridPage = Math.max(1, Math.ceil(matchedCount / LOCAL_LIBRARY_GRID_PAGE_SIZE));
     const gridVisibleCount = Math.min(gridPage * LOCAL_LIBRARY_GRID_PAGE_SIZE, sortedRecords.length);
     const visibleGridRecords = React.useMemo(() => sortedRecords.slice(0, gridVisibleCount), [sortedRecords, gridVisibleCount]);
-    const maxListPage = Math.max(1, Math.ceil(sortedRecords.length / listPageSize));
+    const maxListPage = Math.max(1, Math.ceil(matchedCount / listPageSize));
     const listVisibleCount = Math.min(listPage * listPageSize, sortedRecords.length);
     const visibleListRecords = React.useMemo(() => sortedRecords.slice(0, listVisibleCount), [sortedRecords, listVisibleCount]);
-    const hasMoreGridRecords = gridVisibleCount < sortedRecords.length;
-    const hasMoreListRecords = listVisibleCount < sortedRecords.length;
+    const hasMoreGridRecords = gridVisibleCount < matchedCount;
+    const hasMoreListRecords = listVisibleCount < matchedCount;
+    // 当前视图需要的行数（多预取一页）超过已加载行数时，按游标请求下一页
+    const neededRecordCount = viewMode === "grid"
+        ? (gridPage + 1) * LOCAL_LIBRARY_GRID_PAGE_SIZE
+        : (listPage + 1) * listPageSize;
 
     React.useEffect(() => {
         setGridPage(1);
         setListPage(1);
-    }, [records, filters, sortRule]);
+    }, [library.loadId, filters, sortRule]);
 
     React.useEffect(() => () => {
         if (gridPageLoadingTimerRef.current) {
@@ -663,7 +576,7 @@ export default function LocalLibraryPage() {
 
     const handleListPageChange = (page, size = listPageSize) => {
         const nextPageSize = Number(size) || LOCAL_LIBRARY_LIST_DEFAULT_PAGE_SIZE;
-        const nextMaxPage = Math.max(1, Math.ceil(sortedRecords.length / nextPageSize));
+        const nextMaxPage = Math.max(1, Math.ceil(matchedCount / nextPageSize));
         setListPageSize(nextPageSize);
         setListPage(Math.max(1, Math.min(Number(page) || 1, nextMaxPage)));
         startListPageLoading();
@@ -775,23 +688,79 @@ export default function LocalLibraryPage() {
         }
     };
 
-    const loadLibrary = async () => {
+    const fetchLibraryPage = async (query, cursor, limit) => {
+        const queryParams = new URLSearchParams();
+        queryParams.set("sort", query.sort);
+        queryParams.set("limit", String(limit));
+        if (query.keyword) {
+            queryParams.set("q", query.keyword);
+        }
+        LOCAL_LIBRARY_FILTER_KEYS.forEach((key) => {
+            (query.filters[key] || []).forEach((value) => queryParams.append(key, value));
+        });
+        if (cursor) {
+            queryParams.set("cursor", cursor);
+        }
+        const response = await fetch(`/api/movies/local-library/summary?${queryParams.toString()}`);
+        const data = await response.json();
+        if (!data.success) {
+            throw new Error(data.message || "加载失败");
+        }
+        return data;
+    };
+
+    const loadLibrary = async (query = libraryQuery) => {
+        const loadId = libraryLoadIdRef.current + 1;
+        libraryLoadIdRef.current = loadId;
+        libraryPageLoadingRef.current = false;
         setLoading(true);
         try {
-            const response = await fetch("/api/movies/local-library");
-            const data = await response.json();
-            if (!data.success) {
-                throw new Error(data.message || "加载失败");
+            const firstPage = await fetchLibraryPage(query, "", LOCAL_LIBRARY_FIRST_PAGE_LIMIT);
+            if (libraryLoadIdRef.current !== loadId) {
+                return;
             }
-            setLibrary(data);
-            await loadActorLibrary();
+            setLibrary({ ...firstPage, query, loadId });
         } catch (error) {
             message.error(`影视库加载失败：${error.message}`);
+            return;
         } finally {
             setLoading(false);
         }
+        await loadActorLibrary();
     };
 
+    const loadMoreLibraryRecords = async () => {
+        const { loadId, query, next_cursor: cursor } = library;
+        if (!cursor || !query || libraryPageLoadingRef.current) {
+            return;
+        }
+        libraryPageLoadingRef.current = true;
+        try {
+            const page = await fetchLibraryPage(query, cursor, LOCAL_LIBRARY_NEXT_PAGE_LIMIT);
+            if (libraryLoadIdRef.current !== loadId) {
+                return;
+            }
+            setLibrary((current) => ({
+                ...current,
+                records: [...(current.records || []), ...(page.records || [])],
+                next_cursor: page.next_cursor,
+                matched_count: page.matched_count,
+            }));
+        } catch (error) {
+            message.error(`影视库加载失败：${error.message}`);
+        } finally {
+            if (libraryLoadIdRef.current === loadId) {
+                libraryPageLoadingRef.current = false;
+            }
+        }
+    };
+
+    React.useEffect(() => {
+        if (library.next_cursor && neededRecordCount > sortedRecords.length) {
+            loadMoreLibraryRecords();
+        }
+    }, [library.next_cursor, neededRecordCount, sortedRecords.length]);
+
     const openInformationCheck = () => {
         const saved = loadInformationCheckSettings();
         setInformationCheckFields(saved.fields);
@@ -843,14 +812,23 @@ export default function LocalLibraryPage() {
     };
 
     React.useEffect(() => {
-        loadLibrary();
-    }, []);
+        loadLibrary(libraryQuery);
+    }, [libraryQuery]);
 
-    const openRecordPreview = (record) => {
+    const openRecordPreview = async (record) => {
         setSelectedRecord(record);
         setPlayingRecordKey("");
         setSelectedPlayFileIndex(0);
         window.scrollTo({ top: 0, behavior: "smooth" });
+        try {
+            const response = await fetch(`/api/movies/local-library/${encodeURIComponent(record.movie_id)}`);
+            const data = await response.json();
+            if (data.success && data.record) {
+                setSelectedRecord((current) => (current?.movie_id === record.movie_id ? data.record : current));
+            }
+        } catch (error) {
+            message.error(`影片详情加载失败：${error.message}`);
+        }
     };
 
     const closeRecordPreview = () => {
@@ -1565,7 +1543,7 @@ export default function LocalLibraryPage() {
                         <Button icon={<Icon as={SearchOutlined} />} onClick={openInformationCheck} loading={checkingInformation}>
                             检查信息
                         </Button>
-                        <Button icon={<Icon as={ReloadOutlined} />} onClick={loadLibrary} loading={loading}>
+                        <Button icon={<Icon as={ReloadOutlined} />} onClick={() => loadLibrary()} loading={loading}>
                             刷新
                         </Button>
                         <Popconfirm
@@ -1615,7 +1593,7 @@ export default function LocalLibraryPage() {
                         </div>
                         <div className="jav-kpi-card">
                             <span className="jav-kpi-label">筛选</span>
-                            <strong>{filteredRecords.length}</strong>
+                            <strong>{matchedCount}</strong>
                             <span className="jav-kpi-note">当前结果</span>
                         </div>
                         <div className="jav-kpi-card">
@@ -1645,12 +1623,12 @@ export default function LocalLibraryPage() {
                             <>
                                 <div className="jav-library-grid-toolbar">
                                     <Text type="secondary">
-                                        {gridVisibleCount > 0 ? `1-${gridVisibleCount}` : 0} / {sortedRecords.length}
+                                        {gridVisibleCount > 0 ? `1-${gridVisibleCount}` : 0} / {matchedCount}
                                     </Text>
                                     <Pagination
                                         current={gridPage}
                                         pageSize={LOCAL_LIBRARY_GRID_PAGE_SIZE}
-                                        total={sortedRecords.length}
+                                        total={matchedCount}
                                         showSizeChanger={false}
                                         onChange={handleGridPageChange}
                                     />
@@ -1715,13 +1693,13 @@ export default function LocalLibraryPage() {
                                     className="jav-library-grid-pagination-bottom"
                                     current={gridPage}
                                     pageSize={LOCAL_LIBRARY_GRID_PAGE_SIZE}
-                                    total={sortedRecords.length}
+                                    total={matchedCount}
                                     showSizeChanger={false}
                                     onChange={handleGridPageChange}
                                 />
                                 {renderAutoLoadFooter({
                                     visibleCount: gridVisibleCount,
-                                    total: sortedRecords.length,
+                                    total: matchedCount,
                                     hasMore: hasMoreGridRecords,
                                     loading: gridPageLoading,
                                     onLoadMore: loadNextGridPage,
@@ -1753,7 +1731,7 @@ export default function LocalLibraryPage() {
                                     className="jav-library-list-pagination-bottom"
                                     current={listPage}
                                     pageSize={listPageSize}
-                                    total={sortedRecords.length}
+                                    total={matchedCount}
                                     showSizeChanger
                                     pageSizeOptions={[10, 20, 30, 50, 100]}
                                     showTotal={(total) => `${listVisibleCount} / ${total}`}
@@ -1762,7 +1740,7 @@ export default function LocalLibraryPage() {
                                 />
                                 {renderAutoLoadFooter({
                                     visibleCount: listVisibleCount,
-                                    total: sortedRecords.length,
+                                    total: matchedCount,
                                     hasMore: hasMoreListRecords,
                                     loading: listPageLoading,
                                     onLoadMore: loadNextListPage,
@@ -6,13 +6,17 @@ from starlette.middleware.sessions import SessionMiddleware
 
 from modules.automation.router import router as automation_router
 from modules.automation.service import automation_service
+from modules.common.image_download import image_client_pool, image_validator_store
 from modules.common.runtime import SESSION_SECRET, VERSION_INFO, is_frontend_cache_disabled
 from modules.history.router import router as history_router
-from modules.history.service import download_history_service
+from modules.history.service import download_history_service, local_actor_library_service, local_movie_library_service
 from modules.javbus_api import javbus_api_service
 from modules.javbus_api.router import router as javbus_api_router
 from modules.magnets.router import router as magnets_router
+from modules.movies.library_watcher import local_library_watcher
+from modules.movies.media_probe import video_probe_service
 from modules.movies.router import router as movies_router
+from modules.movies.scrape_cache import metadata_scrape_cache
 from modules.pan115.router import router as pan115_router
 from modules.pikpak.router import router as pikpak_router
 from modules.proxy.router import router as proxy_router
@@ -64,7 +68,9 @@ async def startup_event():
     logger.info("JavJaeger 应用启动中...")
     await javbus_api_service.startup()
     await download_history_service.load_records()
+    await metadata_scrape_cache.startup()
     await automation_service.startup()
+    await local_library_watcher.startup()
     logger.info("JavJaeger 应用启动完成")
 
 
@@ -72,6 +78,13 @@ async def startup_event():
 async def shutdown_event():
     await javbus_api_service.shutdown()
     await automation_service.shutdown()
+    await local_library_watcher.shutdown()
+    await local_actor_library_service.shutdown()
+    await local_movie_library_service.sync()
+    video_probe_service.sync()
+    await image_client_pool.aclose()
+    image_validator_store.sync()
+    await metadata_scrape_cache.shutdown()
     await webdav_session_store.close_all()
 
 
@@ -1,11 +1,17 @@
 import asyncio
 import base64
+import json
 import logging
+import os
+import tempfile
+import threading
+import time
 from pathlib import Path
 from typing import Any
 
 import httpx
 
+from modules.common.json_files import default_file_mode, write_json_atomic
 from modules.common.runtime import get_javbus_config
 
 
@@ -22,6 +28,17 @@ IMAGE_DOWNLOAD_HEADERS = {
 }
 DEFAULT_IMAGE_DOWNLOAD_ATTEMPTS = 3
 DEFAULT_IMAGE_DOWNLOAD_BACKOFF_SECONDS = 0.25
+IMAGE_DOWNLOAD_TIMEOUT_SECONDS = 20.0
+IMAGE_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# 每个代理设置一个长连接客户端，同一图床的多次下载复用 TCP/TLS 连接
+IMAGE_CLIENT_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=8, keepalive_expiry=30.0)
+# 覆盖下载时按 ETag/Last-Modified 发条件请求；校验信息最多保留的条数与落盘间隔
+IMAGE_VALIDATOR_MAX_ENTRIES = 50000
+IMAGE_VALIDATOR_SAVE_INTERVAL_SECONDS = 5.0
+
+
+class ImageDownloadError(Exception):
+    pass
 
 
 def image_download_headers(javbus_config: dict[str, Any]) -> dict[str, str]:
@@ -32,6 +49,169 @@ def image_download_headers(javbus_config: dict[str, Any]) -> dict[str, str]:
     return headers
 
 
+class ImageClientPool:
+    """按代理地址复用 httpx.AsyncClient；客户端绑定创建时的事件循环，循环变化后重新创建"""
+
+    def __init__(self) -> None:
+        self._clients: dict[str, tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+    def get(self, proxy: str | None) -> httpx.AsyncClient:
+        key = str(proxy or "")
+        current_loop = asyncio.get_running_loop()
+        entry = self._clients.get(key)
+        if entry is not None and entry[0] is current_loop and not entry[1].is_closed:
+            return entry[1]
+        kwargs: dict[str, Any] = {
+            "timeout": IMAGE_DOWNLOAD_TIMEOUT_SECONDS,
+            "follow_redirects": True,
+            "limits": IMAGE_CLIENT_LIMITS,
+        }
+        if proxy:
+            kwargs["proxy"] = proxy
+        client = httpx.AsyncClient(**kwargs)
+        self._clients[key] = (current_loop, client)
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        current_loop = asyncio.get_running_loop()
+        for loop, client in clients.values():
+            if loop is not current_loop or client.is_closed:
+                continue
+            try:
+                await client.aclose()
+            except RuntimeError:
+                logger.debug("Image download client loop was already closed")
+
+
+class ImageValidatorStore:
+    """
+    记录已下载图片的来源 URL 与 ETag/Last-Modified，按 (路径, 大小, mtime_ns) 校验本地文件未被改动
+    覆盖下载同一 URL 时据此发条件请求，服务器返回 304 时保留本地文件不再传输
+    """
+
+    def __init__(self, file_path: str = "data/image_validators.json") -> None:
+        self.file_path = file_path
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        # 保证先取的快照先落盘，并发保存时不会用旧快照覆盖新快照
+        self._save_lock = threading.Lock()
+
+    def _load_locked(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as exc:
+            logger.warning("加载图片校验信息失败 %s: %s", self.file_path, exc)
+            return
+        entries = data.get("entries") if isinstance(data, dict) else None
+        if isinstance(entries, dict):
+            self._entries = {str(path): entry for path, entry in entries.items() if isinstance(entry, dict)}
+
+    def get(self, target: Path, url: str) -> dict[str, str]:
+        """返回条件请求头；来源 URL 不同或本地文件与记录的大小、mtime 不一致时返回空字典"""
+        try:
+            stat = os.stat(target)
+        except OSError:
+            return {}
+        with self._lock:
+            self._load_locked()
+            entry = self._entries.get(os.path.abspath(str(target)))
+        if not entry or entry.get("url") != url:
+            return {}
+        if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = str(entry["etag"])
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = str(entry["last_modified"])
+        return headers
+
+    def store(self, target: Path, url: str, etag: str | None, last_modified: str | None) -> None:
+        """只在内存中记录，落盘由 flush_if_due 或 sync 在线程中完成"""
+        key = os.path.abspath(str(target))
+        with self._lock:
+            self._load_locked()
+            if not etag and not last_modified:
+                if self._entries.pop(key, None) is not None:
+                    self._dirty = True
+                return
+            try:
+                stat = os.stat(target)
+            except OSError:
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = {
+                "url": url,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "etag": etag or "",
+                "last_modified": last_modified or "",
+            }
+            while len(self._entries) > IMAGE_VALIDATOR_MAX_ENTRIES:
+                self._entries.pop(next(iter(self._entries)))
+            self._dirty = True
+
+    async def flush_if_due(self) -> None:
+        """距上次落盘超过间隔时在线程中保存，不阻塞事件循环"""
+        if self._dirty and time.monotonic() - self._saved_at >= IMAGE_VALIDATOR_SAVE_INTERVAL_SECONDS:
+            await asyncio.to_thread(self.sync)
+
+    def sync(self) -> None:
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                entries = dict(self._entries)
+                self._dirty = False
+                self._saved_at = time.monotonic()
+            try:
+                write_json_atomic(self.file_path, {"version": 1, "entries": entries})
+            except OSError as exc:
+                logger.warning("保存图片校验信息失败 %s: %s", self.file_path, exc)
+                with self._lock:
+                    self._dirty = True
+
+
+image_client_pool = ImageClientPool()
+image_validator_store = ImageValidatorStore()
+
+
+async def _stream_to_file(response: httpx.Response, target: Path) -> None:
+    """分块写入同目录临时文件，长度核对无误后原子替换目标，中途失败不会留下半个文件"""
+    fd, temp_path = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".part", dir=target.parent)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            async for chunk in response.aiter_bytes(IMAGE_DOWNLOAD_CHUNK_SIZE):
+                file.write(chunk)
+            written = file.tell()
+        if written <= 0:
+            raise ImageDownloadError("empty image response")
+        # Content-Length 是传输的原始字节数，压缩响应改用 httpx 统计的已接收字节对比
+        expected = response.headers.get("content-length")
+        encoding = response.headers.get("content-encoding", "").strip().lower()
+        received = written if encoding in ("", "identity") else response.num_bytes_downloaded
+        if expected and expected.isdigit() and received != int(expected):
+            raise ImageDownloadError(f"incomplete image response: {received}/{expected} bytes")
+        os.chmod(temp_path, default_file_mode(str(target)))
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 async def download_image(url: str, target: Path, overwrite: bool) -> str | None:
     if not url:
         return None
@@ -45,10 +225,9 @@ async def download_image(url: str, target: Path, overwrite: bool) -> str | None:
 
     javbus_config = get_javbus_config()
     headers = image_download_headers(javbus_config)
-    client_kwargs: dict[str, Any] = {"timeout": 20.0, "follow_redirects": True}
-    proxy = javbus_config.get("proxy")
-    if proxy:
-        client_kwargs["proxy"] = proxy
+    if target.exists():
+        headers.update(image_validator_store.get(target, url))
+    proxy = javbus_config.get("proxy") or None
 
     retry_attempts_value = javbus_config.get("image_retry_attempts")
     try:
@@ -71,10 +250,19 @@ async def download_image(url: str, target: Path, overwrite: bool) -> str | None:
     last_exc: Exception | None = None
     for attempt in range(1, retry_attempts + 1):
         try:
-            async with httpx.AsyncClient(**client_kwargs) as client:
-                response = await client.get(url, headers=headers)
+            client = image_client_pool.get(proxy)
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and target.exists():
+                    return target.name
                 response.raise_for_status()
-                target.write_bytes(response.content)
+                await _stream_to_file(response, target)
+                image_validator_store.store(
+                    target,
+                    url,
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                )
+            await image_validator_store.flush_if_due()
             return target.name
         except Exception as exc:
             last_exc = exc
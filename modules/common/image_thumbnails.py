@@ -0,0 +1,226 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+try:
+    from PIL import Image, ImageOps
+except ModuleNotFoundError:
+    Image = None
+    ImageOps = None
+
+
+logger = logging.getLogger(__name__)
+
+# 请求的宽度向上取整到固定档位，同一张图最多生成这几种尺寸
+THUMBNAIL_WIDTH_BUCKETS = (160, 240, 320, 480, 640, 960, 1280)
+THUMBNAIL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# 超出上限后按最近使用时间淘汰到上限的该比例，避免每次写入都触发淘汰
+THUMBNAIL_CACHE_EVICT_RATIO = 0.9
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+# 本地封面可能被重新下载覆盖且地址不带版本，浏览器每次按 ETag 重新验证；远程封面地址不变内容即不变
+LOCAL_IMAGE_CACHE_CONTROL = "no-cache"
+REMOTE_IMAGE_CACHE_CONTROL = "public, max-age=2592000, immutable"
+THUMBNAIL_FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+
+ThumbnailRenderer = Callable[[Path | bytes, int, str], bytes | None]
+
+
+def bucket_width(width: int | None) -> int | None:
+    if not width or width <= 0:
+        return None
+    for bucket in THUMBNAIL_WIDTH_BUCKETS:
+        if width <= bucket:
+            return bucket
+    return THUMBNAIL_WIDTH_BUCKETS[-1]
+
+
+def thumbnail_format(accept: str) -> str:
+    return "webp" if "image/webp" in str(accept or "").lower() else "jpeg"
+
+
+def render_thumbnail(source: Path | bytes, width: int, image_format: str) -> bytes | None:
+    """按宽度等比缩小并编码为 WebP/JPEG；原图不比目标宽时只转码不放大"""
+    try:
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as opened:
+            if opened.format == "JPEG":
+                # JPEG 可以在解码时直接按 1/2、1/4、1/8 缩小，大图解码快得多
+                opened.draft("RGB", (width, width * 4))
+            image = ImageOps.exif_transpose(opened)
+            if image.width > width:
+                image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            pillow_format = THUMBNAIL_FORMATS[image_format][0]
+            if pillow_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            elif pillow_format == "WEBP" and image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            buffer = io.BytesIO()
+            if pillow_format == "WEBP":
+                image.save(buffer, pillow_format, quality=WEBP_QUALITY, method=4)
+            else:
+                image.save(buffer, pillow_format, quality=JPEG_QUALITY, optimize=True, progressive=True)
+            return buffer.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("生成缩略图失败: %s", exc)
+        return None
+
+
+@dataclass
+class ThumbnailVariant:
+    path: Path
+    media_type: str
+    etag: str
+
+
+class ThumbnailCache:
+    """
+    按宽度档位生成的缩略图磁盘缓存，文件名由来源指纹、宽度和格式的哈希决定
+    总大小超过 max_bytes 时按最近使用时间淘汰；未安装 Pillow 时不可用，调用方直接返回原图
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "data/thumbnail_cache",
+        max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES,
+        renderer: ThumbnailRenderer | None = render_thumbnail if Image is not None else None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.renderer = renderer
+        # 缓存文件 -> (大小, 最近使用时间)，首次使用时从磁盘列举
+        self._entries: dict[str, tuple[int, float]] | None = None
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self.renderer is not None
+
+    def _variant_path(self, source_key: str, width: int, image_format: str) -> tuple[Path, str]:
+        digest = hashlib.sha256(f"{source_key}|{width}|{image_format}".encode("utf-8")).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.{image_format}", digest[:32]
+
+    def _load_entries_locked(self) -> dict[str, tuple[int, float]]:
+        if self._entries is not None:
+            return self._entries
+        entries: dict[str, tuple[int, float]] = {}
+        try:
+            with os.scandir(self.cache_dir) as shards:
+                for shard in shards:
+                    if not shard.is_dir(follow_symlinks=False):
+                        continue
+                    with os.scandir(shard.path) as files:
+                        for entry in files:
+                            if entry.is_file(follow_symlinks=False) and not entry.name.startswith("."):
+                                stat = entry.stat(follow_symlinks=False)
+                                entries[entry.path] = (stat.st_size, stat.st_mtime)
+        except OSError:
+            pass
+        self._entries = entries
+        self._total_bytes = sum(size for size, _used_at in entries.values())
+        return entries
+
+    def _touch_locked(self, path: Path) -> None:
+        entries = self._load_entries_locked()
+        key = str(path)
+        now = time.time()
+        try:
+            # mtime 作为最近使用时间，重启后重新列举时仍保留淘汰顺序
+            os.utime(path, (now, now))
+            size = path.stat().st_size
+        except OSError:
+            return
+        previous = entries.get(key)
+        self._total_bytes += size - (previous[0] if previous else 0)
+        entries[key] = (size, now)
+
+    def _evict_locked(self) -> None:
+        entries = self._load_entries_locked()
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * THUMBNAIL_CACHE_EVICT_RATIO
+        for key, (size, _used_at) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(key)
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.warning("删除缩略图缓存失败 %s: %s", key, exc)
+                continue
+            entries.pop(key, None)
+            self._total_bytes -= size
+
+    def variant(
+        self,
+        source_key: str,
+        width: int | None,
+        accept: str,
+        source: Path | bytes | None = None,
+    ) -> ThumbnailVariant | None:
+        """
+        命中缓存时直接返回；未命中且提供了 source 时生成并写入缓存
+        未安装 Pillow、未指定宽度或生成失败时返回 None，调用方返回原图
+        """
+        bucket = bucket_width(width)
+        if bucket is None or not self.available():
+            return None
+        image_format = thumbnail_format(accept)
+        path, etag = self._variant_path(source_key, bucket, image_format)
+        media_type = THUMBNAIL_FORMATS[image_format][1]
+        if path.is_file():
+            with self._lock:
+                self._touch_locked(path)
+            return ThumbnailVariant(path, media_type, etag)
+        if source is None:
+            return None
+
+        data = self.renderer(source, bucket, image_format)
+        if not data:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError as exc:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            logger.warning("写入缩略图缓存失败 %s: %s", path, exc)
+            return None
+        with self._lock:
+            self._touch_locked(path)
+            self._evict_locked()
+        return ThumbnailVariant(path, media_type, etag)
+
+    @staticmethod
+    def local_etag(path: Path) -> str | None:
+        """原图的 ETag，由 (路径, 大小, mtime_ns) 决定，文件不存在时返回 None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        source_key = f"file:{os.path.abspath(str(path))}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha256(source_key.encode("utf-8")).hexdigest()[:32]
+
+    def local_variant(self, path: Path, width: int | None, accept: str) -> ThumbnailVariant | None:
+        """本地图片以 (路径, 大小, mtime_ns) 作为来源指纹，图片被覆盖后自动生成新的缩略图"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        source_key = f"file:{os.path.abspath(str(path))}:{stat.st_size}:{stat.st_mtime_ns}"
+        return self.variant(source_key, width, accept, path)
+
+
+thumbnail_cache = ThumbnailCache()
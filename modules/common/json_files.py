@@ -0,0 +1,58 @@
+import json
+import os
+import stat
+import tempfile
+from typing import Any
+
+
+def _current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# os.umask 只能先改再改回，启动时读取一次，避免多线程写文件时临时放开权限
+_UMASK = _current_umask()
+
+
+def default_file_mode(file_path: str) -> int:
+    """
+    替换 file_path 时应使用的权限：沿用已有文件的权限，新文件按 umask 计算
+    mkstemp 创建的临时文件固定为 0600，直接替换会让媒体服务器等其他用户无法读取
+    """
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def write_json_atomic(file_path: str, payload: Any, indent: int | None = None) -> None:
+    """先写同目录临时文件再 os.replace，进程中途退出也不会留下被截断的 JSON"""
+    parent_dir = os.path.dirname(file_path) or "."
+    os.makedirs(parent_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=parent_dir)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(payload, file, ensure_ascii=False, indent=indent)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, default_file_mode(file_path))
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def append_lines_durable(file_path: str, lines: list[str]) -> int:
+    """追加多行文本并 fsync，返回追加后的文件大小"""
+    parent_dir = os.path.dirname(file_path)
+    if parent_dir:
+        os.makedirs(parent_dir, exist_ok=True)
+    with open(file_path, "a", encoding="utf-8") as file:
+        file.write("".join(f"{line}\n" for line in lines))
+        file.flush()
+        os.fsync(file.fileno())
+        return file.tell()
@@ -0,0 +1,176 @@
+import re
+import unicodedata
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Any, Iterable, Pattern
+
+from modules.common.subtitles import CHINESE_SUBTITLE_KEYWORDS
+
+
+# 拼接多个候选文本时使用的分隔符：不属于 \s、\w，任何规则都无法跨越它匹配
+SEPARATOR = "\x00"
+
+CODE_PATTERN = re.compile(r"([A-Za-z]{2,})[-_\s]*0*(\d{2,})")
+FOUR_K_LITERALS = ("4k", "uhd", "ultra hd", "ultrahd")
+FOUR_K_RESOLUTION_PATTERN = re.compile(r"(?<!\d)2160p(?!\d)")
+COLLECTION_LITERALS = ("合集", "合辑", "精选", "打包", "collection", "pack")
+# 包含其他关键词的长关键词不会改变结果，只保留最短集合
+SUBTITLE_LITERALS = tuple(
+    keyword
+    for keyword in CHINESE_SUBTITLE_KEYWORDS
+    if not any(other != keyword and other in keyword for other in CHINESE_SUBTITLE_KEYWORDS)
+)
+SUBTITLE_MARKER_PATTERN = re.compile(
+    r"\bchinese\s*(?:sub|srt|subtitle)s?\b"
+    r"|\b(?:sub|srt|subtitle)s?\s*chinese\b"
+    r"|(?<![a-z0-9])(?:ch|chs|cht)(?![a-z0-9])"
+    r"|[-_\s]c(?![a-z0-9])"
+    r"|(?<![a-z0-9])[a-z]{2,8}[-_\s]?\d{2,6}c(?![a-z0-9])"
+)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+@dataclass
+class CandidateTags:
+    """按列保存一批候选的分类结果，第 i 项对应第 i 个候选"""
+
+    is_4k: list[bool] = field(default_factory=list)
+    has_subtitle: list[bool] = field(default_factory=list)
+    is_collection: list[bool] = field(default_factory=list)
+    code_match: list[bool] = field(default_factory=list)
+    code_count: list[int] = field(default_factory=list)
+    query_has_code: bool = False
+
+    def __len__(self) -> int:
+        return len(self.is_4k)
+
+
+class _JoinedTexts:
+    """
+    把一列文本拼成一个字符串，每条规则只对整列扫描一次，再按偏移量映射回候选下标
+    已命中的候选会被跳过，未命中的候选才继续参与后续规则
+    """
+
+    def __init__(self, texts: list[str], skip: list[bool] | None = None) -> None:
+        if skip is not None:
+            texts = ["" if skipped else text for skipped, text in zip(skip, texts)]
+        self.text = SEPARATOR.join(texts)
+        self.starts = list(accumulate(map(len(SEPARATOR).__add__, map(len, texts)), initial=0))
+
+    def index_of(self, position: int) -> int:
+        return bisect_right(self.starts, position) - 1
+
+    def mark_literals(self, literals: Iterable[str], result: list[bool]) -> list[bool]:
+        for literal in literals:
+            position = self.text.find(literal)
+            while position != -1:
+                index = self.index_of(position)
+                result[index] = True
+                position = self.text.find(literal, self.starts[index + 1])
+        return result
+
+    def mark_pattern(self, pattern: Pattern, result: list[bool]) -> list[bool]:
+        match = pattern.search(self.text)
+        while match:
+            index = self.index_of(match.start())
+            result[index] = True
+            match = pattern.search(self.text, self.starts[index + 1])
+        return result
+
+
+def _text(value: Any) -> str:
+    return str(value) if value else ""
+
+
+def extract_code_parts(query: str) -> tuple[str, str] | None:
+    match = CODE_PATTERN.search(query or "")
+    if not match:
+        return None
+    return match.group(1), match.group(2)
+
+
+def build_code_regex(prefix: str, number: str) -> Pattern:
+    pattern = rf"(?<![A-Za-z0-9]){re.escape(prefix)}[-_\s]*0*{re.escape(number)}(?![A-Za-z0-9])"
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def normalize_code(prefix: str, number: str) -> str:
+    try:
+        norm_num = str(int(number))
+    except ValueError:
+        norm_num = number
+    return f"{prefix.upper()}-{norm_num}"
+
+
+def tag_4k(texts: list[str]) -> list[bool]:
+    lowered = [text.lower() for text in texts]
+    result = _JoinedTexts(lowered).mark_literals(FOUR_K_LITERALS, [False] * len(texts))
+    return _JoinedTexts(lowered, skip=result).mark_pattern(FOUR_K_RESOLUTION_PATTERN, result)
+
+
+def tag_collection_keyword(texts: list[str]) -> list[bool]:
+    return _JoinedTexts([text.lower() for text in texts]).mark_literals(COLLECTION_LITERALS, [False] * len(texts))
+
+
+def tag_chinese_subtitle(texts: list[str]) -> list[bool]:
+    normalized = [unicodedata.normalize("NFKC", text).lower() for text in texts]
+    result = _JoinedTexts(normalized).mark_literals(SUBTITLE_LITERALS, [False] * len(texts))
+    # 所有字幕标记规则都包含字母 c，不含 c 的候选无需进入正则扫描
+    marker_skip = [flagged or "c" not in text for flagged, text in zip(result, normalized)]
+    result = _JoinedTexts(normalized, skip=marker_skip).mark_pattern(SUBTITLE_MARKER_PATTERN, result)
+    compact = [WHITESPACE_PATTERN.sub("", text) if not flagged else "" for flagged, text in zip(result, normalized)]
+    return _JoinedTexts(compact, skip=result).mark_literals(SUBTITLE_LITERALS, result)
+
+
+def tag_codes(texts: list[str]) -> list[set[str]]:
+    joined = _JoinedTexts(texts)
+    codes: list[set[str]] = [set() for _text in texts]
+    for match in CODE_PATTERN.finditer(joined.text):
+        prefix, number = match.group(1, 2)
+        codes[joined.index_of(match.start())].add(f"{prefix.upper()}-{int(number)}")
+    return codes
+
+
+def tag_code_match(texts: list[str], query: str | None) -> tuple[bool, list[bool]]:
+    parts = extract_code_parts(query or "")
+    if not parts:
+        return False, [True] * len(texts)
+    joined = _JoinedTexts(texts)
+    return True, joined.mark_pattern(build_code_regex(*parts), [False] * len(texts))
+
+
+def classify_candidates(
+    titles: Iterable[Any],
+    filenames: Iterable[Any] | None = None,
+    query: str | None = None,
+) -> CandidateTags:
+    """
+    一次性为整批候选打标签，每个字段对整列文本只做一次正则扫描
+    :param titles: 候选标题
+    :param filenames: 候选文件名（可选，与标题一一对应）
+    :param query: 搜索番号，用于 code_match；无法识别番号时所有候选视为匹配
+    """
+    title_list = [_text(title) for title in titles]
+    filename_list = [_text(name) for name in filenames] if filenames is not None else [""] * len(title_list)
+    if len(filename_list) != len(title_list):
+        raise ValueError("titles and filenames must have the same length")
+
+    title_4k = tag_4k(title_list)
+    filename_4k = tag_4k(filename_list)
+    title_subtitle = tag_chinese_subtitle(title_list)
+    filename_subtitle = tag_chinese_subtitle(filename_list)
+    collection_keyword = tag_collection_keyword(title_list)
+    codes = [title_codes | filename_codes for title_codes, filename_codes in zip(tag_codes(title_list), tag_codes(filename_list))]
+    query_has_code, code_match = tag_code_match(
+        [f"{title}\n{filename}" for title, filename in zip(title_list, filename_list)],
+        query,
+    )
+    return CandidateTags(
+        is_4k=[a or b for a, b in zip(title_4k, filename_4k)],
+        has_subtitle=[a or b for a, b in zip(title_subtitle, filename_subtitle)],
+        is_collection=[keyword or len(found) >= 2 for keyword, found in zip(collection_keyword, codes)],
+        code_match=code_match,
+        code_count=[len(found) for found in codes],
+        query_has_code=query_has_code,
+    )
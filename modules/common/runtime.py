@@ -43,6 +43,7 @@ DEFAULT_CONFIG: dict[str, Any] = {
     },
     "scrapers": {
         "priority": SCRAPER_PROVIDER_NAMES,
+        "parallel_providers": 3,
         "javbus": {
             "enabled": True,
             "language": "zh",
@@ -106,8 +107,21 @@ DEFAULT_CONFIG: dict[str, Any] = {
         "min_availability": 1.0,
         "min_score": 1.0,
         "probe_timeout_seconds": 20.0,
+        "probe_concurrency": 4,
+        "cache_ttl_seconds": 21600,
         "allow_unknown": True,
     },
+    "local_library_watch": {
+        "enabled": False,
+        # 为空时监听影视库中已有的扫描根目录
+        "roots": [],
+        "debounce_seconds": 3.0,
+        "max_delay_seconds": 30.0,
+        "poll_interval_seconds": 60.0,
+        "force_polling": False,
+        "scrape": True,
+        "concurrent": 3,
+    },
 }
 
 CONFIG_PATH = os.getenv("JAVJAEGER_CONFIG_PATH", "config.json")
@@ -273,6 +287,10 @@ def get_magnet_health_config() -> dict[str, Any]:
     return copy.deepcopy(config.get("magnet_health", DEFAULT_CONFIG["magnet_health"]))
 
 
+def get_local_library_watch_config() -> dict[str, Any]:
+    return copy.deepcopy(config.get("local_library_watch", DEFAULT_CONFIG["local_library_watch"]))
+
+
 def get_javbus_config() -> dict[str, Any]:
     javbus_config = copy.deepcopy(config.get("javbus", DEFAULT_CONFIG["javbus"]))
     env_base_url = os.getenv("JAVBUS_BASE_URL")
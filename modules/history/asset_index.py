@@ -0,0 +1,171 @@
+import itertools
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+
+POSTER_NAME_TEMPLATES = ("{stem}-poster.jpg", "{stem}-poster.png", "poster.jpg", "folder.jpg", "cover.jpg")
+THUMBNAIL_NAME_TEMPLATES = ("{stem}-thumb.jpg", "{stem}-thumb.png", "thumb.jpg", "thumbnail.jpg")
+ACTOR_IMAGE_DIR = "actors"
+# 目录 mtime 与列举时间相差不足该秒数时，同一时间粒度内可能还有写入，下次访问重新列举
+RACY_MTIME_SECONDS = 2.0
+
+
+@dataclass
+class _DirectoryListing:
+    mtime_ns: int
+    listed_at: float
+    checked_at: float
+    version: int
+    resolved: Path | None
+    # 小写文件名 -> 实际文件名，只记录普通文件
+    files: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class MovieAssets:
+    poster: Path | None = None
+    thumbnail: Path | None = None
+    # 以下两项只统计视频文件仍存在的目录，与信息检查的语义一致
+    poster_file: bool = False
+    nfo: bool = False
+    actor_images: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "poster": str(self.poster) if self.poster else None,
+            "thumbnail": str(self.thumbnail) if self.thumbnail else None,
+            "poster_file": self.poster_file,
+            "nfo": self.nfo,
+            "actor_images": list(self.actor_images),
+        }
+
+
+class LocalLibraryAssetIndex:
+    """
+    影视库图片与 NFO 的存在性索引
+    按目录缓存一次 scandir 的结果，目录 mtime 变化后才重新列举；超过 revalidate_seconds 才重新 stat 目录
+    每部影片的结果按所涉及目录的列举版本缓存，目录未变化时直接复用
+    """
+
+    def __init__(self, revalidate_seconds: float = 0.0) -> None:
+        self.revalidate_seconds = revalidate_seconds
+        self._directories: dict[str, _DirectoryListing] = {}
+        self._movies: dict[str, tuple[tuple[Any, ...], MovieAssets]] = {}
+        # prime 会在线程中执行，版本号用 itertools.count 保证不重复
+        self._versions = itertools.count(1)
+
+    def _scan(self, directory: str, mtime_ns: int, now: float) -> _DirectoryListing:
+        files: dict[str, str] = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            files.setdefault(entry.name.lower(), entry.name)
+                    except OSError:
+                        continue
+            resolved = Path(directory).resolve()
+        except OSError:
+            files = {}
+            resolved = None
+        listing = _DirectoryListing(mtime_ns, now, now, next(self._versions), resolved, files)
+        self._directories[directory] = listing
+        return listing
+
+    def _listing(self, directory: Path) -> _DirectoryListing:
+        key = str(directory)
+        now = time.time()
+        listing = self._directories.get(key)
+        racy = listing is not None and listing.listed_at - listing.mtime_ns / 1e9 < RACY_MTIME_SECONDS
+        if listing is not None and not racy and now - listing.checked_at < self.revalidate_seconds:
+            return listing
+        try:
+            mtime_ns = os.stat(key).st_mtime_ns
+        except OSError:
+            mtime_ns = -1
+        if listing is not None and listing.mtime_ns == mtime_ns and not racy:
+            listing.checked_at = now
+            return listing
+        if mtime_ns < 0:
+            listing = _DirectoryListing(mtime_ns, now, now, next(self._versions), None)
+            self._directories[key] = listing
+            return listing
+        return self._scan(key, mtime_ns, now)
+
+    def find(self, directory: Path, names: Iterable[str]) -> Path | None:
+        listing = self._listing(directory)
+        if listing.resolved is None:
+            return None
+        for name in names:
+            actual = listing.files.get(name.lower())
+            if actual:
+                return listing.resolved / actual
+        return None
+
+    def invalidate(self, *directories: Path | str) -> None:
+        """本进程写入图片或 NFO 后调用，下次访问时重新列举"""
+        for directory in directories:
+            self._directories.pop(str(directory), None)
+
+    def prime(self, directories: Iterable[Path | str]) -> int:
+        """扫描入库时预先列举视频所在目录及其演员头像目录"""
+        now = time.time()
+        primed = 0
+        for directory in {str(directory) for directory in directories}:
+            for target in (directory, os.path.join(directory, ACTOR_IMAGE_DIR)):
+                try:
+                    mtime_ns = os.stat(target).st_mtime_ns
+                except OSError:
+                    self._directories.pop(target, None)
+                    continue
+                self._scan(target, mtime_ns, now)
+                primed += 1
+        return primed
+
+    def movie_assets(self, record: dict[str, Any]) -> MovieAssets:
+        video_paths = [
+            Path(str(file_record.get("path") or ""))
+            for file_record in record.get("files", [])
+            if isinstance(file_record, dict) and Path(str(file_record.get("path") or "")).name
+        ]
+        listings = [(video_path, self._listing(video_path.parent)) for video_path in video_paths]
+        actor_listings = [self._listing(video_path.parent / ACTOR_IMAGE_DIR) for video_path in video_paths]
+        signature = (
+            tuple(str(video_path) for video_path in video_paths),
+            tuple(listing.version for _video_path, listing in listings),
+            tuple(listing.version for listing in actor_listings),
+        )
+        movie_key = str(record.get("movie_id") or "").upper()
+        cached = self._movies.get(movie_key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        assets = MovieAssets()
+        for video_path, listing in listings:
+            if listing.resolved is None:
+                continue
+            stem = video_path.stem
+            poster = self._match(listing, POSTER_NAME_TEMPLATES, stem)
+            thumbnail = self._match(listing, THUMBNAIL_NAME_TEMPLATES, stem)
+            assets.poster = assets.poster or poster
+            assets.thumbnail = assets.thumbnail or thumbnail
+            if video_path.name.lower() in listing.files:
+                assets.poster_file = assets.poster_file or poster is not None
+                assets.nfo = assets.nfo or f"{stem}.nfo".lower() in listing.files
+        for listing in actor_listings:
+            for name in listing.files.values():
+                if name not in assets.actor_images:
+                    assets.actor_images.append(name)
+        self._movies[movie_key] = (signature, assets)
+        return assets
+
+    @staticmethod
+    def _match(listing: _DirectoryListing, templates: tuple[str, ...], stem: str) -> Path | None:
+        for template in templates:
+            actual = listing.files.get(template.format(stem=stem).lower())
+            if actual:
+                return listing.resolved / actual
+        return None
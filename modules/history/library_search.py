@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any
+
+LIBRARY_SEARCH_DEFAULT_PAGE_SIZE = 50
+LIBRARY_SEARCH_MAX_PAGE_SIZE = 200
+LIBRARY_SEARCH_FACET_LIMIT = 20
+# trigram 分词至少需要 3 个字符，更短的关键词退回 LIKE 扫描
+FTS_MIN_TOKEN_LENGTH = 3
+# bm25 列权重，顺序与 movies_fts 的列一致
+FTS_COLUMN_WEIGHTS = (10.0, 5.0, 4.0, 2.0, 2.0, 2.0, 1.0)
+LIBRARY_SEARCH_FACETS = ("stars", "genres", "studio", "series")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY,
+    movie_id TEXT NOT NULL UNIQUE,
+    fingerprint TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    studio TEXT NOT NULL DEFAULT '',
+    series TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_movies_date ON movies (date, movie_id);
+CREATE INDEX IF NOT EXISTS idx_movies_studio ON movies (studio);
+CREATE INDEX IF NOT EXISTS idx_movies_series ON movies (series);
+CREATE TABLE IF NOT EXISTS movie_stars (movie_rowid INTEGER NOT NULL, name TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_movie_stars ON movie_stars (name, movie_rowid);
+CREATE INDEX IF NOT EXISTS idx_movie_stars_movie ON movie_stars (movie_rowid);
+CREATE TABLE IF NOT EXISTS movie_genres (movie_rowid INTEGER NOT NULL, name TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_movie_genres ON movie_genres (name, movie_rowid);
+CREATE INDEX IF NOT EXISTS idx_movie_genres_movie ON movie_genres (movie_rowid);
+CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+    movie_id, title, stars, genres, studio, series, full_text,
+    tokenize = 'trigram'
+);
+"""
+
+
+def _names(value: Any) -> list[str]:
+    if not isinstance(value, list):
+        return []
+    names: list[str] = []
+    for item in value:
+        name = item.get("name") if isinstance(item, dict) else item
+        text = str(name or "").strip()
+        if text and text not in names:
+            names.append(text)
+    return names
+
+
+def search_document(movie_id: str, record: dict[str, Any]) -> dict[str, Any]:
+    metadata = record.get("metadata") if isinstance(record.get("metadata"), dict) else {}
+    document = {
+        "movie_id": movie_id,
+        "title": str(record.get("title") or metadata.get("title") or ""),
+        "date": str(record.get("date") or metadata.get("date") or ""),
+        "stars": _names(record.get("stars") or metadata.get("stars")),
+        "genres": _names(record.get("genres") or metadata.get("genres")),
+        "studio": str(record.get("studio") or metadata.get("studio") or ""),
+        "series": str(record.get("series") or metadata.get("series") or ""),
+        "full_text": str(record.get("full_text") or ""),
+    }
+    document["fingerprint"] = hashlib.sha1(
+        json.dumps(document, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return document
+
+
+def _like_pattern(token: str) -> str:
+    return "%" + token.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class LocalLibrarySearchIndex:
+    """
+    影视库的 SQLite 检索索引：movies 保存可筛选字段，movies_fts 为 FTS5 全文索引
+    索引内容由 LocalMovieLibraryService 的记录派生，按指纹增量同步
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            parent_dir = os.path.dirname(self.file_path)
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+            connection = sqlite3.connect(self.file_path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def sync(self, records: dict[str, dict[str, Any]]) -> int:
+        """按指纹比对增量更新索引，返回变更的影片数量"""
+        connection = self._connect()
+        indexed = {
+            movie_id: (rowid, fingerprint)
+            for rowid, movie_id, fingerprint in connection.execute("SELECT id, movie_id, fingerprint FROM movies")
+        }
+        documents = [search_document(str(movie_id), record) for movie_id, record in records.items()]
+        changed = [document for document in documents if indexed.get(document["movie_id"], (None, None))[1] != document["fingerprint"]]
+        removed = [indexed[movie_id][0] for movie_id in indexed.keys() - {document["movie_id"] for document in documents}]
+        if not changed and not removed:
+            return 0
+
+        with connection:
+            for rowid in removed:
+                self._delete_row(connection, rowid)
+            for document in changed:
+                existing = indexed.get(document["movie_id"])
+                if existing:
+                    self._delete_row(connection, existing[0])
+                cursor = connection.execute(
+                    "INSERT INTO movies (movie_id, fingerprint, title, date, studio, series) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        document["movie_id"],
+                        document["fingerprint"],
+                        document["title"],
+                        document["date"],
+                        document["studio"],
+                        document["series"],
+                    ),
+                )
+                rowid = cursor.lastrowid
+                connection.executemany(
+                    "INSERT INTO movie_stars (movie_rowid, name) VALUES (?, ?)",
+                    [(rowid, name) for name in document["stars"]],
+                )
+                connection.executemany(
+                    "INSERT INTO movie_genres (movie_rowid, name) VALUES (?, ?)",
+                    [(rowid, name) for name in document["genres"]],
+                )
+                searchable = [
+                    document["movie_id"],
+                    document["title"],
+                    " ".join(document["stars"]),
+                    " ".join(document["genres"]),
+                    document["studio"],
+                    document["series"],
+                ]
+                connection.execute(
+                    "INSERT INTO movies_fts (rowid, movie_id, title, stars, genres, studio, series, full_text) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (rowid, *searchable, "\n".join([*searchable, document["full_text"]])),
+                )
+        return len(changed) + len(removed)
+
+    @staticmethod
+    def _delete_row(connection: sqlite3.Connection, rowid: int) -> None:
+        connection.execute("DELETE FROM movies WHERE id = ?", (rowid,))
+        connection.execute("DELETE FROM movie_stars WHERE movie_rowid = ?", (rowid,))
+        connection.execute("DELETE FROM movie_genres WHERE movie_rowid = ?", (rowid,))
+        connection.execute("DELETE FROM movies_fts WHERE rowid = ?", (rowid,))
+
+    def search(
+        self,
+        query: str = "",
+        filters: dict[str, str] | None = None,
+        page: int = 1,
+        page_size: int = LIBRARY_SEARCH_DEFAULT_PAGE_SIZE,
+    ) -> dict[str, Any]:
+        connection = self._connect()
+        tokens = [token for token in str(query or "").split() if token]
+        fts_tokens = [token for token in tokens if len(token) >= FTS_MIN_TOKEN_LENGTH]
+        like_tokens = [token for token in tokens if len(token) < FTS_MIN_TOKEN_LENGTH]
+
+        conditions: list[str] = []
+        params: list[Any] = []
+        if fts_tokens:
+            conditions.append("movies_fts MATCH ?")
+            params.append(" ".join('"' + token.replace('"', '""') + '"' for token in fts_tokens))
+        for token in like_tokens:
+            conditions.append("movies_fts.full_text LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(token))
+        active_filters = {key: value for key, value in (filters or {}).items() if key in LIBRARY_SEARCH_FACETS and value}
+        for facet in ("stars", "genres"):
+            if facet in active_filters:
+                table = "movie_stars" if facet == "stars" else "movie_genres"
+                conditions.append(f"m.id IN (SELECT movie_rowid FROM {table} WHERE name = ?)")
+                params.append(active_filters[facet])
+        for facet in ("studio", "series"):
+            if facet in active_filters:
+                conditions.append(f"m.{facet} = ?")
+                params.append(active_filters[facet])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        matched = f"SELECT m.id FROM movies_fts JOIN movies m ON m.id = movies_fts.rowid {where}"
+        page = max(1, int(page or 1))
+        page_size = max(1, min(LIBRARY_SEARCH_MAX_PAGE_SIZE, int(page_size or LIBRARY_SEARCH_DEFAULT_PAGE_SIZE)))
+
+        if fts_tokens:
+            weights = ", ".join(str(weight) for weight in FTS_COLUMN_WEIGHTS)
+            score = f"bm25(movies_fts, {weights})"
+            order = f"{score}, m.date DESC, m.movie_id"
+        else:
+            score = "0.0"
+            order = "m.date DESC, m.movie_id"
+        rows = connection.execute(
+            f"SELECT m.movie_id, {score} FROM movies_fts JOIN movies m ON m.id = movies_fts.rowid {where} "
+            f"ORDER BY {order} LIMIT ? OFFSET ?",
+            [*params, page_size, (page - 1) * page_size],
+        ).fetchall()
+        total = connection.execute(f"SELECT COUNT(*) FROM ({matched})", params).fetchone()[0]
+
+        facets: dict[str, list[dict[str, Any]]] = {}
+        for facet in LIBRARY_SEARCH_FACETS:
+            if facet in ("stars", "genres"):
+                table = "movie_stars" if facet == "stars" else "movie_genres"
+                sql = f"SELECT name, COUNT(*) AS count FROM {table} WHERE movie_rowid IN ({matched}) GROUP BY name"
+            else:
+                sql = f"SELECT {facet}, COUNT(*) AS count FROM movies WHERE id IN ({matched}) AND {facet} != '' GROUP BY {facet}"
+            facets[facet] = [
+                {"value": value, "count": count}
+                for value, count in connection.execute(
+                    f"{sql} ORDER BY count DESC, 1 LIMIT ?",
+                    [*params, LIBRARY_SEARCH_FACET_LIMIT],
+                )
+            ]
+
+        return {
+            "hits": [{"movie_id": movie_id, "score": round(-float(rank), 4)} for movie_id, rank in rows],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "facets": facets,
+        }
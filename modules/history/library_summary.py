@@ -0,0 +1,162 @@
+import base64
+import datetime
+import json
+from typing import Any
+
+
+LIBRARY_SUMMARY_DEFAULT_LIMIT = 120
+LIBRARY_SUMMARY_MAX_LIMIT = 500
+LIBRARY_SUMMARY_FACET_LIMIT = 80
+LIBRARY_SUMMARY_ROW_FILE_LIMIT = 3
+# 排序规则与前端 sortLocalLibraryRecords 保持一致：字段名、是否倒序
+LIBRARY_SUMMARY_SORTS = {
+    "date_desc": ("date", True),
+    "date_asc": ("date", False),
+    "updated_desc": ("updated_at", True),
+    "first_seen_desc": ("first_seen_at", True),
+    "movie_id_asc": ("movie_id", False),
+    "movie_id_desc": ("movie_id", True),
+    "title_asc": ("title", False),
+    "size_desc": ("total_size", True),
+    "size_asc": ("total_size", False),
+    "file_count_desc": ("file_count", True),
+    "resolution_desc": ("resolution_pixels", True),
+    "bitrate_desc": ("bitrate", True),
+}
+LIBRARY_SUMMARY_DEFAULT_SORT = "date_desc"
+LIBRARY_SUMMARY_TIME_FIELDS = ("date", "updated_at", "first_seen_at")
+LIBRARY_SUMMARY_TEXT_FIELDS = ("movie_id", "title")
+# 筛选参数名 -> 行内字段
+LIBRARY_SUMMARY_FILTER_FIELDS = {
+    "genres": "genres",
+    "stars": "stars",
+    "studios": "studio",
+    "publishers": "publisher",
+    "series": "series",
+    "years": "year",
+    "roots": "scan_roots",
+}
+
+
+class LibraryCursorError(ValueError):
+    pass
+
+
+def _name(value: Any) -> str:
+    if isinstance(value, dict):
+        return str(value.get("name") or value.get("title") or value.get("id") or "").strip()
+    return str(value or "").strip()
+
+
+def summary_row(record: dict[str, Any], media_info: dict[str, Any]) -> dict[str, Any]:
+    """影视库列表行：只保留列表、卡片与筛选需要的字段，不含 metadata 与全文"""
+    metadata = record.get("metadata") if isinstance(record.get("metadata"), dict) else {}
+    files = [file_record for file_record in record.get("files", []) if isinstance(file_record, dict)]
+    return {
+        "movie_id": record.get("movie_id"),
+        "title": record.get("title") or record.get("movie_id"),
+        "date": record.get("date") or "",
+        "stars": record.get("stars") or [],
+        "genres": record.get("genres") or [],
+        "studio": record.get("studio") or "",
+        "publisher": record.get("publisher") or "",
+        "series": record.get("series") or "",
+        "scrape_status": record.get("scrape_status") or "",
+        "scan_roots": record.get("scan_roots") or [],
+        "file_count": int(record.get("file_count") or len(files)),
+        "total_size": int(record.get("total_size") or 0),
+        "files": [
+            {"path": file_record.get("path"), "file_name": file_record.get("file_name")}
+            for file_record in files[:LIBRARY_SUMMARY_ROW_FILE_LIMIT]
+        ],
+        "media_info": media_info,
+        "cover_url": metadata.get("cover_url") or record.get("img") or "",
+        "list_thumbnail_url": metadata.get("list_thumbnail_url") or "",
+        "first_seen_at": record.get("first_seen_at") or "",
+        "updated_at": record.get("updated_at") or "",
+    }
+
+
+def summary_search_text(record: dict[str, Any]) -> str:
+    return "\n".join(str(record.get(key) or "") for key in ("movie_id", "title", "full_text")).lower()
+
+
+def summary_filter_values(row: dict[str, Any], field_name: str) -> set[str]:
+    if field_name == "year":
+        year = str(row.get("date") or "")[:4]
+        return {year} if year else set()
+    value = row.get(field_name)
+    values = value if isinstance(value, list) else [value]
+    return {name for name in (_name(item) for item in values) if name}
+
+
+def _sort_value(row: dict[str, Any], field_name: str) -> Any:
+    if field_name in LIBRARY_SUMMARY_TEXT_FIELDS:
+        return str(row.get(field_name) or "").strip().lower()
+    if field_name in LIBRARY_SUMMARY_TIME_FIELDS:
+        try:
+            return datetime.datetime.fromisoformat(str(row.get(field_name) or "")).timestamp()
+        except ValueError:
+            return 0.0
+    source = row.get("media_info") if field_name in ("resolution_pixels", "bitrate") else row
+    try:
+        return float((source or {}).get(field_name) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def summary_sort_key(row: dict[str, Any], sort: str) -> tuple[Any, ...]:
+    """
+    返回升序可比较的排序键，最后一项为番号保证唯一
+    倒序规则按升序列表反向遍历；数值为 0 的行无论正序倒序都排在最后
+    """
+    field_name, reverse = LIBRARY_SUMMARY_SORTS[sort]
+    value = _sort_value(row, field_name)
+    movie_id = str(row.get("movie_id") or "")
+    if isinstance(value, str):
+        return (value, movie_id)
+    missing = value == 0
+    return (not missing if reverse else missing, value, movie_id)
+
+
+def encode_summary_cursor(sort: str, key: tuple[Any, ...]) -> str:
+    payload = json.dumps({"sort": sort, "key": list(key)}, ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_summary_cursor(cursor: str | None, sort: str) -> tuple[Any, ...] | None:
+    if not cursor:
+        return None
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError) as exc:
+        raise LibraryCursorError("invalid library cursor") from exc
+    key = value.get("key") if isinstance(value, dict) else None
+    if (
+        value.get("sort") != sort
+        or not isinstance(key, list)
+        or not key
+        or not all(isinstance(item, (str, int, float, bool)) for item in key)
+    ):
+        raise LibraryCursorError("invalid library cursor")
+    return tuple(key)
+
+
+def clamp_summary_limit(limit: Any) -> int:
+    try:
+        value = int(limit)
+    except (TypeError, ValueError):
+        value = LIBRARY_SUMMARY_DEFAULT_LIMIT
+    return max(1, min(LIBRARY_SUMMARY_MAX_LIMIT, value))
+
+
+def summary_facets(rows: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    facets: dict[str, list[dict[str, Any]]] = {}
+    for filter_name, field_name in LIBRARY_SUMMARY_FILTER_FIELDS.items():
+        counts: dict[str, int] = {}
+        for row in rows:
+            for value in summary_filter_values(row, field_name):
+                counts[value] = counts.get(value, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:LIBRARY_SUMMARY_FACET_LIMIT]
+        facets[filter_name] = [{"value": value, "count": count} for value, count in ranked]
+    return facets
@@ -1,8 +1,9 @@
 import logging
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 
-from .service import download_history_service
+from .service import HISTORY_PAGE_DEFAULT_LIMIT, HistoryCursorError, download_history_service
 
 
 logger = logging.getLogger(__name__)
@@ -10,15 +11,47 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["history"])
 
 
+def _not_modified(request: Request, etag: str) -> Response | None:
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
 @router.get("/api/history")
-async def get_history():
+async def get_history(request: Request):
     try:
-        return await download_history_service.get_history()
+        etag = download_history_service.history_etag("all")
+        cached = _not_modified(request, etag)
+        if cached:
+            return cached
+        records = await download_history_service.get_history()
+        return JSONResponse(records, headers={"ETag": etag, "Cache-Control": "no-cache"})
     except Exception as exc:
         logger.error("读取历史记录失败: %s", exc)
         return []
 
 
+@router.get("/api/history/records")
+async def get_history_records(
+    request: Request,
+    q: str = "",
+    cursor: str = "",
+    limit: int = HISTORY_PAGE_DEFAULT_LIMIT,
+):
+    try:
+        etag = download_history_service.history_etag("page", q, cursor, limit)
+        cached = _not_modified(request, etag)
+        if cached:
+            return cached
+        payload = await download_history_service.get_history_page(q, cursor, limit)
+        return JSONResponse(payload, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    except HistoryCursorError as exc:
+        raise HTTPException(status_code=400, detail="分页游标无效") from exc
+    except Exception as exc:
+        logger.error("分页读取历史记录失败: %s", exc)
+        raise HTTPException(status_code=500, detail="读取历史记录失败") from exc
+
+
 @router.delete("/api/history")
 async def clear_history():
     try:
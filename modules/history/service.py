@@ -1,19 +1,52 @@
 import asyncio
+import base64
 import datetime
+import hashlib
 import json
 import logging
 import os
 import re
+from bisect import bisect_left, bisect_right, insort
 from pathlib import Path
 from typing import Any
 
 from modules.common.image_download import download_image
+from modules.common.json_files import append_lines_durable, write_json_atomic
+from modules.history.asset_index import ACTOR_IMAGE_DIR, LocalLibraryAssetIndex, MovieAssets
+from modules.history.library_search import LIBRARY_SEARCH_DEFAULT_PAGE_SIZE, LocalLibrarySearchIndex
+from modules.history.library_summary import (
+    LIBRARY_SUMMARY_DEFAULT_LIMIT,
+    LIBRARY_SUMMARY_DEFAULT_SORT,
+    LIBRARY_SUMMARY_FILTER_FIELDS,
+    LIBRARY_SUMMARY_SORTS,
+    LibraryCursorError,
+    clamp_summary_limit,
+    decode_summary_cursor,
+    encode_summary_cursor,
+    summary_facets,
+    summary_filter_values,
+    summary_row,
+    summary_search_text,
+    summary_sort_key,
+)
 from modules.javbus_api import javbus_api_service
+from modules.magnets.outcome_store import magnet_outcome_store
 
 
 logger = logging.getLogger(__name__)
 
 
+# 历史日志超过该大小后合并进快照文件
+HISTORY_JOURNAL_COMPACT_BYTES = 1024 * 1024
+HISTORY_METADATA_CONCURRENCY = 4
+HISTORY_PAGE_DEFAULT_LIMIT = 50
+HISTORY_PAGE_MAX_LIMIT = 500
+# 影视库逐条更新（补全信息、媒体信息、清理）合并写盘的最长间隔
+LOCAL_LIBRARY_FLUSH_INTERVAL_SECONDS = 2.0
+# 影视库图片存在性索引重新检查目录 mtime 的间隔；本进程写入的图片会立即失效缓存
+LOCAL_LIBRARY_ASSET_REVALIDATE_SECONDS = 30.0
+# 演员头像查询与下载的最大并发数
+ACTOR_AVATAR_DOWNLOAD_CONCURRENCY = 4
 LOCAL_LIBRARY_INFORMATION_FIELDS = ("title", "date", "stars", "genres", "cover_url")
 LOCAL_LIBRARY_INFORMATION_ASSET_FIELDS = ("nfo", "poster_file")
 LOCAL_LIBRARY_INFORMATION_CHECK_FIELDS = LOCAL_LIBRARY_INFORMATION_FIELDS + LOCAL_LIBRARY_INFORMATION_ASSET_FIELDS
@@ -128,12 +161,230 @@ def _normalize_history_record(record: dict[str, Any]) -> dict[str, Any] | None:
     return normalized
 
 
+def _saved_download_link(
+    index: int,
+    magnet_links: list[str] | None,
+    magnet_sources: list[str] | None,
+) -> tuple[str, str]:
+    if magnet_links is None or index >= len(magnet_links):
+        return "", ""
+    link = str(magnet_links[index] or "").strip()
+    source = (
+        _normalize_magnet_source(magnet_sources[index])
+        if magnet_sources is not None and index < len(magnet_sources)
+        else ""
+    )
+    return link, source
+
+
+async def _fetch_history_metadata(movie_ids: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    在历史锁之外并发获取影片元数据，同一批次内重复的番号只请求一次
+    JavBus 客户端先查页面缓存，未命中的请求仍受其自身的请求间隔限制
+    """
+    semaphore = asyncio.Semaphore(HISTORY_METADATA_CONCURRENCY)
+
+    async def fetch(movie_id: str) -> dict[str, Any]:
+        async with semaphore:
+            try:
+                return await javbus_api_service.get_movie_detail(movie_id) or {}
+            except Exception as exc:
+                logger.error("Failed to load movie metadata for %s: %s", movie_id, exc)
+                return {}
+
+    unique_ids = list(dict.fromkeys(movie_id for movie_id in movie_ids if movie_id))
+    results = await asyncio.gather(*(fetch(movie_id) for movie_id in unique_ids))
+    return dict(zip(unique_ids, results))
+
+
+def _apply_saved_download(
+    record: dict[str, Any] | None,
+    movie_id: str,
+    movie_data: dict[str, Any],
+    link: str,
+    source: str,
+    current_time: str,
+) -> dict[str, Any]:
+    record = record if record is not None else {"movie_id": movie_id, "download_time": current_time}
+    record["movie_id"] = movie_id
+    record.setdefault("download_time", current_time)
+    record["updated_at"] = current_time
+    record["title"] = movie_data.get("title", "")
+    record["date"] = movie_data.get("date", "")
+
+    stars = movie_data.get("stars", [])
+    record["stars"] = [star.get("name", "") for star in stars] if isinstance(stars, list) else []
+
+    genres = movie_data.get("genres", [])
+    record["genres"] = [genre.get("name", "") for genre in genres] if isinstance(genres, list) else []
+
+    record["img"] = movie_data.get("img", "")
+    download_resources = _extract_download_resources(record)
+    resource_indexes = {
+        _normalize_download_link_key(resource.get("link")): resource
+        for resource in download_resources
+        if _normalize_download_link_key(resource.get("link"))
+    }
+    link_key = _normalize_download_link_key(link)
+    if link_key and link_key not in resource_indexes:
+        resource = {"link": link, "source": source}
+        download_resources.append(resource)
+        resource_indexes[link_key] = resource
+    elif link_key and source and not resource_indexes[link_key].get("source"):
+        resource_indexes[link_key]["source"] = source
+    record["download_resources"] = download_resources
+    record["download_links"] = [resource["link"] for resource in download_resources]
+    return record
+
+
+class HistoryCursorError(ValueError):
+    pass
+
+
+def _history_sort_key(record: dict[str, Any]) -> tuple[str, str]:
+    return (str(record.get("download_time") or ""), str(record.get("movie_id") or ""))
+
+
+def _history_search_text(record: dict[str, Any]) -> str:
+    stars = record.get("stars") if isinstance(record.get("stars"), list) else []
+    parts = [record.get("movie_id"), record.get("title"), *stars]
+    parts.extend(resource.get("source") for resource in record.get("download_resources") or [])
+    return "\n".join(str(part) for part in parts if part).lower()
+
+
+def encode_history_cursor(key: tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key), ensure_ascii=False).encode("utf-8")).decode("ascii")
+
+
+def decode_history_cursor(cursor: str | None) -> tuple[str, str] | None:
+    if not cursor:
+        return None
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError) as exc:
+        raise HistoryCursorError("invalid history cursor") from exc
+    if not isinstance(value, list) or len(value) != 2 or not all(isinstance(item, str) for item in value):
+        raise HistoryCursorError("invalid history cursor")
+    return value[0], value[1]
+
+
+def _clamp_history_page_limit(limit: Any) -> int:
+    try:
+        value = int(limit)
+    except (TypeError, ValueError):
+        value = HISTORY_PAGE_DEFAULT_LIMIT
+    return max(1, min(HISTORY_PAGE_MAX_LIMIT, value))
+
+
 class DownloadHistoryService:
-    def __init__(self, file_path: str = "data/downloaded_movies.json") -> None:
+    """
+    下载历史：data/downloaded_movies.json 为快照，每次变更只向 .journal.jsonl 追加一行
+    加载时先读快照再重放日志，日志超过 compact_bytes 后在后台线程写入新快照并清空日志
+    """
+
+    def __init__(
+        self,
+        file_path: str = "data/downloaded_movies.json",
+        journal_path: str | None = None,
+        compact_bytes: int = HISTORY_JOURNAL_COMPACT_BYTES,
+    ) -> None:
         self.file_path = file_path
+        self.journal_path = journal_path or f"{os.path.splitext(file_path)[0]}.journal.jsonl"
+        self.compact_bytes = compact_bytes
         self._cache: dict[str, dict[str, Any]] = {}
         self._loaded = False
         self._lock = asyncio.Lock()
+        # 按 (download_time, movie_id) 升序维护的索引，分页与完整列表都无需每次排序
+        self._order: list[tuple[str, str]] = []
+        self._search_text: dict[str, str] = {}
+        self._link_keys: set[tuple[str, str]] = set()
+        self._revision = 0
+        self._etag_seed = os.urandom(4).hex()
+
+    def _reindex_locked(self) -> None:
+        self._order = sorted(_history_sort_key(record) for record in self._cache.values())
+        self._search_text = {movie_id: _history_search_text(record) for movie_id, record in self._cache.items()}
+        self._link_keys = {
+            (movie_id, _normalize_download_link_key(resource["link"]))
+            for movie_id, record in self._cache.items()
+            for resource in _extract_download_resources(record)
+        }
+
+    def _index_record_locked(self, record: dict[str, Any], previous_key: tuple[str, str] | None) -> None:
+        key = _history_sort_key(record)
+        if previous_key != key:
+            if previous_key is not None:
+                position = bisect_left(self._order, previous_key)
+                if position < len(self._order) and self._order[position] == previous_key:
+                    self._order.pop(position)
+            insort(self._order, key)
+        self._search_text[key[1]] = _history_search_text(record)
+        self._link_keys.update(
+            (key[1], _normalize_download_link_key(resource["link"]))
+            for resource in record.get("download_resources") or []
+        )
+
+    def history_etag(self, *parts: Any) -> str:
+        """历史记录未变化且查询参数相同时 ETag 不变，可直接返回 304"""
+        raw = "\x00".join([self._etag_seed, str(self._revision), *(str(part) for part in parts)])
+        return f'"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+
+    def _load_record_into_cache(self, record: Any) -> None:
+        if not isinstance(record, dict):
+            return
+        normalized = _normalize_history_record(record)
+        if normalized:
+            self._cache[normalized["movie_id"]] = normalized
+
+    def _replay_journal_locked(self) -> bool:
+        """重放日志，返回是否遇到损坏的行（例如写入中途断电留下的半行）"""
+        if not os.path.exists(self.journal_path):
+            return False
+        corrupted = False
+        with open(self.journal_path, "r", encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    corrupted = True
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                if entry.get("op") == "clear":
+                    self._cache = {}
+                elif entry.get("op") == "upsert":
+                    self._load_record_into_cache(entry.get("record"))
+        if corrupted:
+            logger.warning("下载记录日志存在损坏行，已跳过: %s", self.journal_path)
+        return corrupted
+
+    def _sorted_records_locked(self) -> list[dict[str, Any]]:
+        records = list(self._cache.values())
+        records.sort(key=lambda item: item.get("download_time", ""), reverse=True)
+        return records
+
+    @staticmethod
+    def _write_snapshot_and_truncate(file_path: str, journal_path: str, records: list[dict[str, Any]]) -> None:
+        """快照落盘（含 fsync）之后才清空日志，中途失败时旧日志仍可重放"""
+        write_json_atomic(file_path, records, 2)
+        with open(journal_path, "w", encoding="utf-8") as file:
+            os.fsync(file.fileno())
+
+    async def _compact_locked(self) -> None:
+        await asyncio.to_thread(
+            self._write_snapshot_and_truncate,
+            self.file_path,
+            self.journal_path,
+            self._sorted_records_locked(),
+        )
+
+    async def _append_journal_locked(self, entries: list[dict[str, Any]]) -> None:
+        lines = [json.dumps(entry, ensure_ascii=False) for entry in entries]
+        journal_size = await asyncio.to_thread(append_lines_durable, self.journal_path, lines)
+        if journal_size >= self.compact_bytes:
+            await self._compact_locked()
 
     async def load_records(self) -> list[dict[str, Any]]:
         async with self._lock:
@@ -143,6 +394,7 @@ class DownloadHistoryService:
             parent_dir = os.path.dirname(self.file_path)
             if parent_dir:
                 os.makedirs(parent_dir, exist_ok=True)
+            self._cache = {}
             if os.path.exists(self.file_path):
                 with open(self.file_path, "r", encoding="utf-8") as file:
                     data = json.load(file)
@@ -150,37 +402,71 @@ class DownloadHistoryService:
                         source_records = data.get("movies") or data.get("records") or []
                     else:
                         source_records = data
-                    self._cache = {}
                     if isinstance(source_records, list):
                         for record in source_records:
-                            if not isinstance(record, dict):
-                                continue
-                            normalized = _normalize_history_record(record)
-                            if normalized:
-                                self._cache[normalized["movie_id"]] = normalized
-                    logger.info("已加载 %s 条下载记录", len(self._cache))
+                            self._load_record_into_cache(record)
             else:
-                with open(self.file_path, "w", encoding="utf-8") as file:
-                    json.dump([], file, ensure_ascii=False, indent=2)
-                self._cache = {}
+                write_json_atomic(self.file_path, [], 2)
                 logger.info("已创建空的下载记录文件: %s", self.file_path)
 
+            if self._replay_journal_locked():
+                await self._compact_locked()
+            self._reindex_locked()
+            logger.info("已加载 %s 条下载记录", len(self._cache))
             self._loaded = True
             return list(self._cache.values())
 
     async def get_history(self) -> list[dict[str, Any]]:
-        records = await self.load_records()
-        records.sort(key=lambda item: item.get("download_time", ""), reverse=True)
-        return records
+        await self.load_records()
+        return [self._cache[movie_id] for _download_time, movie_id in reversed(self._order)]
+
+    async def get_history_page(
+        self,
+        query: str = "",
+        cursor: str = "",
+        limit: int = HISTORY_PAGE_DEFAULT_LIMIT,
+    ) -> dict[str, Any]:
+        """按下载时间倒序分页，query 匹配番号、标题、演员和磁力来源；cursor 为上一页返回的 next_cursor"""
+        await self.load_records()
+        page_limit = _clamp_history_page_limit(limit)
+        cursor_key = decode_history_cursor(cursor)
+        needle = str(query or "").strip().lower()
+
+        records: list[dict[str, Any]] = []
+        next_cursor = None
+        position = bisect_left(self._order, cursor_key) if cursor_key else len(self._order)
+        for index in range(position - 1, -1, -1):
+            key = self._order[index]
+            if needle and needle not in self._search_text.get(key[1], ""):
+                continue
+            if len(records) == page_limit:
+                next_cursor = encode_history_cursor(_history_sort_key(records[-1]))
+                break
+            records.append(self._cache[key[1]])
+
+        total_count = len(self._cache)
+        matched_count = (
+            sum(1 for text in self._search_text.values() if needle in text)
+            if needle
+            else total_count
+        )
+        return {
+            "success": True,
+            "records": records,
+            "next_cursor": next_cursor,
+            "limit": page_limit,
+            "total_count": total_count,
+            "matched_count": matched_count,
+        }
 
     async def clear(self) -> dict[str, Any]:
         async with self._lock:
-            parent_dir = os.path.dirname(self.file_path)
-            if parent_dir:
-                os.makedirs(parent_dir, exist_ok=True)
-            with open(self.file_path, "w", encoding="utf-8") as file:
-                json.dump([], file, ensure_ascii=False)
+            # 先记一条 clear 日志，写快照与截断日志之间中断时重放也得到空历史
+            await asyncio.to_thread(append_lines_durable, self.journal_path, [json.dumps({"op": "clear"})])
             self._cache.clear()
+            await self._compact_locked()
+            self._reindex_locked()
+            self._revision += 1
             self._loaded = True
         return {"success": True, "message": "历史记录已清空"}
 
@@ -192,14 +478,19 @@ class DownloadHistoryService:
         if not movie_id or not magnet_link:
             return False
         await self.load_records()
-        record = self._cache.get(_normalize_movie_id(movie_id))
-        if not record:
-            return False
-        target_key = _normalize_download_link_key(magnet_link)
-        return any(
-            _normalize_download_link_key(resource.get("link")) == target_key
-            for resource in _extract_download_resources(record)
-        )
+        return (_normalize_movie_id(movie_id), _normalize_download_link_key(magnet_link)) in self._link_keys
+
+    async def downloaded_magnet_pairs(self, pairs: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        """批量判断 (番号, 磁力) 是否已在历史中，返回归一化后已存在的 (番号, 链接键)"""
+        keys = {
+            (_normalize_movie_id(movie_id), _normalize_download_link_key(magnet_link))
+            for movie_id, magnet_link in pairs
+            if movie_id and magnet_link
+        }
+        if not keys:
+            return set()
+        await self.load_records()
+        return keys & self._link_keys
 
     async def get_magnet_source(self, movie_id: str, magnet_link: str) -> str:
         if not movie_id or not magnet_link:
@@ -234,72 +525,30 @@ class DownloadHistoryService:
         magnet_links: list[str] | None = None,
         magnet_sources: list[str] | None = None,
     ) -> None:
+        normalized_ids = [_normalize_movie_id(movie_id) for movie_id in movie_ids]
+        metadata = await _fetch_history_metadata(normalized_ids)
         await self.load_records()
         async with self._lock:
             current_time = datetime.datetime.now().isoformat()
+            changed_records: dict[str, dict[str, Any]] = {}
 
-            for index, raw_movie_id in enumerate(movie_ids):
-                movie_id = _normalize_movie_id(raw_movie_id)
+            for index, movie_id in enumerate(normalized_ids):
                 if not movie_id:
                     continue
 
-                try:
-                    movie_data = await javbus_api_service.get_movie_detail(movie_id)
-                except Exception as exc:
-                    logger.error("Failed to load movie metadata for %s: %s", movie_id, exc)
-                    movie_data = {}
-
-                record = self._cache.get(
-                    movie_id,
-                    {
-                        "movie_id": movie_id,
-                        "download_time": current_time,
-                    },
-                )
-                record["movie_id"] = movie_id
-                record.setdefault("download_time", current_time)
-                record["updated_at"] = current_time
-                record["title"] = movie_data.get("title", "")
-                record["date"] = movie_data.get("date", "")
-
-                stars = movie_data.get("stars", [])
-                record["stars"] = [star.get("name", "") for star in stars] if isinstance(stars, list) else []
-
-                genres = movie_data.get("genres", [])
-                record["genres"] = [genre.get("name", "") for genre in genres] if isinstance(genres, list) else []
-
-                record["img"] = movie_data.get("img", "")
-                download_resources = _extract_download_resources(record)
-                resource_indexes = {
-                    _normalize_download_link_key(resource.get("link")): resource
-                    for resource in download_resources
-                    if _normalize_download_link_key(resource.get("link"))
-                }
-                if magnet_links is not None and index < len(magnet_links):
-                    link = str(magnet_links[index] or "").strip()
-                    link_key = _normalize_download_link_key(link)
-                    source = (
-                        _normalize_magnet_source(magnet_sources[index])
-                        if magnet_sources is not None and index < len(magnet_sources)
-                        else ""
-                    )
-                    if link_key and link_key not in resource_indexes:
-                        resource = {"link": link, "source": source}
-                        download_resources.append(resource)
-                        resource_indexes[link_key] = resource
-                    elif link_key and source and not resource_indexes[link_key].get("source"):
-                        resource_indexes[link_key]["source"] = source
-                record["download_resources"] = download_resources
-                record["download_links"] = [resource["link"] for resource in download_resources]
+                link, source = _saved_download_link(index, magnet_links, magnet_sources)
+                previous = self._cache.get(movie_id)
+                previous_key = _history_sort_key(previous) if previous else None
+                record = _apply_saved_download(previous, movie_id, metadata[movie_id], link, source, current_time)
                 self._cache[movie_id] = record
+                self._index_record_locked(record, previous_key)
+                changed_records[movie_id] = record
 
-            downloaded_movies = list(self._cache.values())
-            downloaded_movies.sort(key=lambda item: item.get("download_time", ""), reverse=True)
-            parent_dir = os.path.dirname(self.file_path)
-            if parent_dir:
-                os.makedirs(parent_dir, exist_ok=True)
-            with open(self.file_path, "w", encoding="utf-8") as file:
-                json.dump(downloaded_movies, file, ensure_ascii=False, indent=2)
+            if changed_records:
+                self._revision += 1
+                await self._append_journal_locked(
+                    [{"op": "upsert", "record": record} for record in changed_records.values()]
+                )
 
             logger.info("保存下载记录: %s", movie_ids)
 
@@ -350,6 +599,12 @@ class DownloadHistoryService:
             checked_records.append(checked_record)
 
         missing_records = [record for record in checked_records if record["needs_reselect"]]
+        try:
+            await magnet_outcome_store.record_completed_movies(
+                {record["movie_id"] for record in checked_records if record["in_local_library"]}
+            )
+        except Exception as exc:
+            logger.warning("记录磁力入库结果失败: %s", exc)
         return {
             "success": True,
             "total_count": len(checked_records),
@@ -366,7 +621,15 @@ class DownloadHistoryService:
         }
 
 
-download_history_service = DownloadHistoryService()
+def create_download_history_service() -> "DownloadHistoryService":
+    if os.getenv("JAVJAEGER_HISTORY_BACKEND", "json").strip().lower() == "sqlite":
+        from .sqlite_history import SqliteDownloadHistoryService
+
+        return SqliteDownloadHistoryService()
+    return DownloadHistoryService()
+
+
+download_history_service = create_download_history_service()
 
 
 def _safe_actor_file_stem(value: str, fallback: str = "actor") -> str:
@@ -388,9 +651,14 @@ class ActorLibraryService:
         self._cache: dict[str, dict[str, Any]] = {}
         self._loaded = False
         self._lock = asyncio.Lock()
-
-    def _empty_payload(self) -> dict[str, Any]:
-        return {"version": 1, "updated_at": "", "actors": {}}
+        # 番号 -> 出演演员键，增量同步时据此找到受影响的演员
+        self._movie_actor_keys: dict[str, set[str]] = {}
+        # 演员库文件不存在时需要先按全部影片完整重建一次
+        self._rebuild_required = False
+        self._avatar_pending: set[str] = set()
+        # 本进程内已尝试过补头像的演员，增量同步不再重复查询
+        self._avatar_attempted: set[str] = set()
+        self._avatar_task: asyncio.Task | None = None
 
     def _actor_key(self, actor: dict[str, Any]) -> str:
         actor_id = str(actor.get("id") or "").strip()
@@ -468,18 +736,63 @@ class ActorLibraryService:
                 actors = data.get("actors", {}) if isinstance(data, dict) else {}
                 self._cache = {str(actor_key): record for actor_key, record in actors.items() if isinstance(record, dict)}
             else:
-                with open(self.file_path, "w", encoding="utf-8") as file:
-                    json.dump(self._empty_payload(), file, ensure_ascii=False, indent=2)
+                # 文件要等第一次完整重建后才写出，中途退出时下次启动仍会重建
                 self._cache = {}
+                self._rebuild_required = True
+            self._index_movies_locked()
             self._loaded = True
             return self._cache
 
+    def _index_movies_locked(self) -> None:
+        self._movie_actor_keys = {}
+        for actor_key, actor in self._cache.items():
+            movies = actor.get("movies") if isinstance(actor.get("movies"), dict) else {}
+            for movie_id in movies:
+                self._movie_actor_keys.setdefault(movie_id, set()).add(actor_key)
+
+    async def needs_full_sync(self) -> bool:
+        await self.load_records()
+        return self._rebuild_required
+
     async def _save_locked(self) -> None:
         now = datetime.datetime.now().isoformat()
         payload = {"version": 1, "updated_at": now, "actors": self._cache}
-        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        with open(self.file_path, "w", encoding="utf-8") as file:
-            json.dump(payload, file, ensure_ascii=False, indent=2)
+        # 持有锁期间 _cache 不会被修改，序列化与写盘放到线程中执行
+        await asyncio.to_thread(write_json_atomic, self.file_path, payload, 2)
+
+    def _new_actor(
+        self,
+        actor_key: str,
+        actor_ref: dict[str, str],
+        existing: dict[str, Any],
+        now: str,
+    ) -> dict[str, Any]:
+        return {
+            "key": actor_key,
+            "id": existing.get("id") or actor_ref.get("id") or "",
+            "name": existing.get("name") or actor_ref.get("name") or actor_key,
+            "remote_avatar_url": existing.get("remote_avatar_url") or actor_ref.get("avatar") or "",
+            "avatar_file": existing.get("avatar_file") or "",
+            "first_seen_at": existing.get("first_seen_at") or now,
+            "movies": {},
+        }
+
+    def _add_actor_movie(self, actor: dict[str, Any], actor_ref: dict[str, str], movie: dict[str, Any], now: str) -> None:
+        actor_key = actor["key"]
+        if actor_ref.get("id") and not actor.get("id"):
+            actor["id"] = actor_ref["id"]
+        if actor_ref.get("name") and actor.get("name") == actor_key:
+            actor["name"] = actor_ref["name"]
+        if actor_ref.get("avatar") and not actor.get("remote_avatar_url"):
+            actor["remote_avatar_url"] = actor_ref["avatar"]
+        actor["movies"][movie["movie_id"]] = movie
+        actor["updated_at"] = now
+
+    @staticmethod
+    def _refresh_actor_movies(actor: dict[str, Any]) -> None:
+        movies = actor.get("movies") if isinstance(actor.get("movies"), dict) else {}
+        actor["movie_ids"] = sorted(movies.keys())
+        actor["movie_count"] = len(actor["movie_ids"])
 
     async def _ensure_actor_avatar(self, actor_key: str, actor: dict[str, Any], overwrite: bool) -> bool:
         existing_path = await self.get_avatar_path(actor_key)
@@ -533,40 +846,26 @@ class ActorLibraryService:
                 continue
             for actor_ref in self._actor_refs_from_record(record):
                 actor_key = self._actor_key(actor_ref)
-                existing = previous.get(actor_key, {})
-                actor = next_cache.get(actor_key) or {
-                    "key": actor_key,
-                    "id": existing.get("id") or actor_ref.get("id") or "",
-                    "name": existing.get("name") or actor_ref.get("name") or actor_key,
-                    "remote_avatar_url": existing.get("remote_avatar_url") or actor_ref.get("avatar") or "",
-                    "avatar_file": existing.get("avatar_file") or "",
-                    "first_seen_at": existing.get("first_seen_at") or now,
-                    "movies": {},
-                }
-                if actor_ref.get("id") and not actor.get("id"):
-                    actor["id"] = actor_ref["id"]
-                if actor_ref.get("name") and actor.get("name") == actor_key:
-                    actor["name"] = actor_ref["name"]
-                if actor_ref.get("avatar") and not actor.get("remote_avatar_url"):
-                    actor["remote_avatar_url"] = actor_ref["avatar"]
-                actor["movies"][movie["movie_id"]] = movie
-                actor["updated_at"] = now
+                actor = next_cache.get(actor_key) or self._new_actor(actor_key, actor_ref, previous.get(actor_key, {}), now)
+                self._add_actor_movie(actor, actor_ref, movie, now)
                 next_cache[actor_key] = actor
 
         changed_avatar_count = 0
         if download_missing_avatars:
-            for actor_key, actor in next_cache.items():
-                if await self._ensure_actor_avatar(actor_key, actor, overwrite_existing_avatars):
-                    changed_avatar_count += 1
+            results = await self._download_avatars(next_cache, overwrite_existing_avatars)
+            for actor_key, (changed, fields) in results.items():
+                next_cache[actor_key].update(fields)
+                changed_avatar_count += int(changed)
+            self._avatar_attempted.update(next_cache.keys())
 
         for actor in next_cache.values():
-            movies = actor.get("movies") if isinstance(actor.get("movies"), dict) else {}
-            actor["movie_ids"] = sorted(movies.keys())
-            actor["movie_count"] = len(actor["movie_ids"])
+            self._refresh_actor_movies(actor)
 
         async with self._lock:
             self._cache = next_cache
             self._loaded = True
+            self._rebuild_required = False
+            self._index_movies_locked()
             await self._save_locked()
 
         return {
@@ -575,6 +874,146 @@ class ActorLibraryService:
             "downloaded_avatar_count": changed_avatar_count,
         }
 
+    async def apply_movie_changes(
+        self,
+        changed_records: list[dict[str, Any]] | None = None,
+        removed_movie_ids: list[str] | set[str] | None = None,
+        download_missing_avatars: bool = True,
+    ) -> dict[str, Any]:
+        """
+        只按变化或移除的影片更新受影响演员的作品列表，不重建整个演员库
+        缺少头像的演员交给后台有界并发下载，不阻塞调用方也不占用演员库锁
+        """
+        await self.load_records()
+        now = datetime.datetime.now().isoformat()
+        changed_movies: dict[str, tuple[dict[str, Any], list[dict[str, str]]]] = {}
+        for record in changed_records or []:
+            movie = self._movie_summary_from_record(record)
+            if movie["movie_id"]:
+                changed_movies[movie["movie_id"]] = (movie, self._actor_refs_from_record(record))
+        removed = {str(movie_id or "").strip().upper() for movie_id in removed_movie_ids or []} - {""}
+
+        async with self._lock:
+            touched: set[str] = set()
+            for movie_id in removed | set(changed_movies):
+                for actor_key in self._movie_actor_keys.pop(movie_id, set()):
+                    actor = self._cache.get(actor_key)
+                    if actor and isinstance(actor.get("movies"), dict):
+                        actor["movies"].pop(movie_id, None)
+                        touched.add(actor_key)
+
+            for movie_id, (movie, actor_refs) in changed_movies.items():
+                for actor_ref in actor_refs:
+                    actor_key = self._actor_key(actor_ref)
+                    actor = self._cache.get(actor_key)
+                    if actor is None:
+                        actor = self._new_actor(actor_key, actor_ref, {}, now)
+                        self._cache[actor_key] = actor
+                    actor.setdefault("key", actor_key)
+                    if not isinstance(actor.get("movies"), dict):
+                        actor["movies"] = {}
+                    self._add_actor_movie(actor, actor_ref, movie, now)
+                    self._movie_actor_keys.setdefault(movie_id, set()).add(actor_key)
+                    touched.add(actor_key)
+
+            removed_actor_count = 0
+            for actor_key in touched:
+                actor = self._cache[actor_key]
+                self._refresh_actor_movies(actor)
+                if not actor["movie_count"]:
+                    self._cache.pop(actor_key, None)
+                    removed_actor_count += 1
+                else:
+                    actor["updated_at"] = now
+            if touched:
+                await self._save_locked()
+
+            queued = set()
+            if download_missing_avatars:
+                queued = {
+                    actor_key
+                    for actor_key in touched
+                    if actor_key in self._cache
+                    and not self._cache[actor_key].get("avatar_file")
+                    and actor_key not in self._avatar_attempted
+                }
+                self._queue_avatar_downloads_locked(queued)
+
+        return {
+            "success": True,
+            "total_actors": len(self._cache),
+            "updated_actor_count": len(touched) - removed_actor_count,
+            "removed_actor_count": removed_actor_count,
+            "queued_avatar_count": len(queued),
+        }
+
+    async def _download_avatars(
+        self,
+        actors: dict[str, dict[str, Any]],
+        overwrite: bool,
+    ) -> dict[str, tuple[bool, dict[str, str]]]:
+        """并发补全头像，返回 {演员键: (是否下载了新头像, 需要写回的头像字段)}"""
+        semaphore = asyncio.Semaphore(ACTOR_AVATAR_DOWNLOAD_CONCURRENCY)
+
+        async def download(actor_key: str, actor: dict[str, Any]) -> tuple[str, bool, dict[str, str]]:
+            candidate = dict(actor)
+            async with semaphore:
+                changed = await self._ensure_actor_avatar(actor_key, candidate, overwrite)
+            fields = {
+                field: str(candidate.get(field) or "")
+                for field in ("remote_avatar_url", "avatar_file")
+                if candidate.get(field)
+            }
+            return actor_key, changed, fields
+
+        results = await asyncio.gather(*(download(actor_key, actor) for actor_key, actor in actors.items()))
+        return {actor_key: (changed, fields) for actor_key, changed, fields in results}
+
+    def _queue_avatar_downloads_locked(self, actor_keys: set[str]) -> None:
+        if not actor_keys:
+            return
+        self._avatar_attempted.update(actor_keys)
+        self._avatar_pending.update(actor_keys)
+        task = self._avatar_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._avatar_task = asyncio.create_task(self._avatar_worker())
+
+    async def _avatar_worker(self) -> None:
+        while self._avatar_pending:
+            batch, self._avatar_pending = self._avatar_pending, set()
+            actors = {actor_key: dict(self._cache[actor_key]) for actor_key in batch if actor_key in self._cache}
+            try:
+                results = await self._download_avatars(actors, overwrite=False)
+                async with self._lock:
+                    updated = False
+                    for actor_key, (_changed, fields) in results.items():
+                        actor = self._cache.get(actor_key)
+                        if actor is not None and any(actor.get(key) != value for key, value in fields.items()):
+                            actor.update(fields)
+                            updated = True
+                    if updated:
+                        await self._save_locked()
+            except Exception as exc:
+                logger.warning("Actor avatar queue failed: %r", exc)
+
+    async def wait_for_avatar_downloads(self) -> None:
+        task = self._avatar_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            await task
+
+    async def shutdown(self) -> None:
+        """取消后台补头像任务；已下载到本地的头像下次同步时会直接识别"""
+        self._avatar_pending.clear()
+        task = self._avatar_task
+        self._avatar_task = None
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
     async def get_summary(self) -> dict[str, Any]:
         records = await self.load_records()
         actors: list[dict[str, Any]] = []
@@ -635,12 +1074,27 @@ class LocalMovieLibraryService:
         self,
         file_path: str = "data/local_movie_library.json",
         actor_library_service: ActorLibraryService | None = None,
+        flush_interval_seconds: float = 0.0,
+        asset_revalidate_seconds: float = 0.0,
     ) -> None:
         self.file_path = file_path
         self.actor_library_service = actor_library_service
+        self.flush_interval_seconds = flush_interval_seconds
+        self.asset_index = LocalLibraryAssetIndex(asset_revalidate_seconds)
         self._cache: dict[str, dict[str, Any]] = {}
         self._loaded = False
         self._lock = asyncio.Lock()
+        self._dirty = False
+        self._flush_task: asyncio.Task | None = None
+        # 每次修改 _cache 都递增，检索索引据此判断是否需要增量同步
+        self._revision = 0
+        self._search_revision = -1
+        self._search_index: LocalLibrarySearchIndex | None = None
+        # 列表行、搜索文本与各排序规则的有序键，按 _revision 失效
+        self._summary_revision = -1
+        self._summary_rows: dict[str, tuple[dict[str, Any], str]] = {}
+        self._summary_orders: dict[str, list[tuple[Any, ...]]] = {}
+        self._summary_facets: dict[str, list[dict[str, Any]]] | None = None
 
     def _empty_payload(self) -> dict[str, Any]:
         return {"version": 1, "updated_at": "", "movies": {}}
@@ -672,20 +1126,61 @@ class LocalMovieLibraryService:
     async def _save_locked(self) -> None:
         now = datetime.datetime.now().isoformat()
         payload = {"version": 1, "updated_at": now, "movies": self._cache}
-        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        with open(self.file_path, "w", encoding="utf-8") as file:
-            json.dump(payload, file, ensure_ascii=False, indent=2)
+        self._revision += 1
+        # 持有锁期间其他协程无法修改 _cache，序列化与写盘可以放到线程中执行
+        try:
+            await asyncio.to_thread(write_json_atomic, self.file_path, payload, 2)
+        except Exception:
+            # 写盘失败时保留待写入标记，下次合并写盘或 sync() 会重试
+            self._dirty = True
+            raise
+        self._dirty = False
+
+    async def _mark_dirty_locked(self) -> None:
+        """
+        逐条更新只标记为待写入，最多每 flush_interval_seconds 合并写盘一次
+        间隔为 0 时立即写盘；关闭应用或调用 sync() 时会写出尚未落盘的修改
+        """
+        if self.flush_interval_seconds <= 0:
+            await self._save_locked()
+            return
+        self._dirty = True
+        self._revision += 1
+        task = self._flush_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval_seconds)
+        try:
+            await self.sync()
+        except Exception as exc:
+            logger.error("写入本地影片库失败: %s", exc)
+
+    async def sync(self) -> bool:
+        async with self._lock:
+            if not self._dirty:
+                return False
+            await self._save_locked()
+            return True
 
     async def _sync_actor_library(
         self,
-        records: list[dict[str, Any]] | None = None,
+        changed_records: list[dict[str, Any]] | None = None,
+        removed_movie_ids: list[str] | set[str] | None = None,
         download_missing_avatars: bool = True,
     ) -> dict[str, Any] | None:
+        """只同步变化和移除的影片；演员库尚未建立时按全部影片完整重建一次"""
         if self.actor_library_service is None:
             return None
-        source_records = records if records is not None else list(self._cache.values())
-        return await self.actor_library_service.sync_from_movie_records(
-            source_records,
+        if await self.actor_library_service.needs_full_sync():
+            return await self.actor_library_service.sync_from_movie_records(
+                list(self._cache.values()),
+                download_missing_avatars=download_missing_avatars,
+            )
+        return await self.actor_library_service.apply_movie_changes(
+            changed_records,
+            removed_movie_ids,
             download_missing_avatars=download_missing_avatars,
         )
 
@@ -695,21 +1190,25 @@ class LocalMovieLibraryService:
         values.sort(key=lambda item: item.get("movie_id", ""))
         return values
 
+    async def _decorate_record(self, source: dict[str, Any]) -> dict[str, Any]:
+        """补充前端展示需要的封面、媒体信息与本地图片地址"""
+        record = dict(source)
+        metadata = record.get("metadata") if isinstance(record.get("metadata"), dict) else {}
+        record["cover_url"] = metadata.get("cover_url") or record.get("img") or ""
+        record["media_info"] = self._record_media_info(record)
+        record.pop("poster_url", None)
+        record.pop("thumbnail_url", None)
+        assets = self.asset_index.movie_assets(source)
+        if assets.poster:
+            record["poster_url"] = f"/api/movies/local-library/poster/{record.get('movie_id')}"
+        if assets.thumbnail:
+            record["thumbnail_url"] = f"/api/movies/local-library/thumbnail/{record.get('movie_id')}"
+        elif metadata.get("list_thumbnail_url"):
+            record["thumbnail_url"] = metadata.get("list_thumbnail_url")
+        return record
+
     async def get_summary(self) -> dict[str, Any]:
-        records = [dict(record) for record in await self.get_all()]
-        for record in records:
-            metadata = record.get("metadata") if isinstance(record.get("metadata"), dict) else {}
-            record["cover_url"] = metadata.get("cover_url") or record.get("img") or ""
-            record["media_info"] = self._record_media_info(record)
-            record.pop("poster_url", None)
-            record.pop("thumbnail_url", None)
-            if await self.get_poster_path(str(record.get("movie_id") or "")):
-                record["poster_url"] = f"/api/movies/local-library/poster/{record.get('movie_id')}"
-            thumbnail_path = await self.get_thumbnail_path(str(record.get("movie_id") or ""))
-            if thumbnail_path:
-                record["thumbnail_url"] = f"/api/movies/local-library/thumbnail/{record.get('movie_id')}"
-            elif metadata.get("list_thumbnail_url"):
-                record["thumbnail_url"] = metadata.get("list_thumbnail_url")
+        records = [await self._decorate_record(record) for record in await self.get_all()]
         total_files = sum(int(record.get("file_count") or 0) for record in records)
         total_size = sum(int(record.get("total_size") or 0) for record in records)
         return {
@@ -720,6 +1219,161 @@ class LocalMovieLibraryService:
             "records": records,
         }
 
+    def _summary_index(self) -> dict[str, tuple[dict[str, Any], str]]:
+        """在事件循环中同步重建，期间没有 await，不会与其他协程的修改交错"""
+        if self._summary_revision != self._revision:
+            self._summary_rows = {
+                movie_id: (summary_row(record, self._record_media_info(record)), summary_search_text(record))
+                for movie_id, record in self._cache.items()
+            }
+            self._summary_orders = {}
+            self._summary_facets = None
+            self._summary_revision = self._revision
+        return self._summary_rows
+
+    def _summary_order(self, sort: str) -> list[tuple[Any, ...]]:
+        rows = self._summary_index()
+        if sort not in self._summary_orders:
+            self._summary_orders[sort] = sorted(summary_sort_key(row, sort) for row, _search_text in rows.values())
+        return self._summary_orders[sort]
+
+    def _decorate_summary_row(self, row: dict[str, Any]) -> dict[str, Any]:
+        record = dict(row)
+        thumbnail_url = record.pop("list_thumbnail_url", "")
+        source = self._cache.get(str(record.get("movie_id") or "").upper())
+        assets = self.asset_index.movie_assets(source) if source else None
+        if assets and assets.poster:
+            record["poster_url"] = f"/api/movies/local-library/poster/{record.get('movie_id')}"
+        if assets and assets.thumbnail:
+            record["thumbnail_url"] = f"/api/movies/local-library/thumbnail/{record.get('movie_id')}"
+        elif thumbnail_url:
+            record["thumbnail_url"] = thumbnail_url
+        return record
+
+    async def get_summary_page(
+        self,
+        sort: str = LIBRARY_SUMMARY_DEFAULT_SORT,
+        query: str = "",
+        filters: dict[str, list[str]] | None = None,
+        cursor: str = "",
+        limit: int = LIBRARY_SUMMARY_DEFAULT_LIMIT,
+    ) -> dict[str, Any]:
+        """
+        服务端排序、筛选并按游标分页的影视库列表，只返回轻量列表行
+        完整记录通过 get_detail 单独读取；首页（无游标）附带筛选项统计
+        """
+        await self.load_records()
+        sort = sort if sort in LIBRARY_SUMMARY_SORTS else LIBRARY_SUMMARY_DEFAULT_SORT
+        page_limit = clamp_summary_limit(limit)
+        cursor_key = decode_summary_cursor(cursor, sort)
+        needle = str(query or "").strip().lower()
+        active_filters = {
+            LIBRARY_SUMMARY_FILTER_FIELDS[name]: {str(value) for value in values if str(value).strip()}
+            for name, values in (filters or {}).items()
+            if name in LIBRARY_SUMMARY_FILTER_FIELDS and values
+        }
+        active_filters = {field_name: values for field_name, values in active_filters.items() if values}
+
+        rows = self._summary_index()
+        keys = self._summary_order(sort)
+        reverse = LIBRARY_SUMMARY_SORTS[sort][1]
+
+        def matches(movie_id: str) -> bool:
+            row, search_text = rows[movie_id]
+            if needle and needle not in search_text:
+                return False
+            return all(summary_filter_values(row, field_name) & values for field_name, values in active_filters.items())
+
+        try:
+            if reverse:
+                end = bisect_left(keys, cursor_key) if cursor_key else len(keys)
+                positions = range(end - 1, -1, -1)
+            else:
+                start = bisect_right(keys, cursor_key) if cursor_key else 0
+                positions = range(start, len(keys))
+        except TypeError as exc:
+            raise LibraryCursorError("invalid library cursor") from exc
+
+        page_keys: list[tuple[Any, ...]] = []
+        has_more = False
+        for position in positions:
+            key = keys[position]
+            if not matches(key[-1]):
+                continue
+            if len(page_keys) == page_limit:
+                has_more = True
+                break
+            page_keys.append(key)
+
+        filtered = bool(needle or active_filters)
+        matched_count = sum(1 for movie_id in rows if matches(movie_id)) if filtered else len(rows)
+        payload = {
+            "success": True,
+            "sort": sort,
+            "records": [self._decorate_summary_row(rows[key[-1]][0]) for key in page_keys],
+            "next_cursor": encode_summary_cursor(sort, page_keys[-1]) if has_more else None,
+            "limit": page_limit,
+            "total_movies": len(rows),
+            "total_files": sum(int(row.get("file_count") or 0) for row, _search_text in rows.values()),
+            "total_size": sum(int(row.get("total_size") or 0) for row, _search_text in rows.values()),
+            "matched_count": matched_count,
+        }
+        if not cursor_key:
+            if self._summary_facets is None:
+                self._summary_facets = summary_facets([row for row, _search_text in rows.values()])
+            payload["facets"] = self._summary_facets
+        return payload
+
+    async def get_detail(self, movie_id: str) -> dict[str, Any] | None:
+        records = await self.load_records()
+        record = records.get((movie_id or "").upper())
+        return await self._decorate_record(record) if record else None
+
+    def _search_locked(self, query: str, filters: dict[str, str], page: int, page_size: int) -> dict[str, Any]:
+        if self._search_index is None:
+            self._search_index = LocalLibrarySearchIndex(f"{os.path.splitext(self.file_path)[0]}.search.db")
+        if self._search_revision != self._revision:
+            changed = self._search_index.sync(self._cache)
+            if changed:
+                logger.info("本地影片库检索索引已更新 %s 条", changed)
+            self._search_revision = self._revision
+        return self._search_index.search(query, filters, page, page_size)
+
+    async def search(
+        self,
+        query: str = "",
+        star: str = "",
+        genre: str = "",
+        studio: str = "",
+        series: str = "",
+        page: int = 1,
+        page_size: int = LIBRARY_SEARCH_DEFAULT_PAGE_SIZE,
+    ) -> dict[str, Any]:
+        """
+        通过 SQLite FTS5 检索影视库，按相关度排序并返回演员、标签、片商、系列分面
+        索引在影视库有修改后的首次检索时按指纹增量同步
+        """
+        await self.load_records()
+        filters = {"stars": star, "genres": genre, "studio": studio, "series": series}
+        async with self._lock:
+            result = await asyncio.to_thread(self._search_locked, query, filters, page, page_size)
+            sources = [(hit, self._cache.get(hit["movie_id"])) for hit in result["hits"]]
+        records = []
+        for hit, source in sources:
+            if source:
+                record = await self._decorate_record(source)
+                record["score"] = hit["score"]
+                records.append(record)
+        return {
+            "success": True,
+            "query": query,
+            "total": result["total"],
+            "page": result["page"],
+            "page_size": result["page_size"],
+            "records": records,
+            "facets": result["facets"],
+        }
+
     def _has_remote_metadata(self, record: dict[str, Any]) -> bool:
         metadata = record.get("metadata") if isinstance(record.get("metadata"), dict) else {}
         raw = metadata.get("raw")
@@ -731,46 +1385,6 @@ class LocalMovieLibraryService:
             return metadata.get("cover_url") or record.get("cover_url") or record.get("img")
         return metadata.get(field_name) if field_name in metadata else record.get(field_name)
 
-    def _iter_existing_video_paths(self, record: dict[str, Any]) -> list[Path]:
-        paths: list[Path] = []
-        for file_record in record.get("files", []):
-            video_path = Path(str(file_record.get("path") or ""))
-            if not video_path.name:
-                continue
-            try:
-                resolved = video_path.resolve()
-            except OSError:
-                continue
-            if resolved.exists() and resolved.is_file():
-                paths.append(resolved)
-        return paths
-
-    def _has_nfo_file(self, record: dict[str, Any]) -> bool:
-        for video_path in self._iter_existing_video_paths(record):
-            try:
-                if video_path.with_suffix(".nfo").exists():
-                    return True
-            except OSError:
-                continue
-        return False
-
-    def _has_poster_file(self, record: dict[str, Any]) -> bool:
-        for video_path in self._iter_existing_video_paths(record):
-            candidates = [
-                video_path.with_name(f"{video_path.stem}-poster.jpg"),
-                video_path.with_name(f"{video_path.stem}-poster.png"),
-                video_path.with_name("poster.jpg"),
-                video_path.with_name("folder.jpg"),
-                video_path.with_name("cover.jpg"),
-            ]
-            for candidate in candidates:
-                try:
-                    if candidate.exists() and candidate.is_file():
-                        return True
-                except OSError:
-                    continue
-        return False
-
     def _missing_information_fields(
         self,
         record: dict[str, Any],
@@ -781,6 +1395,9 @@ class LocalMovieLibraryService:
         missing: list[str] = []
         movie_id = str(record.get("movie_id") or "").strip().upper()
         has_remote_metadata = self._has_remote_metadata(record)
+        assets: MovieAssets | None = None
+        if "nfo" in selected_fields or "poster_file" in selected_fields:
+            assets = self.asset_index.movie_assets(record)
         for field_name in metadata_fields:
             value = self._information_value(record, field_name)
             is_missing = value in (None, "", [], {})
@@ -788,9 +1405,9 @@ class LocalMovieLibraryService:
                 is_missing = True
             if is_missing:
                 missing.append(field_name)
-        if "nfo" in selected_fields and has_remote_metadata and not self._has_nfo_file(record):
+        if "nfo" in selected_fields and has_remote_metadata and not assets.nfo:
             missing.append("nfo")
-        if "poster_file" in selected_fields and self._information_value(record, "cover_url") and not self._has_poster_file(record):
+        if "poster_file" in selected_fields and self._information_value(record, "cover_url") and not assets.poster_file:
             missing.append("poster_file")
         return missing
 
@@ -860,9 +1477,8 @@ class LocalMovieLibraryService:
             record["scrape_error"] = scrape_error
             record["scraped_at"] = scraped_at
             self._refresh_record_totals(record, scraped_at)
-            actor_records = list(self._cache.values())
-            await self._save_locked()
-        await self._sync_actor_library(actor_records, download_missing_avatars=True)
+            await self._mark_dirty_locked()
+        await self._sync_actor_library([record], download_missing_avatars=True)
         return True
 
     async def update_file_media_info(self, movie_id: str, media_by_path: dict[str, dict[str, Any]]) -> bool:
@@ -899,7 +1515,7 @@ class LocalMovieLibraryService:
                         changed = True
             if changed:
                 self._refresh_record_totals(record, datetime.datetime.now().isoformat())
-                await self._save_locked()
+                await self._mark_dirty_locked()
             return changed
 
     async def clean_file_records(
@@ -976,12 +1592,11 @@ class LocalMovieLibraryService:
                         self._cache.pop(movie_id, None)
                         removed_movie_ids.append(movie_id)
 
-            actor_records = list(self._cache.values())
             if touched:
-                await self._save_locked()
+                await self._mark_dirty_locked()
 
-        if removed_file_count or removed_movie_ids:
-            await self._sync_actor_library(actor_records, download_missing_avatars=False)
+        if removed_movie_ids:
+            await self._sync_actor_library(removed_movie_ids=removed_movie_ids, download_missing_avatars=False)
 
         return {
             "success": True,
@@ -998,7 +1613,8 @@ class LocalMovieLibraryService:
         async with self._lock:
             self._cache.clear()
             await self._save_locked()
-        await self._sync_actor_library([], download_missing_avatars=False)
+        if self.actor_library_service is not None:
+            await self.actor_library_service.sync_from_movie_records([], download_missing_avatars=False)
         return {"success": True, "message": "本地影片库已清空"}
 
     async def delete_movie(self, movie_id: str) -> dict[str, Any]:
@@ -1023,10 +1639,9 @@ class LocalMovieLibraryService:
                     "error": "movie_not_found",
                     "message": "影片不在影视库中",
                 }
-            actor_records = list(self._cache.values())
             await self._save_locked()
 
-        await self._sync_actor_library(actor_records, download_missing_avatars=False)
+        await self._sync_actor_library(removed_movie_ids=[normalized], download_missing_avatars=False)
         return {
             "success": True,
             "deleted": True,
@@ -1035,12 +1650,44 @@ class LocalMovieLibraryService:
             "message": "影片已从影视库移除",
         }
 
+    async def get_scan_fingerprints(self, scan_root: str) -> dict[str, tuple[int, int, int]]:
+        """返回该扫描根目录下已入库文件的 (size, mtime_ns, inode)，旧记录缺少的字段记为 -1"""
+        records = await self.load_records()
+        normalized_root = os.path.abspath(scan_root)
+        fingerprints: dict[str, tuple[int, int, int]] = {}
+        for record in records.values():
+            for file_record in record.get("files", []):
+                if os.path.abspath(str(file_record.get("scan_root") or "")) != normalized_root:
+                    continue
+                fingerprints[os.path.abspath(str(file_record.get("path") or ""))] = (
+                    int(file_record.get("size") or 0),
+                    int(file_record.get("mtime_ns") if file_record.get("mtime_ns") is not None else -1),
+                    int(file_record.get("inode") if file_record.get("inode") is not None else -1),
+                )
+        return fingerprints
+
+    async def get_scan_roots(self) -> list[str]:
+        records = await self.load_records()
+        return sorted({
+            os.path.abspath(str(file_record.get("scan_root")))
+            for record in records.values()
+            for file_record in record.get("files", [])
+            if file_record.get("scan_root")
+        })
+
     async def is_movie_present(self, movie_id: str) -> bool:
         if not movie_id:
             return False
         records = await self.load_records()
         return movie_id.upper() in records
 
+    async def present_movie_ids(self, movie_ids: list[str] | set[str]) -> set[str]:
+        targets = {str(movie_id).upper() for movie_id in movie_ids if movie_id}
+        if not targets:
+            return set()
+        records = await self.load_records()
+        return {movie_id for movie_id in targets if movie_id in records}
+
     async def get_status(self, movie_id: str) -> dict[str, Any]:
         records = await self.load_records()
         normalized = (movie_id or "").upper()
@@ -1052,56 +1699,32 @@ class LocalMovieLibraryService:
             "record": record,
         }
 
-    async def get_poster_path(self, movie_id: str) -> Path | None:
+    async def _asset_path(self, movie_id: str, asset_name: str) -> Path | None:
         records = await self.load_records()
         record = records.get((movie_id or "").upper())
         if not record:
             return None
+        path = getattr(self.asset_index.movie_assets(record), asset_name)
+        if path is not None and not path.is_file():
+            # 索引尚未察觉外部删除时重新列举一次
+            self.asset_index.invalidate(path.parent)
+            path = getattr(self.asset_index.movie_assets(record), asset_name)
+        return path
 
-        for file_record in record.get("files", []):
-            video_path = Path(str(file_record.get("path") or ""))
-            if not video_path.name:
-                continue
-            candidates = [
-                video_path.with_name(f"{video_path.stem}-poster.jpg"),
-                video_path.with_name(f"{video_path.stem}-poster.png"),
-                video_path.with_name("poster.jpg"),
-                video_path.with_name("folder.jpg"),
-                video_path.with_name("cover.jpg"),
-            ]
-            for candidate in candidates:
-                try:
-                    if candidate.exists() and candidate.is_file():
-                        return candidate.resolve()
-                except OSError:
-                    continue
-        return None
+    async def get_poster_path(self, movie_id: str) -> Path | None:
+        return await self._asset_path(movie_id, "poster")
 
     async def get_thumbnail_path(self, movie_id: str) -> Path | None:
+        return await self._asset_path(movie_id, "thumbnail")
+
+    async def get_movie_assets(self, movie_id: str) -> dict[str, Any] | None:
         records = await self.load_records()
         record = records.get((movie_id or "").upper())
         if not record:
             return None
+        return self.asset_index.movie_assets(record).to_dict()
 
-        for file_record in record.get("files", []):
-            video_path = Path(str(file_record.get("path") or ""))
-            if not video_path.name:
-                continue
-            candidates = [
-                video_path.with_name(f"{video_path.stem}-thumb.jpg"),
-                video_path.with_name(f"{video_path.stem}-thumb.png"),
-                video_path.with_name("thumb.jpg"),
-                video_path.with_name("thumbnail.jpg"),
-            ]
-            for candidate in candidates:
-                try:
-                    if candidate.exists() and candidate.is_file():
-                        return candidate.resolve()
-                except OSError:
-                    continue
-        return None
-
-    def _actor_avatar_candidates(self, video_path: Path, actor_name: str) -> list[Path]:
+    def _actor_avatar_names(self, actor_name: str) -> list[str]:
         raw_name = str(actor_name or "").strip()
         if not raw_name:
             return []
@@ -1111,9 +1734,8 @@ class LocalMovieLibraryService:
         for stem in (raw_name, sanitized):
             if stem and stem not in stems:
                 stems.append(stem)
-        actor_dir = video_path.parent / "actors"
         extensions = [".jpg", ".jpeg", ".png", ".webp"]
-        return [actor_dir / f"{stem}{extension}" for stem in stems for extension in extensions]
+        return [f"{stem}{extension}" for stem in stems for extension in extensions]
 
     async def get_actor_avatar_path(self, movie_id: str, actor_name: str) -> Path | None:
         records = await self.load_records()
@@ -1121,16 +1743,20 @@ class LocalMovieLibraryService:
         if not record:
             return None
 
+        names = self._actor_avatar_names(actor_name)
+        if not names:
+            return None
         for file_record in record.get("files", []):
             video_path = Path(str(file_record.get("path") or ""))
             if not video_path.name:
                 continue
-            for candidate in self._actor_avatar_candidates(video_path, actor_name):
-                try:
-                    if candidate.exists() and candidate.is_file():
-                        return candidate.resolve()
-                except OSError:
-                    continue
+            actor_dir = video_path.parent / ACTOR_IMAGE_DIR
+            candidate = self.asset_index.find(actor_dir, names)
+            if candidate is not None and not candidate.is_file():
+                self.asset_index.invalidate(actor_dir)
+                candidate = self.asset_index.find(actor_dir, names)
+            if candidate is not None:
+                return candidate
         return None
 
     async def get_video_file_path(self, movie_id: str, file_index: int = 0) -> Path | None:
@@ -1156,33 +1782,44 @@ class LocalMovieLibraryService:
         scan_root: str,
         files: list[dict[str, Any]],
         remove_missing: bool = True,
+        removed_paths: list[str] | set[str] | None = None,
     ) -> dict[str, Any]:
+        """
+        remove_missing 为真时先移除该扫描根目录下的全部文件记录再写入 files
+        增量扫描传入 removed_paths，只移除这些路径，其余文件记录保持不变
+        """
         await self.load_records()
         now = datetime.datetime.now().isoformat()
         normalized_root = os.path.abspath(scan_root)
         recognized_files = [item for item in files if item.get("movie_id")]
         unrecognized_files = [item for item in files if not item.get("movie_id")]
+        removed_path_set = {os.path.abspath(str(path)) for path in removed_paths or []}
 
         async with self._lock:
             previous_movie_ids = set(self._cache.keys())
             removed_files = 0
 
-            if remove_missing:
+            if remove_missing or removed_path_set:
                 empty_movie_ids: list[str] = []
                 for movie_id, record in self._cache.items():
                     kept_files = []
                     for file_record in record.get("files", []):
-                        if os.path.abspath(str(file_record.get("scan_root") or "")) == normalized_root:
+                        if os.path.abspath(str(file_record.get("scan_root") or "")) == normalized_root and (
+                            remove_missing or os.path.abspath(str(file_record.get("path") or "")) in removed_path_set
+                        ):
                             removed_files += 1
                             continue
                         kept_files.append(file_record)
+                    changed = len(kept_files) != len(record.get("files", []))
                     record["files"] = kept_files
                     if not kept_files:
                         empty_movie_ids.append(movie_id)
-                    else:
+                    elif remove_missing or changed:
                         self._refresh_record_totals(record, now)
                 for movie_id in empty_movie_ids:
                     self._cache.pop(movie_id, None)
+            else:
+                empty_movie_ids = []
 
             changed_movie_ids: set[str] = set()
             for item in recognized_files:
@@ -1235,10 +1872,13 @@ class LocalMovieLibraryService:
                 changed_movie_ids.add(movie_id)
 
             await self._save_locked()
-            actor_records = list(self._cache.values())
+            changed_records = [self._cache[movie_id] for movie_id in sorted(changed_movie_ids)]
+            removed_movie_ids = [movie_id for movie_id in empty_movie_ids if movie_id not in self._cache]
 
+        video_dirs = {os.path.dirname(str(item.get("path") or "")) for item in recognized_files if item.get("path")}
+        await asyncio.to_thread(self.asset_index.prime, video_dirs)
         new_movie_ids = changed_movie_ids - previous_movie_ids
-        actor_result = await self._sync_actor_library(actor_records, download_missing_avatars=True)
+        actor_result = await self._sync_actor_library(changed_records, removed_movie_ids, download_missing_avatars=True)
         return {
             "success": True,
             "scan_root": normalized_root,
@@ -1280,4 +1920,8 @@ class LocalMovieLibraryService:
         return media_info
 
 
-local_movie_library_service = LocalMovieLibraryService(actor_library_service=local_actor_library_service)
+local_movie_library_service = LocalMovieLibraryService(
+    actor_library_service=local_actor_library_service,
+    flush_interval_seconds=LOCAL_LIBRARY_FLUSH_INTERVAL_SECONDS,
+    asset_revalidate_seconds=LOCAL_LIBRARY_ASSET_REVALIDATE_SECONDS,
+)
@@ -0,0 +1,309 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import sqlite3
+from typing import Any, Callable
+
+from .service import (
+    HISTORY_PAGE_DEFAULT_LIMIT,
+    DownloadHistoryService,
+    _apply_saved_download,
+    _clamp_history_page_limit,
+    _fetch_history_metadata,
+    _history_search_text,
+    _history_sort_key,
+    _normalize_download_link_key,
+    _normalize_history_record,
+    _normalize_magnet_source,
+    _normalize_movie_id,
+    _saved_download_link,
+    decode_history_cursor,
+    encode_history_cursor,
+)
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (
+    movie_id TEXT PRIMARY KEY,
+    download_time TEXT NOT NULL DEFAULT '',
+    search_text TEXT NOT NULL DEFAULT '',
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_movies_download_time ON movies (download_time, movie_id);
+CREATE TABLE IF NOT EXISTS download_resources (
+    movie_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    link TEXT NOT NULL,
+    link_key TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (movie_id, link_key)
+);
+CREATE INDEX IF NOT EXISTS idx_download_resources_link_key ON download_resources (link_key);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+# 旧 JSON 历史只导入一次，之后即使清空历史也不会重新导入
+LEGACY_IMPORT_MARKER = "legacy_json_imported"
+
+
+class SqliteDownloadHistoryService(DownloadHistoryService):
+    """
+    下载历史的 SQLite 后端，公开方法与 JSON 版本一致
+    movies 表保存完整记录，download_resources 表按 movie_id、归一化链接建索引，成员判断只需一次索引查询
+    首次启动时若数据库为空，会从旧的 JSON 快照和日志导入一次
+    """
+
+    def __init__(
+        self,
+        file_path: str = "data/downloaded_movies.db",
+        import_path: str | None = "data/downloaded_movies.json",
+    ) -> None:
+        super().__init__(import_path or "data/downloaded_movies.json")
+        self.file_path = file_path
+        self.import_path = import_path
+        self._connection: sqlite3.Connection | None = None
+
+    def _open(self) -> sqlite3.Connection:
+        parent_dir = os.path.dirname(self.file_path)
+        if parent_dir:
+            os.makedirs(parent_dir, exist_ok=True)
+        connection = sqlite3.connect(self.file_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    async def _run(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        """在锁内把数据库操作交给线程执行，避免阻塞事件循环"""
+        await self._ensure_ready()
+        async with self._lock:
+            return await asyncio.to_thread(self._transaction, operation)
+
+    def _transaction(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._connection:
+            return operation(self._connection)
+
+    async def _ensure_ready(self) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            self._connection = await asyncio.to_thread(self._open)
+            imported, empty = await asyncio.to_thread(self._import_state)
+            if not imported:
+                records: list[dict[str, Any]] = []
+                if empty and self.import_path and os.path.exists(self.import_path):
+                    legacy = DownloadHistoryService(self.import_path)
+                    records = await legacy.load_records()
+
+                def import_records(connection: sqlite3.Connection) -> None:
+                    self._upsert_records(connection, records)
+                    connection.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                        (LEGACY_IMPORT_MARKER, datetime.datetime.now().isoformat()),
+                    )
+
+                await asyncio.to_thread(self._transaction, import_records)
+                if records:
+                    logger.info("已从 %s 导入 %s 条下载记录", self.import_path, len(records))
+            self._loaded = True
+
+    def _import_state(self) -> tuple[bool, bool]:
+        """返回 (是否已导入过旧 JSON 历史, movies 表是否为空)"""
+        imported = self._connection.execute(
+            "SELECT 1 FROM meta WHERE key = ?", (LEGACY_IMPORT_MARKER,)
+        ).fetchone() is not None
+        empty = self._connection.execute("SELECT 1 FROM movies LIMIT 1").fetchone() is None
+        return imported, empty
+
+    @staticmethod
+    def _upsert_records(connection: sqlite3.Connection, records: list[dict[str, Any]]) -> None:
+        for record in records:
+            movie_id = record["movie_id"]
+            connection.execute(
+                "INSERT OR REPLACE INTO movies (movie_id, download_time, search_text, record) VALUES (?, ?, ?, ?)",
+                (
+                    movie_id,
+                    str(record.get("download_time") or ""),
+                    _history_search_text(record),
+                    json.dumps(record, ensure_ascii=False),
+                ),
+            )
+            connection.execute("DELETE FROM download_resources WHERE movie_id = ?", (movie_id,))
+            connection.executemany(
+                "INSERT OR IGNORE INTO download_resources (movie_id, position, link, link_key, source) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (movie_id, position, resource["link"], _normalize_download_link_key(resource["link"]), resource.get("source") or "")
+                    for position, resource in enumerate(record.get("download_resources") or [])
+                ],
+            )
+
+    @staticmethod
+    def _decode_record(raw: str) -> dict[str, Any] | None:
+        try:
+            return _normalize_history_record(json.loads(raw))
+        except (TypeError, ValueError):
+            return None
+
+    async def load_records(self) -> list[dict[str, Any]]:
+        rows = await self._run(lambda connection: connection.execute("SELECT record FROM movies").fetchall())
+        return [record for record in (self._decode_record(row[0]) for row in rows) if record]
+
+    async def get_history(self) -> list[dict[str, Any]]:
+        rows = await self._run(
+            lambda connection: connection.execute("SELECT record FROM movies ORDER BY download_time DESC, movie_id DESC").fetchall()
+        )
+        return [record for record in (self._decode_record(row[0]) for row in rows) if record]
+
+    async def get_history_page(
+        self,
+        query: str = "",
+        cursor: str = "",
+        limit: int = HISTORY_PAGE_DEFAULT_LIMIT,
+    ) -> dict[str, Any]:
+        page_limit = _clamp_history_page_limit(limit)
+        cursor_key = decode_history_cursor(cursor)
+        needle = str(query or "").strip().lower()
+        pattern = "%" + needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+        def fetch_page(connection: sqlite3.Connection) -> tuple[list[Any], int, int]:
+            conditions: list[str] = []
+            params: list[Any] = []
+            if needle:
+                conditions.append("search_text LIKE ? ESCAPE '\\'")
+                params.append(pattern)
+            matched_where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            matched_count = connection.execute(f"SELECT COUNT(*) FROM movies {matched_where}", params).fetchone()[0]
+            if cursor_key:
+                conditions.append("(download_time < ? OR (download_time = ? AND movie_id < ?))")
+                params.extend([cursor_key[0], cursor_key[0], cursor_key[1]])
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            rows = connection.execute(
+                f"SELECT record FROM movies {where} ORDER BY download_time DESC, movie_id DESC LIMIT ?",
+                [*params, page_limit + 1],
+            ).fetchall()
+            total_count = connection.execute("SELECT COUNT(*) FROM movies").fetchone()[0]
+            return rows, total_count, matched_count
+
+        rows, total_count, matched_count = await self._run(fetch_page)
+        records = [record for record in (self._decode_record(row[0]) for row in rows[:page_limit]) if record]
+        next_cursor = encode_history_cursor(_history_sort_key(records[-1])) if len(rows) > page_limit and records else None
+        return {
+            "success": True,
+            "records": records,
+            "next_cursor": next_cursor,
+            "limit": page_limit,
+            "total_count": total_count,
+            "matched_count": matched_count,
+        }
+
+    async def clear(self) -> dict[str, Any]:
+        def clear_tables(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM download_resources")
+            connection.execute("DELETE FROM movies")
+
+        await self._run(clear_tables)
+        self._revision += 1
+        return {"success": True, "message": "历史记录已清空"}
+
+    async def is_movie_downloaded(self, movie_id: str) -> bool:
+        key = _normalize_movie_id(movie_id)
+        row = await self._run(
+            lambda connection: connection.execute("SELECT 1 FROM movies WHERE movie_id = ?", (key,)).fetchone()
+        )
+        return row is not None
+
+    async def is_magnet_downloaded(self, movie_id: str, magnet_link: str) -> bool:
+        if not movie_id or not magnet_link:
+            return False
+        return await self._find_resource_source(movie_id, magnet_link) is not None
+
+    async def downloaded_magnet_pairs(self, pairs: list[tuple[str, str]]) -> set[tuple[str, str]]:
+        keys = {
+            (_normalize_movie_id(movie_id), _normalize_download_link_key(magnet_link))
+            for movie_id, magnet_link in pairs
+            if movie_id and magnet_link
+        }
+        if not keys:
+            return set()
+        movie_ids = sorted({movie_id for movie_id, _link_key in keys})
+
+        def fetch(connection: sqlite3.Connection) -> set[tuple[str, str]]:
+            found: set[tuple[str, str]] = set()
+            for offset in range(0, len(movie_ids), 500):
+                chunk = movie_ids[offset: offset + 500]
+                placeholders = ", ".join("?" for _movie_id in chunk)
+                found.update(
+                    connection.execute(
+                        f"SELECT movie_id, link_key FROM download_resources WHERE movie_id IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                )
+            return found
+
+        return keys & await self._run(fetch)
+
+    async def get_magnet_source(self, movie_id: str, magnet_link: str) -> str:
+        if not movie_id or not magnet_link:
+            return ""
+        return _normalize_magnet_source(await self._find_resource_source(movie_id, magnet_link))
+
+    async def _find_resource_source(self, movie_id: str, magnet_link: str) -> str | None:
+        params = (_normalize_movie_id(movie_id), _normalize_download_link_key(magnet_link))
+        row = await self._run(
+            lambda connection: connection.execute(
+                "SELECT source FROM download_resources WHERE movie_id = ? AND link_key = ?",
+                params,
+            ).fetchone()
+        )
+        return row[0] if row else None
+
+    async def get_downloaded_magnet_resources(self, movie_id: str) -> list[dict[str, str]]:
+        key = _normalize_movie_id(movie_id)
+        rows = await self._run(
+            lambda connection: connection.execute(
+                "SELECT link, source FROM download_resources WHERE movie_id = ? ORDER BY position",
+                (key,),
+            ).fetchall()
+        )
+        return [{"link": link, "source": _normalize_magnet_source(source)} for link, source in rows]
+
+    async def get_downloaded_magnet_links(self, movie_id: str) -> list[str]:
+        return [resource["link"] for resource in await self.get_downloaded_magnet_resources(movie_id)]
+
+    async def save_movies(
+        self,
+        movie_ids: list[str],
+        magnet_links: list[str] | None = None,
+        magnet_sources: list[str] | None = None,
+    ) -> None:
+        normalized_ids = [_normalize_movie_id(movie_id) for movie_id in movie_ids]
+        metadata = await _fetch_history_metadata(normalized_ids)
+        current_time = datetime.datetime.now().isoformat()
+        updates = [
+            (movie_id, metadata[movie_id], *_saved_download_link(index, magnet_links, magnet_sources))
+            for index, movie_id in enumerate(normalized_ids)
+            if movie_id
+        ]
+        if not updates:
+            return
+
+        def apply(connection: sqlite3.Connection) -> None:
+            records: dict[str, dict[str, Any]] = {}
+            for movie_id, movie_data, link, source in updates:
+                if movie_id not in records:
+                    row = connection.execute("SELECT record FROM movies WHERE movie_id = ?", (movie_id,)).fetchone()
+                    records[movie_id] = self._decode_record(row[0]) if row else None
+                records[movie_id] = _apply_saved_download(records[movie_id], movie_id, movie_data, link, source, current_time)
+            self._upsert_records(connection, list(records.values()))
+
+        await self._run(apply)
+        self._revision += 1
+        logger.info("保存下载记录: %s", movie_ids)
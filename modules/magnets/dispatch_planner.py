@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from modules.history.service import (
+    _normalize_download_link_key,
+    _normalize_magnet_source,
+    _normalize_movie_id,
+    download_history_service,
+    local_movie_library_service,
+)
+
+
+logger = logging.getLogger(__name__)
+
+REPLACEMENT_LOOKUP_CONCURRENCY = 4
+
+ReplacementLookup = Callable[[str, str, str], Awaitable[dict[str, Any] | None]]
+
+
+@dataclass
+class DispatchPlanItem:
+    index: int
+    movie_id: str
+    magnet: str
+    source: str
+    original_magnet: str = ""
+    # already_exists / magnet_already_tried / empty_magnet / duplicate_magnet，为空表示需要下发
+    skip_reason: str = ""
+
+
+async def plan_magnet_dispatch(
+    magnet_links: list[str],
+    movie_ids: list[str],
+    magnet_sources: list[str] | None,
+    find_replacement: ReplacementLookup,
+    dedupe: bool = True,
+) -> list[DispatchPlanItem]:
+    """
+    一次性为整批磁力做下发前检查：影视库与下载历史各批量查询一次，
+    只对历史中已尝试过的条目并发查找替换磁力，最后按最终链接去重
+    """
+    sources = magnet_sources or []
+    items = [
+        DispatchPlanItem(
+            index=index,
+            movie_id=movie_ids[index] if index < len(movie_ids) else "",
+            magnet=magnet_link,
+            source=_normalize_magnet_source(sources[index] if index < len(sources) else ""),
+        )
+        for index, magnet_link in enumerate(magnet_links)
+    ]
+
+    present = await local_movie_library_service.present_movie_ids({_normalize_movie_id(item.movie_id) for item in items if item.movie_id})
+    for item in items:
+        if item.movie_id and _normalize_movie_id(item.movie_id) in present:
+            item.skip_reason = "already_exists"
+
+    pending = [item for item in items if not item.skip_reason and item.movie_id and item.magnet]
+    tried = await download_history_service.downloaded_magnet_pairs([(item.movie_id, item.magnet) for item in pending])
+    needs_replacement = [
+        item
+        for item in pending
+        if (_normalize_movie_id(item.movie_id), _normalize_download_link_key(item.magnet)) in tried
+    ]
+
+    semaphore = asyncio.Semaphore(REPLACEMENT_LOOKUP_CONCURRENCY)
+
+    async def lookup(item: DispatchPlanItem) -> dict[str, Any] | None:
+        async with semaphore:
+            try:
+                return await find_replacement(item.movie_id, item.magnet, item.source)
+            except Exception as exc:
+                logger.warning("查找替换磁力失败 %s: %s", item.movie_id, exc)
+                return None
+
+    replacements = await asyncio.gather(*(lookup(item) for item in needs_replacement))
+    for item, replacement in zip(needs_replacement, replacements):
+        replacement_link = str((replacement or {}).get("link") or "").strip()
+        if not replacement_link or _normalize_download_link_key(replacement_link) == _normalize_download_link_key(item.magnet):
+            item.skip_reason = "magnet_already_tried"
+            logger.info("Download link for movie %s already exists in history and no replacement was found", item.movie_id)
+            continue
+        item.original_magnet = item.magnet
+        item.magnet = replacement_link
+        item.source = _normalize_magnet_source((replacement or {}).get("source") or item.source)
+
+    seen_links: set[str] = set()
+    for item in items:
+        if item.skip_reason:
+            continue
+        if not item.magnet:
+            item.skip_reason = "empty_magnet"
+            continue
+        key = _normalize_download_link_key(item.magnet)
+        if dedupe and key in seen_links:
+            item.skip_reason = "duplicate_magnet"
+            continue
+        seen_links.add(key)
+    return items
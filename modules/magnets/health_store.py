@@ -0,0 +1,152 @@
+import asyncio
+import base64
+import copy
+import datetime
+import json
+import logging
+import os
+import re
+from typing import Any
+
+from modules.common.json_files import write_json_atomic
+
+
+logger = logging.getLogger(__name__)
+
+BTIH_PATTERN = re.compile(r"urn:btih:([A-Za-z0-9]+)", re.IGNORECASE)
+MAGNET_HEALTH_METRIC_FIELDS = ("seeders", "peers", "availability")
+
+
+def normalize_btih(link: Any) -> str:
+    match = BTIH_PATTERN.search(str(link or ""))
+    if not match:
+        return ""
+    value = match.group(1)
+    if len(value) == 40 and re.fullmatch(r"[0-9A-Fa-f]{40}", value):
+        return value.lower()
+    if len(value) == 32:
+        try:
+            return base64.b32decode(value.upper()).hex()
+        except (ValueError, TypeError):
+            return ""
+    return ""
+
+
+def _parse_timestamp(value: Any) -> datetime.datetime | None:
+    try:
+        return datetime.datetime.fromisoformat(str(value or ""))
+    except ValueError:
+        return None
+
+
+class MagnetHealthStore:
+    def __init__(self, file_path: str = "data/magnet_health.json") -> None:
+        self.file_path = file_path
+        self._cache: dict[str, dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def load_records(self) -> dict[str, dict[str, Any]]:
+        async with self._lock:
+            if self._loaded:
+                return self._cache
+
+            parent_dir = os.path.dirname(self.file_path)
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+            self._cache = {}
+            if os.path.exists(self.file_path):
+                try:
+                    with open(self.file_path, "r", encoding="utf-8") as file:
+                        data = json.load(file)
+                except (OSError, ValueError) as exc:
+                    logger.warning("加载磁力健康度缓存失败 %s: %s", self.file_path, exc)
+                    data = {}
+                torrents = data.get("torrents", {}) if isinstance(data, dict) else {}
+                self._cache = {str(btih): record for btih, record in torrents.items() if isinstance(record, dict)}
+            self._loaded = True
+            return self._cache
+
+    async def _save_locked(self) -> None:
+        now = datetime.datetime.now().isoformat()
+        payload = {"version": 1, "updated_at": now, "torrents": self._cache}
+        # 原子替换并放到线程中写入，崩溃不会截断缓存，也不阻塞事件循环
+        await asyncio.to_thread(write_json_atomic, self.file_path, copy.deepcopy(payload))
+
+    async def get_fresh_metrics(self, link: Any, max_age_seconds: float) -> dict[str, float] | None:
+        btih = normalize_btih(link)
+        if not btih or max_age_seconds <= 0:
+            return None
+        records = await self.load_records()
+        record = records.get(btih)
+        probed_at = _parse_timestamp((record or {}).get("probed_at"))
+        if not record or probed_at is None:
+            return None
+        if (datetime.datetime.now() - probed_at).total_seconds() > max_age_seconds:
+            return None
+        return {
+            field: float(record[field])
+            for field in MAGNET_HEALTH_METRIC_FIELDS
+            if isinstance(record.get(field), (int, float))
+        }
+
+    async def record_metrics(self, entries: list[tuple[Any, dict[str, float], str]]) -> int:
+        updates: list[tuple[str, dict[str, float], str]] = []
+        for link, metrics, source in entries:
+            btih = normalize_btih(link)
+            values = {field: metrics[field] for field in MAGNET_HEALTH_METRIC_FIELDS if field in metrics}
+            if btih and values:
+                updates.append((btih, values, str(source or "").strip().lower()))
+        if not updates:
+            return 0
+
+        await self.load_records()
+        now = datetime.datetime.now().isoformat()
+        async with self._lock:
+            for btih, values, source in updates:
+                record = self._cache.setdefault(btih, {"btih": btih})
+                for field in MAGNET_HEALTH_METRIC_FIELDS:
+                    record.pop(field, None)
+                record.update(values)
+                record["probed_at"] = now
+                if source:
+                    record["source"] = source
+            await self._save_locked()
+        return len(updates)
+
+    async def record_dispatch_results(self, dispatcher: str, results: list[dict[str, Any]]) -> int:
+        updates: list[tuple[str, dict[str, Any]]] = []
+        for item in results:
+            if not isinstance(item, dict) or item.get("skipped"):
+                continue
+            btih = normalize_btih(item.get("magnet"))
+            if btih:
+                updates.append((btih, item))
+        if not updates:
+            return 0
+
+        await self.load_records()
+        now = datetime.datetime.now().isoformat()
+        async with self._lock:
+            for btih, item in updates:
+                record = self._cache.setdefault(btih, {"btih": btih})
+                record["last_dispatch"] = {
+                    "dispatcher": dispatcher,
+                    "success": bool(item.get("success")),
+                    "source": str(item.get("source") or "").strip().lower(),
+                    "error": str(item.get("error") or ""),
+                    "at": now,
+                }
+            await self._save_locked()
+        return len(updates)
+
+    async def get_record(self, link: Any) -> dict[str, Any] | None:
+        btih = normalize_btih(link)
+        if not btih:
+            return None
+        records = await self.load_records()
+        record = records.get(btih)
+        return dict(record) if record else None
+
+
+magnet_health_store = MagnetHealthStore()
@@ -0,0 +1,238 @@
+import asyncio
+import copy
+import datetime
+import json
+import logging
+import os
+import re
+import time
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from modules.common.json_files import write_json_atomic
+from modules.magnets.health_store import normalize_btih
+
+
+logger = logging.getLogger(__name__)
+
+# 样本数达到 MIN_RELIABILITY_SAMPLES 后，成功率低于 LOW_RELIABILITY_RATE 的来源/发布者会被降权
+MIN_RELIABILITY_SAMPLES = 3
+LOW_RELIABILITY_RATE = 0.3
+# 同一磁力下发失败达到该次数后不再参与自动选择；最后一次失败超过有效期后失败次数清零
+LINK_FAILURE_LIMIT = 2
+LINK_FAILURE_EXPIRY_SECONDS = 7 * 24 * 3600
+# 来源/发布者的统计按半衰期衰减，较早的失败逐渐失去影响
+RELIABILITY_HALF_LIFE_SECONDS = 30 * 24 * 3600
+# 下发服务接受了请求但拒绝了这条链接才算链接本身的问题；登录、配额、服务不可用等错误不计入统计
+MAGNET_FAULT_ERRORS = {"pan115_add_failed", "pikpak_link_rejected", "aria2_link_rejected"}
+COUNT_FIELDS = ("dispatched", "failed", "completed")
+UPLOADER_TAG_PATTERN = re.compile(r"^\s*(?:[\[【]([^\]】]{2,40})[\]】]|([A-Za-z0-9][\w.-]{1,39})@)")
+
+
+def magnet_uploader(link: Any = "", title: Any = "") -> str:
+    """从标题或磁力 dn 参数中提取发布者标记，例如 "hhd800.com@ABP-123" 中的 hhd800.com"""
+    texts = [str(title or "")]
+    query = urlsplit(str(link or "")).query
+    texts.extend(parse_qs(query).get("dn", []))
+    for text in texts:
+        match = UPLOADER_TAG_PATTERN.match(text)
+        if match:
+            return (match.group(1) or match.group(2)).strip().lower()
+    return ""
+
+
+def is_magnet_fault(item: dict[str, Any]) -> bool:
+    """下发失败是否由链接本身造成；结果可用 magnet_fault 显式标记，否则按错误码判断"""
+    if "magnet_fault" in item:
+        return bool(item["magnet_fault"])
+    return str(item.get("error") or "") in MAGNET_FAULT_ERRORS
+
+
+def _timestamp(value: Any) -> float | None:
+    try:
+        return datetime.datetime.fromisoformat(str(value)).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _decayed_counts(counts: dict[str, Any] | None, now: float) -> dict[str, float]:
+    """按距上次更新的时间衰减各项计数；没有 decayed_at 的旧记录视为刚更新"""
+    counts = counts or {}
+    updated_at = _timestamp(counts.get("decayed_at"))
+    elapsed = max(0.0, now - updated_at) if updated_at is not None else 0.0
+    factor = 0.5 ** (elapsed / RELIABILITY_HALF_LIFE_SECONDS)
+    return {field: float(counts.get(field) or 0) * factor for field in COUNT_FIELDS}
+
+
+def link_failures(record: dict[str, Any] | None, now: float | None = None) -> int:
+    """最后一次失败仍在有效期内时返回失败次数，否则为 0"""
+    if not record:
+        return 0
+    failed_at = _timestamp(record.get("last_failed_at") or record.get("at"))
+    current = time.time() if now is None else now
+    if failed_at is None or current - failed_at > LINK_FAILURE_EXPIRY_SECONDS:
+        return 0
+    return int(record.get("failures") or 0)
+
+
+def reliability_rate(counts: dict[str, Any] | None, now: float | None = None) -> float | None:
+    """
+    平滑后的成功率：已入库记 1，已下发待确认记 0.5，下发失败记 0，各项按半衰期衰减
+    样本不足时返回 None
+    """
+    counts = _decayed_counts(counts, time.time() if now is None else now)
+    completed = counts["completed"]
+    failed = counts["failed"]
+    pending = max(0.0, counts["dispatched"] - completed)
+    samples = completed + pending + failed
+    if round(samples, 2) < MIN_RELIABILITY_SAMPLES:
+        return None
+    return (completed + pending * 0.5 + 1) / (samples + 2)
+
+
+class MagnetOutcomeStore:
+    def __init__(self, file_path: str = "data/magnet_outcomes.json") -> None:
+        self.file_path = file_path
+        self._cache: dict[str, dict[str, Any]] = {"sources": {}, "uploaders": {}, "links": {}}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    async def load_records(self) -> dict[str, dict[str, Any]]:
+        async with self._lock:
+            if self._loaded:
+                return self._cache
+
+            parent_dir = os.path.dirname(self.file_path)
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+            self._cache = {"sources": {}, "uploaders": {}, "links": {}}
+            if os.path.exists(self.file_path):
+                try:
+                    with open(self.file_path, "r", encoding="utf-8") as file:
+                        data = json.load(file)
+                except (OSError, ValueError) as exc:
+                    logger.warning("加载磁力下载结果统计失败 %s: %s", self.file_path, exc)
+                    data = {}
+                if isinstance(data, dict):
+                    for section in self._cache:
+                        values = data.get(section)
+                        if isinstance(values, dict):
+                            self._cache[section] = {
+                                str(key): value for key, value in values.items() if isinstance(value, dict)
+                            }
+            self._loaded = True
+            return self._cache
+
+    async def _save_locked(self) -> None:
+        now = datetime.datetime.now().isoformat()
+        payload = {"version": 1, "updated_at": now, **self._cache}
+        await asyncio.to_thread(write_json_atomic, self.file_path, copy.deepcopy(payload))
+
+    def _bump_locked(self, source: str, uploader: str, field: str) -> None:
+        now = datetime.datetime.now()
+        for section, key in (("sources", source), ("uploaders", uploader)):
+            if not key:
+                continue
+            counts = _decayed_counts(self._cache[section].get(key), now.timestamp())
+            counts[field] += 1
+            self._cache[section][key] = {
+                **{name: round(value, 4) for name, value in counts.items()},
+                "decayed_at": now.isoformat(),
+            }
+
+    async def record_dispatch_results(self, dispatcher: str, results: list[dict[str, Any]]) -> int:
+        updates: list[tuple[str, dict[str, Any]]] = []
+        for item in results:
+            if not isinstance(item, dict) or item.get("skipped"):
+                continue
+            if not item.get("success") and not is_magnet_fault(item):
+                continue
+            btih = normalize_btih(item.get("magnet"))
+            if btih:
+                updates.append((btih, item))
+        if not updates:
+            return 0
+
+        await self.load_records()
+        now = datetime.datetime.now().isoformat()
+        async with self._lock:
+            for btih, item in updates:
+                source = str(item.get("source") or "").strip().lower()
+                uploader = magnet_uploader(item.get("magnet"), item.get("title"))
+                success = bool(item.get("success"))
+                link_record = self._cache["links"].setdefault(btih, {"failures": 0})
+                # 失败已过期的链接重新计数
+                failures = link_failures(link_record, time.time())
+                link_record.update(
+                    {
+                        "movie_id": str(item.get("movie_id") or "").strip().upper(),
+                        "source": source,
+                        "uploader": uploader,
+                        "dispatcher": dispatcher,
+                        "status": "dispatched" if success else "failed",
+                        "at": now,
+                    }
+                )
+                if not success:
+                    link_record["failures"] = failures + 1
+                    link_record["last_failed_at"] = now
+                self._bump_locked(source, uploader, "dispatched" if success else "failed")
+            await self._save_locked()
+        return len(updates)
+
+    async def record_completed_movies(self, movie_ids: list[str] | set[str]) -> int:
+        """已入库的影片视为其待确认的下发已完成"""
+        targets = {str(movie_id or "").strip().upper() for movie_id in movie_ids if movie_id}
+        if not targets:
+            return 0
+
+        records = await self.load_records()
+        if not any(
+            record.get("status") == "dispatched" and record.get("movie_id") in targets
+            for record in records["links"].values()
+        ):
+            return 0
+
+        now = datetime.datetime.now().isoformat()
+        completed = 0
+        async with self._lock:
+            for record in self._cache["links"].values():
+                if record.get("status") != "dispatched" or record.get("movie_id") not in targets:
+                    continue
+                record["status"] = "completed"
+                record["completed_at"] = now
+                self._bump_locked(str(record.get("source") or ""), str(record.get("uploader") or ""), "completed")
+                completed += 1
+            await self._save_locked()
+        return completed
+
+    async def candidate_reliability(self, candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """返回每个候选有效期内的链接失败次数、来源与发布者成功率"""
+        keys = [
+            (
+                normalize_btih(candidate.get("link")),
+                str(candidate.get("source") or "").strip().lower(),
+                magnet_uploader(candidate.get("link"), candidate.get("title")),
+            )
+            for candidate in candidates
+        ]
+        if not any(btih or uploader for btih, _source, uploader in keys):
+            return [{"failures": 0, "source_rate": None, "uploader_rate": None} for _key in keys]
+
+        records = await self.load_records()
+        now = time.time()
+        return [
+            {
+                "failures": link_failures(records["links"].get(btih), now) if btih else 0,
+                "source_rate": reliability_rate(records["sources"].get(source), now) if source else None,
+                "uploader_rate": reliability_rate(records["uploaders"].get(uploader), now) if uploader else None,
+            }
+            for btih, source, uploader in keys
+        ]
+
+    async def source_rates(self) -> dict[str, float | None]:
+        records = await self.load_records()
+        return {source: reliability_rate(counts) for source, counts in records["sources"].items()}
+
+
+magnet_outcome_store = MagnetOutcomeStore()
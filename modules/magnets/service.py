@@ -10,16 +10,18 @@ from bs4 import BeautifulSoup
 from cilisousuo_cli import (
     filter_4k_results as cilisousuo_filter_4k_results,
     filter_results_by_subtitle as cilisousuo_filter_results_by_subtitle,
-    is_4k_resource,
     parse_size_to_bytes,
     search_cilisousuo,
     select_best_result as cilisousuo_select_best_result,
 )
 
 from modules.common import runtime
+from modules.common.magnet_classifier import classify_candidates, tag_4k, tag_chinese_subtitle
 from modules.common.subtitles import has_chinese_subtitle
 from modules.history.service import download_history_service, local_movie_library_service
 from modules.javbus_api import javbus_api_service
+from modules.magnets.health_store import magnet_health_store
+from modules.magnets.outcome_store import LINK_FAILURE_LIMIT, LOW_RELIABILITY_RATE, magnet_outcome_store
 from modules.movies.service import get_movie_detail
 
 
@@ -162,14 +164,22 @@ def _health_decision(metrics: dict[str, float], config: dict[str, Any]) -> tuple
     return True, health
 
 
-async def _aria2_rpc(client: httpx.AsyncClient, rpc_url: str, secret: str, method: str, params: list[Any] | None = None) -> Any:
+MAGNET_HEALTH_PROBE_STATUS_KEYS = ["gid", "status", "numSeeders", "connections", "followedBy", "errorCode", "errorMessage"]
+MAGNET_HEALTH_PROBE_FINAL_STATUSES = {"complete", "error", "removed"}
+
+
+def _aria2_rpc_params(secret: str, params: list[Any] | None = None) -> list[Any]:
     rpc_params: list[Any] = []
     if secret:
         rpc_params.append(f"token:{secret}")
     rpc_params.extend(params or [])
+    return rpc_params
+
+
+async def _aria2_post(client: httpx.AsyncClient, rpc_url: str, method: str, params: list[Any]) -> Any:
     response = await client.post(
         rpc_url,
-        json={"jsonrpc": "2.0", "id": "magnet-health", "method": f"aria2.{method}", "params": rpc_params},
+        json={"jsonrpc": "2.0", "id": "magnet-health", "method": method, "params": params},
     )
     response.raise_for_status()
     payload = response.json()
@@ -178,75 +188,148 @@ async def _aria2_rpc(client: httpx.AsyncClient, rpc_url: str, secret: str, metho
     return payload.get("result")
 
 
-async def _remove_aria2_probe(client: httpx.AsyncClient, rpc_url: str, secret: str, gid: str) -> None:
-    for method in ("forceRemove", "removeDownloadResult"):
-        try:
-            await _aria2_rpc(client, rpc_url, secret, method, [gid])
-        except Exception:
-            continue
+async def _aria2_multicall(
+    client: httpx.AsyncClient,
+    rpc_url: str,
+    secret: str,
+    calls: list[tuple[str, list[Any]]],
+) -> list[Any]:
+    # 一次 system.multicall 往返执行多个 aria2 方法；失败的子调用返回 None，不影响整批
+    if not calls:
+        return []
+    result = await _aria2_post(
+        client,
+        rpc_url,
+        "system.multicall",
+        [[
+            {"methodName": f"aria2.{method}", "params": _aria2_rpc_params(secret, params)}
+            for method, params in calls
+        ]],
+    )
+    values: list[Any] = []
+    for item in result or []:
+        values.append(item[0] if isinstance(item, list) and item else None)
+    values.extend([None] * (len(calls) - len(values)))
+    return values
 
 
-async def _probe_magnet_health_with_aria2(magnet_link: str, config: dict[str, Any]) -> dict[str, float]:
-    aria2_config = runtime.get_aria2_config()
-    if not aria2_config.get("enabled") or not aria2_config.get("url"):
-        return {}
+async def _remove_aria2_probes(client: httpx.AsyncClient, rpc_url: str, secret: str, gids: list[str]) -> None:
+    calls = [(method, [gid]) for gid in gids if gid for method in ("forceRemove", "removeDownloadResult")]
+    try:
+        await _aria2_multicall(client, rpc_url, secret, calls)
+    except Exception as exc:
+        logger.debug("Aria2 magnet health probe cleanup failed: %s", exc)
 
+
+def _aria2_probe_status_metrics(status: Any, metrics: dict[str, float]) -> dict[str, float]:
+    if not isinstance(status, dict):
+        return metrics
+    next_metrics = dict(metrics)
+    seeders = _parse_float(status.get("numSeeders"))
+    peers = _parse_float(status.get("connections"))
+    if seeders is not None:
+        next_metrics["seeders"] = seeders
+    if peers is not None:
+        next_metrics["peers"] = peers
+    return next_metrics
+
+
+async def _probe_magnets_health_with_aria2(
+    client: httpx.AsyncClient,
+    magnet_links: list[str],
+    config: dict[str, Any],
+    accept=None,
+) -> tuple[int | None, list[dict[str, float]]]:
+    # 同一连接内批量添加并轮询所有 GID；每轮按排名检查 accept，首个通过的候选立即结束探测
+    aria2_config = runtime.get_aria2_config()
     rpc_url = str(aria2_config.get("url") or "")
     secret = str(aria2_config.get("secret") or "")
     timeout_seconds = float(config.get("probe_timeout_seconds") or 20.0)
-    gid = ""
-    followed_by: list[str] = []
-    metrics: dict[str, float] = {}
-    async with httpx.AsyncClient(timeout=max(timeout_seconds + 5.0, 10.0)) as client:
-        try:
-            gid = await _aria2_rpc(
+    probed: list[dict[str, float]] = [{} for _link in magnet_links]
+    gids: list[str] = []
+    followed_by: dict[int, list[str]] = {}
+    try:
+        add_options = {
+            "bt-metadata-only": "true",
+            "bt-save-metadata": "false",
+            "bt-stop-timeout": str(int(timeout_seconds)),
+            "seed-time": "0",
+        }
+        added = await _aria2_multicall(
+            client,
+            rpc_url,
+            secret,
+            [("addUri", [[link], dict(add_options)]) for link in magnet_links],
+        )
+        gids = [str(gid or "") for gid in added]
+        settled = {index for index, gid in enumerate(gids) if not gid}
+        deadline = asyncio.get_running_loop().time() + timeout_seconds
+        while len(settled) < len(gids) and asyncio.get_running_loop().time() < deadline:
+            pending = [index for index in range(len(gids)) if index not in settled]
+            statuses = await _aria2_multicall(
                 client,
                 rpc_url,
                 secret,
-                "addUri",
-                [
-                    [magnet_link],
-                    {
-                        "bt-metadata-only": "true",
-                        "bt-save-metadata": "false",
-                        "bt-stop-timeout": str(int(timeout_seconds)),
-                        "seed-time": "0",
-                    },
-                ],
+                [("tellStatus", [gids[index], MAGNET_HEALTH_PROBE_STATUS_KEYS]) for index in pending],
             )
-            deadline = asyncio.get_running_loop().time() + timeout_seconds
-            while asyncio.get_running_loop().time() < deadline:
-                status = await _aria2_rpc(
-                    client,
-                    rpc_url,
-                    secret,
-                    "tellStatus",
-                    [
-                        gid,
-                        ["gid", "status", "numSeeders", "connections", "followedBy", "errorCode", "errorMessage"],
-                    ],
-                )
-                if isinstance(status, dict):
-                    seeders = _parse_float(status.get("numSeeders"))
-                    peers = _parse_float(status.get("connections"))
-                    if seeders is not None:
-                        metrics["seeders"] = seeders
-                    if peers is not None:
-                        metrics["peers"] = peers
-                    if isinstance(status.get("followedBy"), list):
-                        followed_by = [str(item) for item in status["followedBy"] if item]
-                    if status.get("status") in {"complete", "error", "removed"}:
-                        break
-                await asyncio.sleep(1.0)
-        except Exception as exc:
-            logger.warning("Aria2 magnet health probe failed: %s", exc)
-            return metrics
-        finally:
-            cleanup_ids = [gid, *followed_by]
-            for cleanup_gid in cleanup_ids:
-                if cleanup_gid:
-                    await _remove_aria2_probe(client, rpc_url, secret, cleanup_gid)
-    return metrics
+            for index, status in zip(pending, statuses):
+                probed[index] = _aria2_probe_status_metrics(status, probed[index])
+                if not isinstance(status, dict):
+                    continue
+                if isinstance(status.get("followedBy"), list):
+                    followed_by[index] = [str(item) for item in status["followedBy"] if item]
+                if status.get("status") in MAGNET_HEALTH_PROBE_FINAL_STATUSES:
+                    settled.add(index)
+            if accept is not None:
+                for index, metrics in enumerate(probed):
+                    if metrics and accept(index, metrics):
+                        return index, probed
+            await asyncio.sleep(1.0)
+    except Exception as exc:
+        logger.warning("Aria2 magnet health probe failed: %s", exc)
+    finally:
+        cleanup_ids = [*gids, *(gid for children in followed_by.values() for gid in children)]
+        await _remove_aria2_probes(client, rpc_url, secret, cleanup_ids)
+    return None, probed
+
+
+def _aria2_probe_client(config: dict[str, Any]) -> httpx.AsyncClient:
+    timeout_seconds = float(config.get("probe_timeout_seconds") or 20.0)
+    return httpx.AsyncClient(timeout=max(timeout_seconds + 5.0, 10.0))
+
+
+def _aria2_probe_available() -> bool:
+    aria2_config = runtime.get_aria2_config()
+    return bool(aria2_config.get("enabled") and aria2_config.get("url"))
+
+
+async def _probe_magnet_health_with_aria2(magnet_link: str, config: dict[str, Any]) -> dict[str, float]:
+    if not _aria2_probe_available():
+        return {}
+    async with _aria2_probe_client(config) as client:
+        _accepted, probed = await _probe_magnets_health_with_aria2(client, [magnet_link], config)
+    return probed[0]
+
+
+def _health_cache_ttl(config: dict[str, Any]) -> float:
+    return float(config.get("cache_ttl_seconds") or 0)
+
+
+async def _record_probed_health(entries: list[tuple[dict[str, Any], dict[str, float]]]) -> None:
+    try:
+        await magnet_health_store.record_metrics(
+            [(candidate.get("link"), metrics, str(candidate.get("source") or "")) for candidate, metrics in entries]
+        )
+    except Exception as exc:
+        logger.warning("保存磁力健康度缓存失败: %s", exc)
+
+
+async def record_magnet_dispatch_results(dispatcher: str, results: list[dict[str, Any]]) -> None:
+    try:
+        await magnet_health_store.record_dispatch_results(dispatcher, results)
+        await magnet_outcome_store.record_dispatch_results(dispatcher, results)
+    except Exception as exc:
+        logger.warning("保存磁力派发结果失败: %s", exc)
 
 
 async def assess_magnet_health(magnet: dict[str, Any], config: dict[str, Any] | None = None) -> tuple[bool, dict[str, Any]]:
@@ -255,30 +338,24 @@ async def assess_magnet_health(magnet: dict[str, Any], config: dict[str, Any] |
         return True, {"status": "disabled"}
 
     metrics = _extract_health_metrics(magnet)
-    if health_config.get("probe_with_aria2") and magnet.get("link"):
+    cached_metrics = await magnet_health_store.get_fresh_metrics(magnet.get("link"), _health_cache_ttl(health_config))
+    if cached_metrics is not None:
+        metrics = _merge_health_metrics(metrics, cached_metrics)
+    elif health_config.get("probe_with_aria2") and magnet.get("link"):
         probed_metrics = await _probe_magnet_health_with_aria2(str(magnet["link"]), health_config)
         metrics = _merge_health_metrics(metrics, probed_metrics)
+        await _record_probed_health([(magnet, metrics)])
     return _health_decision(metrics, health_config)
 
 
-async def select_healthy_best_magnet(
-    candidates: list[dict[str, Any]],
-    select_best,
-    health_config: dict[str, Any] | None = None,
-) -> dict[str, Any] | None:
+def _rank_magnet_candidates(candidates: list[dict[str, Any]], select_best) -> list[dict[str, Any]]:
     remaining = list(candidates or [])
-    active_config = health_config or runtime.get_magnet_health_config()
+    ranked: list[dict[str, Any]] = []
     while remaining:
         selected = select_best(remaining)
         if not selected:
-            return None
-        acceptable, health = await assess_magnet_health(selected, active_config)
-        result = copy.deepcopy(selected)
-        if active_config.get("enabled"):
-            result["health"] = health
-        if acceptable:
-            return result
-
+            break
+        ranked.append(selected)
         selected_identity = _candidate_identity(selected)
         next_remaining = [
             candidate
@@ -288,6 +365,147 @@ async def select_healthy_best_magnet(
         if len(next_remaining) == len(remaining):
             next_remaining = remaining[1:]
         remaining = next_remaining
+    return ranked
+
+
+def _is_unreliable(rate: float | None) -> bool:
+    return rate is not None and rate < LOW_RELIABILITY_RATE
+
+
+async def _order_by_reliability(
+    ranked: list[dict[str, Any]],
+    exclude_failed_links: bool = True,
+) -> list[dict[str, Any]]:
+    try:
+        reliability = await magnet_outcome_store.candidate_reliability(ranked)
+    except Exception as exc:
+        logger.warning("读取磁力下载结果统计失败: %s", exc)
+        return ranked
+
+    # 自动选择时剔除多次下发失败的链接，手动查看时保留但排到最后；
+    # 其余按原排名稳定排序，只把失败过或发布者/来源不可靠的候选后移
+    kept = [
+        (candidate, info)
+        for candidate, info in zip(ranked, reliability)
+        if not exclude_failed_links or info["failures"] < LINK_FAILURE_LIMIT
+    ]
+    kept.sort(
+        key=lambda item: (
+            item[1]["failures"] > 0,
+            _is_unreliable(item[1]["uploader_rate"]) or _is_unreliable(item[1]["source_rate"]),
+        )
+    )
+    return [candidate for candidate, _info in kept]
+
+
+async def rank_magnet_sources(preferred: str | None = None) -> list[str]:
+    preferred_source = _normalize_magnet_source_name(preferred) or "javbus"
+    try:
+        rates = await magnet_outcome_store.source_rates()
+    except Exception as exc:
+        logger.warning("读取磁力来源成功率失败: %s", exc)
+        rates = {}
+    others = sorted(
+        (source for source in MAGNET_SOURCES if source != preferred_source),
+        key=lambda source: (-(rates.get(source) if rates.get(source) is not None else 0.5), source),
+    )
+    preferred_rate = rates.get(preferred_source)
+    if _is_unreliable(preferred_rate) and others and (rates.get(others[0]) or 0.5) > preferred_rate:
+        return [*others, preferred_source]
+    return [preferred_source, *others]
+
+
+def _with_health(candidate: dict[str, Any], health: dict[str, Any]) -> dict[str, Any]:
+    result = copy.deepcopy(candidate)
+    result["health"] = health
+    return result
+
+
+async def _select_probed_healthy_magnet(
+    ranked: list[dict[str, Any]],
+    base_metrics: list[dict[str, float]],
+    cached: list[bool],
+    config: dict[str, Any],
+) -> dict[str, Any] | None:
+    concurrency = max(1, int(config.get("probe_concurrency") or 1))
+    async with _aria2_probe_client(config) as client:
+        for offset in range(0, len(ranked), concurrency):
+            batch = ranked[offset: offset + concurrency]
+            merged = base_metrics[offset: offset + concurrency]
+            batch_cached = cached[offset: offset + concurrency]
+
+            # 排名靠前且缓存未过期的候选无需探测即可判定
+            for candidate, metrics, is_cached in zip(batch, merged, batch_cached):
+                if not is_cached:
+                    break
+                acceptable, health = _health_decision(metrics, config)
+                if acceptable:
+                    return _with_health(candidate, health)
+
+            probe_indexes = [
+                index
+                for index, candidate in enumerate(batch)
+                if candidate.get("link") and not batch_cached[index]
+            ]
+
+            def accept(probe_index: int, metrics: dict[str, float]) -> bool:
+                batch_index = probe_indexes[probe_index]
+                return _health_decision(_merge_health_metrics(merged[batch_index], metrics), config)[0]
+
+            accepted, probed = await _probe_magnets_health_with_aria2(
+                client,
+                [str(batch[index]["link"]) for index in probe_indexes],
+                config,
+                accept=accept,
+            )
+            merged = list(merged)
+            for probe_index, metrics in enumerate(probed):
+                batch_index = probe_indexes[probe_index]
+                merged[batch_index] = _merge_health_metrics(merged[batch_index], metrics)
+            await _record_probed_health([(batch[index], merged[index]) for index in probe_indexes])
+
+            if accepted is not None:
+                batch_index = probe_indexes[accepted]
+                _acceptable, health = _health_decision(merged[batch_index], config)
+                return _with_health(batch[batch_index], health)
+            for candidate, metrics in zip(batch, merged):
+                acceptable, health = _health_decision(metrics, config)
+                if acceptable:
+                    return _with_health(candidate, health)
+    return None
+
+
+async def select_healthy_best_magnet(
+    candidates: list[dict[str, Any]],
+    select_best,
+    health_config: dict[str, Any] | None = None,
+    exclude_failed_links: bool = True,
+) -> dict[str, Any] | None:
+    active_config = health_config or runtime.get_magnet_health_config()
+    ranked = await _order_by_reliability(_rank_magnet_candidates(candidates, select_best), exclude_failed_links)
+    if not ranked:
+        return None
+    if not active_config.get("enabled"):
+        return copy.deepcopy(ranked[0])
+
+    base_metrics: list[dict[str, float]] = []
+    cached: list[bool] = []
+    cache_ttl = _health_cache_ttl(active_config)
+    for candidate in ranked:
+        metrics = _extract_health_metrics(candidate)
+        cached_metrics = await magnet_health_store.get_fresh_metrics(candidate.get("link"), cache_ttl)
+        if cached_metrics is not None:
+            metrics = _merge_health_metrics(metrics, cached_metrics)
+        base_metrics.append(metrics)
+        cached.append(cached_metrics is not None)
+
+    if active_config.get("probe_with_aria2") and _aria2_probe_available():
+        return await _select_probed_healthy_magnet(ranked, base_metrics, cached, active_config)
+
+    for candidate, metrics in zip(ranked, base_metrics):
+        acceptable, health = _health_decision(metrics, active_config)
+        if acceptable:
+            return _with_health(candidate, health)
     return None
 
 
@@ -299,9 +517,10 @@ def _filter_javbus_magnet_candidates(
     if not magnet_data:
         return []
 
-    candidates = [_with_inferred_subtitle_flag(magnet) for magnet in magnet_data]
+    candidates = _with_inferred_subtitle_flags(magnet_data)
     if exclude_4k:
-        filtered_data = [magnet for magnet in candidates if not is_4k_resource(magnet.get("title", ""))]
+        title_is_4k = tag_4k([str(magnet.get("title") or "") for magnet in candidates])
+        filtered_data = [magnet for magnet, is_4k in zip(candidates, title_is_4k) if not is_4k]
         if filtered_data:
             candidates = filtered_data
             logger.info("排除4K后剩余 %s 个磁力链接", len(candidates))
@@ -369,20 +588,18 @@ def has_valid_javbus_movie_params(movie_data: dict[str, Any] | None) -> bool:
     return bool(movie_data and movie_data.get("gid") and movie_data.get("uc") is not None)
 
 
-def _magnet_has_chinese_subtitle(magnet: dict[str, Any]) -> bool:
-    if bool(magnet.get("hasSubtitle")):
-        return True
-    return any(
-        has_chinese_subtitle(str(magnet.get(field) or ""))
+def _with_inferred_subtitle_flags(magnets: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    field_flags = [
+        tag_chinese_subtitle([str(magnet.get(field) or "") for magnet in magnets])
         for field in ("title", "filename", "name")
-    )
-
-
-def _with_inferred_subtitle_flag(magnet: dict[str, Any]) -> dict[str, Any]:
-    normalized = dict(magnet)
-    normalized["hasSubtitle"] = _magnet_has_chinese_subtitle(normalized)
-    normalized.setdefault("source", "javbus")
-    return normalized
+    ]
+    normalized_magnets: list[dict[str, Any]] = []
+    for index, magnet in enumerate(magnets):
+        normalized = dict(magnet)
+        normalized["hasSubtitle"] = bool(magnet.get("hasSubtitle")) or any(flags[index] for flags in field_flags)
+        normalized.setdefault("source", "javbus")
+        normalized_magnets.append(normalized)
+    return normalized_magnets
 
 
 async def fetch_javbus_magnet_data(movie_id: str, movie_data: dict[str, Any]) -> Any | None:
@@ -403,6 +620,7 @@ async def get_cilisousuo_best_magnet_payload(
     has_subtitle_filter: str | None = None,
     exclude_4k: bool = False,
     excluded_links: list[str] | None = None,
+    exclude_failed_links: bool = True,
 ) -> dict[str, Any] | None:
     results = await search_cilisousuo(movie_id, resolve_detail=True, allow_chinese_subtitles=has_subtitle_filter != "false")
     results = cilisousuo_filter_results_by_subtitle(results, has_subtitle_filter)
@@ -445,6 +663,7 @@ async def get_cilisousuo_best_magnet_payload(
     return await select_healthy_best_magnet(
         candidates,
         select_best_payload,
+        exclude_failed_links=exclude_failed_links,
     )
 
 
@@ -523,11 +742,11 @@ def _filter_yhg007_results(
 ) -> list[dict[str, Any]]:
     filtered = results
     if exclude_4k:
-        filtered = [
-            result
-            for result in filtered
-            if not is_4k_resource(result.get("title", ""), result.get("filename", ""))
-        ]
+        tags = classify_candidates(
+            [result.get("title", "") for result in filtered],
+            [result.get("filename", "") for result in filtered],
+        )
+        filtered = [result for result, is_4k in zip(filtered, tags.is_4k) if not is_4k]
 
     if has_subtitle_filter in ("true", "false"):
         expected = has_subtitle_filter == "true"
@@ -615,6 +834,7 @@ async def get_yhg007_best_magnet_payload(
     has_subtitle_filter: str | None = None,
     exclude_4k: bool = False,
     excluded_links: list[str] | None = None,
+    exclude_failed_links: bool = True,
 ) -> dict[str, Any] | None:
     results = await fetch_yhg007_magnet_data(
         movie_id,
@@ -624,7 +844,11 @@ async def get_yhg007_best_magnet_payload(
         sort_order="desc",
     )
     results = _filter_excluded_magnet_links(results, excluded_links)
-    return await select_healthy_best_magnet(results, select_yhg007_best_magnet)
+    return await select_healthy_best_magnet(
+        results,
+        select_yhg007_best_magnet,
+        exclude_failed_links=exclude_failed_links,
+    )
 
 
 async def get_best_magnet_payload(
@@ -637,7 +861,9 @@ async def get_best_magnet_payload(
     movie_data: dict[str, Any] | None = None,
     excluded_links: list[str] | None = None,
     exclude_history_links: bool = True,
+    exclude_failed_links: bool = True,
 ) -> dict[str, Any] | None:
+    """exclude_failed_links 为 False 时（手动查看磁力）保留多次下发失败的链接，只排到最后"""
     effective_has_subtitle_filter = normalize_subtitle_filter_for_source(
         magnet_source=magnet_source,
         has_subtitle_filter=has_subtitle_filter,
@@ -656,6 +882,7 @@ async def get_best_magnet_payload(
             has_subtitle_filter=effective_has_subtitle_filter,
             exclude_4k=exclude_4k,
             excluded_links=blocked_links,
+            exclude_failed_links=exclude_failed_links,
         )
     if magnet_source == "yhg007":
         return await get_yhg007_best_magnet_payload(
@@ -663,6 +890,7 @@ async def get_best_magnet_payload(
             has_subtitle_filter=effective_has_subtitle_filter,
             exclude_4k=exclude_4k,
             excluded_links=blocked_links,
+            exclude_failed_links=exclude_failed_links,
         )
 
     if movie_data is None:
@@ -673,10 +901,14 @@ async def get_best_magnet_payload(
     magnet_data = await fetch_javbus_magnet_data(movie_id, movie_data)
     candidates = _filter_javbus_magnet_candidates(magnet_data, effective_has_subtitle_filter, exclude_4k)
     candidates = _filter_excluded_magnet_links(candidates, blocked_links)
-    return await select_healthy_best_magnet(candidates, lambda remaining: remaining[0])
+    return await select_healthy_best_magnet(
+        candidates,
+        lambda remaining: remaining[0],
+        exclude_failed_links=exclude_failed_links,
+    )
 
 
-async def get_same_source_replacement_magnet_payload(
+async def get_replacement_magnet_payload(
     movie_id: str,
     magnet_link: str,
     magnet_source: str | None = None,
@@ -688,15 +920,21 @@ async def get_same_source_replacement_magnet_payload(
         )
     source = source or "javbus"
 
-    replacement = await get_best_magnet_payload(
-        movie_id,
-        magnet_source=source,
-        excluded_links=[magnet_link],
-        exclude_history_links=True,
-    )
-    if replacement and replacement.get("link"):
-        replacement.setdefault("source", source)
-        return replacement
+    # 替换磁力可能来自其他来源：优先同一来源；同来源找不到或历史成功率过低时，按成功率依次换其他来源
+    for candidate_source in await rank_magnet_sources(source):
+        try:
+            replacement = await get_best_magnet_payload(
+                movie_id,
+                magnet_source=candidate_source,
+                excluded_links=[magnet_link],
+                exclude_history_links=True,
+            )
+        except Exception as exc:
+            logger.warning("从 %s 查找替换磁力失败 %s: %s", candidate_source, movie_id, exc)
+            continue
+        if replacement and replacement.get("link"):
+            replacement.setdefault("source", candidate_source)
+            return replacement
     return None
 
 
@@ -750,6 +988,7 @@ async def get_magnets_payload(movie_id: str, request_query: dict[str, str]) -> A
             exclude_4k=exclude_4k,
             allow_chinese_subtitles=allow_chinese_subtitles,
             allow_param_present="allowChineseSubtitles" in request_query,
+            exclude_failed_links=False,
         )
         return [best_magnet] if best_magnet else []
     if magnet_source == "yhg007":
@@ -762,7 +1001,11 @@ async def get_magnets_payload(movie_id: str, request_query: dict[str, str]) -> A
         )
         results = _filter_excluded_magnet_links(results, history_excluded_links)
         if runtime.get_magnet_health_config().get("enabled"):
-            best_magnet = await select_healthy_best_magnet(results, select_yhg007_best_magnet)
+            best_magnet = await select_healthy_best_magnet(
+                results,
+                select_yhg007_best_magnet,
+                exclude_failed_links=False,
+            )
             return [best_magnet] if best_magnet else []
         return results
 
@@ -795,7 +1038,11 @@ async def get_magnets_payload(movie_id: str, request_query: dict[str, str]) -> A
 
     if runtime.get_magnet_health_config().get("enabled"):
         candidates = _filter_javbus_magnet_candidates(data, None, False)
-        best_magnet = await select_healthy_best_magnet(candidates, lambda remaining: remaining[0])
+        best_magnet = await select_healthy_best_magnet(
+            candidates,
+            lambda remaining: remaining[0],
+            exclude_failed_links=False,
+        )
         return [best_magnet] if best_magnet else []
 
     return data
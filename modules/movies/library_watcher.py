@@ -0,0 +1,380 @@
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import re
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from modules.common import runtime
+from modules.history.service import local_movie_library_service
+from .local_library import sync_local_library_paths
+from .local_scrape import SKIPPED_DIRECTORY_NAMES, VIDEO_EXTENSIONS
+
+
+logger = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+# 普通文件只在写完、移入、删除、移出时同步；IN_CREATE 时文件可能仍在下载中
+FILE_CHANGE_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM
+# 网络与 FUSE 文件系统上 inotify_add_watch 能成功，但收不到其他客户端的修改，这些根目录直接轮询
+NETWORK_FILESYSTEM_TYPES = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs", "lustre", "davfs", "ncpfs", "virtiofs",
+}
+PROC_MOUNTS_PATH = "/proc/mounts"
+INOTIFY_EVENT = struct.Struct("iIII")
+INOTIFY_READ_SIZE = 64 * 1024
+WATCH_STATUS_SYNC_FIELDS = ("directory", "changed_file_count", "removed_file_count", "new_movie_count", "synced_at")
+
+
+@dataclass
+class _PendingChanges:
+    paths: set[str] = field(default_factory=set)
+    directories: set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.paths or self.directories)
+
+
+def _is_watched_directory_name(name: str) -> bool:
+    return not name.startswith(".") and name.lower() not in SKIPPED_DIRECTORY_NAMES
+
+
+def _unescape_mount_field(value: str) -> str:
+    """/proc/mounts 中空格、制表符等按八进制转义，如 \\040"""
+    return re.sub(r"\\([0-7]{3})", lambda match: chr(int(match.group(1), 8)), value)
+
+
+def filesystem_type(path: str, mounts_path: str = PROC_MOUNTS_PATH) -> str:
+    """按挂载点最长前缀匹配路径所在的文件系统类型，读取失败时返回空字符串"""
+    target = os.path.realpath(path)
+    best_mount, best_type = "", ""
+    try:
+        with open(mounts_path, "r", encoding="utf-8", errors="replace") as file:
+            for line in file:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = _unescape_mount_field(fields[1])
+                prefix = os.path.join(mount_point, "")
+                if (target == mount_point or target.startswith(prefix)) and len(mount_point) >= len(best_mount):
+                    best_mount, best_type = mount_point, fields[2]
+    except OSError:
+        return ""
+    return best_type
+
+
+def is_network_filesystem(path: str, mounts_path: str = PROC_MOUNTS_PATH) -> bool:
+    fs_type = filesystem_type(path, mounts_path).lower()
+    return fs_type in NETWORK_FILESYSTEM_TYPES or fs_type.startswith("fuse")
+
+
+class InotifyWatcher:
+    """
+    基于 ctypes 调用 libc inotify 的递归目录监听，不引入额外依赖
+    每个子目录一个 watch，新建或移入的子目录在事件到达时补充监听
+    """
+
+    def __init__(self, on_change: Callable[[str, str, bool], None], on_overflow: Callable[[str | None], None]) -> None:
+        self.on_change = on_change
+        self.on_overflow = on_overflow
+        self._libc: Any = None
+        self._fd = -1
+        # watch 描述符 -> (扫描根目录, 目录路径)
+        self._watches: dict[int, tuple[str, str]] = {}
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux")
+
+    def open(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        self._libc = libc
+        self._fd = fd
+
+    @property
+    def fd(self) -> int:
+        return self._fd
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = -1
+        self._watches.clear()
+
+    def add_tree(self, root: str, directory: str) -> int:
+        """为目录及其子目录添加监听，返回新增的 watch 数量；watch 数量超出系统上限时抛出 OSError"""
+        added = 0
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                code = ctypes.get_errno()
+                if code == errno.ENOSPC:
+                    raise OSError(code, "inotify watch 数量已达系统上限 fs.inotify.max_user_watches")
+                continue
+            self._watches[wd] = (root, current)
+            added += 1
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if _is_watched_directory_name(entry.name) and entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+            except OSError:
+                continue
+        return added
+
+    def remove_tree(self, directory: str) -> None:
+        """目录被移走后停止监听其下所有 watch，避免事件仍按旧路径上报"""
+        prefix = os.path.join(directory, "")
+        for wd, (_root, path) in list(self._watches.items()):
+            if path == directory or path.startswith(prefix):
+                self._libc.inotify_rm_watch(self._fd, wd)
+                self._watches.pop(wd, None)
+
+    def read_events(self) -> None:
+        while True:
+            try:
+                data = os.read(self._fd, INOTIFY_READ_SIZE)
+            except BlockingIOError:
+                return
+            except OSError as exc:
+                logger.warning("读取 inotify 事件失败: %s", exc)
+                return
+            if not data:
+                return
+            offset = 0
+            while offset + INOTIFY_EVENT.size <= len(data):
+                wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+                raw_name = data[offset + INOTIFY_EVENT.size: offset + INOTIFY_EVENT.size + length]
+                offset += INOTIFY_EVENT.size + length
+                self._handle_event(wd, mask, os.fsdecode(raw_name.rstrip(b"\0")))
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            self.on_overflow(None)
+            return
+        watch = self._watches.get(wd)
+        if watch is None:
+            return
+        root, directory = watch
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+            if directory == root:
+                # 扫描根目录本身被删除或移走，交给轮询兜底重新遍历
+                self.on_overflow(root)
+            return
+        if not name:
+            return
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if not _is_watched_directory_name(name):
+                return
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self.add_tree(root, path)
+                except OSError as exc:
+                    logger.warning("监听新目录失败 %s: %s", path, exc)
+                    self.on_overflow(root)
+            elif mask & IN_MOVED_FROM:
+                self.remove_tree(path)
+            self.on_change(root, path, True)
+            return
+        if mask & FILE_CHANGE_MASK and os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS:
+            self.on_change(root, path, False)
+
+
+class LocalLibraryWatcher:
+    """
+    影视库目录监听：inotify 可用时按事件增量入库，否则按 poll_interval_seconds 轮询遍历
+    事件先按扫描根目录合并，静默 debounce_seconds 后统一同步；持续有事件时最多延迟 max_delay_seconds
+    """
+
+    def __init__(self, config_loader: Callable[[], dict[str, Any]] = runtime.get_local_library_watch_config) -> None:
+        self.config_loader = config_loader
+        self.backend = ""
+        self.roots: list[str] = []
+        self._config: dict[str, Any] = {}
+        self._pending: dict[str, _PendingChanges] = {}
+        self._changed = asyncio.Event()
+        self._inotify: InotifyWatcher | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._polled_roots: set[str] = set()
+        self.last_sync: dict[str, Any] | None = None
+
+    async def startup(self) -> None:
+        config = self.config_loader()
+        if not config.get("enabled") or self._tasks:
+            return
+        self._config = config
+        configured = [str(root) for root in config.get("roots") or [] if str(root).strip()]
+        roots = configured or await local_movie_library_service.get_scan_roots()
+        self.roots = sorted({os.path.realpath(root) for root in roots if os.path.isdir(root)})
+        if not self.roots:
+            logger.info("影视库监听未启动：没有可监听的扫描根目录")
+            return
+
+        self._changed = asyncio.Event()
+        if not config.get("force_polling") and InotifyWatcher.available():
+            network_roots = {root for root in self.roots if is_network_filesystem(root)}
+            for root in sorted(network_roots):
+                logger.info("%s 位于网络或 FUSE 文件系统，改用轮询", root)
+            self._polled_roots = set(network_roots)
+            await self._start_inotify([root for root in self.roots if root not in network_roots])
+        if self._inotify is None:
+            self._polled_roots = set(self.roots)
+        self.backend = "inotify" if self._inotify is not None and self._polled_roots != set(self.roots) else "polling"
+        if self._polled_roots:
+            self._tasks.append(asyncio.create_task(self._poll_loop()))
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+        logger.info("影视库监听已启动（%s）：%s", self.backend, ", ".join(self.roots))
+
+    async def _start_inotify(self, roots: list[str]) -> None:
+        if not roots:
+            return
+        inotify = InotifyWatcher(self._queue_change, self._queue_overflow)
+        try:
+            inotify.open()
+        except (OSError, AttributeError) as exc:
+            logger.warning("inotify 不可用，改用轮询: %s", exc)
+            return
+        # 大目录树逐个添加 watch 较慢，放到线程里执行，避免阻塞应用启动
+        failed_roots = await asyncio.to_thread(self._add_inotify_roots, inotify, roots)
+        self._polled_roots.update(failed_roots)
+        asyncio.get_running_loop().add_reader(inotify.fd, inotify.read_events)
+        self._inotify = inotify
+
+    @staticmethod
+    def _add_inotify_roots(inotify: InotifyWatcher, roots: list[str]) -> list[str]:
+        failed_roots = []
+        for root in roots:
+            try:
+                inotify.add_tree(root, root)
+            except OSError as exc:
+                # watch 数量不足时，该根目录退回轮询
+                logger.warning("无法监听 %s，改用轮询: %s", root, exc)
+                inotify.remove_tree(root)
+                failed_roots.append(root)
+        return failed_roots
+
+    async def shutdown(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._inotify is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+        self._pending.clear()
+        self._polled_roots.clear()
+        self.backend = ""
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "enabled": bool(self._tasks),
+            "backend": self.backend,
+            "roots": list(self.roots),
+            "polled_roots": sorted(self._polled_roots),
+            "pending_roots": sorted(root for root, pending in self._pending.items() if pending),
+            "last_sync": self.last_sync,
+        }
+
+    def _queue_change(self, root: str, path: str, is_directory: bool) -> None:
+        pending = self._pending.setdefault(root, _PendingChanges())
+        (pending.directories if is_directory else pending.paths).add(path)
+        self._changed.set()
+
+    def _queue_overflow(self, root: str | None) -> None:
+        """事件队列溢出或根目录失效时，整体重新遍历受影响的根目录"""
+        for target in [root] if root else self.roots:
+            self._queue_change(target, target, True)
+
+    async def _poll_loop(self) -> None:
+        interval = max(1.0, float(self._config.get("poll_interval_seconds") or 60.0))
+        while True:
+            await asyncio.sleep(interval)
+            for root in sorted(self._polled_roots):
+                self._queue_change(root, root, True)
+
+    async def _flush_loop(self) -> None:
+        debounce = max(0.0, float(self._config.get("debounce_seconds") or 0.0))
+        max_delay = max(debounce, float(self._config.get("max_delay_seconds") or debounce))
+        while True:
+            await self._changed.wait()
+            first_event_at = time.monotonic()
+            # 事件持续到达时继续等待，直到静默 debounce 秒或达到最大延迟
+            while True:
+                self._changed.clear()
+                remaining = max_delay - (time.monotonic() - first_event_at)
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=min(debounce, remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._changed.clear()
+            await self.flush()
+
+    async def flush(self) -> list[dict[str, Any]]:
+        pending, self._pending = self._pending, {}
+        results = []
+        for root, changes in sorted(pending.items()):
+            if not changes:
+                continue
+            try:
+                result = await sync_local_library_paths(
+                    root,
+                    paths=changes.paths,
+                    directories=changes.directories,
+                    scrape=bool(self._config.get("scrape", True)),
+                    concurrent=int(self._config.get("concurrent") or 3),
+                )
+            except Exception:
+                logger.exception("影视库监听同步失败: %s", root)
+                continue
+            if result:
+                result["synced_at"] = time.time()
+                self.last_sync = {key: result.get(key) for key in WATCH_STATUS_SYNC_FIELDS}
+                results.append(result)
+                logger.info(
+                    "影视库监听同步 %s：变化 %s 个文件，移除 %s 个文件",
+                    root,
+                    result.get("changed_file_count"),
+                    result.get("removed_file_count"),
+                )
+        return results
+
+
+local_library_watcher = LocalLibraryWatcher()
@@ -1,3 +1,4 @@
+import asyncio
 import datetime
 import logging
 import os
@@ -6,17 +7,20 @@ from pathlib import Path
 from typing import Any
 
 from modules.common.paths import UserPathError, resolve_existing_directory
+from modules.history.asset_index import ACTOR_IMAGE_DIR
 from modules.history.service import (
     LOCAL_LIBRARY_INFORMATION_FIELDS,
     local_movie_library_service,
     normalize_local_library_information_fields,
 )
+from modules.magnets.outcome_store import magnet_outcome_store
 from .local_scrape import (
+    WalkedVideoFile,
     _build_metadata,
     _file_size,
     _metadata_full_text,
-    _probe_video_metadata,
     _source_part_marker,
+    _stat_video_file,
     _walk_video_files,
     _write_actor_images,
     _write_images,
@@ -25,6 +29,7 @@ from .local_scrape import (
     recognize_designation,
     scrape_movie_metadata_map,
 )
+from .media_probe import video_probe_service
 from .schemas import LocalLibraryInformationDownloadRequest, LocalLibraryScanRequest
 
 
@@ -38,19 +43,27 @@ def _iso_mtime(path: Path) -> str:
         return ""
 
 
-def _build_library_file_record(path: Path, root: Path) -> dict[str, Any]:
+def _build_library_file_record(
+    path: Path,
+    root: Path,
+    fingerprint: tuple[int, int, int] | None = None,
+) -> dict[str, Any]:
     code = recognize_designation(path.stem)
     record = {
         "movie_id": code,
         "path": str(path),
         "relative_path": str(path.relative_to(root)),
         "file_name": path.name,
-        "size": _file_size(path),
-        "modified_at": _iso_mtime(path),
+        "size": fingerprint[0] if fingerprint else _file_size(path),
+        "modified_at": (
+            datetime.datetime.fromtimestamp(fingerprint[1] / 1e9).isoformat() if fingerprint else _iso_mtime(path)
+        ),
         "extension": path.suffix.lower(),
         "part": _source_part_marker(path.stem),
     }
-    record.update(_probe_video_metadata(path))
+    if fingerprint:
+        record["mtime_ns"] = fingerprint[1]
+        record["inode"] = fingerprint[2]
     return record
 
 
@@ -66,20 +79,51 @@ def _has_readable_video_media(media_info: dict[str, Any]) -> bool:
     return bool((width > 0 and height > 0) or resolution > 0 or bitrate > 0 or codec or container)
 
 
-async def _scrape_metadata(movie_ids: list[str], concurrent: int) -> dict[str, dict[str, Any]]:
-    return await scrape_movie_metadata_map(movie_ids, concurrent)
+def _probe_video_metadata(path: Path) -> dict[str, Any] | None:
+    return video_probe_service.probe_or_none(path)
 
 
-async def scan_local_library(request: LocalLibraryScanRequest) -> dict[str, Any]:
-    try:
-        root = resolve_existing_directory(request.directory)
-    except UserPathError as exc:
-        return {"success": False, "error": exc.code, "message": exc.message}
+async def _probe_video_files(paths: list[Path]) -> dict[str, dict[str, Any] | None]:
+    """在 ffprobe 线程池中并发探测，返回 {绝对路径: 媒体信息}；超时等暂时性失败为 None"""
+    return await video_probe_service.probe_many(paths, _probe_video_metadata)
+
+
+async def _scrape_metadata(
+    movie_ids: list[str],
+    concurrent: int,
+    force_refresh: bool = False,
+) -> dict[str, dict[str, Any]]:
+    return await scrape_movie_metadata_map(movie_ids, concurrent, force_refresh)
 
-    video_files = _walk_video_files(root, request.recursive, request.max_depth)
-    records = [_build_library_file_record(path, root) for path in video_files]
+
+async def _apply_library_file_changes(
+    root: Path,
+    changed_files: list[WalkedVideoFile],
+    removed_paths: list[str],
+    incremental: bool,
+    scrape: bool,
+    concurrent: int,
+    remove_missing: bool = False,
+    force_refresh: bool = False,
+) -> tuple[dict[str, Any], int]:
+    """探测并刮削变化的文件后写入影视库，返回 update_from_scan 的结果与刮削到的影片数量"""
+    if incremental:
+        existing_movie_ids = await local_movie_library_service.present_movie_ids(
+            {str(recognize_designation(walked.path.stem) or "").upper() for walked in changed_files} - {""}
+        )
+    else:
+        existing_movie_ids = set()
+
+    records = [_build_library_file_record(walked.path, root, walked.fingerprint) for walked in changed_files]
+    media_by_path = await _probe_video_files([
+        walked.path
+        for walked in changed_files
+        if not incremental or recognize_designation(walked.path.stem)
+    ])
+    for record in records:
+        record.update(media_by_path.get(os.path.abspath(record["path"])) or {})
     movie_ids = sorted({str(record["movie_id"]).upper() for record in records if record.get("movie_id")})
-    metadata_map = await _scrape_metadata(movie_ids, request.concurrent) if request.scrape else {}
+    metadata_map = await _scrape_metadata(movie_ids, concurrent, force_refresh) if scrape else {}
     scan_time = datetime.datetime.now().isoformat()
 
     for record in records:
@@ -90,6 +134,9 @@ async def scan_local_library(request: LocalLibraryScanRequest) -> dict[str, Any]
         if scraped:
             record.update(scraped)
             record["scraped_at"] = scan_time
+        elif str(movie_id).upper() in existing_movie_ids:
+            # 已入库影片的文件有变化但未刮削时，保留原有元数据
+            continue
         else:
             metadata = _build_metadata(None, str(movie_id), str(movie_id))
             record["metadata"] = metadata
@@ -101,10 +148,122 @@ async def scan_local_library(request: LocalLibraryScanRequest) -> dict[str, Any]
     result = await local_movie_library_service.update_from_scan(
         str(root),
         records,
-        remove_missing=request.remove_missing,
+        remove_missing=remove_missing,
+        removed_paths=removed_paths,
+    )
+    try:
+        await magnet_outcome_store.record_completed_movies({str(record["movie_id"]) for record in records if record.get("movie_id")})
+    except Exception as exc:
+        logger.warning("记录磁力入库结果失败: %s", exc)
+    return result, len(metadata_map)
+
+
+async def scan_local_library(request: LocalLibraryScanRequest) -> dict[str, Any]:
+    try:
+        root = resolve_existing_directory(request.directory)
+    except UserPathError as exc:
+        return {"success": False, "error": exc.code, "message": exc.message}
+
+    # 遍历时 DirEntry 已带回 (size, mtime_ns, inode)，增量比对不再额外 stat
+    walked_files = await _walk_video_files(root, request.recursive, request.max_depth)
+    removed_paths: list[str] = []
+    unchanged_count = 0
+    added_count = 0
+    # 识别不出番号的文件不会入库，每次扫描都像新文件；只计入 unrecognized_files，不算新增或变化
+    unrecognized_count = 0
+    if request.incremental:
+        # 指纹未变化的文件直接跳过，不再探测媒体信息，也不参与刮削
+        known = await local_movie_library_service.get_scan_fingerprints(str(root))
+        seen = {os.path.abspath(str(walked.path)) for walked in walked_files}
+        changed_files = []
+        for walked in walked_files:
+            previous = known.get(os.path.abspath(str(walked.path)))
+            if previous is not None and previous == walked.fingerprint:
+                unchanged_count += 1
+                continue
+            if not recognize_designation(walked.path.stem):
+                unrecognized_count += 1
+            elif previous is None:
+                added_count += 1
+            changed_files.append(walked)
+        if request.remove_missing:
+            removed_paths = sorted(path for path in known if path not in seen)
+    else:
+        changed_files = walked_files
+        unrecognized_count = sum(1 for walked in walked_files if not recognize_designation(walked.path.stem))
+        added_count = len(walked_files) - unrecognized_count
+
+    result, scraped_count = await _apply_library_file_changes(
+        root,
+        changed_files,
+        removed_paths,
+        incremental=request.incremental,
+        scrape=request.scrape,
+        concurrent=request.concurrent,
+        remove_missing=request.remove_missing and not request.incremental,
+        force_refresh=request.force_refresh,
+    )
+    result["directory"] = str(root)
+    result["scraped_movie_count"] = scraped_count
+    result["incremental"] = request.incremental
+    result["scanned_files"] = len(walked_files)
+    result["added_file_count"] = added_count
+    result["changed_file_count"] = len(changed_files) - added_count - unrecognized_count
+    result["unchanged_file_count"] = unchanged_count
+    return result
+
+
+async def sync_local_library_paths(
+    directory: str,
+    paths: list[str] | set[str] = (),
+    directories: list[str] | set[str] = (),
+    scrape: bool = True,
+    concurrent: int = 3,
+) -> dict[str, Any] | None:
+    """
+    按路径增量同步扫描根目录下的部分文件，供目录监听使用
+    paths 为变化的单个文件，directories 为需要整体重新遍历的子目录；已不存在的已入库路径会被移除
+    没有任何变化时返回 None，不写入影视库
+    """
+    root = Path(os.path.abspath(directory))
+    known = await local_movie_library_service.get_scan_fingerprints(str(root))
+    current: dict[str, WalkedVideoFile] = {}
+    touched: set[str] = set()
+    for path in paths:
+        key = os.path.abspath(path)
+        touched.add(key)
+        walked = await asyncio.to_thread(_stat_video_file, Path(key))
+        if walked:
+            current[key] = walked
+    for subdirectory in directories:
+        prefix = os.path.join(os.path.abspath(subdirectory), "")
+        touched.update(path for path in known if path.startswith(prefix) or path == prefix[:-1])
+        if os.path.isdir(subdirectory):
+            for walked in await _walk_video_files(Path(subdirectory), True, None):
+                key = os.path.abspath(str(walked.path))
+                touched.add(key)
+                current[key] = walked
+
+    # 识别不出番号的文件不会入库，也就没有指纹；不跳过的话每次同步都会被当作变化重新写入影视库
+    changed_files = [
+        current[key]
+        for key in sorted(current)
+        if known.get(key) != current[key].fingerprint and recognize_designation(current[key].path.stem)
+    ]
+    removed_paths = sorted(key for key in touched if key in known and key not in current)
+    if not changed_files and not removed_paths:
+        return None
+    result, scraped_count = await _apply_library_file_changes(
+        root,
+        changed_files,
+        removed_paths,
+        incremental=True,
+        scrape=scrape,
+        concurrent=concurrent,
     )
     result["directory"] = str(root)
-    result["scraped_movie_count"] = len(metadata_map)
+    result["scraped_movie_count"] = scraped_count
+    result["changed_file_count"] = len(changed_files)
     return result
 
 
@@ -112,6 +271,42 @@ async def get_local_library_payload() -> dict[str, Any]:
     return await local_movie_library_service.get_summary()
 
 
+async def get_local_library_summary_page(
+    sort: str = "",
+    q: str = "",
+    filters: dict[str, list[str]] | None = None,
+    cursor: str = "",
+    limit: int = 120,
+) -> dict[str, Any]:
+    return await local_movie_library_service.get_summary_page(
+        sort=sort,
+        query=q,
+        filters=filters,
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+async def search_local_library(
+    q: str = "",
+    star: str = "",
+    genre: str = "",
+    studio: str = "",
+    series: str = "",
+    page: int = 1,
+    page_size: int = 50,
+) -> dict[str, Any]:
+    return await local_movie_library_service.search(
+        query=q.strip(),
+        star=star.strip(),
+        genre=genre.strip(),
+        studio=studio.strip(),
+        series=series.strip(),
+        page=page,
+        page_size=page_size,
+    )
+
+
 def parse_information_check_fields(fields: str | list[str] | tuple[str, ...] | None) -> tuple[str, ...]:
     if isinstance(fields, str):
         raw_fields = [field.strip() for field in fields.split(",")]
@@ -142,9 +337,11 @@ async def clean_invalid_local_library_files() -> dict[str, Any]:
     invalid_file_count = 0
     deleted_files: list[dict[str, Any]] = []
     failed_files: list[dict[str, Any]] = []
+    skipped_files: list[dict[str, Any]] = []
     invalid_paths_by_movie: dict[str, list[str]] = {}
     media_by_movie: dict[str, dict[str, dict[str, Any]]] = {}
 
+    checked_files: list[tuple[str, dict[str, Any], Path]] = []
     for record in records:
         movie_id = str(record.get("movie_id") or "").strip().upper()
         if not movie_id:
@@ -165,32 +362,44 @@ async def clean_invalid_local_library_files() -> dict[str, Any]:
                 continue
             if not resolved.exists() or not resolved.is_file():
                 continue
+            checked_files.append((movie_id, file_record, resolved))
+
+    # 全部文件一次性交给探测线程池，未变化的文件直接命中探测缓存
+    media_by_path = await _probe_video_files([resolved for _movie_id, _file_record, resolved in checked_files])
+    for movie_id, file_record, resolved in checked_files:
+        checked_file_count += 1
+        media_info = media_by_path.get(os.path.abspath(str(resolved)))
+        if media_info is None:
+            # ffprobe 超时或暂时不可用时无法判断文件是否有效，保留文件，下次清洗时再探测
+            skipped_files.append({
+                "movie_id": movie_id,
+                "path": str(resolved),
+                "error": "probe_unavailable",
+            })
+            continue
+        if _has_readable_video_media(media_info):
+            media_by_movie.setdefault(movie_id, {})[os.path.abspath(str(resolved))] = media_info
+            continue
 
-            checked_file_count += 1
-            media_info = _probe_video_metadata(resolved)
-            if _has_readable_video_media(media_info):
-                media_by_movie.setdefault(movie_id, {})[os.path.abspath(str(resolved))] = media_info
-                continue
-
-            invalid_file_count += 1
-            try:
-                resolved.unlink()
-            except OSError as exc:
-                failed_files.append({
-                    "movie_id": movie_id,
-                    "path": str(resolved),
-                    "error": "delete_failed",
-                    "message": str(exc),
-                })
-                continue
-
-            deleted_files.append({
+        invalid_file_count += 1
+        try:
+            resolved.unlink()
+        except OSError as exc:
+            failed_files.append({
                 "movie_id": movie_id,
                 "path": str(resolved),
-                "file_name": file_record.get("file_name") or resolved.name,
-                "size": int(file_record.get("size") or 0),
+                "error": "delete_failed",
+                "message": str(exc),
             })
-            invalid_paths_by_movie.setdefault(movie_id, []).append(os.path.abspath(str(resolved)))
+            continue
+
+        deleted_files.append({
+            "movie_id": movie_id,
+            "path": str(resolved),
+            "file_name": file_record.get("file_name") or resolved.name,
+            "size": int(file_record.get("size") or 0),
+        })
+        invalid_paths_by_movie.setdefault(movie_id, []).append(os.path.abspath(str(resolved)))
 
     prune_result = await local_movie_library_service.clean_file_records(
         invalid_paths_by_movie,
@@ -202,6 +411,7 @@ async def clean_invalid_local_library_files() -> dict[str, Any]:
         "invalid_file_count": invalid_file_count,
         "deleted_file_count": len(deleted_files),
         "deletion_failed_count": len(failed_files),
+        "skipped_file_count": len(skipped_files),
         "removed_file_count": prune_result.get("removed_file_count", 0),
         "removed_movie_count": prune_result.get("removed_movie_count", 0),
         "updated_media_file_count": prune_result.get("updated_media_file_count", 0),
@@ -209,7 +419,12 @@ async def clean_invalid_local_library_files() -> dict[str, Any]:
         "total_files": prune_result.get("total_files", 0),
         "deleted_files": deleted_files[:100],
         "failed_files": failed_files[:100],
-        "message": f"已清洗 {len(deleted_files)} 个无效文件",
+        "skipped_files": skipped_files[:100],
+        "message": (
+            f"已清洗 {len(deleted_files)} 个无效文件，{len(skipped_files)} 个文件探测超时或失败，已跳过"
+            if skipped_files
+            else f"已清洗 {len(deleted_files)} 个无效文件"
+        ),
     }
 
 
@@ -243,7 +458,11 @@ async def download_missing_local_library_information(request: LocalLibraryInform
             or any(field in metadata_field_names for field in (record.get("missing_fields") or []))
         )
     ]
-    metadata_map = await _scrape_metadata(refresh_movie_ids, request.concurrent) if refresh_movie_ids else {}
+    metadata_map = (
+        await _scrape_metadata(refresh_movie_ids, request.concurrent, request.force_refresh)
+        if refresh_movie_ids
+        else {}
+    )
     scraped_at = datetime.datetime.now().isoformat()
     results: list[dict[str, Any]] = []
     updated_count = 0
@@ -308,6 +527,7 @@ async def download_missing_local_library_information(request: LocalLibraryInform
             **asset_result,
         })
 
+    await local_movie_library_service.sync()
     next_check = await local_movie_library_service.get_information_check(selected_fields)
     return {
         "success": True,
@@ -348,7 +568,8 @@ async def _write_local_library_information_assets(
         }
 
     primary_video_path = video_paths[0]
-    media_by_path = {str(video_path): _probe_video_metadata(video_path) for video_path in video_paths}
+    probed = await _probe_video_files(video_paths)
+    media_by_path = {str(video_path): probed.get(os.path.abspath(str(video_path))) or {} for video_path in video_paths}
     await local_movie_library_service.update_file_media_info(movie_id, media_by_path)
     poster_name = None
     sample_names: list[str] = []
@@ -379,6 +600,8 @@ async def _write_local_library_information_assets(
 
     if request.write_nfo:
         nfo_path = _write_nfo(primary_video_path, metadata, poster_name, sample_names)
+    asset_dirs = {primary_video_path.parent, *(Path(str(file_record.get("path") or "")).parent for file_record in files)}
+    local_movie_library_service.asset_index.invalidate(*asset_dirs, *(asset_dir / ACTOR_IMAGE_DIR for asset_dir in asset_dirs))
 
     return {
         "nfo_path": str(nfo_path) if nfo_path else None,
@@ -392,7 +615,11 @@ async def _write_local_library_information_assets(
 
 
 async def get_local_library_status(movie_id: str) -> dict[str, Any]:
-    return await local_movie_library_service.get_status(movie_id)
+    status = await local_movie_library_service.get_status(movie_id)
+    if status.get("record"):
+        # 列表只返回轻量行，详情接口补齐封面、媒体信息等展示字段
+        status["record"] = await local_movie_library_service.get_detail(movie_id)
+    return status
 
 
 async def clear_local_library() -> dict[str, Any]:
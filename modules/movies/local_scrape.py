@@ -1,25 +1,26 @@
 import asyncio
-import base64
 import datetime
 import json
 import logging
+import os
 import re
 import shutil
-import subprocess
+import stat as stat_module
 import xml.etree.ElementTree as ET
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator
 
-import httpx
-
-from modules.common.runtime import get_javbus_config
+from modules.common.image_download import download_image
 from modules.common.paths import UserPathError, resolve_existing_directory, resolve_existing_file, resolve_user_path
 from modules.history.service import local_movie_library_service
 from modules.javbus_api import javbus_api_service
+from .media_probe import video_probe_service
 from .metadata_scrapers import metadata_scraper_service
-from .schemas import LocalScrapeApplyRequest, LocalScrapeDeleteRequest, LocalScrapePreviewRequest
+from .scrape_images import LOCAL_SCRAPE_IMAGE_STORE_DIR, ScrapeImageFetcher
+from .schemas import LocalScrapeApplyItem, LocalScrapeApplyRequest, LocalScrapeDeleteRequest, LocalScrapePreviewRequest
 
 
 logger = logging.getLogger(__name__)
@@ -54,25 +55,8 @@ SKIPPED_DIRECTORY_NAMES = {"behind the scenes", "backdrops"}
 TS_MIN_VIDEO_SIZE = 10 * 1024 * 1024
 MPEG_TS_PACKET_SIZE = 188
 MPEG_TS_SYNC_BYTE = 0x47
-IMAGE_DOWNLOAD_HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    ),
-    "Referer": "https://www.javbus.com/",
-    "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
-}
-DEFAULT_IMAGE_DOWNLOAD_ATTEMPTS = 3
-DEFAULT_IMAGE_DOWNLOAD_BACKOFF_SECONDS = 0.25
-
-
-def _image_download_headers(javbus_config: dict[str, Any]) -> dict[str, str]:
-    headers = dict(IMAGE_DOWNLOAD_HEADERS)
-    base_url = str(javbus_config.get("base_url") or "").strip()
-    if base_url:
-        headers["Referer"] = f"{base_url.rstrip('/')}/"
-    return headers
+# 并发列举目录的线程数，网络文件系统上每次目录读取都是一次往返
+VIDEO_WALK_WORKERS = 8
 
 
 DESIGNATION_PATTERNS: list[tuple[re.Pattern[str], int]] = [
@@ -144,10 +128,6 @@ def recognize_designation(filename: str) -> str | None:
     return None
 
 
-def _is_skipped_directory(path: Path) -> bool:
-    return path.name.lower() in SKIPPED_DIRECTORY_NAMES
-
-
 def _is_mpeg_ts_header(path: Path) -> bool:
     try:
         with path.open("rb") as file:
@@ -201,35 +181,104 @@ def _scrape_diagnostic_log(message: str, level: str = "info") -> dict[str, str]:
     }
 
 
-def _walk_video_files(root: Path, recursive: bool, max_depth: int | None) -> list[Path]:
-    files: list[Path] = []
-    root = root.resolve()
-
-    def walk(current: Path, depth: int) -> None:
-        try:
-            entries = list(current.iterdir())
-        except OSError as exc:
-            logger.warning("Failed to read local scrape directory %s: %s", current, exc)
-            return
-
-        for entry in entries:
-            if entry.name.startswith(".") or entry.is_symlink():
-                continue
-            if entry.is_dir():
-                if _is_skipped_directory(entry):
+@dataclass
+class WalkedVideoFile:
+    path: Path
+    size: int
+    mtime_ns: int
+    inode: int
+
+    @property
+    def fingerprint(self) -> tuple[int, int, int]:
+        return self.size, self.mtime_ns, self.inode
+
+
+def _scan_video_directory(
+    directory: str,
+    depth: int,
+    recursive: bool,
+    max_depth: int | None,
+) -> tuple[list[WalkedVideoFile], list[tuple[str, int]]]:
+    """
+    列举单个目录：文件类型与大小直接取自 DirEntry 缓存的 stat，不再逐个 is_dir/is_file/resolve
+    只有达到大小阈值的 .ts 文件才会打开嗅探文件头
+    """
+    files: list[WalkedVideoFile] = []
+    subdirectories: list[tuple[str, int]] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
                     continue
-                if recursive and (max_depth is None or depth < max_depth):
-                    walk(entry, depth + 1)
-                continue
-            if entry.is_file() and _should_scan_as_video(entry):
                 try:
-                    if entry.stat().st_size > 0:
-                        files.append(entry.resolve())
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name.lower() in SKIPPED_DIRECTORY_NAMES:
+                            continue
+                        if recursive and (max_depth is None or depth < max_depth):
+                            subdirectories.append((entry.path, depth + 1))
+                        continue
+                    suffix = os.path.splitext(entry.name)[1].lower()
+                    if suffix not in VIDEO_EXTENSIONS or not entry.is_file(follow_symlinks=False):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_size <= 0:
+                        continue
+                    path = Path(entry.path)
+                    if suffix == ".ts" and (stat.st_size < TS_MIN_VIDEO_SIZE or not _is_mpeg_ts_header(path)):
+                        continue
+                    files.append(WalkedVideoFile(path, stat.st_size, stat.st_mtime_ns, entry.inode()))
                 except OSError:
                     continue
+    except OSError as exc:
+        logger.warning("Failed to read local scrape directory %s: %s", directory, exc)
+    return files, subdirectories
+
+
+def _stat_video_file(path: Path) -> WalkedVideoFile | None:
+    """按遍历器相同的规则检查单个文件，用于监听到的文件变化；不是有效视频时返回 None"""
+    suffix = path.suffix.lower()
+    if path.name.startswith(".") or suffix not in VIDEO_EXTENSIONS:
+        return None
+    try:
+        stat = os.lstat(path)
+    except OSError:
+        return None
+    if not stat_module.S_ISREG(stat.st_mode) or stat.st_size <= 0:
+        return None
+    if suffix == ".ts" and (stat.st_size < TS_MIN_VIDEO_SIZE or not _is_mpeg_ts_header(path)):
+        return None
+    return WalkedVideoFile(path, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+async def _stream_video_files(
+    root: Path,
+    recursive: bool,
+    max_depth: int | None,
+    workers: int = VIDEO_WALK_WORKERS,
+) -> AsyncIterator[WalkedVideoFile]:
+    """在线程池中并发列举子目录，每列举完一个目录就产出其中的视频文件，调用方可以边遍历边处理"""
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="video-walk") as executor:
+        pending = {
+            loop.run_in_executor(executor, _scan_video_directory, str(root.resolve()), 0, recursive, max_depth)
+        }
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                files, subdirectories = future.result()
+                for subdirectory, depth in subdirectories:
+                    pending.add(
+                        loop.run_in_executor(executor, _scan_video_directory, subdirectory, depth, recursive, max_depth)
+                    )
+                for walked in files:
+                    yield walked
+
 
-    walk(root, 0)
-    return sorted(files, key=lambda path: str(path).lower())
+async def _walk_video_files(root: Path, recursive: bool, max_depth: int | None) -> list[WalkedVideoFile]:
+    files = [walked async for walked in _stream_video_files(root, recursive, max_depth)]
+    return sorted(files, key=lambda walked: str(walked.path).lower())
 
 
 def _truncate_utf8(value: str, max_bytes: int) -> str:
@@ -567,95 +616,18 @@ def _iso_mtime(path: Path) -> str:
         return ""
 
 
-def _int_or_none(value: Any) -> int | None:
-    try:
-        parsed = int(float(value))
-    except (TypeError, ValueError):
-        return None
-    return parsed if parsed > 0 else None
-
-
-def _normalize_container_format(format_name: Any, suffix: str) -> str:
-    names = [item.strip().lower() for item in str(format_name or "").split(",") if item.strip()]
-    extension = str(suffix or "").lower()
-    extension_containers = {
-        ".mp4": "mp4",
-        ".m4v": "mp4",
-        ".mov": "mov",
-        ".mkv": "matroska",
-        ".webm": "webm",
-        ".avi": "avi",
-        ".wmv": "asf",
-        ".flv": "flv",
-        ".ts": "mpegts",
-        ".mpg": "mpeg",
-        ".mpeg": "mpeg",
-        ".3gp": "3gp",
-    }
-    extension_container = extension_containers.get(extension)
-    if extension_container and (not names or extension_container in names):
-        return extension_container
-    if extension_container == "mp4" and {"mov", "mp4"}.issubset(set(names)):
-        return "mp4"
-    if extension_container == "webm" and "webm" in names:
-        return "webm"
-    return names[0] if names else ""
+def _probe_video_metadata(path: Path) -> dict[str, Any]:
+    return video_probe_service.probe(path)
 
 
-def _probe_video_metadata(path: Path) -> dict[str, Any]:
-    try:
-        completed = subprocess.run(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-select_streams",
-                "v:0",
-                "-show_entries",
-                "stream=width,height,bit_rate,codec_name,duration:format=bit_rate,duration,format_name",
-                "-of",
-                "json",
-                str(path),
-            ],
-            capture_output=True,
-            check=False,
-            text=True,
-            timeout=5,
-        )
-    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
-        return {}
-    if completed.returncode != 0 or not completed.stdout:
-        return {}
-    try:
-        payload = json.loads(completed.stdout)
-    except json.JSONDecodeError:
-        return {}
-
-    streams = payload.get("streams") if isinstance(payload, dict) else None
-    stream = streams[0] if isinstance(streams, list) and streams and isinstance(streams[0], dict) else {}
-    file_format = payload.get("format") if isinstance(payload.get("format"), dict) else {}
-    width = _int_or_none(stream.get("width"))
-    height = _int_or_none(stream.get("height"))
-    bitrate = _int_or_none(stream.get("bit_rate")) or _int_or_none(file_format.get("bit_rate"))
-    duration = _int_or_none(stream.get("duration")) or _int_or_none(file_format.get("duration"))
-    codec = str(stream.get("codec_name") or "").strip()
-    container = _normalize_container_format(file_format.get("format_name"), path.suffix)
-    metadata: dict[str, Any] = {}
-    if width:
-        metadata["width"] = width
-    if height:
-        metadata["height"] = height
-    if width and height:
-        metadata["resolution_pixels"] = width * height
-    if bitrate:
-        metadata["bitrate"] = bitrate
-    if codec:
-        metadata["codec"] = codec
-    if container:
-        metadata["container"] = container
-    if duration:
-        metadata["duration_seconds"] = duration
-    return metadata
+async def _probe_video_files(paths: list[Path]) -> dict[str, dict[str, Any]]:
+    """整理时在 ffprobe 线程池中探测，不阻塞事件循环；返回 {绝对路径: 媒体信息}"""
+    media = await video_probe_service.probe_many(paths, _probe_video_metadata)
+    return {key: value or {} for key, value in media.items()}
+
+
+def _media_for(media: dict[str, dict[str, Any]], path: Path) -> dict[str, Any]:
+    return media.get(os.path.abspath(str(path))) or {}
 
 
 def _file_detail(path: Path, exists: bool | None = None, include_media: bool = False) -> dict[str, Any]:
@@ -698,14 +670,24 @@ def _conflict_skip_result(
     }
 
 
-def _choose_conflict_keep_side(source_path: Path, target_path: Path, resolution: str) -> str | None:
+# 这些冲突策略需要比较两侧的媒体信息，调用方先用 _probe_video_files 探测后传入
+CONFLICT_MEDIA_RESOLUTIONS = {"auto_best", "keep_higher_resolution", "keep_higher_bitrate"}
+
+
+def _choose_conflict_keep_side(
+    source_path: Path,
+    target_path: Path,
+    resolution: str,
+    media: dict[str, dict[str, Any]] | None = None,
+) -> str | None:
+    media = media or {}
     if resolution in {"keep_source"}:
         return "source"
     if resolution in {"skip", "keep_target"}:
         return "target"
     if resolution == "auto_best":
-        source_media = _probe_video_metadata(source_path)
-        target_media = _probe_video_metadata(target_path)
+        source_media = _media_for(media, source_path)
+        target_media = _media_for(media, target_path)
         comparisons = [
             (source_media.get("resolution_pixels") or 0, target_media.get("resolution_pixels") or 0),
             (source_media.get("bitrate") or 0, target_media.get("bitrate") or 0),
@@ -730,11 +712,11 @@ def _choose_conflict_keep_side(source_path: Path, target_path: Path, resolution:
         source_value = _file_size(source_path)
         target_value = _file_size(target_path)
     elif resolution == "keep_higher_resolution":
-        source_value = _probe_video_metadata(source_path).get("resolution_pixels") or 0
-        target_value = _probe_video_metadata(target_path).get("resolution_pixels") or 0
+        source_value = _media_for(media, source_path).get("resolution_pixels") or 0
+        target_value = _media_for(media, target_path).get("resolution_pixels") or 0
     elif resolution == "keep_higher_bitrate":
-        source_value = _probe_video_metadata(source_path).get("bitrate") or 0
-        target_value = _probe_video_metadata(target_path).get("bitrate") or 0
+        source_value = _media_for(media, source_path).get("bitrate") or 0
+        target_value = _media_for(media, target_path).get("bitrate") or 0
     else:
         return None
 
@@ -805,6 +787,7 @@ def _build_library_record_for_applied_video(
     library_root: Path,
     metadata: dict[str, Any],
     scraped_at: str,
+    media_info: dict[str, Any],
 ) -> dict[str, Any] | None:
     movie_id = str(metadata.get("id") or "").strip().upper()
     if not movie_id:
@@ -826,11 +809,15 @@ def _build_library_record_for_applied_video(
         "scraped_at": scraped_at,
         "full_text": _metadata_full_text(movie_id, metadata),
     }
-    record.update(_probe_video_metadata(current_video))
+    record.update(media_info)
     return record
 
 
-async def scrape_movie_metadata(movie_id: str, source_stem: str | None = None) -> dict[str, Any]:
+async def scrape_movie_metadata(
+    movie_id: str,
+    source_stem: str | None = None,
+    force_refresh: bool = False,
+) -> dict[str, Any]:
     normalized_id = str(movie_id or "").strip().upper()
     stem = source_stem or normalized_id
     if not normalized_id:
@@ -850,7 +837,7 @@ async def scrape_movie_metadata(movie_id: str, source_stem: str | None = None) -
         }
 
     try:
-        scrape_result = await metadata_scraper_service.get_movie_detail(normalized_id)
+        scrape_result = await metadata_scraper_service.get_movie_detail(normalized_id, force_refresh=force_refresh)
         movie_detail = None
         scrape_source = None
         scrape_error = None
@@ -901,7 +888,11 @@ async def scrape_movie_metadata(movie_id: str, source_stem: str | None = None) -
         }
 
 
-async def scrape_movie_metadata_map(movie_ids: list[str], concurrent: int) -> dict[str, dict[str, Any]]:
+async def scrape_movie_metadata_map(
+    movie_ids: list[str],
+    concurrent: int,
+    force_refresh: bool = False,
+) -> dict[str, dict[str, Any]]:
     semaphore = asyncio.Semaphore(max(1, min(concurrent, 5)))
     results: dict[str, dict[str, Any]] = {}
 
@@ -910,7 +901,7 @@ async def scrape_movie_metadata_map(movie_ids: list[str], concurrent: int) -> di
         if not normalized_id:
             return
         async with semaphore:
-            results[normalized_id] = await scrape_movie_metadata(normalized_id, normalized_id)
+            results[normalized_id] = await scrape_movie_metadata(normalized_id, normalized_id, force_refresh)
 
     await asyncio.gather(*[fetch(movie_id) for movie_id in movie_ids])
     return results
@@ -936,26 +927,7 @@ async def preview_local_scrape(
             "total": 0,
         },
     )
-    video_files = _walk_video_files(directory, request.recursive, request.max_depth)
-    _emit_progress(
-        progress_callback,
-        {
-            "phase": "scan",
-            "message": f"扫描完成，发现 {len(video_files)} 个视频文件",
-            "completed": 0,
-            "total": len(video_files),
-        },
-    )
-    candidates = [
-        LocalFileCandidate(
-            path=path,
-            code=recognize_designation(path.stem),
-            recognition_method="regex",
-            recognition_message="recognized" if recognize_designation(path.stem) else "unrecognized",
-        )
-        for path in video_files
-    ]
-
+    candidates: list[LocalFileCandidate] = []
     semaphore = asyncio.Semaphore(max(1, min(request.concurrent, 5)))
     completed = 0
 
@@ -986,7 +958,11 @@ async def preview_local_scrape(
             scrape_logs.append(_scrape_diagnostic_log(f"识别到番号：{candidate.code}"))
             async with semaphore:
                 try:
-                    scrape_result = await scrape_movie_metadata(candidate.code, candidate.path.stem)
+                    scrape_result = await scrape_movie_metadata(
+                        candidate.code,
+                        candidate.path.stem,
+                        force_refresh=request.force_refresh,
+                    )
                     if isinstance(scrape_result, dict):
                         movie_detail = scrape_result.get("metadata")
                         scrape_source = scrape_result.get("source")
@@ -1061,8 +1037,10 @@ async def preview_local_scrape(
             "relative_path": str(candidate.path.relative_to(directory.resolve())),
             "file_name": candidate.path.name,
             "file_size": _file_size(candidate.path),
-            "source_file": _file_detail(candidate.path, True, include_media=conflict),
-            "target_file": _file_detail(target_video, target_video.exists(), include_media=True) if conflict else None,
+            "source_file": await asyncio.to_thread(_file_detail, candidate.path, True, conflict),
+            "target_file": (
+                await asyncio.to_thread(_file_detail, target_video, target_video.exists(), True) if conflict else None
+            ),
             "code": candidate.code,
             "recognition_method": candidate.recognition_method if candidate.code else "failed",
             "recognition_message": candidate.recognition_message,
@@ -1097,7 +1075,28 @@ async def preview_local_scrape(
         )
         return item
 
-    items = await asyncio.gather(*[enrich(candidate) for candidate in candidates])
+    # 遍历与识别、刮削并行：每发现一个视频文件就开始处理，不等整棵目录树遍历完成
+    tasks: list[asyncio.Task] = []
+    async for walked in _stream_video_files(directory, request.recursive, request.max_depth):
+        code = recognize_designation(walked.path.stem)
+        candidate = LocalFileCandidate(
+            path=walked.path,
+            code=code,
+            recognition_method="regex",
+            recognition_message="recognized" if code else "unrecognized",
+        )
+        candidates.append(candidate)
+        tasks.append(asyncio.create_task(enrich(candidate)))
+    _emit_progress(
+        progress_callback,
+        {
+            "phase": "scan",
+            "message": f"扫描完成，发现 {len(candidates)} 个视频文件",
+            "completed": completed,
+            "total": len(candidates),
+        },
+    )
+    items = sorted(await asyncio.gather(*tasks), key=lambda item: str(item.get("source_path") or "").lower())
     target_records: list[dict[str, Any]] = []
     for item in items:
         source_path = Path(str(item.get("source_path") or ""))
@@ -1134,7 +1133,7 @@ async def preview_local_scrape(
     payload = {
         "success": True,
         "directory": str(directory.resolve()),
-        "total_files": len(video_files),
+        "total_files": len(candidates),
         "recognized_count": sum(1 for item in items if item.get("code")),
         "found_count": sum(1 for item in items if item.get("scrape_status") == "found"),
         "already_scraped_count": sum(1 for item in items if item.get("already_scraped")),
@@ -1147,8 +1146,8 @@ async def preview_local_scrape(
         {
             "phase": "complete",
             "message": f"预览完成：{payload['found_count']}/{payload['total_files']} 个文件匹配成功",
-            "completed": len(video_files),
-            "total": len(video_files),
+            "completed": len(candidates),
+            "total": len(candidates),
         },
     )
     return payload
@@ -1172,7 +1171,13 @@ def _move_file(source: Path, target: Path, overwrite: bool) -> None:
         source.unlink()
 
 
-def _write_nfo(video_path: Path, metadata: dict[str, Any], poster_name: str | None, sample_names: list[str]) -> Path:
+def _write_nfo(
+    video_path: Path,
+    metadata: dict[str, Any],
+    poster_name: str | None,
+    sample_names: list[str],
+    media_info: dict[str, Any] | None = None,
+) -> Path:
     root = ET.Element("movie")
 
     def add(tag: str, value: Any) -> None:
@@ -1221,7 +1226,8 @@ def _write_nfo(video_path: Path, metadata: dict[str, Any], poster_name: str | No
         ET.SubElement(root, "genre").text = genre
         ET.SubElement(root, "tag").text = genre
 
-    media_info = _probe_video_metadata(video_path)
+    if media_info is None:
+        media_info = _probe_video_metadata(video_path)
     if media_info:
         file_info = ET.SubElement(root, "fileinfo")
         stream_details = ET.SubElement(file_info, "streamdetails")
@@ -1240,96 +1246,80 @@ def _write_nfo(video_path: Path, metadata: dict[str, Any], poster_name: str | No
 
 
 async def _download_image(url: str, target: Path, overwrite: bool) -> str | None:
-    if not url:
-        return None
-    target.parent.mkdir(parents=True, exist_ok=True)
-    if target.exists() and not overwrite:
-        return target.name
-    if url.startswith("data:"):
-        _, _, payload = url.partition(",")
-        target.write_bytes(base64.b64decode(payload))
-        return target.name
-    javbus_config = get_javbus_config()
-    headers = _image_download_headers(javbus_config)
-    client_kwargs: dict[str, Any] = {"timeout": 20.0, "follow_redirects": True}
-    proxy = javbus_config.get("proxy")
-    if proxy:
-        client_kwargs["proxy"] = proxy
-    retry_attempts_value = javbus_config.get("image_retry_attempts")
-    try:
-        retry_attempts = int(
-            DEFAULT_IMAGE_DOWNLOAD_ATTEMPTS if retry_attempts_value in (None, "") else retry_attempts_value
-        )
-    except (TypeError, ValueError):
-        retry_attempts = DEFAULT_IMAGE_DOWNLOAD_ATTEMPTS
-    retry_attempts = max(1, min(retry_attempts, 10))
-    retry_backoff_value = javbus_config.get("image_retry_backoff_seconds")
-    try:
-        retry_backoff = float(
-            DEFAULT_IMAGE_DOWNLOAD_BACKOFF_SECONDS if retry_backoff_value in (None, "") else retry_backoff_value
-        )
-    except (TypeError, ValueError):
-        retry_backoff = DEFAULT_IMAGE_DOWNLOAD_BACKOFF_SECONDS
-    retry_backoff = max(0.0, min(retry_backoff, 10.0))
-    last_exc: Exception | None = None
-    for attempt in range(1, retry_attempts + 1):
-        try:
-            async with httpx.AsyncClient(**client_kwargs) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                target.write_bytes(response.content)
-            return target.name
-        except Exception as exc:
-            last_exc = exc
-            if attempt < retry_attempts and retry_backoff > 0:
-                await asyncio.sleep(retry_backoff * attempt)
-    if last_exc:
-        raise last_exc
-    return target.name
+    return await download_image(url, target, overwrite)
 
 
-async def _download_image_or_warn(url: str, target: Path, overwrite: bool) -> str | None:
+async def _download_image_or_warn(
+    url: str,
+    target: Path,
+    overwrite: bool,
+    fetcher: ScrapeImageFetcher | None = None,
+    shared: bool = False,
+) -> str | None:
     try:
+        if fetcher is not None:
+            return await fetcher.fetch(url, target, overwrite, shared=shared)
         return await _download_image(url, target, overwrite)
     except Exception as exc:
         logger.warning("Local scrape image download failed for %s: %r", url, exc)
         return None
 
 
+def _new_image_fetcher(store_dir: str | None = None) -> ScrapeImageFetcher:
+    return ScrapeImageFetcher(_download_image, store_dir)
+
+
 async def _write_images(
     video_path: Path,
     metadata: dict[str, Any],
     overwrite: bool,
     include_samples: bool = False,
+    fetcher: ScrapeImageFetcher | None = None,
 ) -> tuple[str | None, list[str]]:
-    stem = video_path.stem
-    poster_name = None
-    sample_names: list[str] = []
-    if metadata.get("cover_url"):
-        poster_name = await _download_image_or_warn(
-            str(metadata.get("cover_url")),
-            video_path.with_name(f"{stem}-poster.jpg"),
+    """海报与样品图交给同一个 fetcher 并发下载，未传入时按本次调用新建"""
+    fetcher = fetcher or _new_image_fetcher()
+    # 第一项始终是海报，没有封面地址时 fetcher 直接返回 None
+    downloads = [
+        _download_image_or_warn(
+            str(metadata.get("cover_url") or ""),
+            video_path.with_name(f"{video_path.stem}-poster.jpg"),
             overwrite,
+            fetcher,
         )
+    ]
 
     samples = metadata.get("samples") or []
-    if samples:
+    if samples and include_samples:
         fanart_dir = video_path.parent / "extrafanart"
-        if include_samples:
-            for index, sample in enumerate(samples, start=1):
-                url = sample.get("src") or sample.get("thumbnail") if isinstance(sample, dict) else None
-                if not url:
-                    continue
-                name = await _download_image_or_warn(str(url), fanart_dir / f"fanart{index}.jpg", overwrite)
-                if name:
-                    sample_names.append(str(Path("extrafanart") / name))
+        for index, sample in enumerate(samples, start=1):
+            url = sample.get("src") or sample.get("thumbnail") if isinstance(sample, dict) else None
+            if url:
+                downloads.append(_download_image_or_warn(str(url), fanart_dir / f"fanart{index}.jpg", overwrite, fetcher))
+    poster_name, *names = await asyncio.gather(*downloads)
+    sample_names = [str(Path("extrafanart") / name) for name in names if name]
     return poster_name, sample_names
 
 
-async def _write_actor_images(video_path: Path, metadata: dict[str, Any], overwrite: bool) -> list[str]:
-    actor_names: list[str] = []
+async def _lookup_actor_avatar_url(actor_id: str, fetcher: ScrapeImageFetcher) -> str:
+    try:
+        star_info = await fetcher.lookup(f"star:{actor_id}", lambda: javbus_api_service.get_star_info(actor_id))
+    except Exception as exc:
+        logger.warning("Local scrape actor info fetch failed for %s: %r", actor_id, exc)
+        return ""
+    return str(star_info.get("avatar") or "").strip() if isinstance(star_info, dict) else ""
+
+
+async def _write_actor_images(
+    video_path: Path,
+    metadata: dict[str, Any],
+    overwrite: bool,
+    fetcher: ScrapeImageFetcher | None = None,
+) -> list[str]:
+    """演员头像按 URL 去重；fetcher 带共享目录时，已下载过的头像直接硬链接或复制"""
+    fetcher = fetcher or _new_image_fetcher()
     actor_dir = video_path.parent / "actors"
     used_names: set[str] = set()
+    downloads = []
     for index, actor in enumerate(metadata.get("actor_refs") or [], start=1):
         if not isinstance(actor, dict):
             continue
@@ -1342,25 +1332,26 @@ async def _write_actor_images(video_path: Path, metadata: dict[str, Any], overwr
             or ""
         ).strip()
         if not avatar_url and actor_id:
-            try:
-                star_info = await javbus_api_service.get_star_info(actor_id)
-            except Exception as exc:
-                logger.warning("Local scrape actor info fetch failed for %s: %r", actor_id, exc)
-                continue
-            avatar_url = str(star_info.get("avatar") or "").strip() if isinstance(star_info, dict) else ""
+            avatar_url = await _lookup_actor_avatar_url(actor_id, fetcher)
         if not avatar_url:
             continue
         file_stem = _sanitize_path_segment(str(actor.get("name") or actor_id or f"actor{index}"), f"actor{index}")
         if file_stem.lower() in used_names:
             file_stem = _sanitize_path_segment(f"{file_stem}-{index}", f"actor{index}")
         used_names.add(file_stem.lower())
-        name = await _download_image_or_warn(str(avatar_url), actor_dir / f"{file_stem}.jpg", overwrite)
-        if name:
-            actor_names.append(str(Path("actors") / name))
-    return actor_names
+        downloads.append(
+            _download_image_or_warn(str(avatar_url), actor_dir / f"{file_stem}.jpg", overwrite, fetcher, shared=True)
+        )
+    names = await asyncio.gather(*downloads)
+    return [str(Path("actors") / name) for name in names if name]
 
 
-async def _write_list_thumbnail(video_path: Path, metadata: dict[str, Any], overwrite: bool) -> str | None:
+async def _write_list_thumbnail(
+    video_path: Path,
+    metadata: dict[str, Any],
+    overwrite: bool,
+    fetcher: ScrapeImageFetcher | None = None,
+) -> str | None:
     thumbnail_url = metadata.get("list_thumbnail_url") or _derive_list_thumbnail_url(metadata.get("cover_url"))
     if not thumbnail_url:
         return None
@@ -1368,6 +1359,7 @@ async def _write_list_thumbnail(video_path: Path, metadata: dict[str, Any], over
         str(thumbnail_url),
         video_path.with_name(f"{video_path.stem}-thumb.jpg"),
         overwrite,
+        fetcher,
     )
 
 
@@ -1407,6 +1399,7 @@ async def apply_local_scrape(
             }
 
     target_counts, target_plan = _build_apply_target_plan(request)
+    applied_items: list[tuple[Any, ...]] = []
 
     for index, item in enumerate(request.items, start=1):
         _emit_progress(
@@ -1484,7 +1477,12 @@ async def apply_local_scrape(
             subtitles = _related_subtitles(source_path)
             conflict = target_video.exists() and target_video.resolve() != source_path.resolve()
             conflict_resolution = str(item.conflict_resolution or "").strip()
-            keep_side = _choose_conflict_keep_side(source_path, target_video, conflict_resolution) if conflict else None
+            conflict_media = (
+                await _probe_video_files([source_path, target_video])
+                if conflict and conflict_resolution in CONFLICT_MEDIA_RESOLUTIONS
+                else {}
+            )
+            keep_side = _choose_conflict_keep_side(source_path, target_video, conflict_resolution, conflict_media) if conflict else None
             unresolved_auto_best = bool(conflict and conflict_resolution == "auto_best" and keep_side is None)
             if conflict and not request.overwrite_existing and not conflict_resolution:
                 results.append(
@@ -1563,52 +1561,100 @@ async def apply_local_scrape(
                 _move_file(subtitle, subtitle_target, overwrite_target)
                 moved_assets.append(str(subtitle_target))
 
-            poster_name = None
-            sample_names: list[str] = []
-            actor_image_names: list[str] = []
-            list_thumbnail_name = None
-            image_error = None
-            if request.download_images and metadata.get("id"):
-                try:
-                    poster_name, sample_names = await _write_images(
+            # 图片下载、NFO 与入库记录放到循环结束后统一并发执行，先占住结果位置保持顺序
+            result = {"source_path": item.source_path}
+            results.append(result)
+            kept_source = bool(conflict and keep_side == "source")
+            applied_items.append(
+                (index, item, metadata, source_path, current_video, target_dir, kept_source, moved_assets, result)
+            )
+        except Exception as exc:
+            logger.error("Local scrape apply failed for %s: %s", source_path, exc)
+            results.append({"source_path": item.source_path, "success": False, "error": "apply_failed"})
+            _emit_progress(
+                progress_callback,
+                {
+                    "phase": "apply",
+                    "message": f"失败 {index}/{total_items}：{item.source_path}",
+                    "completed": index,
+                    "total": total_items,
+                    "current": item.source_path,
+                },
+            )
+
+    # 所有影片的图片共用一个有界并发的下载阶段，同一 URL 只下载一次
+    fetcher = _new_image_fetcher(LOCAL_SCRAPE_IMAGE_STORE_DIR)
+    completed_count = len(results) - len(applied_items)
+
+    async def finish_applied_item(
+        index: int,
+        item: LocalScrapeApplyItem,
+        metadata: dict[str, Any],
+        source_path: Path,
+        current_video: Path,
+        target_dir: Path,
+        kept_source: bool,
+        moved_assets: list[str],
+        result: dict[str, Any],
+    ) -> tuple[bool, tuple[str, dict[str, Any]] | None]:
+        nonlocal completed_count
+        library_entry = None
+        try:
+            downloads: dict[str, Any] = {}
+            if metadata.get("id"):
+                if request.download_images:
+                    downloads["images"] = _write_images(
                         current_video,
                         metadata,
                         request.overwrite_existing,
                         include_samples=request.download_sample_images,
+                        fetcher=fetcher,
                     )
-                except Exception as exc:
-                    image_error = "image_download_failed"
-                    logger.warning("Local scrape image download failed for %s: %s", metadata.get("id"), exc)
-            if request.download_actor_images and metadata.get("id"):
-                actor_image_names = await _write_actor_images(current_video, metadata, request.overwrite_existing)
-            if request.download_list_thumbnail and metadata.get("id"):
-                list_thumbnail_name = await _write_list_thumbnail(current_video, metadata, request.overwrite_existing)
+                if request.download_actor_images:
+                    downloads["actors"] = _write_actor_images(current_video, metadata, request.overwrite_existing, fetcher)
+                if request.download_list_thumbnail:
+                    downloads["thumbnail"] = _write_list_thumbnail(current_video, metadata, request.overwrite_existing, fetcher)
+            outcomes = dict(zip(downloads, await asyncio.gather(*downloads.values(), return_exceptions=True)))
 
+            poster_name = None
+            sample_names: list[str] = []
+            image_error = None
+            images = outcomes.get("images")
+            if isinstance(images, Exception):
+                image_error = "image_download_failed"
+                logger.warning("Local scrape image download failed for %s: %s", metadata.get("id"), images)
+            elif images:
+                poster_name, sample_names = images
+            for key in ("actors", "thumbnail"):
+                if isinstance(outcomes.get(key), Exception):
+                    raise outcomes[key]
+            actor_image_names = outcomes.get("actors") or []
+            list_thumbnail_name = outcomes.get("thumbnail")
+
+            # 移动后路径已变，探测缓存通常不命中，交给 ffprobe 线程池
+            media_info = _media_for(await _probe_video_files([current_video]), current_video)
             nfo_path = None
             if request.write_nfo and metadata.get("id"):
-                nfo_path = _write_nfo(current_video, metadata, poster_name, sample_names)
+                nfo_path = _write_nfo(current_video, metadata, poster_name, sample_names, media_info)
 
-            library_recorded = False
             library_root = _library_root_for_applied_video(request, source_path, current_video)
             library_record = _build_library_record_for_applied_video(
                 current_video,
                 library_root,
                 metadata,
                 datetime.datetime.now().isoformat(),
+                media_info,
             )
             if library_record:
-                library_records_by_root[str(library_root)].append(library_record)
-                library_recorded = True
+                library_entry = (str(library_root), library_record)
 
-            success_count += 1
-            results.append(
+            result.update(
                 {
-                    "source_path": item.source_path,
                     "success": True,
                     "code": metadata.get("id"),
                     "target_video_path": str(current_video),
                     "target_dir": str(target_dir),
-                    "kept": "source" if conflict and keep_side == "source" else None,
+                    "kept": "source" if kept_source else None,
                     "nfo_path": str(nfo_path) if nfo_path else None,
                     "poster": poster_name,
                     "samples": sample_names,
@@ -1616,32 +1662,39 @@ async def apply_local_scrape(
                     "list_thumbnail": list_thumbnail_name,
                     "image_error": image_error,
                     "moved_assets": moved_assets,
-                    "library_recorded": library_recorded,
+                    "library_recorded": library_entry is not None,
                 }
             )
-            _emit_progress(
-                progress_callback,
-                {
-                    "phase": "apply",
-                    "message": f"完成 {index}/{total_items}：{current_video.name}",
-                    "completed": index,
-                    "total": total_items,
-                    "current": str(current_video),
-                },
-            )
+            success = True
+            message = f"完成 {index}/{total_items}：{current_video.name}"
+            current = str(current_video)
         except Exception as exc:
             logger.error("Local scrape apply failed for %s: %s", source_path, exc)
-            results.append({"source_path": item.source_path, "success": False, "error": "apply_failed"})
-            _emit_progress(
-                progress_callback,
-                {
-                    "phase": "apply",
-                    "message": f"失败 {index}/{total_items}：{item.source_path}",
-                    "completed": index,
-                    "total": total_items,
-                    "current": item.source_path,
-                },
-            )
+            result.clear()
+            result.update({"source_path": item.source_path, "success": False, "error": "apply_failed"})
+            library_entry = None
+            success = False
+            message = f"失败 {index}/{total_items}：{item.source_path}"
+            current = item.source_path
+        completed_count += 1
+        _emit_progress(
+            progress_callback,
+            {
+                "phase": "apply",
+                "message": message,
+                "completed": completed_count,
+                "total": total_items,
+                "current": current,
+            },
+        )
+        return success, library_entry
+
+    finished = await asyncio.gather(*(finish_applied_item(*applied) for applied in applied_items))
+    for success, library_entry in finished:
+        success_count += int(success)
+        if library_entry:
+            root, record = library_entry
+            library_records_by_root[root].append(record)
 
     library_updates: list[dict[str, Any]] = []
     for root, records in library_records_by_root.items():
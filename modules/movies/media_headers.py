@@ -0,0 +1,374 @@
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+# 只解析常见封装的头部：MP4 读取 moov 盒，Matroska 读取 Info 与 Tracks 元素，其余格式交给 ffprobe
+MP4_EXTENSIONS = {".mp4", ".m4v", ".mov"}
+MATROSKA_EXTENSIONS = {".mkv", ".webm"}
+HEADER_EXTENSIONS = MP4_EXTENSIONS | MATROSKA_EXTENSIONS
+MP4_FORMAT_NAME = "mov,mp4,m4a,3gp,3g2,mj2"
+MATROSKA_FORMAT_NAME = "matroska,webm"
+MP4_TOP_LEVEL_BOXES = {
+    b"ftyp", b"styp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pdin", b"uuid", b"meta", b"moof", b"mfra", b"sidx",
+}
+# moov 过大时多半不是正常的影片文件，交给 ffprobe
+MAX_MOOV_BYTES = 64 * 1024 * 1024
+MAX_MATROSKA_ELEMENT_BYTES = 4 * 1024 * 1024
+MP4_VIDEO_CODECS = {
+    b"avc1": "h264",
+    b"avc3": "h264",
+    b"hvc1": "hevc",
+    b"hev1": "hevc",
+    b"av01": "av1",
+    b"vp09": "vp9",
+    b"vp08": "vp8",
+    b"mp4v": "mpeg4",
+}
+MATROSKA_VIDEO_CODECS = {
+    "V_MPEG4/ISO/AVC": "h264",
+    "V_MPEGH/ISO/HEVC": "hevc",
+    "V_AV1": "av1",
+    "V_VP9": "vp9",
+    "V_VP8": "vp8",
+    "V_MPEG4/ISO/ASP": "mpeg4",
+    "V_MPEG4/ISO/SP": "mpeg4",
+    "V_MPEG4/ISO/AP": "mpeg4",
+    "V_MPEG2": "mpeg2video",
+}
+
+EBML_HEADER = 0x1A45DFA3
+EBML_DOC_TYPE = 0x4282
+MKV_SEGMENT = 0x18538067
+MKV_INFO = 0x1549A966
+MKV_TRACKS = 0x1654AE6B
+MKV_CLUSTER = 0x1F43B675
+MKV_TIMECODE_SCALE = 0x2AD7B1
+MKV_DURATION = 0x4489
+MKV_TRACK_ENTRY = 0xAE
+MKV_TRACK_TYPE = 0x83
+MKV_CODEC_ID = 0x86
+MKV_VIDEO = 0xE0
+MKV_PIXEL_WIDTH = 0xB0
+MKV_PIXEL_HEIGHT = 0xBA
+MKV_VIDEO_TRACK_TYPE = 1
+
+
+class MediaHeaderError(ValueError):
+    pass
+
+
+def _ffprobe_payload(
+    width: int,
+    height: int,
+    codec: str,
+    duration: float,
+    stream_bitrate: float | None,
+    file_size: int,
+    format_name: str,
+) -> dict[str, Any] | None:
+    """组装成与 ffprobe -of json 相同结构的结果，交给同一套字段整理逻辑"""
+    if width <= 0 or height <= 0 or not codec or duration <= 0:
+        return None
+    stream: dict[str, Any] = {"width": width, "height": height, "codec_name": codec, "duration": f"{duration:.6f}"}
+    if stream_bitrate:
+        stream["bit_rate"] = str(int(stream_bitrate))
+    return {
+        "streams": [stream],
+        "format": {
+            "format_name": format_name,
+            "duration": f"{duration:.6f}",
+            "bit_rate": str(int(file_size * 8 / duration)),
+        },
+    }
+
+
+def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            return
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _child(data: bytes, start: int, end: int, box_type: bytes) -> tuple[int, int] | None:
+    for child_type, child_start, child_end in _iter_boxes(data, start, end):
+        if child_type == box_type:
+            return child_start, child_end
+    return None
+
+
+def _read_moov(file: BinaryIO, file_size: int) -> bytes:
+    """逐个读取顶层盒的头部并跳过 mdat，只把 moov 读入内存"""
+    offset = 0
+    first = True
+    while offset + 8 <= file_size:
+        file.seek(offset)
+        header = file.read(16)
+        if len(header) < 8:
+            break
+        size, box_type = struct.unpack_from(">I4s", header)
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                break
+            size = struct.unpack_from(">Q", header, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - offset
+        if first and box_type not in MP4_TOP_LEVEL_BOXES:
+            raise MediaHeaderError("not an mp4 file")
+        first = False
+        if size < header_size:
+            break
+        if box_type == b"moov":
+            if size > MAX_MOOV_BYTES:
+                raise MediaHeaderError("moov box too large")
+            file.seek(offset + header_size)
+            data = file.read(size - header_size)
+            if len(data) != size - header_size:
+                raise MediaHeaderError("truncated moov box")
+            return data
+        offset += size
+    raise MediaHeaderError("moov box not found")
+
+
+def _mp4_video_track(moov: bytes) -> dict[str, Any] | None:
+    for box_type, start, end in _iter_boxes(moov, 0, len(moov)):
+        if box_type != b"trak":
+            continue
+        mdia = _child(moov, start, end, b"mdia")
+        if not mdia:
+            continue
+        hdlr = _child(moov, *mdia, b"hdlr")
+        if not hdlr or moov[hdlr[0] + 8: hdlr[0] + 12] != b"vide":
+            continue
+        track: dict[str, Any] = {"width": 0, "height": 0, "codec": "", "duration": 0.0, "sample_bytes": 0}
+
+        tkhd = _child(moov, start, end, b"tkhd")
+        if tkhd:
+            offset = tkhd[0] + (88 if moov[tkhd[0]] == 1 else 76)
+            if offset + 8 <= tkhd[1]:
+                width, height = struct.unpack_from(">II", moov, offset)
+                track["width"], track["height"] = width >> 16, height >> 16
+
+        mdhd = _child(moov, *mdia, b"mdhd")
+        if mdhd:
+            if moov[mdhd[0]] == 1:
+                timescale, duration = struct.unpack_from(">IQ", moov, mdhd[0] + 20)
+            else:
+                timescale, duration = struct.unpack_from(">II", moov, mdhd[0] + 12)
+            if timescale:
+                track["duration"] = duration / timescale
+
+        minf = _child(moov, *mdia, b"minf")
+        stbl = _child(moov, *minf, b"stbl") if minf else None
+        stsd = _child(moov, *stbl, b"stsd") if stbl else None
+        if stsd:
+            entries = list(_iter_boxes(moov, stsd[0] + 8, stsd[1]))
+            if entries:
+                entry_type, entry_start, _entry_end = entries[0]
+                track["codec"] = MP4_VIDEO_CODECS.get(entry_type, "")
+                # VisualSampleEntry 中编码宽高位于第 24、26 字节
+                coded_width, coded_height = struct.unpack_from(">HH", moov, entry_start + 24)
+                if coded_width and coded_height:
+                    track["width"], track["height"] = coded_width, coded_height
+        stsz = _child(moov, *stbl, b"stsz") if stbl else None
+        if stsz:
+            sample_size, sample_count = struct.unpack_from(">II", moov, stsz[0] + 4)
+            if sample_size:
+                track["sample_bytes"] = sample_size * sample_count
+            elif stsz[0] + 12 + sample_count * 4 <= stsz[1]:
+                track["sample_bytes"] = sum(struct.unpack_from(f">{sample_count}I", moov, stsz[0] + 12))
+        return track
+    return None
+
+
+def read_mp4_header(path: Path) -> dict[str, Any] | None:
+    file_size = path.stat().st_size
+    with open(path, "rb") as file:
+        moov = _read_moov(file, file_size)
+    track = _mp4_video_track(moov)
+    if not track:
+        return None
+    duration = track["duration"]
+    if duration <= 0:
+        mvhd = _child(moov, 0, len(moov), b"mvhd")
+        if mvhd:
+            if moov[mvhd[0]] == 1:
+                timescale, total = struct.unpack_from(">IQ", moov, mvhd[0] + 20)
+            else:
+                timescale, total = struct.unpack_from(">II", moov, mvhd[0] + 12)
+            duration = total / timescale if timescale else 0.0
+    stream_bitrate = track["sample_bytes"] * 8 / duration if track["sample_bytes"] and duration > 0 else None
+    return _ffprobe_payload(
+        track["width"], track["height"], track["codec"], duration, stream_bitrate, file_size, MP4_FORMAT_NAME
+    )
+
+
+def _read_vint(file: BinaryIO, keep_marker: bool) -> tuple[int, int]:
+    """读取 EBML 变长整数，返回 (值, 字节数)；元素 ID 保留长度标记位，大小去掉标记位"""
+    first = file.read(1)
+    if not first:
+        raise MediaHeaderError("unexpected end of file")
+    value = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not value & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise MediaHeaderError("invalid EBML variable integer")
+    rest = file.read(length - 1)
+    if len(rest) != length - 1:
+        raise MediaHeaderError("unexpected end of file")
+    if not keep_marker:
+        value &= mask - 1
+    for byte in rest:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        # 全 1 表示未知长度，只允许出现在 Segment 与 Cluster 上
+        return -1, length
+    return value, length
+
+
+def _iter_elements(file: BinaryIO, end: int) -> Iterator[tuple[int, int, int]]:
+    """在 [当前位置, end) 内逐个读取子元素头部，返回 (ID, 内容起点, 内容大小)，调用方负责读取或跳过内容"""
+    while file.tell() < end:
+        element_id, _ = _read_vint(file, keep_marker=True)
+        size, _ = _read_vint(file, keep_marker=False)
+        start = file.tell()
+        yield element_id, start, size
+        if size < 0:
+            return
+        file.seek(start + size)
+
+
+def _read_element(file: BinaryIO, size: int) -> bytes:
+    if size < 0 or size > MAX_MATROSKA_ELEMENT_BYTES:
+        raise MediaHeaderError("matroska element too large")
+    data = file.read(size)
+    if len(data) != size:
+        raise MediaHeaderError("truncated matroska element")
+    return data
+
+
+def _iter_buffer_elements(data: bytes) -> Iterator[tuple[int, bytes]]:
+    offset = 0
+    while offset < len(data):
+        first = data[offset]
+        id_length = 1
+        while id_length <= 4 and not first & (0x80 >> (id_length - 1)):
+            id_length += 1
+        if id_length > 4:
+            return
+        element_id = int.from_bytes(data[offset: offset + id_length], "big")
+        offset += id_length
+        if offset >= len(data):
+            return
+        first = data[offset]
+        size_length = 1
+        while size_length <= 8 and not first & (0x80 >> (size_length - 1)):
+            size_length += 1
+        if size_length > 8:
+            return
+        size = int.from_bytes(data[offset: offset + size_length], "big") & ((1 << (7 * size_length)) - 1)
+        offset += size_length
+        yield element_id, data[offset: offset + size]
+        offset += size
+
+
+def _matroska_info(data: bytes) -> float:
+    timecode_scale = 1_000_000
+    duration = 0.0
+    for element_id, value in _iter_buffer_elements(data):
+        if element_id == MKV_TIMECODE_SCALE and value:
+            timecode_scale = int.from_bytes(value, "big")
+        elif element_id == MKV_DURATION and len(value) in (4, 8):
+            duration = struct.unpack(">f" if len(value) == 4 else ">d", value)[0]
+    return duration * timecode_scale / 1e9
+
+
+def _matroska_video_track(data: bytes) -> tuple[int, int, str] | None:
+    for element_id, entry in _iter_buffer_elements(data):
+        if element_id != MKV_TRACK_ENTRY:
+            continue
+        track_type = 0
+        codec = ""
+        width = height = 0
+        for child_id, value in _iter_buffer_elements(entry):
+            if child_id == MKV_TRACK_TYPE:
+                track_type = int.from_bytes(value, "big")
+            elif child_id == MKV_CODEC_ID:
+                codec = value.rstrip(b"\0").decode("ascii", "replace")
+            elif child_id == MKV_VIDEO:
+                for video_id, video_value in _iter_buffer_elements(value):
+                    if video_id == MKV_PIXEL_WIDTH:
+                        width = int.from_bytes(video_value, "big")
+                    elif video_id == MKV_PIXEL_HEIGHT:
+                        height = int.from_bytes(video_value, "big")
+        if track_type == MKV_VIDEO_TRACK_TYPE:
+            return width, height, MATROSKA_VIDEO_CODECS.get(codec, "")
+    return None
+
+
+def read_matroska_header(path: Path) -> dict[str, Any] | None:
+    file_size = path.stat().st_size
+    duration = 0.0
+    track = None
+    with open(path, "rb") as file:
+        header_id, _ = _read_vint(file, keep_marker=True)
+        if header_id != EBML_HEADER:
+            raise MediaHeaderError("not an EBML file")
+        header_size, _ = _read_vint(file, keep_marker=False)
+        doc_type = ""
+        for element_id, value in _iter_buffer_elements(_read_element(file, header_size)):
+            if element_id == EBML_DOC_TYPE:
+                doc_type = value.rstrip(b"\0").decode("ascii", "replace")
+        if doc_type not in ("matroska", "webm"):
+            raise MediaHeaderError("unsupported EBML document type")
+
+        for element_id, start, size in _iter_elements(file, file_size):
+            if element_id != MKV_SEGMENT:
+                continue
+            segment_end = file_size if size < 0 else min(file_size, start + size)
+            # Info 与 Tracks 一般都在第一个 Cluster 之前，读到 Cluster 仍缺失时交给 ffprobe
+            for child_id, _child_start, child_size in _iter_elements(file, segment_end):
+                if child_id == MKV_INFO:
+                    duration = _matroska_info(_read_element(file, child_size))
+                elif child_id == MKV_TRACKS:
+                    track = _matroska_video_track(_read_element(file, child_size))
+                elif child_id == MKV_CLUSTER:
+                    break
+                if track is not None and duration > 0:
+                    break
+            break
+    if track is None:
+        return None
+    width, height, codec = track
+    return _ffprobe_payload(width, height, codec, duration, None, file_size, MATROSKA_FORMAT_NAME)
+
+
+def read_media_header(path: Path) -> dict[str, Any] | None:
+    """
+    从 MP4/Matroska 头部读取视频流信息，返回 ffprobe -of json 结构的结果
+    其他封装、无法识别的编码或头部不完整时返回 None，由调用方改用 ffprobe
+    """
+    suffix = path.suffix.lower()
+    try:
+        if suffix in MP4_EXTENSIONS:
+            return read_mp4_header(path)
+        if suffix in MATROSKA_EXTENSIONS:
+            return read_matroska_header(path)
+    except (OSError, MediaHeaderError, struct.error, IndexError):
+        return None
+    return None
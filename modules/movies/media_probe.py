@@ -0,0 +1,266 @@
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from modules.common.json_files import write_json_atomic
+from .media_headers import read_media_header
+
+
+logger = logging.getLogger(__name__)
+
+FFPROBE_TIMEOUT_SECONDS = 5
+# 单次探测的结果按 (路径, 大小, mtime_ns) 缓存；超出上限时淘汰最久未使用的条目
+PROBE_CACHE_MAX_ENTRIES = 50000
+# 逐个探测时最多每隔该秒数落盘一次，批量探测结束后立即落盘
+PROBE_CACHE_SAVE_INTERVAL_SECONDS = 5.0
+EXTENSION_CONTAINERS = {
+    ".mp4": "mp4",
+    ".m4v": "mp4",
+    ".mov": "mov",
+    ".mkv": "matroska",
+    ".webm": "webm",
+    ".avi": "avi",
+    ".wmv": "asf",
+    ".flv": "flv",
+    ".ts": "mpegts",
+    ".mpg": "mpeg",
+    ".mpeg": "mpeg",
+    ".3gp": "3gp",
+}
+
+
+def _int_or_none(value: Any) -> int | None:
+    try:
+        parsed = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed > 0 else None
+
+
+def _normalize_container_format(format_name: Any, suffix: str) -> str:
+    names = [item.strip().lower() for item in str(format_name or "").split(",") if item.strip()]
+    extension_container = EXTENSION_CONTAINERS.get(str(suffix or "").lower())
+    if extension_container and (not names or extension_container in names):
+        return extension_container
+    if extension_container == "mp4" and {"mov", "mp4"}.issubset(set(names)):
+        return "mp4"
+    if extension_container == "webm" and "webm" in names:
+        return "webm"
+    return names[0] if names else ""
+
+
+def run_ffprobe(path: Path) -> dict[str, Any] | None:
+    """
+    运行一次 ffprobe 并整理出分辨率、码率、编码、封装格式和时长
+    ffprobe 不存在、超时等暂时性失败返回 None，不写入缓存；文件无法解析时返回空字典
+    """
+    try:
+        completed = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-select_streams",
+                "v:0",
+                "-show_entries",
+                "stream=width,height,bit_rate,codec_name,duration:format=bit_rate,duration,format_name",
+                "-of",
+                "json",
+                str(path),
+            ],
+            capture_output=True,
+            check=False,
+            text=True,
+            timeout=FFPROBE_TIMEOUT_SECONDS,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+        return None
+    if completed.returncode != 0 or not completed.stdout:
+        return {}
+    try:
+        payload = json.loads(completed.stdout)
+    except json.JSONDecodeError:
+        return {}
+    return _metadata_from_payload(payload, path)
+
+
+def _metadata_from_payload(payload: Any, path: Path) -> dict[str, Any]:
+    streams = payload.get("streams") if isinstance(payload, dict) else None
+    stream = streams[0] if isinstance(streams, list) and streams and isinstance(streams[0], dict) else {}
+    file_format = payload.get("format") if isinstance(payload.get("format"), dict) else {}
+    width = _int_or_none(stream.get("width"))
+    height = _int_or_none(stream.get("height"))
+    bitrate = _int_or_none(stream.get("bit_rate")) or _int_or_none(file_format.get("bit_rate"))
+    duration = _int_or_none(stream.get("duration")) or _int_or_none(file_format.get("duration"))
+    codec = str(stream.get("codec_name") or "").strip()
+    container = _normalize_container_format(file_format.get("format_name"), path.suffix)
+    metadata: dict[str, Any] = {}
+    if width:
+        metadata["width"] = width
+    if height:
+        metadata["height"] = height
+    if width and height:
+        metadata["resolution_pixels"] = width * height
+    if bitrate:
+        metadata["bitrate"] = bitrate
+    if codec:
+        metadata["codec"] = codec
+    if container:
+        metadata["container"] = container
+    if duration:
+        metadata["duration_seconds"] = duration
+    return metadata
+
+
+def probe_media(path: Path) -> dict[str, Any] | None:
+    """MP4/Matroska 先读文件头，解析不了或其他封装再启动 ffprobe"""
+    payload = read_media_header(path)
+    if payload is not None:
+        return _metadata_from_payload(payload, path)
+    return run_ffprobe(path)
+
+
+class VideoProbeService:
+    """
+    视频探测服务：结果按文件指纹持久化缓存，文件未变化时不再重新探测
+    批量探测在有界线程池中并发运行，MP4/Matroska 直接读文件头，其他封装启动 ffprobe，不阻塞事件循环
+    """
+
+    def __init__(
+        self,
+        cache_path: str = "data/video_probe_cache.json",
+        workers: int | None = None,
+        runner: Callable[[Path], dict[str, Any] | None] = probe_media,
+    ) -> None:
+        self.cache_path = cache_path
+        self.workers = max(1, workers or os.cpu_count() or 4)
+        self.runner = runner
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._loaded = False
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _load_locked(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as exc:
+            logger.warning("加载视频探测缓存失败 %s: %s", self.cache_path, exc)
+            return
+        entries = data.get("entries") if isinstance(data, dict) else None
+        if isinstance(entries, dict):
+            self._entries = {
+                str(path): entry
+                for path, entry in entries.items()
+                if isinstance(entry, dict) and isinstance(entry.get("media"), dict)
+            }
+
+    @staticmethod
+    def _fingerprint(path: Path) -> tuple[str, int, int] | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return os.path.abspath(str(path)), stat.st_size, stat.st_mtime_ns
+
+    def cached(self, path: Path) -> dict[str, Any] | None:
+        fingerprint = self._fingerprint(path)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            self._load_locked()
+            return self._lookup_locked(fingerprint)
+
+    def _lookup_locked(self, fingerprint: tuple[str, int, int]) -> dict[str, Any] | None:
+        key, size, mtime_ns = fingerprint
+        entry = self._entries.get(key)
+        if not entry or entry.get("size") != size or entry.get("mtime_ns") != mtime_ns:
+            return None
+        # 命中后移到末尾，淘汰时优先丢弃最久未使用的条目
+        self._entries[key] = self._entries.pop(key)
+        return dict(entry["media"])
+
+    def _store_locked(self, fingerprint: tuple[str, int, int], media: dict[str, Any]) -> None:
+        key, size, mtime_ns = fingerprint
+        self._entries.pop(key, None)
+        self._entries[key] = {"size": size, "mtime_ns": mtime_ns, "media": dict(media)}
+        while len(self._entries) > PROBE_CACHE_MAX_ENTRIES:
+            self._entries.pop(next(iter(self._entries)))
+        self._dirty = True
+
+    def probe(self, path: Path) -> dict[str, Any]:
+        """同步探测单个文件，命中缓存时不启动 ffprobe；暂时无法探测时返回空字典"""
+        return self.probe_or_none(path) or {}
+
+    def probe_or_none(self, path: Path) -> dict[str, Any] | None:
+        """
+        与 probe 相同，但文件无法访问、ffprobe 不存在或超时等暂时性失败返回 None
+        返回空字典表示文件确实无法解析，调用方据此区分"无效文件"和"这次没探测成功"
+        """
+        fingerprint = self._fingerprint(path)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            self._load_locked()
+            cached = self._lookup_locked(fingerprint)
+        if cached is not None:
+            return cached
+        media = self.runner(path)
+        if media is None:
+            return None
+        with self._lock:
+            self._store_locked(fingerprint, media)
+            if time.monotonic() - self._saved_at >= PROBE_CACHE_SAVE_INTERVAL_SECONDS:
+                self._save_locked()
+        return dict(media)
+
+    async def probe_many(
+        self,
+        paths: Iterable[Path],
+        probe: Callable[[Path], dict[str, Any] | None] | None = None,
+    ) -> dict[str, dict[str, Any] | None]:
+        """
+        并发探测多个文件，返回 {绝对路径: 媒体信息}；probe 默认为带缓存的 self.probe_or_none
+        暂时性失败的文件值为 None，与无法解析的空字典区分
+        """
+        probe = probe or self.probe_or_none
+        unique = list({os.path.abspath(str(path)): Path(path) for path in paths}.items())
+        if not unique:
+            return {}
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ffprobe")
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(loop.run_in_executor(self._executor, probe, path) for _key, path in unique))
+        await asyncio.to_thread(self.sync)
+        return {key: media for (key, _path), media in zip(unique, results)}
+
+    def _save_locked(self) -> None:
+        try:
+            write_json_atomic(self.cache_path, {"version": 1, "entries": self._entries})
+        except OSError as exc:
+            logger.warning("保存视频探测缓存失败 %s: %s", self.cache_path, exc)
+            return
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+
+video_probe_service = VideoProbeService()
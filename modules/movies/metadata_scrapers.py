@@ -14,12 +14,17 @@ from bs4 import BeautifulSoup
 from modules.common import runtime
 from modules.javbus_api import javbus_api_service
 
+from .scrape_cache import MetadataScrapeCache, metadata_scrape_cache
+
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_SCRAPER_PROVIDERS = tuple(runtime.SCRAPER_PROVIDER_NAMES)
 IMPLEMENTED_SCRAPER_PROVIDERS = set(runtime.IMPLEMENTED_SCRAPER_PROVIDER_NAMES)
 DEFAULT_SCRAPER_TIMEOUT_SECONDS = 20.0
+# 同一番号同时查询的刮削源数量，1 表示按优先级逐个查询
+DEFAULT_PARALLEL_SCRAPER_PROVIDERS = 3
+MAX_PARALLEL_SCRAPER_PROVIDERS = 8
 DEFAULT_SCRAPER_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
     "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
@@ -55,6 +60,14 @@ def _scraper_log(provider: str, message: str, level: str = "info") -> dict[str,
     }
 
 
+def _parallel_provider_count(config: dict[str, Any]) -> int:
+    try:
+        count = int(config.get("parallel_providers") or DEFAULT_PARALLEL_SCRAPER_PROVIDERS)
+    except (TypeError, ValueError):
+        count = DEFAULT_PARALLEL_SCRAPER_PROVIDERS
+    return max(1, min(count, MAX_PARALLEL_SCRAPER_PROVIDERS))
+
+
 async def _sleep_for_provider_delay(provider_config: dict[str, Any]) -> None:
     try:
         delay_ms = int(float(provider_config.get("request_delay") or 0))
@@ -1383,16 +1396,53 @@ async def test_metadata_scraper_providers(payload: dict[str, Any] | None = None)
 
 
 class MetadataScraperService:
-    async def get_movie_detail(self, movie_id: str) -> dict[str, Any]:
+    def __init__(self, cache: MetadataScrapeCache = metadata_scrape_cache) -> None:
+        self.cache = cache
+
+    async def _query_provider(
+        self,
+        provider: str,
+        provider_config: dict[str, Any],
+        movie_id: str,
+        force_refresh: bool,
+    ) -> dict[str, Any]:
+        """查询单个刮削源，返回 metadata（未匹配为 None）、cached 和 error；抓取失败不抛出"""
+        if not force_refresh:
+            cached = await self.cache.get(movie_id, provider)
+            if cached is not None:
+                status, metadata = cached
+                matched = status == "found" and bool(metadata and metadata.get("id"))
+                return {"metadata": metadata if matched else None, "cached": True, "error": None}
+
+        try:
+            if provider == "javbus":
+                metadata = await javbus_api_service.get_movie_detail(movie_id)
+            else:
+                fetcher = globals()[PROVIDER_FETCHERS[provider]]
+                metadata = await fetcher(movie_id, provider_config)
+        except Exception as exc:
+            logger.warning("Metadata scraper %s failed for %s: %s", provider, movie_id, exc)
+            return {"metadata": None, "cached": False, "error": str(exc)}
+
+        matched = bool(metadata and metadata.get("id"))
+        await self.cache.store(movie_id, provider, metadata if matched else None)
+        return {"metadata": metadata if matched else None, "cached": False, "error": None}
+
+    async def get_movie_detail(self, movie_id: str, force_refresh: bool = False) -> dict[str, Any]:
+        """
+        按优先级选用第一个匹配的刮削源；优先级最高的 parallel_providers 个刮削源同时查询，
+        各自按 request_delay 限速，较高优先级匹配后取消其余查询
+        各刮削源的匹配与未匹配结果会被缓存，force_refresh 时跳过缓存重新抓取
+        """
         config = runtime.get_scrapers_config()
         priority = config.get("priority")
         if not isinstance(priority, list) or not priority:
             priority = list(SUPPORTED_SCRAPER_PROVIDERS)
+        parallel = _parallel_provider_count(config)
 
-        logs: list[dict[str, str]] = []
+        # (刮削源, 配置, 跳过原因日志)，跳过的刮削源只记录日志
+        steps: list[tuple[str, dict[str, Any], dict[str, str] | None]] = []
         seen: set[str] = set()
-        had_error = False
-        last_error_message = ""
         for raw_provider in priority:
             provider = str(raw_provider or "").strip().lower()
             if provider in seen or provider not in SUPPORTED_SCRAPER_PROVIDERS:
@@ -1403,41 +1453,72 @@ class MetadataScraperService:
             if not isinstance(provider_config, dict):
                 provider_config = {}
             if not bool(provider_config.get("enabled")):
-                logs.append(_scraper_log(provider, f"{provider} is disabled", "debug"))
-                continue
-
-            if provider not in IMPLEMENTED_SCRAPER_PROVIDERS:
-                logs.append(
-                    _scraper_log(
+                steps.append((provider, provider_config, _scraper_log(provider, f"{provider} is disabled", "debug")))
+            elif provider not in IMPLEMENTED_SCRAPER_PROVIDERS:
+                steps.append(
+                    (
                         provider,
-                        f"{provider} is configured but not implemented in JavJaeger yet",
-                        "warning",
+                        provider_config,
+                        _scraper_log(
+                            provider,
+                            f"{provider} is configured but not implemented in JavJaeger yet",
+                            "warning",
+                        ),
                     )
                 )
-                continue
+            else:
+                steps.append((provider, provider_config, None))
 
-            try:
-                if provider == "javbus":
-                    metadata = await javbus_api_service.get_movie_detail(movie_id)
-                else:
-                    fetcher = globals()[PROVIDER_FETCHERS[provider]]
-                    metadata = await fetcher(movie_id, provider_config)
-            except Exception as exc:
-                had_error = True
-                last_error_message = str(exc)
-                logger.warning("Metadata scraper %s failed for %s: %s", provider, movie_id, exc)
-                logs.append(_scraper_log(provider, f"{provider} failed: {exc}", "error"))
-                continue
+        queued = [(provider, provider_config) for provider, provider_config, skipped_log in steps if skipped_log is None]
+        tasks: dict[str, asyncio.Future] = {}
+        started = 0
+        consumed = 0
+        logs: list[dict[str, str]] = []
+        had_error = False
+        last_error_message = ""
+        try:
+            for provider, _provider_config, skipped_log in steps:
+                if skipped_log is not None:
+                    logs.append(skipped_log)
+                    continue
 
-            if metadata and metadata.get("id"):
-                logs.append(_scraper_log(provider, f"{provider} matched {movie_id}"))
-                return {
-                    "metadata": metadata,
-                    "source": provider,
-                    "logs": logs,
-                }
+                # 当前刮削源及其后 parallel - 1 个刮削源保持同时查询
+                while started < min(len(queued), consumed + parallel):
+                    ahead_provider, ahead_config = queued[started]
+                    tasks[ahead_provider] = asyncio.ensure_future(
+                        self._query_provider(ahead_provider, ahead_config, movie_id, force_refresh)
+                    )
+                    started += 1
+                consumed += 1
+                result = await tasks.pop(provider)
+
+                cached_suffix = " (cached)" if result["cached"] else ""
+                if result["error"] is not None:
+                    had_error = True
+                    last_error_message = result["error"]
+                    logs.append(_scraper_log(provider, f"{provider} failed: {result['error']}", "error"))
+                    continue
 
-            logs.append(_scraper_log(provider, f"{provider} did not match {movie_id}", "warning"))
+                metadata = result["metadata"]
+                if metadata:
+                    logs.append(_scraper_log(provider, f"{provider} matched {movie_id}{cached_suffix}"))
+                    payload = {
+                        "metadata": metadata,
+                        "source": provider,
+                        "logs": logs,
+                    }
+                    if result["cached"]:
+                        payload["cached"] = True
+                    return payload
+
+                logs.append(_scraper_log(provider, f"{provider} did not match {movie_id}{cached_suffix}", "warning"))
+        finally:
+            # 较高优先级已匹配或调用方取消时，放弃仍在进行的低优先级查询
+            pending = list(tasks.values())
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
         return {
             "metadata": None,
@@ -1,11 +1,16 @@
+import asyncio
 import logging
 import mimetypes
+from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
 from modules.common import runtime
+from modules.common.image_thumbnails import LOCAL_IMAGE_CACHE_CONTROL, thumbnail_cache
+from modules.history.library_summary import LibraryCursorError
 from modules.history.service import local_actor_library_service, local_movie_library_service
+from .library_watcher import local_library_watcher
 from .local_library import (
     clean_invalid_local_library_files,
     clear_local_library,
@@ -14,7 +19,9 @@ from .local_library import (
     get_local_library_information_check,
     get_local_library_payload,
     get_local_library_status,
+    get_local_library_summary_page,
     scan_local_library,
+    search_local_library,
 )
 from .local_scrape import apply_local_scrape, delete_local_scrape_files, preview_local_scrape
 from .local_scrape_tasks import local_scrape_task_manager
@@ -74,6 +81,60 @@ async def get_local_movie_library():
         return {"success": False, "error": "library_read_failed", "message": "读取本地影片库失败"}
 
 
+@router.get("/api/movies/local-library/watch")
+async def get_local_movie_library_watch_status():
+    return {"success": True, **local_library_watcher.status()}
+
+
+@router.get("/api/movies/local-library/summary")
+async def get_local_movie_library_summary(
+    sort: str = "",
+    q: str = "",
+    cursor: str = "",
+    limit: int = 120,
+    genres: list[str] = Query(default=[]),
+    stars: list[str] = Query(default=[]),
+    studios: list[str] = Query(default=[]),
+    publishers: list[str] = Query(default=[]),
+    series: list[str] = Query(default=[]),
+    years: list[str] = Query(default=[]),
+    roots: list[str] = Query(default=[]),
+):
+    filters = {
+        "genres": genres,
+        "stars": stars,
+        "studios": studios,
+        "publishers": publishers,
+        "series": series,
+        "years": years,
+        "roots": roots,
+    }
+    try:
+        return await get_local_library_summary_page(sort, q, filters, cursor, limit)
+    except LibraryCursorError:
+        return {"success": False, "error": "invalid_cursor", "message": "分页游标无效"}
+    except Exception as exc:
+        logger.error("Local library summary failed: %s", exc)
+        return {"success": False, "error": "library_read_failed", "message": "读取本地影片库失败"}
+
+
+@router.get("/api/movies/local-library/search")
+async def search_local_movie_library(
+    q: str = "",
+    star: str = "",
+    genre: str = "",
+    studio: str = "",
+    series: str = "",
+    page: int = 1,
+    page_size: int = 50,
+):
+    try:
+        return await search_local_library(q, star, genre, studio, series, page, page_size)
+    except Exception as exc:
+        logger.error("Local library search failed: %s", exc)
+        return {"success": False, "error": "library_search_failed", "message": "检索本地影片库失败"}
+
+
 @router.post("/api/movies/local-library/scan")
 async def scan_local_movie_library(request: LocalLibraryScanRequest):
     try:
@@ -145,20 +206,48 @@ async def get_local_movie_library_actor_library_avatar(actor_key: str):
     return FileResponse(avatar_path)
 
 
+async def _library_image_response(image_path: Path, width: int | None, request: Request) -> Response:
+    """
+    指定 w 时返回按宽度档位缩小的 WebP/JPEG，未安装 Pillow 或生成失败时返回原图
+    响应带 ETag，浏览器重新验证时若未变化返回 304
+    """
+    variant = await asyncio.to_thread(thumbnail_cache.local_variant, image_path, width, request.headers.get("accept", ""))
+    if variant is None:
+        etag = await asyncio.to_thread(thumbnail_cache.local_etag, image_path)
+        path, media_type, headers = image_path, None, {"Cache-Control": LOCAL_IMAGE_CACHE_CONTROL}
+    else:
+        etag = variant.etag
+        path, media_type, headers = variant.path, variant.media_type, {"Cache-Control": LOCAL_IMAGE_CACHE_CONTROL, "Vary": "Accept"}
+    if etag:
+        headers["ETag"] = f'"{etag}"'
+        if_none_match = request.headers.get("if-none-match", "")
+        if headers["ETag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
+
+
 @router.get("/api/movies/local-library/poster/{movie_id}")
-async def get_local_movie_library_poster(movie_id: str):
+async def get_local_movie_library_poster(
+    movie_id: str,
+    request: Request,
+    w: int | None = Query(default=None, ge=1, le=4096),
+):
     poster_path = await local_movie_library_service.get_poster_path(movie_id)
     if poster_path is None:
         raise HTTPException(status_code=404, detail="poster_not_found")
-    return FileResponse(poster_path)
+    return await _library_image_response(poster_path, w, request)
 
 
 @router.get("/api/movies/local-library/thumbnail/{movie_id}")
-async def get_local_movie_library_thumbnail(movie_id: str):
+async def get_local_movie_library_thumbnail(
+    movie_id: str,
+    request: Request,
+    w: int | None = Query(default=None, ge=1, le=4096),
+):
     thumbnail_path = await local_movie_library_service.get_thumbnail_path(movie_id)
     if thumbnail_path is None:
         raise HTTPException(status_code=404, detail="thumbnail_not_found")
-    return FileResponse(thumbnail_path)
+    return await _library_image_response(thumbnail_path, w, request)
 
 
 @router.get("/api/movies/local-library/actor-avatar/{movie_id}/{actor_name}")
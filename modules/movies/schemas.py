@@ -49,6 +49,8 @@ class LocalScrapePreviewRequest(BaseModel):
     download_actor_images: bool = False
     download_list_thumbnail: bool = False
     overwrite_existing: bool = False
+    # 跳过刮削结果缓存，重新向各刮削源查询
+    force_refresh: bool = False
 
 
 class LocalScrapeApplyItem(BaseModel):
@@ -84,6 +86,9 @@ class LocalLibraryScanRequest(BaseModel):
     remove_missing: bool = True
     scrape: bool = True
     concurrent: int = 3
+    # 按 (路径, 大小, mtime_ns, inode) 跳过未变化的文件，只刮削新增或变化的番号
+    incremental: bool = True
+    force_refresh: bool = False
 
 
 class LocalLibraryInformationDownloadRequest(BaseModel):
@@ -97,6 +102,7 @@ class LocalLibraryInformationDownloadRequest(BaseModel):
     download_actor_images: bool = False
     download_list_thumbnail: bool = False
     overwrite_existing: bool = False
+    force_refresh: bool = False
 
 
 class MetadataScraperTestRequest(BaseModel):
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable
+
+
+logger = logging.getLogger(__name__)
+
+# 刮削到的元数据很少变化，保留 30 天；未匹配的番号可能稍后才上架，12 小时后重新查询
+METADATA_SCRAPE_FOUND_TTL_SECONDS = 30 * 24 * 3600
+METADATA_SCRAPE_NOT_FOUND_TTL_SECONDS = 12 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_results (
+    movie_id TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    status TEXT NOT NULL,
+    metadata TEXT,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (movie_id, provider)
+);
+CREATE INDEX IF NOT EXISTS idx_scrape_results_expires_at ON scrape_results (expires_at);
+"""
+
+
+class MetadataScrapeCache:
+    """
+    按 (番号, 刮削源) 缓存各刮削源的结果，匹配结果与未匹配结果分别使用长、短有效期
+    抓取失败不缓存；调用 open() 之前所有操作都是空操作，应用启动时打开
+    """
+
+    def __init__(
+        self,
+        file_path: str = "data/metadata_scrape_cache.db",
+        found_ttl_seconds: float = METADATA_SCRAPE_FOUND_TTL_SECONDS,
+        not_found_ttl_seconds: float = METADATA_SCRAPE_NOT_FOUND_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.file_path = file_path
+        self.found_ttl_seconds = found_ttl_seconds
+        self.not_found_ttl_seconds = not_found_ttl_seconds
+        self.clock = clock
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                return
+            parent_dir = os.path.dirname(self.file_path)
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+            try:
+                connection = sqlite3.connect(self.file_path, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.executescript(SCHEMA)
+                with connection:
+                    connection.execute("DELETE FROM scrape_results WHERE expires_at <= ?", (self.clock(),))
+            except sqlite3.Error as exc:
+                logger.warning("打开刮削缓存失败 %s: %s", self.file_path, exc)
+                return
+            self._connection = connection
+
+    def close(self) -> None:
+        with self._lock:
+            connection, self._connection = self._connection, None
+            if connection is not None:
+                connection.close()
+
+    async def startup(self) -> None:
+        await asyncio.to_thread(self.open)
+
+    async def shutdown(self) -> None:
+        await asyncio.to_thread(self.close)
+
+    def _get_sync(self, movie_id: str, provider: str) -> tuple[str, dict[str, Any] | None] | None:
+        with self._lock:
+            if self._connection is None:
+                return None
+            try:
+                row = self._connection.execute(
+                    "SELECT status, metadata FROM scrape_results WHERE movie_id = ? AND provider = ? AND expires_at > ?",
+                    (movie_id, provider, self.clock()),
+                ).fetchone()
+            except sqlite3.Error as exc:
+                logger.warning("读取刮削缓存失败 %s/%s: %s", provider, movie_id, exc)
+                return None
+        if row is None:
+            return None
+        status, raw = row
+        if status != "found":
+            return "not_found", None
+        try:
+            metadata = json.loads(raw or "")
+        except ValueError:
+            return None
+        return ("found", metadata) if isinstance(metadata, dict) else None
+
+    def _store_sync(self, movie_id: str, provider: str, metadata: dict[str, Any] | None) -> None:
+        if metadata:
+            status = "found"
+            try:
+                raw = json.dumps(metadata, ensure_ascii=False)
+            except (TypeError, ValueError):
+                return
+            ttl = self.found_ttl_seconds
+        else:
+            status, raw, ttl = "not_found", None, self.not_found_ttl_seconds
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                with self._connection:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO scrape_results (movie_id, provider, status, metadata, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (movie_id, provider, status, raw, self.clock() + ttl),
+                    )
+            except sqlite3.Error as exc:
+                logger.warning("写入刮削缓存失败 %s/%s: %s", provider, movie_id, exc)
+
+    async def get(self, movie_id: str, provider: str) -> tuple[str, dict[str, Any] | None] | None:
+        """未过期时返回 ("found", 元数据) 或 ("not_found", None)，未缓存或未打开时返回 None"""
+        if self._connection is None:
+            return None
+        return await asyncio.to_thread(self._get_sync, str(movie_id).upper(), provider)
+
+    async def store(self, movie_id: str, provider: str, metadata: dict[str, Any] | None) -> None:
+        """metadata 为空时记为未匹配"""
+        if self._connection is None:
+            return
+        await asyncio.to_thread(self._store_sync, str(movie_id).upper(), provider, metadata)
+
+
+metadata_scrape_cache = MetadataScrapeCache()
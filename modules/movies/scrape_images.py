@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+
+logger = logging.getLogger(__name__)
+
+# 一次执行刮削中所有影片共享的图片下载并发上限
+LOCAL_SCRAPE_IMAGE_CONCURRENCY = 6
+# 演员头像按 URL 保存的共享目录，不同影片文件夹从这里硬链接或复制
+LOCAL_SCRAPE_IMAGE_STORE_DIR = "data/scrape_image_store"
+
+ImageDownloader = Callable[[str, Path, bool], Awaitable[str | None]]
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    """同一文件系统上硬链接，跨设备或不支持硬链接时复制；先写临时名再替换，避免留下半个文件"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        try:
+            os.link(source, temp_path)
+        except OSError:
+            shutil.copyfile(source, temp_path)
+        os.replace(temp_path, target)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+class ScrapeImageFetcher:
+    """
+    刮削图片下载阶段：所有影片的海报、样品图、演员头像和列表缩略图共用一个有界并发
+    同一 URL 在一次执行中只下载一次，其余目标从首个下载结果硬链接或复制
+    shared 图片（演员头像）另存到按 URL 寻址的 store_dir，之后的执行直接复用
+    """
+
+    def __init__(
+        self,
+        download: ImageDownloader,
+        store_dir: str | None = None,
+        concurrency: int | None = None,
+    ) -> None:
+        self.download = download
+        self.store_dir = Path(store_dir) if store_dir else None
+        self._semaphore = asyncio.Semaphore(max(1, concurrency or LOCAL_SCRAPE_IMAGE_CONCURRENCY))
+        # URL -> 下载到的文件路径，同一 URL 的并发请求等待同一个任务
+        self._downloads: dict[str, asyncio.Task] = {}
+        self._lookups: dict[str, asyncio.Task] = {}
+        self.downloaded_count = 0
+        self.reused_count = 0
+
+    def _store_path(self, url: str) -> Path | None:
+        if self.store_dir is None:
+            return None
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.store_dir / digest[:2] / f"{digest}{Path(url.split('?', 1)[0]).suffix.lower()[:8] or '.jpg'}"
+
+    async def lookup(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """同一 key 的查询（如演员头像地址）只执行一次，其余调用等待同一结果"""
+        task = self._lookups.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._lookups[key] = task
+        return await asyncio.shield(task)
+
+    async def fetch(self, url: str, target: Path, overwrite: bool, shared: bool = False) -> str | None:
+        if not url:
+            return None
+        if target.exists() and not overwrite:
+            return target.name
+        if url.startswith("data:"):
+            return await self.download(url, target, overwrite)
+
+        store_path = self._store_path(url) if shared else None
+        if store_path is not None and not overwrite and store_path.is_file():
+            if self._reuse(store_path, target):
+                return target.name
+
+        task = self._downloads.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download_once(url, target, overwrite, store_path))
+            self._downloads[url] = task
+        source = await asyncio.shield(task)
+        if source is None:
+            return None
+        if source == target or self._reuse(source, target):
+            return target.name
+        # 首个下载结果已被移走或删除时退回单独下载
+        return await self._download_direct(url, target, overwrite)
+
+    def _reuse(self, source: Path, target: Path) -> bool:
+        try:
+            if target.exists() and os.path.samefile(source, target):
+                return True
+            _link_or_copy(source, target)
+        except OSError as exc:
+            logger.debug("复用已下载图片失败 %s -> %s: %s", source, target, exc)
+            return False
+        self.reused_count += 1
+        return True
+
+    async def _download_direct(self, url: str, target: Path, overwrite: bool) -> str | None:
+        async with self._semaphore:
+            name = await self.download(url, target, overwrite)
+        if name:
+            self.downloaded_count += 1
+        return name
+
+    async def _download_once(self, url: str, target: Path, overwrite: bool, store_path: Path | None) -> Path | None:
+        name = await self._download_direct(url, target, overwrite)
+        if not name:
+            return None
+        downloaded = target.with_name(name)
+        if store_path is not None:
+            try:
+                _link_or_copy(downloaded, store_path)
+            except OSError as exc:
+                logger.warning("保存共享图片失败 %s: %s", store_path, exc)
+        return downloaded
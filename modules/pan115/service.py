@@ -11,8 +11,9 @@ import httpx
 
 from modules.common import runtime
 from modules.common.runtime import get_pan115_config
-from modules.history.service import download_history_service, local_movie_library_service
-from modules.magnets.service import get_same_source_replacement_magnet_payload
+from modules.history.service import download_history_service
+from modules.magnets.dispatch_planner import plan_magnet_dispatch
+from modules.magnets.service import get_replacement_magnet_payload, record_magnet_dispatch_results
 
 from .schemas import DownloadRequest
 
@@ -832,10 +833,6 @@ def _normalize_failure_backoff(value: Any) -> list[float]:
     return backoff or list(PAN115_DEFAULT_FAILURE_BACKOFF_SECONDS)
 
 
-def _dedupe_key(magnet_link: str) -> str:
-    return str(magnet_link or "").strip().lower()
-
-
 def _next_batch_delay(base_interval: float, jitter_seconds: float) -> float:
     if base_interval <= 0:
         return 0.0
@@ -870,30 +867,24 @@ async def download(request: DownloadRequest, progress_callback=None) -> dict[str
     dispatch_original_links: list[str] = []
     results: list[dict[str, Any]] = []
 
-    for index, magnet_link in enumerate(request.magnet_links):
-        movie_id = request.movie_ids[index] if index < len(request.movie_ids) else ""
-        magnet_source = request.magnet_sources[index] if index < len(request.magnet_sources) else ""
-        original_magnet_link = ""
-        if not magnet_link:
+    plan = await plan_magnet_dispatch(
+        request.magnet_links,
+        request.movie_ids,
+        request.magnet_sources,
+        get_replacement_magnet_payload,
+    )
+    for item in plan:
+        movie_id = item.movie_id
+        magnet_link = item.magnet
+        magnet_source = item.source
+        original_magnet_link = item.original_magnet
+        if item.skip_reason == "empty_magnet":
             results.append({"magnet": magnet_link, "success": False, "movie_id": movie_id, "error": "empty_magnet", "message": "磁力链接为空"})
             continue
-        if movie_id and await local_movie_library_service.is_movie_present(movie_id):
-            results.append({"magnet": magnet_link, "success": False, "skipped": True, "movie_id": movie_id, "reason": "already_exists"})
-            logger.info("影片 %s 已存在，跳过 115 网盘下发", movie_id)
-            continue
-        if movie_id and await download_history_service.is_magnet_downloaded(movie_id, magnet_link):
-            replacement = await get_same_source_replacement_magnet_payload(movie_id, magnet_link, magnet_source)
-            replacement_link = str((replacement or {}).get("link") or "").strip()
-            if not replacement_link or _dedupe_key(replacement_link) == _dedupe_key(magnet_link):
-                results.append({"magnet": magnet_link, "success": False, "skipped": True, "movie_id": movie_id, "reason": "magnet_already_tried"})
-                logger.info("Download link for movie %s already exists in history and no replacement was found", movie_id)
-                continue
-            original_magnet_link = magnet_link
-            magnet_link = replacement_link
-            magnet_source = str((replacement or {}).get("source") or magnet_source or "").strip().lower()
-        key = _dedupe_key(magnet_link)
-        if any(_dedupe_key(link) == key for link in dispatch_links):
-            results.append({"magnet": magnet_link, "success": False, "skipped": True, "movie_id": movie_id, "reason": "duplicate_magnet"})
+        if item.skip_reason:
+            results.append({"magnet": magnet_link, "success": False, "skipped": True, "movie_id": movie_id, "reason": item.skip_reason})
+            if item.skip_reason == "already_exists":
+                logger.info("影片 %s 已存在，跳过 115 网盘下发", movie_id)
             continue
         dispatch_links.append(magnet_link)
         dispatch_movie_ids.append(movie_id)
@@ -939,6 +930,7 @@ async def download(request: DownloadRequest, progress_callback=None) -> dict[str
                     }
                 )
 
+    await record_magnet_dispatch_results("pan115", results)
     if successful_movie_ids:
         await download_history_service.save_movies(successful_movie_ids, successful_magnet_links, successful_magnet_sources)
 
@@ -1,16 +1,32 @@
 import logging
 from typing import Any
 
-from pikpakapi import PikPakApi
+from pikpakapi import PikPakApi, PikpakException, PikpakRetryException
 
 from modules.common.runtime import get_pikpak_config
-from modules.history.service import download_history_service, local_movie_library_service
-from modules.magnets.service import get_same_source_replacement_magnet_payload
+from modules.history.service import download_history_service
+from modules.magnets.dispatch_planner import plan_magnet_dispatch
+from modules.magnets.service import get_replacement_magnet_payload, record_magnet_dispatch_results
 from .schemas import DownloadRequest, PikPakCredentials
 
 
 logger = logging.getLogger(__name__)
 
+# PikPak 只返回 error_description 文本：提到链接/资源且与账号、空间、次数限制无关的拒绝才算链接本身的问题
+PIKPAK_LINK_ERROR_KEYWORDS = ("url", "magnet", "link", "resource", "链接", "资源", "磁力")
+PIKPAK_ACCOUNT_ERROR_KEYWORDS = ("password", "token", "captcha", "login", "space", "quota", "limit", "vip", "登录", "空间", "容量", "上限")
+
+
+def is_pikpak_link_error(exc: BaseException) -> bool:
+    if not isinstance(exc, PikpakException) or isinstance(exc, PikpakRetryException):
+        return False
+    text = str(exc).lower()
+    if text.startswith("max retries reached"):
+        return False
+    if any(keyword in text for keyword in PIKPAK_ACCOUNT_ERROR_KEYWORDS):
+        return False
+    return any(keyword in text for keyword in PIKPAK_LINK_ERROR_KEYWORDS)
+
 
 def resolve_credentials(username: str | None = None, password: str | None = None) -> PikPakCredentials:
     config = get_pikpak_config()
@@ -44,30 +60,31 @@ async def download(request: DownloadRequest) -> dict[str, Any]:
     successful_magnet_links: list[str] = []
     successful_magnet_sources: list[str] = []
 
-    for index, magnet_link in enumerate(request.magnet_links):
-        movie_id = request.movie_ids[index] if index < len(request.movie_ids) else None
-        magnet_source = request.magnet_sources[index] if index < len(request.magnet_sources) else ""
-        original_magnet_link = ""
-        if movie_id and await local_movie_library_service.is_movie_present(movie_id):
-            results.append({"magnet": magnet_link, "success": False, "skipped": True, "movie_id": movie_id, "reason": "already_exists"})
-            logger.info("影片 %s 已存在，跳过 PikPak 下发", movie_id)
+    plan = await plan_magnet_dispatch(
+        request.magnet_links,
+        request.movie_ids,
+        request.magnet_sources,
+        get_replacement_magnet_payload,
+    )
+    for item in plan:
+        movie_id = item.movie_id or None
+        magnet_link = item.magnet
+        magnet_source = item.source
+        original_magnet_link = item.original_magnet
+        if item.skip_reason == "empty_magnet":
+            results.append({"magnet": magnet_link, "movie_id": movie_id, "source": magnet_source, "success": False, "error": "empty_magnet"})
+            continue
+        if item.skip_reason:
+            results.append({"magnet": magnet_link, "success": False, "skipped": True, "movie_id": movie_id, "reason": item.skip_reason})
+            if item.skip_reason == "already_exists":
+                logger.info("影片 %s 已存在，跳过 PikPak 下发", movie_id)
             continue
-
-        if movie_id and await download_history_service.is_magnet_downloaded(movie_id, magnet_link):
-            replacement = await get_same_source_replacement_magnet_payload(movie_id, magnet_link, magnet_source)
-            replacement_link = str((replacement or {}).get("link") or "").strip()
-            if not replacement_link or replacement_link.lower() == str(magnet_link or "").strip().lower():
-                results.append({"magnet": magnet_link, "success": False, "skipped": True, "movie_id": movie_id, "reason": "magnet_already_tried"})
-                logger.info("Download link for movie %s already exists in history and no replacement was found", movie_id)
-                continue
-            original_magnet_link = magnet_link
-            magnet_link = replacement_link
-            magnet_source = str((replacement or {}).get("source") or magnet_source or "").strip().lower()
 
         try:
             result = await client.offline_download(magnet_link)
             result_item = {
                 "magnet": magnet_link,
+                "movie_id": movie_id,
                 "source": magnet_source,
                 "success": True,
                 "task_id": result.get("task", {}).get("id") if result else None,
@@ -81,9 +98,11 @@ async def download(request: DownloadRequest) -> dict[str, Any]:
                 successful_magnet_sources.append(str(magnet_source or "").strip().lower())
             logger.info("成功添加下载任务: %s...", magnet_link[:50])
         except Exception as exc:
-            results.append({"magnet": magnet_link, "success": False, "error": "download_dispatch_failed"})
+            error = "pikpak_link_rejected" if is_pikpak_link_error(exc) else "download_dispatch_failed"
+            results.append({"magnet": magnet_link, "movie_id": movie_id, "source": magnet_source, "success": False, "error": error})
             logger.error("添加下载任务失败: %s... - %s", magnet_link[:50], exc)
 
+    await record_magnet_dispatch_results("pikpak", results)
     if successful_movie_ids:
         await download_history_service.save_movies(successful_movie_ids, successful_magnet_links, successful_magnet_sources)
 
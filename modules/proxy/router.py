@@ -1,9 +1,12 @@
+import asyncio
 from urllib.parse import unquote_plus, urlparse
 
 from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import Response, JSONResponse
+from fastapi.responses import FileResponse, Response, JSONResponse
 import httpx
 
+from modules.common.image_thumbnails import REMOTE_IMAGE_CACHE_CONTROL, ThumbnailVariant, thumbnail_cache
+
 
 ALLOWED_IMAGE_HOSTS = {"www.javbus.com", "pics.dmm.co.jp"}
 
@@ -20,11 +23,29 @@ def _is_allowed_image_host(url: str) -> bool:
 router = APIRouter(tags=["proxy"])
 
 
+def _thumbnail_response(variant: ThumbnailVariant) -> FileResponse:
+    return FileResponse(
+        variant.path,
+        media_type=variant.media_type,
+        headers={"Cache-Control": REMOTE_IMAGE_CACHE_CONTROL, "ETag": f'"{variant.etag}"', "Vary": "Accept"},
+    )
+
+
 @router.get("/api/image-proxy")
-async def image_proxy(url: str = Query(..., description="Image URL from supported hosts")):
+async def image_proxy(
+    request: Request,
+    url: str = Query(..., description="Image URL from supported hosts"),
+    w: int | None = Query(default=None, ge=1, le=4096, description="Resize to this width bucket"),
+):
     target_url = unquote_plus(url)
     if not _is_allowed_image_host(target_url):
         raise HTTPException(status_code=400, detail="Unsupported image host")
+    accept = request.headers.get("accept", "")
+    source_key = f"url:{target_url}"
+    if w:
+        cached = await asyncio.to_thread(thumbnail_cache.variant, source_key, w, accept)
+        if cached is not None:
+            return _thumbnail_response(cached)
 
     async with httpx.AsyncClient(follow_redirects=True, timeout=15) as client:
         response = await client.get(
@@ -39,10 +60,15 @@ async def image_proxy(url: str = Query(..., description="Image URL from supporte
     if response.status_code >= 400:
         raise HTTPException(status_code=response.status_code, detail="Failed to fetch image")
 
+    if w:
+        variant = await asyncio.to_thread(thumbnail_cache.variant, source_key, w, accept, response.content)
+        if variant is not None:
+            return _thumbnail_response(variant)
     content_type = response.headers.get("content-type", "application/octet-stream")
     return Response(
         content=response.content,
         media_type=content_type,
+        headers={"Cache-Control": REMOTE_IMAGE_CACHE_CONTROL},
     )
 
 
@@ -18,6 +18,7 @@ JAVBUS_SETTING_LIMITS = {
 SCRAPER_SETTING_LIMITS = {
     "request_delay": (0, 60000),
 }
+SCRAPER_PARALLEL_PROVIDERS_LIMITS = (1, 8)
 SCRAPER_LANGUAGES = {"en", "ja", "zh", "cn", "tw"}
 PAN115_SETTING_LIMITS = {
     "batch_size": (1, 50),
@@ -30,6 +31,8 @@ MAGNET_HEALTH_SETTING_LIMITS = {
     "min_availability": (0.0, 100.0),
     "min_score": (0.0, 100000.0),
     "probe_timeout_seconds": (3.0, 120.0),
+    "probe_concurrency": (1, 16),
+    "cache_ttl_seconds": (0, 604800),
 }
 
 
@@ -40,6 +43,7 @@ def build_scrapers_settings_payload(scrapers_config: dict[str, Any]) -> dict[str
             for provider in scrapers_config.get("priority", runtime.SCRAPER_PROVIDER_NAMES)
             if provider in runtime.SCRAPER_PROVIDER_NAMES
         ],
+        "parallel_providers": scrapers_config.get("parallel_providers", runtime.DEFAULT_CONFIG["scrapers"]["parallel_providers"]),
     }
     for provider in runtime.SCRAPER_PROVIDER_NAMES:
         provider_config = scrapers_config.get(provider)
@@ -114,6 +118,8 @@ def build_settings_payload() -> dict[str, Any]:
             "min_availability": float(magnet_health_config.get("min_availability") or 0),
             "min_score": float(magnet_health_config.get("min_score") or 0),
             "probe_timeout_seconds": float(magnet_health_config.get("probe_timeout_seconds") or 0),
+            "probe_concurrency": int(magnet_health_config.get("probe_concurrency") or 1),
+            "cache_ttl_seconds": float(magnet_health_config.get("cache_ttl_seconds") or 0),
             "allow_unknown": bool(magnet_health_config.get("allow_unknown", True)),
         },
         "security": {
@@ -227,6 +233,16 @@ def validate_scrapers_settings(payload: dict[str, Any]) -> dict[str, Any]:
                 priority.append(provider)
         normalized["priority"] = priority
 
+    if "parallel_providers" in payload:
+        try:
+            parallel_providers = int(float(payload["parallel_providers"]))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="parallel_providers_must_be_number")
+        minimum, maximum = SCRAPER_PARALLEL_PROVIDERS_LIMITS
+        if parallel_providers < minimum or parallel_providers > maximum:
+            raise HTTPException(status_code=400, detail="parallel_providers_out_of_range")
+        normalized["parallel_providers"] = parallel_providers
+
     for provider in runtime.SCRAPER_PROVIDER_NAMES:
         values = payload.get(provider)
         if values is None:
@@ -400,7 +416,7 @@ def validate_magnet_health_settings(payload: dict[str, Any]) -> dict[str, Any]:
             raise HTTPException(status_code=400, detail=f"{key}_must_be_number")
         if number < minimum or number > maximum:
             raise HTTPException(status_code=400, detail=f"{key}_out_of_range")
-        normalized[key] = int(number) if key in {"min_seeders", "min_peers"} else number
+        normalized[key] = int(number) if key in {"min_seeders", "min_peers", "probe_concurrency"} else number
 
     return normalized
 
@@ -18,6 +18,15 @@ except ModuleNotFoundError:
 logger = logging.getLogger(__name__)
 
 
+def is_aria2_link_error(exc: BaseException) -> bool:
+    """aria2 以业务错误拒绝 addUri（如 URI 无效）才算链接问题；鉴权、JSON-RPC 协议和网络错误不算"""
+    if aria2p is None or not isinstance(exc, aria2p.ClientException):
+        return False
+    if exc.code < 0:
+        return False
+    return "unauthorized" not in str(exc).lower()
+
+
 @dataclass
 class WebDavFile:
     name: str
@@ -2,11 +2,12 @@ import asyncio
 import logging
 from typing import Any
 
-from modules.history.service import download_history_service, local_movie_library_service
-from modules.magnets.service import get_same_source_replacement_magnet_payload
+from modules.history.service import download_history_service
+from modules.magnets.dispatch_planner import plan_magnet_dispatch
+from modules.magnets.service import get_replacement_magnet_payload, record_magnet_dispatch_results
 from modules.pan115 import service as pan115_service
 
-from .clients import Aria2Client
+from .clients import Aria2Client, is_aria2_link_error
 
 
 logger = logging.getLogger(__name__)
@@ -23,44 +24,34 @@ async def dispatch_magnet_downloads_to_aria2(
     successful_magnet_links: list[str] = []
     successful_magnet_sources: list[str] = []
 
-    for index, magnet_link in enumerate(magnet_links):
-        movie_id = movie_ids[index] if index < len(movie_ids) else ""
-        magnet_source = magnet_sources[index] if magnet_sources is not None and index < len(magnet_sources) else ""
-        original_magnet_link = ""
-        if movie_id and await local_movie_library_service.is_movie_present(movie_id):
+    skip_messages = {
+        "already_exists": "影片已在本地影视库中",
+        "magnet_already_tried": "磁力链接已在历史记录中",
+        "duplicate_magnet": "重复的磁力链接",
+    }
+    plan = await plan_magnet_dispatch(magnet_links, movie_ids, magnet_sources, get_replacement_magnet_payload)
+    for item in plan:
+        movie_id = item.movie_id
+        magnet_link = item.magnet
+        magnet_source = item.source
+        original_magnet_link = item.original_magnet
+        if item.skip_reason == "empty_magnet":
             results.append(
                 {
                     "movie_id": movie_id,
                     "success": False,
-                    "skipped": True,
-                    "reason": "already_exists",
-                    "message": "影片已在本地影视库中",
+                    "message": "磁力链接为空",
                 }
             )
             continue
-        if movie_id and await download_history_service.is_magnet_downloaded(movie_id, magnet_link):
-            replacement = await get_same_source_replacement_magnet_payload(movie_id, magnet_link, magnet_source)
-            replacement_link = str((replacement or {}).get("link") or "").strip()
-            if not replacement_link or replacement_link.lower() == str(magnet_link or "").strip().lower():
-                results.append(
-                    {
-                        "movie_id": movie_id,
-                        "success": False,
-                        "skipped": True,
-                        "reason": "magnet_already_tried",
-                        "message": "磁力链接已在历史记录中",
-                    }
-                )
-                continue
-            original_magnet_link = magnet_link
-            magnet_link = replacement_link
-            magnet_source = str((replacement or {}).get("source") or magnet_source or "").strip().lower()
-        if not magnet_link:
+        if item.skip_reason:
             results.append(
                 {
                     "movie_id": movie_id,
                     "success": False,
-                    "message": "磁力链接为空",
+                    "skipped": True,
+                    "reason": item.skip_reason,
+                    "message": skip_messages[item.skip_reason],
                 }
             )
             continue
@@ -87,12 +78,15 @@ async def dispatch_magnet_downloads_to_aria2(
             results.append(
                 {
                     "movie_id": movie_id,
+                    "magnet": magnet_link,
+                    "source": magnet_source,
                     "success": False,
-                    "error": "aria2_add_failed",
+                    "error": "aria2_link_rejected" if is_aria2_link_error(exc) else "aria2_add_failed",
                     "message": "添加失败",
                 }
             )
 
+    await record_magnet_dispatch_results("aria2", results)
     if successful_movie_ids:
         await download_history_service.save_movies(successful_movie_ids, successful_magnet_links, successful_magnet_sources)
 
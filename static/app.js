@@ -2776,6 +2776,10 @@
   var LOCAL_LIBRARY_THEME_STORAGE_KEY = "javjaeger.localLibrary.theme";
   var LOCAL_LIBRARY_GRID_PAGE_SIZE = 30;
   var LOCAL_LIBRARY_LIST_DEFAULT_PAGE_SIZE = 20;
+  var LOCAL_LIBRARY_FIRST_PAGE_LIMIT = 120;
+  var LOCAL_LIBRARY_NEXT_PAGE_LIMIT = 120;
+  var LOCAL_LIBRARY_FILTER_KEYS = ["genres", "stars", "studios", "publishers", "series", "years", "roots"];
+  var LOCAL_LIBRARY_CARD_IMAGE_WIDTH = 320;
   var LOCAL_LIBRARY_SORT_OPTIONS = [
     { label: "\u53D1\u884C\u65E5\u671F \u65B0\u5230\u65E7", value: "date_desc" },
     { label: "\u53D1\u884C\u65E5\u671F \u65E7\u5230\u65B0", value: "date_asc" },
@@ -2896,73 +2900,6 @@
       return fileScore[0] > bestScore[0] || fileScore[0] === bestScore[0] && fileScore[1] > bestScore[1] ? file : best;
     }, {});
   };
-  var sortableText = (value) => String(value || "").trim().toLowerCase();
-  var sortableTime = (value) => {
-    const time = Date.parse(String(value || ""));
-    return Number.isFinite(time) ? time : 0;
-  };
-  var compareText = (left, right, direction = "asc") => {
-    const result = sortableText(left).localeCompare(sortableText(right), "zh-CN", { numeric: true, sensitivity: "base" });
-    return direction === "desc" ? -result : result;
-  };
-  var compareNumber = (left, right, direction = "desc") => {
-    const leftNumber = Number(left) || 0;
-    const rightNumber = Number(right) || 0;
-    if (leftNumber === rightNumber) return 0;
-    if (leftNumber === 0) return 1;
-    if (rightNumber === 0) return -1;
-    return direction === "asc" ? leftNumber - rightNumber : rightNumber - leftNumber;
-  };
-  var recordResolutionPixels = (record) => {
-    const mediaInfo = primaryMediaInfo(record);
-    return Number(mediaInfo?.resolution_pixels || 0) || Number(mediaInfo?.width || 0) * Number(mediaInfo?.height || 0);
-  };
-  var sortLocalLibraryRecords = (records, sortRule) => {
-    const comparator = (left, right) => {
-      let result = 0;
-      switch (sortRule) {
-        case "date_asc":
-          result = compareNumber(sortableTime(left.date), sortableTime(right.date), "asc");
-          break;
-        case "updated_desc":
-          result = compareNumber(sortableTime(left.updated_at), sortableTime(right.updated_at), "desc");
-          break;
-        case "first_seen_desc":
-          result = compareNumber(sortableTime(left.first_seen_at), sortableTime(right.first_seen_at), "desc");
-          break;
-        case "movie_id_asc":
-          result = compareText(left.movie_id, right.movie_id, "asc");
-          break;
-        case "movie_id_desc":
-          result = compareText(left.movie_id, right.movie_id, "desc");
-          break;
-        case "title_asc":
-          result = compareText(left.title || left.movie_id, right.title || right.movie_id, "asc");
-          break;
-        case "size_desc":
-          result = compareNumber(left.total_size, right.total_size, "desc");
-          break;
-        case "size_asc":
-          result = compareNumber(left.total_size, right.total_size, "asc");
-          break;
-        case "file_count_desc":
-          result = compareNumber(left.file_count, right.file_count, "desc");
-          break;
-        case "resolution_desc":
-          result = compareNumber(recordResolutionPixels(left), recordResolutionPixels(right), "desc");
-          break;
-        case "bitrate_desc":
-          result = compareNumber(primaryMediaInfo(left)?.bitrate, primaryMediaInfo(right)?.bitrate, "desc");
-          break;
-        case "date_desc":
-        default:
-          result = compareNumber(sortableTime(left.date), sortableTime(right.date), "desc");
-          break;
-      }
-      return result || compareText(left.movie_id, right.movie_id, "asc");
-    };
-    return records.map((record, index) => ({ record, index })).sort((left, right) => comparator(left.record, right.record) || left.index - right.index).map((item) => item.record);
-  };
   var renderMediaTags = (mediaInfo) => {
     const resolution = formatResolution2(mediaInfo);
     const bitrate = formatBitrate2(mediaInfo?.bitrate);
@@ -2973,30 +2910,10 @@
     }
     return /* @__PURE__ */ React5.createElement(Space5, { size: 4, wrap: true, className: "jav-library-media-tags" }, resolution !== "-" && /* @__PURE__ */ React5.createElement(Tag4, { color: "geekblue" }, resolution), bitrate !== "-" && /* @__PURE__ */ React5.createElement(Tag4, { color: "gold" }, bitrate), codec !== "-" && /* @__PURE__ */ React5.createElement(Tag4, { color: "volcano" }, codec), container !== "-" && /* @__PURE__ */ React5.createElement(Tag4, { color: "purple" }, container));
   };
-  var countedOptions = (records, getter) => {
-    const counts = /* @__PURE__ */ new Map();
-    records.forEach((record) => {
-      const value = getter(record);
-      const values = Array.isArray(value) ? value : [value];
-      values.filter(Boolean).forEach((item) => {
-        const key = String(item).trim();
-        if (!key) return;
-        counts.set(key, (counts.get(key) || 0) + 1);
-      });
-    });
-    return Array.from(counts.entries()).sort((a, b) => b[1] - a[1] || a[0].localeCompare(b[0])).slice(0, 80).map(([value, count]) => ({
-      label: `${value} (${count})`,
-      value
-    }));
-  };
-  var matchesAny = (recordValues, selectedValues) => {
-    if (!selectedValues || selectedValues.length === 0) {
-      return true;
-    }
-    const values = Array.isArray(recordValues) ? recordValues : [recordValues].filter(Boolean);
-    const normalized = new Set(values.map((value) => String(value)));
-    return selectedValues.some((value) => normalized.has(String(value)));
-  };
+  var facetOptions = (facets) => (facets || []).map((item) => ({
+    label: `${item.value} (${item.count})`,
+    value: item.value
+  }));
   var posterSource = (record) => {
     if (record?.poster_url) {
       return record.poster_url;
@@ -3010,6 +2927,13 @@
     }
     return url.startsWith("/api/") ? url : `/api/image-proxy?url=${encodeURIComponent(url)}`;
   };
+  var sizedImageSource = (url, width) => {
+    if (!url || !width || !url.startsWith("/api/")) {
+      return url;
+    }
+    const pixelWidth = Math.round(width * Math.min(window.devicePixelRatio || 1, 2));
+    return `${url}${url.includes("?") ? "&" : "?"}w=${pixelWidth}`;
+  };
   var thumbnailSource = (record) => {
     const thumbnailUrl = record?.thumbnail_url || "";
     if (thumbnailUrl.startsWith("/api/")) {
@@ -3058,7 +2982,8 @@
     return sources;
   };
   var MoviePoster = ({ record, compact = false, width = null, variant = "poster", onRatio = null }) => {
-    const src = variant === "thumbnail" ? thumbnailSource(record) || posterSource(record) : posterSource(record);
+    const baseSrc = variant === "thumbnail" ? thumbnailSource(record) || posterSource(record) : posterSource(record);
+    const src = variant === "thumbnail" ? sizedImageSource(baseSrc, width || LOCAL_LIBRARY_CARD_IMAGE_WIDTH) : baseSrc;
     const [failed, setFailed] = React5.useState(false);
     const [imageLoading, setImageLoading] = React5.useState(!!src);
     const style = width ? { width, height: compact ? Math.round(width * 1.5) : void 0 } : void 0;
@@ -3157,6 +3082,8 @@
     });
     const [informationCheckForm] = Form4.useForm();
     const [informationDownloadForm] = Form4.useForm();
+    const libraryLoadIdRef = React5.useRef(0);
+    const libraryPageLoadingRef = React5.useRef(false);
     const gridPageLoadingTimerRef = React5.useRef(null);
     const listPageLoadingTimerRef = React5.useRef(null);
     const gridAutoLoadSentinelRef = React5.useRef(null);
@@ -3213,48 +3140,41 @@
         return map;
       }, {});
     }, [informationCheck]);
-    const filterOptions = React5.useMemo(() => ({
-      genres: countedOptions(records, (record) => record.genres),
-      stars: countedOptions(records, (record) => record.stars),
-      studios: countedOptions(records, (record) => record.studio),
-      publishers: countedOptions(records, (record) => record.publisher),
-      series: countedOptions(records, (record) => record.series),
-      years: countedOptions(records, (record) => String(record.date || "").slice(0, 4)),
-      roots: countedOptions(records, (record) => record.scan_roots)
-    }), [records]);
+    const filterOptions = React5.useMemo(() => library.facets ? {
+      genres: facetOptions(library.facets.genres),
+      stars: facetOptions(library.facets.stars),
+      studios: facetOptions(library.facets.studios),
+      publishers: facetOptions(library.facets.publishers),
+      series: facetOptions(library.facets.series),
+      years: facetOptions(library.facets.years),
+      roots: facetOptions(library.facets.roots)
+    } : {}, [library.facets]);
     const activeFilterCount = React5.useMemo(() => Object.entries(filters).reduce((count, [key, value]) => {
       if (key === "keyword") {
         return count + (String(value || "").trim() ? 1 : 0);
       }
       return count + (Array.isArray(value) ? value.length : 0);
     }, 0), [filters]);
-    const filteredRecords = React5.useMemo(() => {
-      const keyword = filters.keyword.trim().toLowerCase();
-      return records.filter((record) => {
-        if (keyword) {
-          const text = `${record.movie_id || ""}
-${record.title || ""}
-${record.full_text || ""}`.toLowerCase();
-          if (!text.includes(keyword)) {
-            return false;
-          }
-        }
-        return matchesAny(record.genres, filters.genres) && matchesAny(record.stars, filters.stars) && matchesAny(record.studio, filters.studios) && matchesAny(record.publisher, filters.publishers) && matchesAny(record.series, filters.series) && matchesAny(String(record.date || "").slice(0, 4), filters.years) && matchesAny(record.scan_roots, filters.roots);
-      });
-    }, [records, filters]);
-    const sortedRecords = React5.useMemo(() => sortLocalLibraryRecords(filteredRecords, sortRule), [filteredRecords, sortRule]);
-    const maxGridPage = Math.max(1, Math.ceil(sortedRecords.length / LOCAL_LIBRARY_GRID_PAGE_SIZE));
+    const libraryQuery = React5.useMemo(() => ({
+      keyword: filters.keyword.trim(),
+      sort: sortRule,
+      filters: LOCAL_LIBRARY_FILTER_KEYS.reduce((result, key) => ({ ...result, [key]: filters[key] || [] }), {})
+    }), [filters, sortRule]);
+    const sortedRecords = records;
+    const matchedCount = Math.max(Number(library.matched_count) || 0, sortedRecords.length);
+    const maxGridPage = Math.max(1, Math.ceil(matchedCount / LOCAL_LIBRARY_GRID_PAGE_SIZE));
     const gridVisibleCount = Math.min(gridPage * LOCAL_LIBRARY_GRID_PAGE_SIZE, sortedRecords.length);
     const visibleGridRecords = React5.useMemo(() => sortedRecords.slice(0, gridVisibleCount), [sortedRecords, gridVisibleCount]);
-    const maxListPage = Math.max(1, Math.ceil(sortedRecords.length / listPageSize));
+    const maxListPage = Math.max(1, Math.ceil(matchedCount / listPageSize));
     const listVisibleCount = Math.min(listPage * listPageSize, sortedRecords.length);
     const visibleListRecords = React5.useMemo(() => sortedRecords.slice(0, listVisibleCount), [sortedRecords, listVisibleCount]);
-    const hasMoreGridRecords = gridVisibleCount < sortedRecords.length;
-    const hasMoreListRecords = listVisibleCount < sortedRecords.length;
+    const hasMoreGridRecords = gridVisibleCount < matchedCount;
+    const hasMoreListRecords = listVisibleCount < matchedCount;
+    const neededRecordCount = viewMode === "grid" ? (gridPage + 1) * LOCAL_LIBRARY_GRID_PAGE_SIZE : (listPage + 1) * listPageSize;
     React5.useEffect(() => {
       setGridPage(1);
       setListPage(1);
-    }, [records, filters, sortRule]);
+    }, [library.loadId, filters, sortRule]);
     React5.useEffect(() => () => {
       if (gridPageLoadingTimerRef.current) {
         window.clearTimeout(gridPageLoadingTimerRef.current);
@@ -3291,7 +3211,7 @@ ${record.full_text || ""}`.toLowerCase();
     };
     const handleListPageChange = (page, size = listPageSize) => {
       const nextPageSize = Number(size) || LOCAL_LIBRARY_LIST_DEFAULT_PAGE_SIZE;
-      const nextMaxPage = Math.max(1, Math.ceil(sortedRecords.length / nextPageSize));
+      const nextMaxPage = Math.max(1, Math.ceil(matchedCount / nextPageSize));
       setListPageSize(nextPageSize);
       setListPage(Math.max(1, Math.min(Number(page) || 1, nextMaxPage)));
       startListPageLoading();
@@ -3392,22 +3312,75 @@ ${record.full_text || ""}`.toLowerCase();
         setActorLibraryLoading(false);
       }
     };
-    const loadLibrary = async () => {
+    const fetchLibraryPage = async (query, cursor, limit) => {
+      const queryParams = new URLSearchParams();
+      queryParams.set("sort", query.sort);
+      queryParams.set("limit", String(limit));
+      if (query.keyword) {
+        queryParams.set("q", query.keyword);
+      }
+      LOCAL_LIBRARY_FILTER_KEYS.forEach((key) => {
+        (query.filters[key] || []).forEach((value) => queryParams.append(key, value));
+      });
+      if (cursor) {
+        queryParams.set("cursor", cursor);
+      }
+      const response = await fetch(`/api/movies/local-library/summary?${queryParams.toString()}`);
+      const data = await response.json();
+      if (!data.success) {
+        throw new Error(data.message || "\u52A0\u8F7D\u5931\u8D25");
+      }
+      return data;
+    };
+    const loadLibrary = async (query = libraryQuery) => {
+      const loadId = libraryLoadIdRef.current + 1;
+      libraryLoadIdRef.current = loadId;
+      libraryPageLoadingRef.current = false;
       setLoading(true);
       try {
-        const response = await fetch("/api/movies/local-library");
-        const data = await response.json();
-        if (!data.success) {
-          throw new Error(data.message || "\u52A0\u8F7D\u5931\u8D25");
+        const firstPage = await fetchLibraryPage(query, "", LOCAL_LIBRARY_FIRST_PAGE_LIMIT);
+        if (libraryLoadIdRef.current !== loadId) {
+          return;
         }
-        setLibrary(data);
-        await loadActorLibrary();
+        setLibrary({ ...firstPage, query, loadId });
       } catch (error) {
         message5.error(`\u5F71\u89C6\u5E93\u52A0\u8F7D\u5931\u8D25\uFF1A${error.message}`);
+        return;
       } finally {
         setLoading(false);
       }
+      await loadActorLibrary();
     };
+    const loadMoreLibraryRecords = async () => {
+      const { loadId, query, next_cursor: cursor } = library;
+      if (!cursor || !query || libraryPageLoadingRef.current) {
+        return;
+      }
+      libraryPageLoadingRef.current = true;
+      try {
+        const page = await fetchLibraryPage(query, cursor, LOCAL_LIBRARY_NEXT_PAGE_LIMIT);
+        if (libraryLoadIdRef.current !== loadId) {
+          return;
+        }
+        setLibrary((current) => ({
+          ...current,
+          records: [...current.records || [], ...page.records || []],
+          next_cursor: page.next_cursor,
+          matched_count: page.matched_count
+        }));
+      } catch (error) {
+        message5.error(`\u5F71\u89C6\u5E93\u52A0\u8F7D\u5931\u8D25\uFF1A${error.message}`);
+      } finally {
+        if (libraryLoadIdRef.current === loadId) {
+          libraryPageLoadingRef.current = false;
+        }
+      }
+    };
+    React5.useEffect(() => {
+      if (library.next_cursor && neededRecordCount > sortedRecords.length) {
+        loadMoreLibraryRecords();
+      }
+    }, [library.next_cursor, neededRecordCount, sortedRecords.length]);
     const openInformationCheck = () => {
       const saved = loadInformationCheckSettings();
       setInformationCheckFields(saved.fields);
@@ -3456,13 +3429,22 @@ ${record.full_text || ""}`.toLowerCase();
       }
     };
     React5.useEffect(() => {
-      loadLibrary();
-    }, []);
-    const openRecordPreview = (record) => {
+      loadLibrary(libraryQuery);
+    }, [libraryQuery]);
+    const openRecordPreview = async (record) => {
       setSelectedRecord(record);
       setPlayingRecordKey("");
       setSelectedPlayFileIndex(0);
       window.scrollTo({ top: 0, behavior: "smooth" });
+      try {
+        const response = await fetch(`/api/movies/local-library/${encodeURIComponent(record.movie_id)}`);
+        const data = await response.json();
+        if (data.success && data.record) {
+          setSelectedRecord((current) => current?.movie_id === record.movie_id ? data.record : current);
+        }
+      } catch (error) {
+        message5.error(`\u5F71\u7247\u8BE6\u60C5\u52A0\u8F7D\u5931\u8D25\uFF1A${error.message}`);
+      }
     };
     const closeRecordPreview = () => {
       setSelectedRecord(null);
@@ -3969,7 +3951,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
         onChange: viewMode === "grid" ? setGridPosterSize : setListPosterSize,
         tooltip: { formatter: (value) => `${value}px` }
       }
-    )), /* @__PURE__ */ React5.createElement(Button5, { icon: /* @__PURE__ */ React5.createElement(Icon3, { as: FilterOutlined }), onClick: () => setFilterOpen(true) }, "\u7B5B\u9009", activeFilterCount ? ` (${activeFilterCount})` : ""), /* @__PURE__ */ React5.createElement(Button5, { icon: /* @__PURE__ */ React5.createElement(Icon3, { as: SearchOutlined2 }), onClick: openInformationCheck, loading: checkingInformation }, "\u68C0\u67E5\u4FE1\u606F"), /* @__PURE__ */ React5.createElement(Button5, { icon: /* @__PURE__ */ React5.createElement(Icon3, { as: ReloadOutlined3 }), onClick: loadLibrary, loading }, "\u5237\u65B0"), /* @__PURE__ */ React5.createElement(
+    )), /* @__PURE__ */ React5.createElement(Button5, { icon: /* @__PURE__ */ React5.createElement(Icon3, { as: FilterOutlined }), onClick: () => setFilterOpen(true) }, "\u7B5B\u9009", activeFilterCount ? ` (${activeFilterCount})` : ""), /* @__PURE__ */ React5.createElement(Button5, { icon: /* @__PURE__ */ React5.createElement(Icon3, { as: SearchOutlined2 }), onClick: openInformationCheck, loading: checkingInformation }, "\u68C0\u67E5\u4FE1\u606F"), /* @__PURE__ */ React5.createElement(Button5, { icon: /* @__PURE__ */ React5.createElement(Icon3, { as: ReloadOutlined3 }), onClick: () => loadLibrary(), loading }, "\u5237\u65B0"), /* @__PURE__ */ React5.createElement(
       Popconfirm4,
       {
         title: "\u6E05\u6D17\u65E0\u6548\u6587\u4EF6\uFF1F",
@@ -3987,7 +3969,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
       },
       "\u641C\u7D22: ",
       filters.keyword.trim()
-    ), activeFilterTags(), /* @__PURE__ */ React5.createElement(Button5, { size: "small", type: "link", onClick: clearFilters }, "\u6E05\u9664\u5168\u90E8")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-grid jav-local-kpis jav-library-kpis" }, /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u5F71\u7247"), /* @__PURE__ */ React5.createElement("strong", null, library.total_movies || 0), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u6570\u636E\u5E93\u8BB0\u5F55")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u6587\u4EF6"), /* @__PURE__ */ React5.createElement("strong", null, library.total_files || 0), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u672C\u5730\u89C6\u9891")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u5BB9\u91CF"), /* @__PURE__ */ React5.createElement("strong", null, formatBytes2(library.total_size)), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u603B\u5927\u5C0F")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u7B5B\u9009"), /* @__PURE__ */ React5.createElement("strong", null, filteredRecords.length), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u5F53\u524D\u7ED3\u679C")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u4FE1\u606F"), /* @__PURE__ */ React5.createElement("strong", null, informationCheck ? informationCheck.incomplete_count : "-"), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u7F3A\u5931\u8D44\u6599"))), informationCheck && /* @__PURE__ */ React5.createElement(
+    ), activeFilterTags(), /* @__PURE__ */ React5.createElement(Button5, { size: "small", type: "link", onClick: clearFilters }, "\u6E05\u9664\u5168\u90E8")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-grid jav-local-kpis jav-library-kpis" }, /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u5F71\u7247"), /* @__PURE__ */ React5.createElement("strong", null, library.total_movies || 0), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u6570\u636E\u5E93\u8BB0\u5F55")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u6587\u4EF6"), /* @__PURE__ */ React5.createElement("strong", null, library.total_files || 0), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u672C\u5730\u89C6\u9891")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u5BB9\u91CF"), /* @__PURE__ */ React5.createElement("strong", null, formatBytes2(library.total_size)), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u603B\u5927\u5C0F")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u7B5B\u9009"), /* @__PURE__ */ React5.createElement("strong", null, matchedCount), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u5F53\u524D\u7ED3\u679C")), /* @__PURE__ */ React5.createElement("div", { className: "jav-kpi-card" }, /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-label" }, "\u4FE1\u606F"), /* @__PURE__ */ React5.createElement("strong", null, informationCheck ? informationCheck.incomplete_count : "-"), /* @__PURE__ */ React5.createElement("span", { className: "jav-kpi-note" }, "\u7F3A\u5931\u8D44\u6599"))), informationCheck && /* @__PURE__ */ React5.createElement(
       Alert2,
       {
         style: { marginTop: 14 },
@@ -3996,12 +3978,12 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
         message: `\u4FE1\u606F\u68C0\u67E5\uFF1A\u5B8C\u6574 ${informationCheck.complete_count || 0} / ${informationCheck.total_movies || 0}`,
         description: informationCheck.incomplete_count > 0 ? `\u7F3A\u5931 ${informationCheck.incomplete_count} \u90E8\uFF0C\u53EF\u5728\u201C\u68C0\u67E5\u4FE1\u606F\u201D\u7A97\u53E3\u4E2D\u4E0B\u8F7D\u7F3A\u5931\u4FE1\u606F\u3002` : "\u5F53\u524D\u5DF2\u5165\u5E93\u5F71\u7247\u4FE1\u606F\u548C\u672C\u5730\u8D44\u6599\u5B8C\u6574\u3002"
       }
-    ), /* @__PURE__ */ React5.createElement(Divider2, { className: "jav-section-divider" }), viewMode === "actors" ? renderActorLibraryView() : viewMode === "grid" ? sortedRecords.length ? /* @__PURE__ */ React5.createElement(React5.Fragment, null, /* @__PURE__ */ React5.createElement("div", { className: "jav-library-grid-toolbar" }, /* @__PURE__ */ React5.createElement(Text5, { type: "secondary" }, gridVisibleCount > 0 ? `1-${gridVisibleCount}` : 0, " / ", sortedRecords.length), /* @__PURE__ */ React5.createElement(
+    ), /* @__PURE__ */ React5.createElement(Divider2, { className: "jav-section-divider" }), viewMode === "actors" ? renderActorLibraryView() : viewMode === "grid" ? sortedRecords.length ? /* @__PURE__ */ React5.createElement(React5.Fragment, null, /* @__PURE__ */ React5.createElement("div", { className: "jav-library-grid-toolbar" }, /* @__PURE__ */ React5.createElement(Text5, { type: "secondary" }, gridVisibleCount > 0 ? `1-${gridVisibleCount}` : 0, " / ", matchedCount), /* @__PURE__ */ React5.createElement(
       Pagination,
       {
         current: gridPage,
         pageSize: LOCAL_LIBRARY_GRID_PAGE_SIZE,
-        total: sortedRecords.length,
+        total: matchedCount,
         showSizeChanger: false,
         onChange: handleGridPageChange
       }
@@ -4056,13 +4038,13 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
         className: "jav-library-grid-pagination-bottom",
         current: gridPage,
         pageSize: LOCAL_LIBRARY_GRID_PAGE_SIZE,
-        total: sortedRecords.length,
+        total: matchedCount,
         showSizeChanger: false,
         onChange: handleGridPageChange
       }
     ), renderAutoLoadFooter({
       visibleCount: gridVisibleCount,
-      total: sortedRecords.length,
+      total: matchedCount,
       hasMore: hasMoreGridRecords,
       loading: gridPageLoading,
       onLoadMore: loadNextGridPage,
@@ -4087,7 +4069,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
         className: "jav-library-list-pagination-bottom",
         current: listPage,
         pageSize: listPageSize,
-        total: sortedRecords.length,
+        total: matchedCount,
         showSizeChanger: true,
         pageSizeOptions: [10, 20, 30, 50, 100],
         showTotal: (total) => `${listVisibleCount} / ${total}`,
@@ -4096,7 +4078,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
       }
     ), renderAutoLoadFooter({
       visibleCount: listVisibleCount,
-      total: sortedRecords.length,
+      total: matchedCount,
       hasMore: hasMoreListRecords,
       loading: listPageLoading,
       onLoadMore: loadNextListPage,
@@ -5768,6 +5750,8 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
   } = icons8;
   var Icon6 = ({ as: Component }) => Component ? /* @__PURE__ */ React8.createElement(Component, null) : null;
   var HEADER_BRAND_NAME = "JavJaeger";
+  var BROWSE_COVER_IMAGE_WIDTH = 480;
+  var HISTORY_PAGE_LIMIT = 50;
   var HEADER_SLOGAN_QUOTE = '"\u4EBA\u7C7B\u7684\u4E00\u5207\u75DB\u82E6\uFF0C\u90FD\u662F\u56E0\u4E3A\u6027\u6B32\u5F97\u4E0D\u5230\u6EE1\u8DB3"';
   var HEADER_SLOGAN_AUTHOR = " --\u5F17\u6D1B\u4F0A\u5FB7 \u5CF0";
   var RESOURCE_REQUEST_CONCURRENCY = 4;
@@ -5819,6 +5803,10 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
     const [movieDetailMap, setMovieDetailMap] = React8.useState({});
     const [webdavConnected, setWebdavConnected] = React8.useState(false);
     const [historyData, setHistoryData] = React8.useState(null);
+    const [historyKeyword, setHistoryKeyword] = React8.useState("");
+    const [historyPage, setHistoryPage] = React8.useState({ keyword: "", nextCursor: null, matchedCount: 0, totalCount: 0 });
+    const [historyPageLoading, setHistoryPageLoading] = React8.useState(false);
+    const historyRequestVersionRef = React8.useRef(0);
     const [checkingHistoryLibrary, setCheckingHistoryLibrary] = React8.useState(false);
     const [currentPage, setCurrentPage] = React8.useState(1);
     const [lastFilterValues, setLastFilterValues] = React8.useState(null);
@@ -6754,19 +6742,66 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
         setDownloadingMovieIds((prev) => ({ ...prev, [movie.id]: false }));
       }
     };
-    const fetchHistory = async () => {
+    const fetchHistoryPage = async (keyword, cursor) => {
+      const queryParams = new URLSearchParams();
+      queryParams.set("limit", String(HISTORY_PAGE_LIMIT));
+      if (keyword) {
+        queryParams.set("q", keyword);
+      }
+      if (cursor) {
+        queryParams.set("cursor", cursor);
+      }
+      return fetchWithRetry(`/api/history/records?${queryParams.toString()}`);
+    };
+    const applyHistoryPage = (keyword, data, append) => {
+      const records = Array.isArray(data?.records) ? data.records : [];
+      setHistoryData((prev) => append ? [...prev || [], ...records] : records);
+      setHistoryPage({
+        keyword,
+        nextCursor: data?.next_cursor || null,
+        matchedCount: Number(data?.matched_count) || 0,
+        totalCount: Number(data?.total_count) || 0
+      });
+    };
+    const fetchHistory = async (keyword = "") => {
+      const normalizedKeyword = String(keyword || "").trim();
+      const requestVersion = historyRequestVersionRef.current + 1;
+      historyRequestVersionRef.current = requestVersion;
       setLoading(true);
       setViewMode("history");
       try {
-        const data = await fetchWithRetry("/api/history");
-        setHistoryData(data);
-        message8.success("\u5DF2\u52A0\u8F7D\u5386\u53F2\u8BB0\u5F55");
+        const data = await fetchHistoryPage(normalizedKeyword, "");
+        if (historyRequestVersionRef.current !== requestVersion) {
+          return;
+        }
+        applyHistoryPage(normalizedKeyword, data, false);
+        if (!normalizedKeyword) {
+          message8.success("\u5DF2\u52A0\u8F7D\u5386\u53F2\u8BB0\u5F55");
+        }
       } catch (error) {
         message8.error("\u83B7\u53D6\u5386\u53F2\u8BB0\u5F55\u5931\u8D25");
       } finally {
         setLoading(false);
       }
     };
+    const loadMoreHistory = async () => {
+      const { keyword, nextCursor } = historyPage;
+      if (!nextCursor || historyPageLoading) {
+        return;
+      }
+      const requestVersion = historyRequestVersionRef.current;
+      setHistoryPageLoading(true);
+      try {
+        const data = await fetchHistoryPage(keyword, nextCursor);
+        if (historyRequestVersionRef.current === requestVersion) {
+          applyHistoryPage(keyword, data, true);
+        }
+      } catch (error) {
+        message8.error("\u52A0\u8F7D\u66F4\u591A\u5386\u53F2\u8BB0\u5F55\u5931\u8D25");
+      } finally {
+        setHistoryPageLoading(false);
+      }
+    };
     const handleClearHistory = async () => {
       setLoading(true);
       try {
@@ -6775,6 +6810,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
         if (result.success) {
           message8.success("\u5386\u53F2\u8BB0\u5F55\u5DF2\u6E05\u7A7A");
           setHistoryData([]);
+          setHistoryPage({ keyword: "", nextCursor: null, matchedCount: 0, totalCount: 0 });
         } else {
           message8.error("\u6E05\u7A7A\u5386\u53F2\u8BB0\u5F55\u5931\u8D25: " + (result.message || "\u672A\u77E5\u9519\u8BEF"));
         }
@@ -6823,7 +6859,10 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
         if (result.success) {
           const checkedRecords = result.records || [];
           const missingRecords = result.missing_records || checkedRecords.filter((record) => record.needs_reselect);
+          historyRequestVersionRef.current += 1;
           setHistoryData(checkedRecords);
+          setHistoryKeyword("");
+          setHistoryPage({ keyword: "", nextCursor: null, matchedCount: checkedRecords.length, totalCount: checkedRecords.length });
           if (missingRecords.length === 0) {
             message8.success(result.message || "\u5386\u53F2\u8BB0\u5F55\u5747\u5DF2\u5165\u5E93");
             return;
@@ -6956,11 +6995,22 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
       ))));
     };
     const renderHistory = () => {
+      const historyEmpty = !historyData || historyData.length === 0 && !historyPage.totalCount;
       return /* @__PURE__ */ React8.createElement("div", null, /* @__PURE__ */ React8.createElement("div", { className: "jav-section-header" }, /* @__PURE__ */ React8.createElement(Title7, { level: 4, style: { margin: 0 } }, "\u5386\u53F2\u4E0B\u8F7D\u8BB0\u5F55"), /* @__PURE__ */ React8.createElement(Space8, null, /* @__PURE__ */ React8.createElement(
+        Input8.Search,
+        {
+          allowClear: true,
+          placeholder: "\u641C\u7D22\u756A\u53F7\u3001\u6807\u9898\u3001\u6F14\u5458\u6216\u6765\u6E90",
+          value: historyKeyword,
+          onChange: (event) => setHistoryKeyword(event.target.value),
+          onSearch: (value) => fetchHistory(value),
+          style: { width: 240 }
+        }
+      ), /* @__PURE__ */ React8.createElement(
         Button8,
         {
           icon: /* @__PURE__ */ React8.createElement(Icon6, { as: SafetyCertificateOutlined2 }),
-          disabled: !historyData || historyData.length === 0,
+          disabled: historyEmpty,
           loading: checkingHistoryLibrary,
           onClick: handleCheckHistoryLocalLibrary
         },
@@ -6973,7 +7023,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
           okText: "\u786E\u5B9A",
           cancelText: "\u53D6\u6D88"
         },
-        /* @__PURE__ */ React8.createElement(Button8, { danger: true, disabled: !historyData || historyData.length === 0, loading }, "\u6E05\u7A7A\u5386\u53F2\u8BB0\u5F55")
+        /* @__PURE__ */ React8.createElement(Button8, { danger: true, disabled: historyEmpty, loading }, "\u6E05\u7A7A\u5386\u53F2\u8BB0\u5F55")
       ), /* @__PURE__ */ React8.createElement(Button8, { icon: /* @__PURE__ */ React8.createElement(Icon6, { as: ArrowLeftOutlined2 }), onClick: () => setViewMode("search") }, "\u8FD4\u56DE\u67E5\u8BE2"))), /* @__PURE__ */ React8.createElement(Divider5, { className: "jav-section-divider" }), /* @__PURE__ */ React8.createElement(
         antd8.Table,
         {
@@ -7055,7 +7105,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
             }
           ]
         }
-      ));
+      ), historyData && /* @__PURE__ */ React8.createElement("div", { style: { display: "flex", justifyContent: "space-between", alignItems: "center", marginTop: 12 } }, /* @__PURE__ */ React8.createElement(Text8, { type: "secondary" }, "\u5DF2\u52A0\u8F7D ", historyData.length, "/", historyPage.matchedCount || historyData.length, " \u6761", historyPage.keyword ? `\uFF0C\u5171 ${historyPage.totalCount} \u6761\u5386\u53F2\u8BB0\u5F55` : ""), historyPage.nextCursor && /* @__PURE__ */ React8.createElement(Button8, { loading: historyPageLoading, onClick: loadMoreHistory }, "\u52A0\u8F7D\u66F4\u591A")));
     };
     const renderActorsList = () => {
       return /* @__PURE__ */ React8.createElement("div", null, /* @__PURE__ */ React8.createElement("div", { className: "jav-section-header" }, /* @__PURE__ */ React8.createElement(Title7, { level: 4, style: { margin: 0 } }, "\u6D4F\u89C8\u6F14\u5458"), /* @__PURE__ */ React8.createElement(Button8, { icon: /* @__PURE__ */ React8.createElement(Icon6, { as: ArrowLeftOutlined2 }), onClick: () => setViewMode("search") }, "\u8FD4\u56DE\u67E5\u8BE2")), /* @__PURE__ */ React8.createElement(Divider5, { className: "jav-section-divider" }), /* @__PURE__ */ React8.createElement(
@@ -7091,7 +7141,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
       const isDownloadingMovie = !!downloadingMovieIds[movie.id];
       const isMovieDownloaded = movie.status === "local_exists" || movie.status === "already_downloaded" || movie.is_downloaded || movie.in_local_library;
       const rawMovieImage = movie && movie.img || detail && detail.img || "";
-      const movieImage = rawMovieImage && /^https?:/i.test(rawMovieImage) ? `/api/image-proxy?url=${encodeURIComponent(rawMovieImage)}` : rawMovieImage;
+      const movieImage = rawMovieImage && /^https?:/i.test(rawMovieImage) ? `/api/image-proxy?url=${encodeURIComponent(rawMovieImage)}&w=${BROWSE_COVER_IMAGE_WIDTH}` : rawMovieImage;
       const showImage = movieImage && !movieImageLoadErrorMap[movie.id];
       const stars = detail && detail.stars ? detail.stars.map((s) => s.name || s).filter(Boolean) : [];
       const genres = detail && detail.genres ? detail.genres.map((g) => g.name || g).filter(Boolean) : [];
@@ -7432,7 +7482,7 @@ ${(actor.movie_ids || []).join("\n")}`.toLowerCase();
             type: "default",
             block: true,
             icon: /* @__PURE__ */ React8.createElement(Icon6, { as: HistoryOutlined }),
-            onClick: fetchHistory,
+            onClick: () => fetchHistory(historyKeyword),
             className: "jav-sidebar-action"
           },
           "\u67E5\u770B\u5386\u53F2\u8BB0\u5F55"
@@ -55,3 +55,12 @@ test("history redispatch payload uses the latest attempted resource per missing
         { link: "magnet:legacy", movie_id: "ABP-125", source: "yhg007" },
     ]);
 });
+
+test("history view pages and searches records on the server", () => {
+    assert.doesNotMatch(javPage, /fetchWithRetry\('\/api\/history'\)/);
+    assert.match(javPage, /\/api\/history\/records\?\$\{queryParams\.toString\(\)\}/);
+    assert.match(javPage, /queryParams\.set\('cursor', cursor\)/);
+    assert.match(javPage, /queryParams\.set\('q', keyword\)/);
+    assert.match(javPage, /nextCursor: data\?\.next_cursor \|\| null/);
+    assert.match(javPage, /onClick=\{loadMoreHistory\}/);
+});
@@ -42,6 +42,8 @@ test("local library list and card posters prefer local images before remote thum
     assert.match(localLibraryPage, /if \(thumbnailUrl\.startsWith\("\/api\/"\)\) \{[\s\S]*return thumbnailUrl;[\s\S]*if \(record\?\.poster_url\) \{[\s\S]*return record\.poster_url;/);
     assert.match(localLibraryPage, /return proxiedImageSource\(thumbnailUrl \|\| record\?\.metadata\?\.list_thumbnail_url \|\| ""\)/);
     assert.match(localLibraryPage, /variant === "thumbnail"\s*\?\s*thumbnailSource\(record\)/);
+    assert.match(localLibraryPage, /const sizedImageSource = \(url, width\) =>[\s\S]*w=\$\{pixelWidth\}/);
+    assert.match(localLibraryPage, /sizedImageSource\(baseSrc, width \|\| LOCAL_LIBRARY_CARD_IMAGE_WIDTH\)/);
     assert.match(localLibraryPage, /<MoviePoster record=\{record\} compact width=\{listPosterSize\} variant="thumbnail" \/>/);
     assert.match(localLibraryPage, /cover=\{<MoviePoster record=\{record\} variant="thumbnail" \/>\}/);
     assert.match(localLibraryPage, /<MoviePoster record=\{selectedRecord\} onRatio=\{handlePosterAspectRatio\} \/>/);
@@ -84,13 +86,14 @@ test("local library list and card modes support multiple sort rules", () => {
     assert.match(localLibraryPage, /value: "updated_desc"/);
     assert.match(localLibraryPage, /value: "size_desc"/);
     assert.match(localLibraryPage, /value: "resolution_desc"/);
-    assert.match(localLibraryPage, /const sortLocalLibraryRecords = \(records, sortRule\) =>/);
     assert.match(localLibraryPage, /const \[sortRule, setSortRule\] = React\.useState\("date_desc"\)/);
-    assert.match(localLibraryPage, /const sortedRecords = React\.useMemo\(\(\) => sortLocalLibraryRecords\(filteredRecords, sortRule\), \[filteredRecords, sortRule\]\)/);
+    assert.match(localLibraryPage, /sort: sortRule,/);
+    assert.match(localLibraryPage, /queryParams\.set\("sort", query\.sort\)/);
+    assert.doesNotMatch(localLibraryPage, /sortLocalLibraryRecords/);
     assert.match(localLibraryPage, /const visibleGridRecords = React\.useMemo\(\(\) => sortedRecords\.slice\(0, gridVisibleCount\)/);
     assert.match(localLibraryPage, /<Select[\s\S]*value=\{sortRule\}[\s\S]*onChange=\{setSortRule\}[\s\S]*options=\{LOCAL_LIBRARY_SORT_OPTIONS\}/);
     assert.match(localLibraryPage, /dataSource=\{visibleListRecords\}/);
-    assert.match(localLibraryPage, /total=\{sortedRecords\.length\}/);
+    assert.match(localLibraryPage, /total=\{matchedCount\}/);
 });
 
 test("local library search box keeps search and clear actions in the same row", () => {
@@ -264,3 +267,23 @@ test("local library immersive preview uses dark backdrop and closes from backgro
     assert.match(css, /\.jav-library-preview-surface\s*\{[\s\S]*background:\s*transparent;[\s\S]*box-shadow:\s*none;/);
     assert.match(css, /\.jav-library-page\.is-previewing\s*\{[\s\S]*background:\s*#2f2f2f;/);
 });
+
+test("local library sends facet filters to the summary endpoint and loads more pages on scroll", () => {
+    assert.match(localLibraryPage, /const LOCAL_LIBRARY_FILTER_KEYS = \["genres", "stars", "studios", "publishers", "series", "years", "roots"\]/);
+    assert.match(localLibraryPage, /queryParams\.append\(key, value\)/);
+    assert.match(localLibraryPage, /React\.useEffect\(\(\) => \{\s*loadLibrary\(libraryQuery\);\s*\}, \[libraryQuery\]\)/);
+    assert.match(localLibraryPage, /if \(library\.next_cursor && neededRecordCount > sortedRecords\.length\) \{\s*loadMoreLibraryRecords\(\);/);
+    assert.match(localLibraryPage, /fetchLibraryPage\(query, cursor, LOCAL_LIBRARY_NEXT_PAGE_LIMIT\)/);
+    assert.match(localLibraryPage, /const hasMoreGridRecords = gridVisibleCount < matchedCount;/);
+    assert.doesNotMatch(localLibraryPage, /matchesAny\(/);
+    assert.doesNotMatch(localLibraryPage, /countedOptions\(/);
+});
+
+test("local library renders from the first summary page and loads details on preview", () => {
+    assert.match(localLibraryPage, /\/api\/movies\/local-library\/summary\?\$\{queryParams\.toString\(\)\}/);
+    assert.match(localLibraryPage, /fetchLibraryPage\(query, "", LOCAL_LIBRARY_FIRST_PAGE_LIMIT\)/);
+    assert.doesNotMatch(localLibraryPage, /loadRemainingLibraryPages/);
+    assert.match(localLibraryPage, /facetOptions\(library\.facets\.genres\)/);
+    assert.match(localLibraryPage, /setSelectedRecord\(\(current\) => \(current\?\.movie_id === record\.movie_id \? data\.record : current\)\)/);
+    assert.doesNotMatch(localLibraryPage, /fetch\("\/api\/movies\/local-library"\);/);
+});
@@ -1,6 +1,9 @@
 import asyncio
 import json
 import os
+import struct
+import threading
+import time
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -14,11 +17,19 @@ from modules.pan115.schemas import DownloadRequest as Pan115DownloadRequest
 from modules.history.service import local_movie_library_service
 from modules.history.service import local_actor_library_service
 from modules.history import service as history_service_module
+from modules.history import asset_index as asset_index_module
+from modules.common import image_download
+from modules.common import image_thumbnails
 from modules.common import runtime
 from modules.common import paths as common_paths
 from modules.movies import local_scrape
 from modules.movies import local_library as movies_local_library
+from modules.movies import library_watcher as library_watcher_module
+from modules.movies import media_probe
 from modules.movies import metadata_scrapers
+from modules.movies import router as movies_router
+from modules.movies import scrape_cache
+from modules.movies import scrape_images
 from modules.movies import workflows as movies_workflows
 from modules.movies.local_scrape_tasks import LocalScrapeTaskManager
 from modules.movies import service as movies_service
@@ -39,7 +50,7 @@ class FakeMetadataScraperService:
     def __init__(self, fetcher):
         self.fetcher = fetcher
 
-    async def get_movie_detail(self, movie_id):
+    async def get_movie_detail(self, movie_id, force_refresh=False):
         detail = await self.fetcher(movie_id)
         if isinstance(detail, dict) and ("metadata" in detail or "source" in detail or "error" in detail):
             return detail
@@ -108,6 +119,375 @@ def test_download_history_records_and_checks_magnet_links(tmp_path, monkeypatch)
     assert asyncio.run(service.get_magnet_source("ABP-123", "magnet:?xt=urn:btih:def")) == "yhg007"
 
 
+def test_download_history_appends_journal_and_compacts_into_snapshot(tmp_path, monkeypatch):
+    snapshot_path = tmp_path / "downloaded_movies.json"
+    journal_path = tmp_path / "downloaded_movies.journal.jsonl"
+
+    async def fake_get_movie_detail(movie_id):
+        return {"id": movie_id, "title": f"{movie_id} title"}
+
+    monkeypatch.setattr(history_service_module.javbus_api_service, "get_movie_detail", fake_get_movie_detail)
+    compact_threads = []
+    real_compact = history_service_module.DownloadHistoryService._write_snapshot_and_truncate
+
+    def recording_compact(file_path, journal_path, records):
+        compact_threads.append(threading.get_ident())
+        real_compact(file_path, journal_path, records)
+
+    monkeypatch.setattr(history_service_module.DownloadHistoryService, "_write_snapshot_and_truncate", staticmethod(recording_compact))
+
+    async def exercise():
+        service = history_service_module.DownloadHistoryService(str(snapshot_path), compact_bytes=10_000)
+        await service.save_movies(["ABP-123"], ["magnet:?xt=urn:btih:ABC"], ["javbus"])
+        await service.save_movies(["ABP-124"], ["magnet:?xt=urn:btih:DEF"], ["yhg007"])
+        journal_lines = journal_path.read_text(encoding="utf-8").splitlines()
+        snapshot_before = json.loads(snapshot_path.read_text(encoding="utf-8"))
+
+        with journal_path.open("a", encoding="utf-8") as file:
+            file.write('{"op": "upsert", "record": {"movie_id": "TORN')
+        reloaded = history_service_module.DownloadHistoryService(str(snapshot_path), compact_bytes=10_000)
+        reloaded_ids = sorted(record["movie_id"] for record in await reloaded.load_records())
+
+        reloaded.compact_bytes = 1
+        await reloaded.save_movies(["ABP-125"], ["magnet:?xt=urn:btih:GHI"], ["cilisousuo"])
+        return journal_lines, snapshot_before, reloaded_ids
+
+    journal_lines, snapshot_before, reloaded_ids = asyncio.run(exercise())
+    snapshot_after = json.loads(snapshot_path.read_text(encoding="utf-8"))
+    umask = os.umask(0)
+    os.umask(umask)
+    # 原子替换后的快照保持 umask 默认权限，而不是 mkstemp 的 0600
+    assert snapshot_path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+    assert snapshot_before == []
+    assert [json.loads(line)["record"]["movie_id"] for line in journal_lines] == ["ABP-123", "ABP-124"]
+    assert reloaded_ids == ["ABP-123", "ABP-124"]
+    assert sorted(record["movie_id"] for record in snapshot_after) == ["ABP-123", "ABP-124", "ABP-125"]
+    assert journal_path.read_text(encoding="utf-8") == ""
+    # 快照写入与日志清空都在工作线程里完成，不阻塞事件循环
+    assert compact_threads and threading.get_ident() not in compact_threads
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_download_history_clear_survives_crash_before_journal_truncate(tmp_path, monkeypatch):
+    snapshot_path = tmp_path / "downloaded_movies.json"
+
+    async def fake_get_movie_detail(movie_id):
+        return {"id": movie_id, "title": f"{movie_id} title"}
+
+    real_write = history_service_module.write_json_atomic
+
+    def crashing_write(file_path, payload, indent=None):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(history_service_module.javbus_api_service, "get_movie_detail", fake_get_movie_detail)
+
+    async def exercise():
+        service = history_service_module.DownloadHistoryService(str(snapshot_path), compact_bytes=10_000)
+        await service.save_movies(["ABP-123"], ["magnet:?xt=urn:btih:ABC"], ["javbus"])
+        monkeypatch.setattr(history_service_module, "write_json_atomic", crashing_write)
+        with pytest.raises(OSError):
+            await service.clear()
+        monkeypatch.setattr(history_service_module, "write_json_atomic", real_write)
+        reloaded = history_service_module.DownloadHistoryService(str(snapshot_path), compact_bytes=10_000)
+        return await reloaded.load_records()
+
+    assert asyncio.run(exercise()) == []
+
+
+def test_download_history_fetches_metadata_concurrently_outside_lock(tmp_path, monkeypatch):
+    service = history_service_module.DownloadHistoryService(str(tmp_path / "downloaded_movies.json"))
+    calls = []
+    in_flight = 0
+    peak = 0
+
+    async def fake_get_movie_detail(movie_id):
+        nonlocal in_flight, peak
+        calls.append(movie_id)
+        assert not service._lock.locked()
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"id": movie_id, "title": f"{movie_id} title"}
+
+    monkeypatch.setattr(history_service_module.javbus_api_service, "get_movie_detail", fake_get_movie_detail)
+
+    async def exercise():
+        await service.load_records()
+        save = asyncio.create_task(
+            service.save_movies(
+                ["ABP-1", "ABP-2", "abp-1", "ABP-3"],
+                ["magnet:?xt=urn:btih:A", "magnet:?xt=urn:btih:B", "magnet:?xt=urn:btih:C", "magnet:?xt=urn:btih:D"],
+            )
+        )
+        await asyncio.sleep(0)
+        lookup_during_save = await service.is_magnet_downloaded("ABP-1", "magnet:?xt=urn:btih:A")
+        await save
+        return lookup_during_save, await service.get_downloaded_magnet_links("ABP-1")
+
+    lookup_during_save, links = asyncio.run(exercise())
+
+    assert lookup_during_save is False
+    assert sorted(calls) == ["ABP-1", "ABP-2", "ABP-3"]
+    assert peak > 1
+    assert links == ["magnet:?xt=urn:btih:A", "magnet:?xt=urn:btih:C"]
+
+
+def test_history_records_endpoint_paginates_searches_and_returns_304(tmp_path, monkeypatch):
+    from modules.history import router as history_router
+
+    snapshot = [
+        {
+            "movie_id": f"ABP-{index:03d}",
+            "title": f"title {index}",
+            "stars": ["Actor Two" if index % 2 else "Actor One"],
+            "download_time": f"2024-01-{index:02d}T00:00:00",
+            "download_resources": [{"link": f"magnet:?xt=urn:btih:{index}", "source": "yhg007" if index == 3 else "javbus"}],
+        }
+        for index in range(1, 6)
+    ]
+    (tmp_path / "downloaded_movies.json").write_text(json.dumps(snapshot), encoding="utf-8")
+    service = history_service_module.DownloadHistoryService(str(tmp_path / "downloaded_movies.json"))
+    monkeypatch.setattr(history_router, "download_history_service", service)
+
+    async def fake_get_movie_detail(movie_id):
+        return {"id": movie_id, "title": f"{movie_id} new"}
+
+    monkeypatch.setattr(history_service_module.javbus_api_service, "get_movie_detail", fake_get_movie_detail)
+    client = TestClient(main.app)
+
+    first = client.get("/api/history/records", params={"limit": 2})
+    second = client.get("/api/history/records", params={"limit": 2, "cursor": first.json()["next_cursor"]})
+    searched = client.get("/api/history/records", params={"q": "actor one"})
+    by_source = client.get("/api/history/records", params={"q": "YHG007"})
+    unchanged = client.get("/api/history/records", params={"limit": 2}, headers={"If-None-Match": first.headers["etag"]})
+    asyncio.run(service.save_movies(["ABP-900"], ["magnet:?xt=urn:btih:new"], ["javbus"]))
+    changed = client.get("/api/history/records", params={"limit": 2}, headers={"If-None-Match": first.headers["etag"]})
+    invalid = client.get("/api/history/records", params={"cursor": "not-a-cursor"})
+
+    assert [record["movie_id"] for record in first.json()["records"]] == ["ABP-005", "ABP-004"]
+    assert [record["movie_id"] for record in second.json()["records"]] == ["ABP-003", "ABP-002"]
+    assert [record["movie_id"] for record in searched.json()["records"]] == ["ABP-004", "ABP-002"]
+    assert searched.json()["matched_count"] == 2 and searched.json()["total_count"] == 5
+    assert [record["movie_id"] for record in by_source.json()["records"]] == ["ABP-003"]
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert changed.json()["records"][0]["movie_id"] == "ABP-900"
+    assert invalid.status_code == 400
+
+
+def test_sqlite_download_history_imports_json_and_answers_indexed_lookups(tmp_path, monkeypatch):
+    from modules.history.sqlite_history import SqliteDownloadHistoryService
+
+    legacy_path = tmp_path / "downloaded_movies.json"
+    legacy_path.write_text(
+        json.dumps([{"movie_id": "abp-100", "download_time": "2024-01-01", "download_links": ["magnet:?xt=urn:btih:OLD"], "source": "javbus"}]),
+        encoding="utf-8",
+    )
+
+    async def fake_get_movie_detail(movie_id):
+        return {"id": movie_id, "title": f"{movie_id} title", "stars": [{"name": "Actor One"}]}
+
+    monkeypatch.setattr(history_service_module.javbus_api_service, "get_movie_detail", fake_get_movie_detail)
+
+    async def exercise():
+        service = SqliteDownloadHistoryService(str(tmp_path / "history.db"), import_path=str(legacy_path))
+        await service.save_movies(["abp-123"], ["magnet:?xt=urn:btih:ABC"], ["cilisousuo"])
+        await service.save_movies(["ABP-123"], ["MAGNET:?XT=URN:BTIH:ABC"], ["yhg007"])
+        await service.save_movies(["ABP-123"], ["magnet:?xt=urn:btih:DEF"], ["yhg007"])
+        reopened = SqliteDownloadHistoryService(str(tmp_path / "history.db"), import_path=None)
+        history = await reopened.get_history()
+        # 旧版本写入的来源未归一化，读取时与 JSON 后端一样返回小写
+        await reopened._run(
+            lambda connection: connection.execute("UPDATE download_resources SET source = ' YHG007 ' WHERE link_key LIKE '%def'")
+        )
+        return (
+            history,
+            await reopened.is_magnet_downloaded("abp-100", "magnet:?xt=urn:btih:old"),
+            await reopened.is_magnet_downloaded("ABP-123", "magnet:?xt=urn:btih:missing"),
+            await reopened.get_magnet_source("ABP-123", "magnet:?xt=urn:btih:abc"),
+            await reopened.get_magnet_source("ABP-123", "magnet:?xt=urn:btih:def"),
+            await reopened.get_downloaded_movie_status("abp-123"),
+            await reopened.clear(),
+            await reopened.is_movie_downloaded("ABP-100"),
+            # 清空后重启不会再次导入旧 JSON 历史
+            await SqliteDownloadHistoryService(str(tmp_path / "history.db"), import_path=str(legacy_path)).get_history(),
+        )
+
+    history, old_found, missing_found, source, legacy_source, status, cleared, after_clear, after_restart = asyncio.run(exercise())
+
+    assert [record["movie_id"] for record in history] == ["ABP-123", "ABP-100"]
+    assert history[0]["stars"] == ["Actor One"]
+    assert old_found is True and missing_found is False
+    assert source == "cilisousuo"
+    assert legacy_source == "yhg007"
+    assert status["is_downloaded"] is True
+    assert status["download_resources"] == [
+        {"link": "magnet:?xt=urn:btih:ABC", "source": "cilisousuo"},
+        {"link": "magnet:?xt=urn:btih:DEF", "source": "yhg007"},
+    ]
+    assert cleared["success"] is True and after_clear is False
+    assert after_restart == []
+
+
+def test_local_library_write_behind_coalesces_information_updates(tmp_path, monkeypatch):
+    library_path = tmp_path / "local_library.json"
+    writes = []
+    real_write = history_service_module.write_json_atomic
+
+    def counting_write(file_path, payload, indent=None):
+        writes.append(file_path)
+        real_write(file_path, payload, indent)
+
+    monkeypatch.setattr(history_service_module, "write_json_atomic", counting_write)
+
+    async def exercise():
+        service = history_service_module.LocalMovieLibraryService(str(library_path), flush_interval_seconds=0.05)
+        await service.update_from_scan(
+            str(tmp_path),
+            [{"movie_id": f"ABP-{index}", "path": str(tmp_path / f"ABP-{index}.mp4"), "size": 1} for index in range(5)],
+        )
+        writes_after_scan = len(writes)
+        for index in range(5):
+            await service.update_information(f"ABP-{index}", {"title": f"title {index}"}, "success", None, "", "2024-01-01")
+        pending_on_disk = json.loads(library_path.read_text(encoding="utf-8"))["movies"]["ABP-4"].get("title")
+        await asyncio.sleep(0.1)
+        flushed_writes = len(writes) - writes_after_scan
+        await service.update_information("ABP-0", {"title": "renamed"}, "success", None, "", "2024-01-02")
+        synced = await service.sync()
+        return pending_on_disk, flushed_writes, synced, await service.sync()
+
+    pending_on_disk, flushed_writes, synced, second_sync = asyncio.run(exercise())
+    saved = json.loads(library_path.read_text(encoding="utf-8"))["movies"]
+
+    assert pending_on_disk != "title 4"
+    assert flushed_writes == 1
+    assert synced is True and second_sync is False
+    assert saved["ABP-4"]["title"] == "title 4"
+    assert saved["ABP-0"]["title"] == "renamed"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_local_library_failed_flush_keeps_pending_updates(tmp_path, monkeypatch):
+    library_path = tmp_path / "local_library.json"
+    real_write = history_service_module.write_json_atomic
+    failures = []
+
+    def flaky_write(file_path, payload, indent=None):
+        if not failures:
+            failures.append(file_path)
+            raise OSError("disk full")
+        real_write(file_path, payload, indent)
+
+    async def exercise():
+        service = history_service_module.LocalMovieLibraryService(str(library_path), flush_interval_seconds=0.05)
+        await service.update_from_scan(str(tmp_path), [{"movie_id": "ABP-1", "path": str(tmp_path / "ABP-1.mp4"), "size": 1}])
+        monkeypatch.setattr(history_service_module, "write_json_atomic", flaky_write)
+        await service.update_information("ABP-1", {"title": "pending"}, "success", None, "", "2024-01-01")
+        await asyncio.sleep(0.1)
+        return await service.sync()
+
+    synced = asyncio.run(exercise())
+    saved = json.loads(library_path.read_text(encoding="utf-8"))["movies"]
+
+    assert failures
+    assert synced is True
+    assert saved["ABP-1"]["title"] == "pending"
+
+
+def test_local_library_search_ranks_facets_and_paginates(tmp_path, monkeypatch):
+    library_service = history_service_module.LocalMovieLibraryService(str(tmp_path / "local_library.json"))
+    monkeypatch.setattr(movies_local_library, "local_movie_library_service", library_service)
+    movies = {
+        "ABP-001": {"title": "Summer Beach Story", "date": "2024-01-01", "stars": [{"name": "Alice"}], "genres": ["剧情"], "studio": "Prestige"},
+        "ABP-002": {"title": "Winter Tale", "date": "2024-02-01", "stars": ["Alice", "Bob"], "genres": ["剧情", "中文字幕"], "studio": "Prestige", "series": "Beach Series"},
+        "SSIS-003": {"title": "City Night", "date": "2024-03-01", "stars": ["Bob"], "genres": ["中文字幕"], "studio": "S1"},
+    }
+
+    async def scan():
+        await library_service.update_from_scan(
+            str(tmp_path),
+            [
+                {
+                    "movie_id": movie_id,
+                    "path": str(tmp_path / f"{movie_id}.mp4"),
+                    "size": 1,
+                    "metadata": metadata,
+                    "full_text": " ".join([movie_id, metadata["title"]]),
+                }
+                for movie_id, metadata in movies.items()
+            ],
+        )
+
+    asyncio.run(scan())
+    client = TestClient(main.app)
+
+    ranked = client.get("/api/movies/local-library/search", params={"q": "beach"}).json()
+    filtered = client.get("/api/movies/local-library/search", params={"star": "Bob", "page_size": 1, "page": 2}).json()
+    short_token = client.get("/api/movies/local-library/search", params={"q": "字幕"}).json()
+
+    assert ranked["success"] is True
+    assert [record["movie_id"] for record in ranked["records"]] == ["ABP-001", "ABP-002"]
+    assert {"value": "Alice", "count": 2} in ranked["facets"]["stars"]
+    assert ranked["facets"]["studio"] == [{"value": "Prestige", "count": 2}]
+    assert filtered["total"] == 2 and [record["movie_id"] for record in filtered["records"]] == ["ABP-002"]
+    assert {record["movie_id"] for record in short_token["records"]} == {"ABP-002", "SSIS-003"}
+
+    asyncio.run(library_service.delete_movie("ABP-001"))
+    after_delete = client.get("/api/movies/local-library/search", params={"q": "beach"}).json()
+    assert [record["movie_id"] for record in after_delete["records"]] == ["ABP-002"]
+
+
+def test_local_library_summary_pages_sorted_light_rows_with_cursor(tmp_path, monkeypatch):
+    library_service = history_service_module.LocalMovieLibraryService(str(tmp_path / "local_library.json"))
+    monkeypatch.setattr(movies_local_library, "local_movie_library_service", library_service)
+
+    async def scan():
+        await library_service.update_from_scan(
+            str(tmp_path),
+            [
+                {
+                    "movie_id": f"ABP-{index:03d}",
+                    "path": str(tmp_path / f"ABP-{index:03d}.mp4"),
+                    "file_name": f"ABP-{index:03d}.mp4",
+                    "size": index * 100,
+                    "metadata": {
+                        "id": f"ABP-{index:03d}",
+                        "title": f"Title {index}",
+                        "date": f"2024-01-{index:02d}" if index != 3 else "",
+                        "genres": ["剧情"] if index % 2 else ["中文字幕"],
+                    },
+                    "full_text": f"ABP-{index:03d} hidden-{index}",
+                }
+                for index in range(1, 6)
+            ],
+        )
+
+    asyncio.run(scan())
+    client = TestClient(main.app)
+
+    first = client.get("/api/movies/local-library/summary", params={"limit": 2}).json()
+    second = client.get("/api/movies/local-library/summary", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    third = client.get("/api/movies/local-library/summary", params={"limit": 2, "cursor": second["next_cursor"]}).json()
+    filtered = client.get("/api/movies/local-library/summary", params={"sort": "size_asc", "genres": ["剧情"]}).json()
+    searched = client.get("/api/movies/local-library/summary", params={"q": "hidden-4"}).json()
+    bad_cursor = client.get("/api/movies/local-library/summary", params={"cursor": first["next_cursor"], "sort": "size_asc"}).json()
+    detail = client.get("/api/movies/local-library/ABP-001").json()
+
+    pages = [[record["movie_id"] for record in page["records"]] for page in (first, second, third)]
+    assert pages == [["ABP-005", "ABP-004"], ["ABP-002", "ABP-001"], ["ABP-003"]]
+    assert third["next_cursor"] is None and "facets" not in second
+    assert first["total_movies"] == 5 and first["total_size"] == 1500
+    assert {"value": "剧情", "count": 3} in first["facets"]["genres"]
+    assert "metadata" not in first["records"][0] and "full_text" not in first["records"][0]
+    assert [record["movie_id"] for record in filtered["records"]] == ["ABP-001", "ABP-003", "ABP-005"]
+    assert filtered["matched_count"] == 3
+    assert [record["movie_id"] for record in searched["records"]] == ["ABP-004"]
+    assert bad_cursor["error"] == "invalid_cursor"
+    assert detail["record"]["metadata"]["title"] == "Title 1" and "media_info" in detail["record"]
+
+
 def test_download_history_can_be_checked_against_local_library(tmp_path, monkeypatch):
     history_service = history_service_module.DownloadHistoryService(str(tmp_path / "downloaded_movies.json"))
     library_service = history_service_module.LocalMovieLibraryService(str(tmp_path / "local_library.json"))
@@ -710,6 +1090,114 @@ def test_metadata_scraper_chain_uses_implemented_non_javbus_provider(monkeypatch
     assert any(entry["provider"] == "libredmm" and "matched" in entry["message"] for entry in result["logs"])
 
 
+def test_metadata_scraper_caches_provider_results_with_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    cache_path = str(tmp_path / "scrape_cache.db")
+    cache = scrape_cache.MetadataScrapeCache(cache_path, found_ttl_seconds=3600, not_found_ttl_seconds=60, clock=lambda: now[0])
+    cache.open()
+    service = metadata_scrapers.MetadataScraperService(cache)
+    monkeypatch.setattr(
+        metadata_scrapers.runtime,
+        "get_scrapers_config",
+        lambda: {
+            "priority": ["r18dev", "libredmm"],
+            "r18dev": {"enabled": True, "request_delay": 0},
+            "libredmm": {"enabled": True, "request_delay": 0},
+        },
+    )
+    calls = []
+
+    async def fake_r18dev(movie_id, provider_config):
+        calls.append(("r18dev", movie_id))
+        return None
+
+    async def fake_libredmm(movie_id, provider_config):
+        calls.append(("libredmm", movie_id))
+        return {"id": movie_id, "title": "LibreDMM Title"}
+
+    monkeypatch.setattr(metadata_scrapers, "fetch_r18dev_movie_detail", fake_r18dev)
+    monkeypatch.setattr(metadata_scrapers, "fetch_libredmm_movie_detail", fake_libredmm)
+
+    first = asyncio.run(service.get_movie_detail("ABP-123"))
+    second = asyncio.run(service.get_movie_detail("ABP-123"))
+
+    assert first["source"] == second["source"] == "libredmm"
+    assert second["metadata"]["title"] == "LibreDMM Title"
+    assert second["cached"] is True
+    assert calls == [("r18dev", "ABP-123"), ("libredmm", "ABP-123")]
+
+    # 未匹配结果过期后重新查询，匹配结果仍然有效
+    now[0] += 120
+    asyncio.run(service.get_movie_detail("ABP-123"))
+    assert calls[2:] == [("r18dev", "ABP-123")]
+
+    asyncio.run(service.get_movie_detail("ABP-123", force_refresh=True))
+    assert calls[3:] == [("r18dev", "ABP-123"), ("libredmm", "ABP-123")]
+    cache.close()
+
+    reopened = scrape_cache.MetadataScrapeCache(cache_path, clock=lambda: now[0])
+    reopened.open()
+    assert asyncio.run(reopened.get("abp-123", "libredmm"))[0] == "found"
+    assert asyncio.run(reopened.get("abp-123", "r18dev")) == ("not_found", None)
+    reopened.close()
+    assert asyncio.run(reopened.get("abp-123", "libredmm")) is None
+
+
+def test_metadata_scraper_hedges_providers_and_cancels_lower_priority(monkeypatch):
+    monkeypatch.setattr(
+        metadata_scrapers.runtime,
+        "get_scrapers_config",
+        lambda: {
+            "priority": ["r18dev", "libredmm", "jav321", "fc2"],
+            "parallel_providers": 2,
+            "r18dev": {"enabled": True, "request_delay": 0},
+            "libredmm": {"enabled": True, "request_delay": 0},
+            "jav321": {"enabled": True, "request_delay": 0},
+            "fc2": {"enabled": True, "request_delay": 0},
+        },
+    )
+    events = []
+
+    async def fake_r18dev(movie_id, provider_config):
+        events.append("r18dev start")
+        await asyncio.sleep(0.02)
+        events.append("r18dev done")
+        return None
+
+    async def fake_libredmm(movie_id, provider_config):
+        events.append("libredmm start")
+        await asyncio.sleep(0.05)
+        return {"id": movie_id, "title": "LibreDMM Title"}
+
+    async def fake_jav321(movie_id, provider_config):
+        events.append("jav321 start")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            events.append("jav321 cancelled")
+            raise
+        return {"id": movie_id, "title": "Jav321 Title"}
+
+    async def fake_fc2(movie_id, provider_config):
+        events.append("fc2 start")
+        return {"id": movie_id}
+
+    monkeypatch.setattr(metadata_scrapers, "fetch_r18dev_movie_detail", fake_r18dev)
+    monkeypatch.setattr(metadata_scrapers, "fetch_libredmm_movie_detail", fake_libredmm)
+    monkeypatch.setattr(metadata_scrapers, "fetch_jav321_movie_detail", fake_jav321)
+    monkeypatch.setattr(metadata_scrapers, "fetch_fc2_movie_detail", fake_fc2)
+
+    started = time.perf_counter()
+    result = asyncio.run(metadata_scrapers.MetadataScraperService().get_movie_detail("ABP-123"))
+
+    assert time.perf_counter() - started < 1
+    assert result["source"] == "libredmm"
+    assert result["metadata"]["title"] == "LibreDMM Title"
+    assert [entry["provider"] for entry in result["logs"]] == ["r18dev", "libredmm"]
+    # 前两个刮削源同时开始，r18dev 未匹配后补上 jav321，libredmm 匹配后取消 jav321
+    assert events == ["r18dev start", "libredmm start", "r18dev done", "jav321 start", "jav321 cancelled"]
+
+
 def test_metadata_scraper_availability_test_reports_success_and_failure(monkeypatch):
     async def fake_javbus(movie_id):
         return {"id": movie_id, "title": "JavBus OK"}
@@ -1074,6 +1562,26 @@ def test_system_settings_rejects_invalid_javbus_values():
     assert response.json()["detail"] == "base_url_must_be_http_url"
 
 
+class _FakeImageStream:
+    """把 FakeAsyncClient.get 返回的响应包装成 client.stream() 的异步上下文"""
+
+    def __init__(self, pending):
+        self.pending = pending
+
+    async def __aenter__(self):
+        response = await self.pending
+
+        async def aiter_bytes(chunk_size=None):
+            yield response.content
+
+        response.headers = getattr(response, "headers", None) or {}
+        response.aiter_bytes = aiter_bytes
+        return response
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
 def test_local_scrape_image_download_uses_configured_retry_policy(tmp_path, monkeypatch):
     attempts = []
     sleeps = []
@@ -1085,9 +1593,11 @@ def test_local_scrape_image_download_uses_configured_retry_policy(tmp_path, monk
 
         def raise_for_status(self) -> None:
             if self.status_code >= 400:
-                raise local_scrape.httpx.HTTPStatusError("failed", request=None, response=self)
+                raise image_download.httpx.HTTPStatusError("failed", request=None, response=self)
 
     class FakeAsyncClient:
+        is_closed = False
+
         def __init__(self, **kwargs) -> None:
             self.kwargs = kwargs
 
@@ -1097,6 +1607,9 @@ def test_local_scrape_image_download_uses_configured_retry_policy(tmp_path, monk
         async def __aexit__(self, exc_type, exc, tb):
             return False
 
+        def stream(self, method, url, headers=None):
+            return _FakeImageStream(self.get(url, headers=headers))
+
         async def get(self, url, headers=None):
             attempts.append(url)
             return FakeResponse(503 if len(attempts) < 4 else 200)
@@ -1104,10 +1617,12 @@ def test_local_scrape_image_download_uses_configured_retry_policy(tmp_path, monk
     async def fake_sleep(seconds):
         sleeps.append(seconds)
 
-    monkeypatch.setattr(local_scrape.httpx, "AsyncClient", FakeAsyncClient)
-    monkeypatch.setattr(local_scrape.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(image_download.httpx, "AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr(image_download, "image_client_pool", image_download.ImageClientPool())
+    monkeypatch.setattr(image_download, "image_validator_store", image_download.ImageValidatorStore(str(tmp_path / "validators.json")))
+    monkeypatch.setattr(image_download.asyncio, "sleep", fake_sleep)
     monkeypatch.setattr(
-        local_scrape,
+        image_download,
         "get_javbus_config",
         lambda: {
             "image_retry_attempts": 4,
@@ -1128,12 +1643,15 @@ def test_local_scrape_image_download_uses_configured_javbus_referer(tmp_path, mo
     captured_headers = []
 
     class FakeResponse:
+        status_code = 200
         content = b"cover"
 
         def raise_for_status(self) -> None:
             return None
 
     class FakeAsyncClient:
+        is_closed = False
+
         def __init__(self, **kwargs) -> None:
             self.kwargs = kwargs
 
@@ -1143,13 +1661,18 @@ def test_local_scrape_image_download_uses_configured_javbus_referer(tmp_path, mo
         async def __aexit__(self, exc_type, exc, tb):
             return False
 
+        def stream(self, method, url, headers=None):
+            return _FakeImageStream(self.get(url, headers=headers))
+
         async def get(self, url, headers=None):
             captured_headers.append(headers or {})
             return FakeResponse()
 
-    monkeypatch.setattr(local_scrape.httpx, "AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr(image_download.httpx, "AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr(image_download, "image_client_pool", image_download.ImageClientPool())
+    monkeypatch.setattr(image_download, "image_validator_store", image_download.ImageValidatorStore(str(tmp_path / "validators.json")))
     monkeypatch.setattr(
-        local_scrape,
+        image_download,
         "get_javbus_config",
         lambda: {
             "base_url": "https://javbus.example.test/custom",
@@ -1166,6 +1689,74 @@ def test_local_scrape_image_download_uses_configured_javbus_referer(tmp_path, mo
     assert target.read_bytes() == b"cover"
 
 
+def test_image_download_streams_through_pooled_client_with_etag_revalidation(tmp_path, monkeypatch):
+    created_clients = []
+    requests = []
+    truncated = {"remaining": 1}
+    real_async_client = image_download.httpx.AsyncClient
+
+    def handler(request):
+        requests.append((request.url.path, request.headers.get("if-none-match")))
+        if request.url.path == "/truncated.jpg" and truncated["remaining"]:
+            truncated["remaining"] -= 1
+            return image_download.httpx.Response(200, headers={"content-length": "100"}, content=b"partial")
+        if request.headers.get("if-none-match") == '"v1"':
+            return image_download.httpx.Response(304)
+        return image_download.httpx.Response(200, headers={"etag": '"v1"'}, content=b"image:" + request.url.path.encode())
+
+    def pooled_client(**kwargs):
+        created_clients.append(kwargs)
+        return real_async_client(transport=image_download.httpx.MockTransport(handler), **kwargs)
+
+    monkeypatch.setattr(image_download.httpx, "AsyncClient", pooled_client)
+    monkeypatch.setattr(image_download, "image_client_pool", image_download.ImageClientPool())
+    monkeypatch.setattr(image_download, "image_validator_store", image_download.ImageValidatorStore(str(tmp_path / "validators.json")))
+    monkeypatch.setattr(image_download, "IMAGE_VALIDATOR_SAVE_INTERVAL_SECONDS", 0.0)
+    monkeypatch.setattr(
+        image_download,
+        "get_javbus_config",
+        lambda: {"image_retry_attempts": 2, "image_retry_backoff_seconds": 0},
+    )
+    poster = tmp_path / "ABP-123-poster.jpg"
+    thumb = tmp_path / "ABP-123-thumb.jpg"
+
+    async def exercise():
+        await image_download.download_image("https://img.example/cover.jpg", poster, True)
+        await image_download.download_image("https://img.example/truncated.jpg", thumb, True)
+        first_mtime = poster.stat().st_mtime_ns
+        await image_download.download_image("https://img.example/cover.jpg", poster, True)
+        unchanged = poster.stat().st_mtime_ns == first_mtime
+        poster.write_bytes(b"edited locally")
+        await image_download.download_image("https://img.example/cover.jpg", poster, True)
+        # 换了封面地址时不能带上旧地址的 ETag，否则 304 会保留旧图
+        await image_download.download_image("https://img.example/new-cover.jpg", poster, True)
+        await image_download.image_client_pool.aclose()
+        return unchanged
+
+    unchanged = asyncio.run(exercise())
+
+    assert len(created_clients) == 1
+    assert created_clients[0]["limits"] == image_download.IMAGE_CLIENT_LIMITS
+    assert requests == [
+        ("/cover.jpg", None),
+        ("/truncated.jpg", None),
+        ("/truncated.jpg", None),
+        ("/cover.jpg", '"v1"'),
+        ("/cover.jpg", None),
+        ("/new-cover.jpg", None),
+    ]
+    assert unchanged is True
+    assert poster.read_bytes() == b"image:/new-cover.jpg"
+    umask = os.umask(0)
+    os.umask(umask)
+    assert thumb.stat().st_mode & 0o777 == 0o666 & ~umask
+    assert thumb.read_bytes() == b"image:/truncated.jpg"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["ABP-123-poster.jpg", "ABP-123-thumb.jpg", "validators.json"]
+    saved = json.loads((tmp_path / "validators.json").read_text(encoding="utf-8"))
+    assert saved["entries"][str(poster)]["etag"] == '"v1"'
+    assert saved["entries"][str(poster)]["url"] == "https://img.example/new-cover.jpg"
+
+
 def test_path_browser_lists_only_child_directories(tmp_path):
     (tmp_path / "Movies").mkdir()
     (tmp_path / "Downloads").mkdir()
@@ -1315,7 +1906,7 @@ def test_movies_payload_refines_results_with_multiple_filter_tags(monkeypatch):
                 "pagination": {"total": 2},
             }
 
-        async def get_movie_detail(self, movie_id):
+        async def get_movie_detail(self, movie_id, force_refresh=False):
             details = {
                 "MATCH-001": {
                     "genres": [{"id": "4y", "name": "Genre A"}, {"id": "5g", "name": "Genre B"}],
@@ -1357,7 +1948,7 @@ def test_movies_payload_can_exclude_vr_movies_by_genre_and_title(monkeypatch):
                 "pagination": {"total": 3},
             }
 
-        async def get_movie_detail(self, movie_id):
+        async def get_movie_detail(self, movie_id, force_refresh=False):
             details = {
                 "KEEP-001": {"title": "Regular Movie", "genres": [{"id": "drama", "name": "Drama"}]},
                 "VR-GENRE-001": {"title": "Regular Title", "genres": [{"id": "vr", "name": "VR"}]},
@@ -1396,7 +1987,7 @@ def test_movies_payload_applies_subtitle_filter_to_movie_identifiers(monkeypatch
                 "pagination": {"total": 4},
             }
 
-        async def get_movie_detail(self, movie_id):
+        async def get_movie_detail(self, movie_id, force_refresh=False):
             self.detail_calls.append(movie_id)
             return {}
 
@@ -1414,6 +2005,72 @@ def test_movies_payload_applies_subtitle_filter_to_movie_identifiers(monkeypatch
     assert payload["pagination"]["total"] == 2
 
 
+def _patch_dispatch_prechecks(monkeypatch, is_movie_present, is_magnet_downloaded):
+    async def present_movie_ids(movie_ids):
+        return {str(movie_id).upper() for movie_id in movie_ids if await is_movie_present(movie_id)}
+
+    async def downloaded_magnet_pairs(pairs):
+        return {
+            (str(movie_id).strip().upper(), str(link).strip().lower())
+            for movie_id, link in pairs
+            if await is_magnet_downloaded(movie_id, link)
+        }
+
+    monkeypatch.setattr(history_service_module.local_movie_library_service, "present_movie_ids", present_movie_ids)
+    monkeypatch.setattr(history_service_module.download_history_service, "downloaded_magnet_pairs", downloaded_magnet_pairs)
+
+
+def test_dispatch_planner_checks_batch_once_and_replaces_tried_links_concurrently(monkeypatch):
+    from modules.magnets.dispatch_planner import plan_magnet_dispatch
+
+    bulk_calls = []
+    in_flight = 0
+    peak = 0
+
+    async def present_movie_ids(movie_ids):
+        bulk_calls.append(("library", sorted(movie_ids)))
+        return {"M2"}
+
+    async def downloaded_magnet_pairs(pairs):
+        bulk_calls.append(("history", sorted(pairs)))
+        return {("M3", "magnet:tried-a"), ("M4", "magnet:tried-b"), ("M6", "magnet:dead")}
+
+    async def find_replacement(movie_id, magnet_link, magnet_source):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if movie_id == "M6":
+            return None
+        return {"link": "magnet:fresh", "source": "yhg007"}
+
+    monkeypatch.setattr(history_service_module.local_movie_library_service, "present_movie_ids", present_movie_ids)
+    monkeypatch.setattr(history_service_module.download_history_service, "downloaded_magnet_pairs", downloaded_magnet_pairs)
+
+    plan = asyncio.run(
+        plan_magnet_dispatch(
+            ["magnet:ok", "magnet:x", "MAGNET:TRIED-A", "magnet:tried-b", "magnet:OK ", "magnet:dead", ""],
+            ["M1", "m2", "M3", "M4", "M5", "M6", "M7"],
+            ["javbus", "javbus", "cilisousuo", "javbus", None],
+            find_replacement,
+        )
+    )
+
+    assert [item.skip_reason for item in plan] == [
+        "",
+        "already_exists",
+        "",
+        "duplicate_magnet",
+        "duplicate_magnet",
+        "magnet_already_tried",
+        "empty_magnet",
+    ]
+    assert (plan[2].magnet, plan[2].original_magnet, plan[2].source) == ("magnet:fresh", "MAGNET:TRIED-A", "yhg007")
+    assert [kind for kind, _args in bulk_calls] == ["library", "history"]
+    assert peak == 3
+
+
 def test_download_magnets_to_aria2_routes_success_and_failures(monkeypatch):
     class FakeAria2Client:
         def __init__(self):
@@ -1443,18 +2100,17 @@ def test_download_magnets_to_aria2_routes_success_and_failures(monkeypatch):
     async def fake_save_movies(movie_ids, magnet_links=None, magnet_sources=None):
         saved_downloads.extend(zip(movie_ids, magnet_links or [], magnet_sources or []))
 
-    async def fake_get_same_source_replacement_magnet_payload(movie_id, magnet_link, magnet_source=None):
+    async def fake_get_replacement_magnet_payload(movie_id, magnet_link, magnet_source=None):
         fallback_calls.append((movie_id, magnet_link, magnet_source))
         return {"link": "magnet:fresh", "source": magnet_source, "title": "fresh fallback"}
 
     monkeypatch.setattr(webdav_router, "session_store", FakeSessionStore())
-    monkeypatch.setattr(webdav_service.local_movie_library_service, "is_movie_present", fake_is_movie_present)
-    monkeypatch.setattr(webdav_service.download_history_service, "is_magnet_downloaded", fake_is_magnet_downloaded)
+    _patch_dispatch_prechecks(monkeypatch, fake_is_movie_present, fake_is_magnet_downloaded)
     monkeypatch.setattr(webdav_service.download_history_service, "save_movies", fake_save_movies)
     monkeypatch.setattr(
         webdav_service,
-        "get_same_source_replacement_magnet_payload",
-        fake_get_same_source_replacement_magnet_payload,
+        "get_replacement_magnet_payload",
+        fake_get_replacement_magnet_payload,
     )
 
     client = TestClient(main.app)
@@ -1650,6 +2306,120 @@ def test_chinese_subtitle_detection_covers_common_release_markers():
     assert not any(result_has_chinese_subtitle(result) for result in negatives)
 
 
+def test_cilisousuo_hedged_detail_fetch_prefers_highest_ranked_and_cancels_losers(monkeypatch):
+    import cilisousuo_cli
+
+    cilisousuo_cli.clear_detail_cache()
+    candidates = [
+        cilisousuo_cli.SearchResult(title=f"ABP-123 {name}", filename="", size="", detail_url=f"https://example.test/{name}", detail_path=f"/{name}")
+        for name in ("dead", "alive", "slow")
+    ]
+    fetched = []
+    cancelled = []
+
+    async def fake_fetch_text(client, url):
+        name = url.rsplit("/", 1)[-1]
+        fetched.append(name)
+        if name == "dead":
+            await asyncio.sleep(0.05)
+            raise RuntimeError("detail page gone")
+        if name == "alive":
+            return '<input id="input-magnet" value="magnet:?xt=urn:btih:ALIVE">'
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+        return '<input id="input-magnet" value="magnet:?xt=urn:btih:SLOW">'
+
+    monkeypatch.setattr(cilisousuo_cli, "fetch_text", fake_fetch_text)
+
+    best = asyncio.run(cilisousuo_cli.fetch_first_resolved_detail(None, candidates, stagger_seconds=0.01))
+    again = asyncio.run(cilisousuo_cli.fetch_first_resolved_detail(None, candidates[1:2], stagger_seconds=0.01))
+
+    assert best is candidates[1]
+    assert best.magnet == "magnet:?xt=urn:btih:ALIVE"
+    assert cancelled == ["slow"]
+    assert again.magnet == "magnet:?xt=urn:btih:ALIVE"
+    assert fetched.count("alive") == 1
+    cilisousuo_cli.clear_detail_cache()
+
+
+def test_cilisousuo_detail_cache_expires_missing_magnets_quickly(monkeypatch):
+    import cilisousuo_cli
+
+    cilisousuo_cli.clear_detail_cache()
+    now = {"value": 1000.0}
+    pages = {"/empty": "<html></html>", "/found": '<input id="input-magnet" value="magnet:?xt=urn:btih:FOUND">'}
+    fetched = []
+
+    async def fake_fetch_text(client, url):
+        path = url.removeprefix("https://example.test")
+        fetched.append(path)
+        return pages[path]
+
+    monkeypatch.setattr(cilisousuo_cli, "fetch_text", fake_fetch_text)
+    monkeypatch.setattr(cilisousuo_cli.time, "monotonic", lambda: now["value"])
+    results = {
+        path: cilisousuo_cli.SearchResult(title="ABP-123", filename="", size="", detail_url=f"https://example.test{path}", detail_path=path)
+        for path in pages
+    }
+
+    async def resolve_all():
+        return [await cilisousuo_cli.resolve_detail_magnet(None, result) for result in results.values()]
+
+    first = asyncio.run(resolve_all())
+    now["value"] += cilisousuo_cli.DETAIL_CACHE_MISS_EXPIRE_SECONDS - 1
+    asyncio.run(resolve_all())
+    pages["/empty"] = '<input id="input-magnet" value="magnet:?xt=urn:btih:LATE">'
+    now["value"] += 1
+    later = asyncio.run(resolve_all())
+    cilisousuo_cli.clear_detail_cache()
+
+    assert first == [None, "magnet:?xt=urn:btih:FOUND"]
+    assert later == ["magnet:?xt=urn:btih:LATE", "magnet:?xt=urn:btih:FOUND"]
+    assert fetched == ["/empty", "/found", "/empty"]
+
+
+def test_batched_magnet_classifier_matches_per_candidate_rules():
+    import cilisousuo_cli
+    from modules.common.magnet_classifier import classify_candidates
+    from modules.common.subtitles import has_chinese_subtitle
+
+    titles = [
+        "ABP-123 \u4e2d\u6587\u5b57\u5e55",
+        "ABP-123C",
+        "ABP-123 chunk",
+        "abp00123 UHD",
+        "ABP-123 2160p",
+        "ABP-123 12160p",
+        "ABP-123 IPX-456 \u5408\u96c6",
+        "ABP-123 Chinese Subs",
+        "\uff21\uff22\uff30-123 \u4e2d \u5b57",
+        "ABP-1234",
+        "",
+        "ABC-123-CARIB",
+    ]
+    filenames = ["ABP-123.mp4", "", "x", "abp123.mkv", "ABP123 [4K].mp4", "y", "z", "", "ABP-123.mp4", "ABP-1234.mp4", "ABP-123 ch.mp4", ""]
+    results = [
+        cilisousuo_cli.SearchResult(title=title, filename=filename, size="20GB" if index % 3 == 0 else "2GB", detail_url="", detail_path="")
+        for index, (title, filename) in enumerate(zip(titles, filenames))
+    ]
+
+    tags = classify_candidates(titles, filenames, "ABP-123")
+    relevant = cilisousuo_cli.filter_irrelevant(results, "ABP-123", allow_chinese_subtitles=False)
+
+    assert tags.is_4k == [cilisousuo_cli.is_4k_resource(t, f) for t, f in zip(titles, filenames)]
+    assert tags.has_subtitle == [has_chinese_subtitle(t) or has_chinese_subtitle(f) for t, f in zip(titles, filenames)]
+    assert tags.is_collection == [
+        cilisousuo_cli._looks_like_collection(t)
+        or len(cilisousuo_cli._find_all_codes(t) | cilisousuo_cli._find_all_codes(f)) >= 2
+        for t, f in zip(titles, filenames)
+    ]
+    assert relevant == [result for result in results if cilisousuo_cli.is_relevant(result, "ABP-123")]
+    assert classify_candidates(titles, filenames, "no code here").code_match == [True] * len(titles)
+
+
 def test_javbus_subtitle_filter_rechecks_filename_markers():
     candidates = [
         {
@@ -1724,6 +2494,227 @@ def test_javbus_best_magnet_retries_after_unhealthy_candidate(monkeypatch):
     assert best["health"]["seeders"] == 2
 
 
+def test_aria2_health_probe_batches_candidates_with_multicall(monkeypatch):
+    test_config = runtime.merge_config(
+        runtime.DEFAULT_CONFIG,
+        {
+            "aria2": {"enabled": True, "url": "http://aria2.test/jsonrpc", "secret": "s3"},
+            "magnet_health": {
+                "enabled": True,
+                "probe_with_aria2": True,
+                "min_seeders": 1,
+                "min_peers": 0,
+                "min_availability": 0,
+                "min_score": 0,
+                "probe_concurrency": 3,
+                "allow_unknown": False,
+            },
+        },
+    )
+    monkeypatch.setattr(runtime, "config", test_config)
+    statuses = {
+        "gid-0": {"status": "error", "numSeeders": "0", "connections": "0"},
+        "gid-1": {"status": "active", "numSeeders": "3", "connections": "5"},
+        "gid-2": {"status": "waiting"},
+    }
+    requests = []
+    clients = []
+
+    class FakeResponse:
+        def __init__(self, payload):
+            self.payload = payload
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return self.payload
+
+    class FakeAria2HttpClient:
+        async def __aenter__(self):
+            clients.append(self)
+            return self
+
+        async def __aexit__(self, *_args):
+            return None
+
+        async def post(self, url, json):
+            requests.append(json)
+            assert json["method"] == "system.multicall"
+            results = []
+            for call in json["params"][0]:
+                assert call["params"][0] == "token:s3"
+                method = call["methodName"]
+                if method == "aria2.addUri":
+                    results.append([f"gid-{len(results)}"])
+                elif method == "aria2.tellStatus":
+                    results.append([statuses[call["params"][1]]])
+                else:
+                    results.append(["OK"])
+            return FakeResponse({"result": results})
+
+    monkeypatch.setattr(magnets_service, "_aria2_probe_client", lambda _config: FakeAria2HttpClient())
+    candidates = [
+        {"title": "dead", "link": "magnet:dead", "size": "10 GB"},
+        {"title": "alive", "link": "magnet:alive", "size": "8 GB"},
+        {"title": "slow", "link": "magnet:slow", "size": "6 GB"},
+    ]
+
+    best = asyncio.run(magnets_service.select_healthy_best_magnet(candidates, lambda remaining: remaining[0]))
+
+    assert best["link"] == "magnet:alive"
+    assert best["health"]["seeders"] == 3
+    assert len(clients) == 1
+    assert [len(request["params"][0]) for request in requests] == [3, 3, 6]
+    removed = {call["params"][1] for call in requests[-1]["params"][0]}
+    assert removed == {"gid-0", "gid-1", "gid-2"}
+
+
+def test_magnet_health_store_reuses_fresh_btih_metrics_across_sources(tmp_path, monkeypatch):
+    from modules.magnets.health_store import MagnetHealthStore, normalize_btih
+
+    btih = "0123456789abcdef0123456789abcdef01234567"
+    store = MagnetHealthStore(str(tmp_path / "magnet_health.json"))
+    monkeypatch.setattr(magnets_service, "magnet_health_store", store)
+    monkeypatch.setattr(magnets_service, "_aria2_probe_available", lambda: True)
+    probes = []
+
+    async def fake_probe(link, config):
+        probes.append(link)
+        return {"seeders": 4.0, "peers": 2.0}
+
+    monkeypatch.setattr(magnets_service, "_probe_magnet_health_with_aria2", fake_probe)
+    config = {
+        "enabled": True,
+        "probe_with_aria2": True,
+        "min_seeders": 1,
+        "allow_unknown": False,
+        "cache_ttl_seconds": 3600,
+    }
+
+    async def scenario():
+        first = await magnets_service.assess_magnet_health(
+            {"link": f"magnet:?xt=urn:btih:{btih.upper()}&dn=javbus", "source": "javbus"},
+            config,
+        )
+        second = await magnets_service.assess_magnet_health(
+            {"link": f"magnet:?xt=urn:btih:{btih}&tr=udp://yhg007", "source": "yhg007"},
+            config,
+        )
+        await store.record_dispatch_results("pikpak", [{"magnet": f"magnet:?xt=urn:btih:{btih}", "success": False, "error": "x", "source": "yhg007"}])
+        expired = await magnets_service.assess_magnet_health(
+            {"link": f"magnet:?xt=urn:btih:{btih}", "source": "cilisousuo"},
+            {**config, "cache_ttl_seconds": 0},
+        )
+        return first, second, expired
+
+    first, second, expired = asyncio.run(scenario())
+    saved = json.loads((tmp_path / "magnet_health.json").read_text(encoding="utf-8"))
+
+    assert normalize_btih("magnet:?xt=urn:btih:AERUKZ4JVPG66AJDIVTYTK6N54ASGRLH") == btih
+    assert first[0] is True and second[0] is True and expired[0] is True
+    assert second[1]["seeders"] == 4
+    assert len(probes) == 2
+    assert saved["torrents"][btih]["seeders"] == 4.0
+    assert saved["torrents"][btih]["last_dispatch"]["success"] is False
+    assert saved["torrents"][btih]["last_dispatch"]["dispatcher"] == "pikpak"
+
+
+def test_magnet_outcome_store_demotes_unreliable_candidates_and_sources(tmp_path, monkeypatch):
+    from modules.magnets import outcome_store as outcome_store_module
+    from modules.magnets.outcome_store import MagnetOutcomeStore, magnet_uploader
+
+    store = MagnetOutcomeStore(str(tmp_path / "magnet_outcomes.json"))
+    monkeypatch.setattr(magnets_service, "magnet_outcome_store", store)
+
+    def link(index, uploader="good.com"):
+        return f"magnet:?xt=urn:btih:{index:040x}&dn={uploader}%40ABP-123"
+
+    rejected = {"success": False, "error": "pan115_add_failed"}
+
+    async def scenario():
+        await store.record_dispatch_results(
+            "pan115",
+            [
+                {"magnet": link(1, "bad.net"), "movie_id": "abp-1", "source": "yhg007", **rejected},
+                {"magnet": link(2, "bad.net"), "movie_id": "abp-2", "source": "yhg007", **rejected},
+                {"magnet": link(3, "bad.net"), "movie_id": "abp-3", "source": "yhg007", **rejected},
+                {"magnet": link(4), "movie_id": "abp-4", "source": "javbus", **rejected},
+                {"magnet": link(4), "movie_id": "abp-4", "source": "javbus", **rejected},
+                {"magnet": link(5), "movie_id": "abp-5", "source": "cilisousuo", "success": True},
+                {"magnet": link(6), "movie_id": "abp-6", "source": "cilisousuo", "success": True},
+                {"magnet": link(7), "movie_id": "abp-7", "source": "cilisousuo", "success": True},
+                {"magnet": link(8), "movie_id": "abp-8", "source": "cilisousuo", "success": True, "skipped": True},
+            ],
+        )
+        # 登录、配额等下发服务自身的错误不算链接失败
+        await store.record_dispatch_results(
+            "pikpak",
+            [
+                {"magnet": link(10), "movie_id": "abp-10", "source": "javbus", "success": False, "error": "download_dispatch_failed"},
+                {"magnet": link(10), "movie_id": "abp-10", "source": "javbus", "success": False, "error": "download_dispatch_failed"},
+            ],
+        )
+        completed = await store.record_completed_movies({"ABP-5", "ABP-6"})
+        candidates = [
+            {"link": link(4), "title": "twice failed"},
+            {"link": link(9, "bad.net"), "title": "unreliable uploader"},
+            {"link": link(10), "title": "good uploader"},
+        ]
+        selected = await magnets_service.select_healthy_best_magnet(candidates, lambda remaining: remaining[0], {"enabled": False})
+        manual = await magnets_service._order_by_reliability(candidates, exclude_failed_links=False)
+        return completed, selected, manual, await magnets_service.rank_magnet_sources("yhg007")
+
+    completed, selected, manual, source_order = asyncio.run(scenario())
+    saved = json.loads((tmp_path / "magnet_outcomes.json").read_text(encoding="utf-8"))
+
+    assert magnet_uploader(title="[HHD800.com] ABP-123") == "hhd800.com"
+    assert completed == 2
+    assert {field: saved["sources"]["cilisousuo"][field] for field in ("dispatched", "failed", "completed")} == {
+        "dispatched": 3,
+        "failed": 0,
+        "completed": 2,
+    }
+    assert saved["uploaders"]["bad.net"]["failed"] == 3
+    assert saved["uploaders"]["good.com"]["failed"] == 2
+    assert f"{8:040x}" not in saved["links"]
+    assert f"{10:040x}" not in saved["links"]
+    assert selected["title"] == "good uploader"
+    assert [candidate["title"] for candidate in manual] == ["good uploader", "unreliable uploader", "twice failed"]
+    assert source_order == ["cilisousuo", "javbus", "yhg007"]
+
+    # 失败次数过期、来源统计按半衰期衰减后，链接重新参与自动选择
+    later = time.time() + outcome_store_module.LINK_FAILURE_EXPIRY_SECONDS + 60
+    assert outcome_store_module.link_failures(saved["links"][f"{4:040x}"], later) == 0
+    half_life_later = time.time() + outcome_store_module.RELIABILITY_HALF_LIFE_SECONDS * 10
+    assert outcome_store_module.reliability_rate(saved["uploaders"]["bad.net"], half_life_later) is None
+
+
+def test_pikpak_and_aria2_link_rejections_count_as_magnet_faults():
+    import aria2p
+    from pikpakapi import PikpakException, PikpakRetryException
+
+    from modules.magnets.outcome_store import is_magnet_fault
+    from modules.pikpak.service import is_pikpak_link_error
+    from modules.webdav.clients import is_aria2_link_error
+
+    assert is_pikpak_link_error(PikpakException("The URL is invalid"))
+    assert not is_pikpak_link_error(PikpakException("Invalid username or password"))
+    assert not is_pikpak_link_error(PikpakException("Storage space is not enough for this link"))
+    assert not is_pikpak_link_error(PikpakException("Max retries reached. Last error: invalid url"))
+    assert not is_pikpak_link_error(PikpakRetryException("Empty JSON data"))
+    assert not is_pikpak_link_error(RuntimeError("url"))
+
+    assert is_aria2_link_error(aria2p.ClientException(1, "Bad URI"))
+    assert not is_aria2_link_error(aria2p.ClientException(1, "Unauthorized"))
+    assert not is_aria2_link_error(aria2p.ClientException(-32602, "bad params"))
+    assert not is_aria2_link_error(ConnectionError("refused"))
+
+    assert is_magnet_fault({"success": False, "error": "pikpak_link_rejected"})
+    assert is_magnet_fault({"success": False, "error": "aria2_link_rejected"})
+    assert not is_magnet_fault({"success": False, "error": "aria2_add_failed"})
+
+
 def test_best_magnet_skips_links_already_recorded_in_history(monkeypatch):
     async def fake_get_movie_detail(movie_id):
         return {"id": movie_id, "gid": "1", "uc": "2"}
@@ -1846,18 +2837,17 @@ def test_pan115_download_dispatches_magnets_and_records_successes(monkeypatch):
     async def fake_save_movies(movie_ids, magnet_links=None, magnet_sources=None):
         saved_downloads.extend(zip(movie_ids, magnet_links or [], magnet_sources or []))
 
-    async def fake_get_same_source_replacement_magnet_payload(movie_id, magnet_link, magnet_source=None):
+    async def fake_get_replacement_magnet_payload(movie_id, magnet_link, magnet_source=None):
         fallback_calls.append((movie_id, magnet_link, magnet_source))
         return {"link": "magnet:fresh", "source": magnet_source, "title": "fresh fallback"}
 
     monkeypatch.setattr(pan115_service_module, "Pan115Client", fake_client)
-    monkeypatch.setattr(pan115_service_module.download_history_service, "is_magnet_downloaded", fake_is_magnet_downloaded)
-    monkeypatch.setattr(pan115_service_module.local_movie_library_service, "is_movie_present", fake_is_movie_present)
+    _patch_dispatch_prechecks(monkeypatch, fake_is_movie_present, fake_is_magnet_downloaded)
     monkeypatch.setattr(pan115_service_module.download_history_service, "save_movies", fake_save_movies)
     monkeypatch.setattr(
         pan115_service_module,
-        "get_same_source_replacement_magnet_payload",
-        fake_get_same_source_replacement_magnet_payload,
+        "get_replacement_magnet_payload",
+        fake_get_replacement_magnet_payload,
     )
     monkeypatch.setattr(
         pan115_service_module,
@@ -1926,8 +2916,7 @@ def test_pan115_download_batches_large_dispatches_with_configured_pause(monkeypa
     monkeypatch.setattr(pan115_service_module, "Pan115Client", FakePan115Client)
     monkeypatch.setattr(pan115_service_module.asyncio, "sleep", fake_sleep)
     monkeypatch.setattr(pan115_service_module.download_history_service, "is_movie_downloaded", fake_not_exists)
-    monkeypatch.setattr(pan115_service_module.download_history_service, "is_magnet_downloaded", fake_magnet_not_downloaded)
-    monkeypatch.setattr(pan115_service_module.local_movie_library_service, "is_movie_present", fake_not_exists)
+    _patch_dispatch_prechecks(monkeypatch, fake_not_exists, fake_magnet_not_downloaded)
     monkeypatch.setattr(pan115_service_module.download_history_service, "save_movies", fake_save_movies)
     monkeypatch.setattr(
         pan115_service_module,
@@ -1991,8 +2980,7 @@ def test_pan115_download_deduplicates_links_and_applies_jitter(monkeypatch):
     monkeypatch.setattr(pan115_service_module.asyncio, "sleep", fake_sleep)
     monkeypatch.setattr(pan115_service_module.random, "uniform", lambda _low, _high: -3.0)
     monkeypatch.setattr(pan115_service_module.download_history_service, "is_movie_downloaded", fake_not_exists)
-    monkeypatch.setattr(pan115_service_module.download_history_service, "is_magnet_downloaded", fake_magnet_not_downloaded)
-    monkeypatch.setattr(pan115_service_module.local_movie_library_service, "is_movie_present", fake_not_exists)
+    _patch_dispatch_prechecks(monkeypatch, fake_not_exists, fake_magnet_not_downloaded)
     monkeypatch.setattr(pan115_service_module.download_history_service, "save_movies", fake_save_movies)
     monkeypatch.setattr(
         pan115_service_module,
@@ -2050,8 +3038,7 @@ def test_pan115_download_retries_failed_batches_with_backoff(monkeypatch):
     monkeypatch.setattr(pan115_service_module, "Pan115Client", FakePan115Client)
     monkeypatch.setattr(pan115_service_module.asyncio, "sleep", fake_sleep)
     monkeypatch.setattr(pan115_service_module.download_history_service, "is_movie_downloaded", fake_not_exists)
-    monkeypatch.setattr(pan115_service_module.download_history_service, "is_magnet_downloaded", fake_magnet_not_downloaded)
-    monkeypatch.setattr(pan115_service_module.local_movie_library_service, "is_movie_present", fake_not_exists)
+    _patch_dispatch_prechecks(monkeypatch, fake_not_exists, fake_magnet_not_downloaded)
     monkeypatch.setattr(pan115_service_module.download_history_service, "save_movies", fake_save_movies)
     monkeypatch.setattr(
         pan115_service_module,
@@ -2795,6 +3782,414 @@ def test_local_library_scan_records_video_media_metadata(tmp_path, monkeypatch):
     assert record["media_info"]["container"] == "matroska"
 
 
+def test_local_library_rescan_skips_unchanged_files_by_fingerprint(tmp_path, monkeypatch):
+    library_dir = tmp_path / "library"
+    library_dir.mkdir()
+    for movie_id in ("ABP-001", "ABP-002", "ABP-003"):
+        (library_dir / f"{movie_id}.mp4").write_bytes(b"video")
+    (library_dir / "holiday-clip.mp4").write_bytes(b"video")
+    service = local_movie_library_service.__class__(str(tmp_path / "library.json"))
+    probed = []
+    scraped = []
+
+    async def fake_get_movie_detail(movie_id):
+        scraped.append(movie_id)
+        return {"id": movie_id, "title": f"{movie_id} Remote Title", "date": "2024-01-02"}
+
+    def fake_probe_video_metadata(path):
+        probed.append(path.name)
+        return {"width": 1920, "height": 1080}
+
+    monkeypatch.setattr(movies_local_library, "local_movie_library_service", service)
+    monkeypatch.setattr(local_scrape, "metadata_scraper_service", FakeMetadataScraperService(fake_get_movie_detail))
+    monkeypatch.setattr(movies_local_library, "_probe_video_metadata", fake_probe_video_metadata)
+    request = movies_local_library.LocalLibraryScanRequest(directory=str(library_dir), scrape=True)
+
+    first = asyncio.run(movies_local_library.scan_local_library(request))
+    probed.clear()
+    scraped.clear()
+    unchanged = asyncio.run(movies_local_library.scan_local_library(request))
+    unchanged_work = (list(probed), list(scraped))
+
+    (library_dir / "ABP-002.mp4").write_bytes(b"re-encoded video")
+    (library_dir / "ABP-003.mp4").unlink()
+    (library_dir / "ABP-004.mp4").write_bytes(b"video")
+    probed.clear()
+    scraped.clear()
+    rescan = asyncio.run(movies_local_library.scan_local_library(request))
+    records = asyncio.run(service.load_records())
+
+    assert (first["added_file_count"], first["unrecognized_files"]) == (3, 1)
+    assert unchanged["unchanged_file_count"] == 3 and unchanged_work == ([], [])
+    assert (unchanged["added_file_count"], unchanged["changed_file_count"], unchanged["unrecognized_files"]) == (0, 0, 1)
+    assert (rescan["added_file_count"], rescan["changed_file_count"], rescan["removed_file_count"]) == (1, 1, 1)
+    assert sorted(probed) == ["ABP-002.mp4", "ABP-004.mp4"]
+    assert sorted(scraped) == ["ABP-002", "ABP-004"]
+    assert sorted(records) == ["ABP-001", "ABP-002", "ABP-004"]
+    assert records["ABP-001"]["title"] == "ABP-001 Remote Title"
+    assert records["ABP-002"]["files"][0]["size"] == len(b"re-encoded video")
+
+
+def test_local_library_path_sync_ignores_unrecognized_files(tmp_path, monkeypatch):
+    library_dir = tmp_path / "library"
+    library_dir.mkdir()
+    (library_dir / "holiday-clip.mp4").write_bytes(b"video")
+    service = local_movie_library_service.__class__(str(tmp_path / "library.json"))
+    monkeypatch.setattr(movies_local_library, "local_movie_library_service", service)
+    monkeypatch.setattr(movies_local_library, "_probe_video_metadata", lambda path: {})
+
+    async def exercise():
+        unrecognized_only = await movies_local_library.sync_local_library_paths(
+            str(library_dir), directories=[str(library_dir)], scrape=False
+        )
+        (library_dir / "ABP-001.mp4").write_bytes(b"video")
+        with_movie = await movies_local_library.sync_local_library_paths(
+            str(library_dir), directories=[str(library_dir)], scrape=False
+        )
+        again = await movies_local_library.sync_local_library_paths(
+            str(library_dir), directories=[str(library_dir)], scrape=False
+        )
+        return unrecognized_only, with_movie, again
+
+    unrecognized_only, with_movie, again = asyncio.run(exercise())
+
+    assert unrecognized_only is None
+    assert with_movie["changed_file_count"] == 1
+    assert again is None
+    assert sorted(asyncio.run(service.load_records())) == ["ABP-001"]
+
+
+@pytest.mark.skipif(not library_watcher_module.InotifyWatcher.available(), reason="inotify 仅在 Linux 可用")
+def test_local_library_watcher_applies_inotify_events_and_polling_fallback(tmp_path, monkeypatch):
+    library_dir = tmp_path / "library"
+    library_dir.mkdir()
+    (library_dir / "ABP-001.mp4").write_bytes(b"video")
+    service = local_movie_library_service.__class__(str(tmp_path / "library.json"))
+    monkeypatch.setattr(movies_local_library, "local_movie_library_service", service)
+    monkeypatch.setattr(library_watcher_module, "local_movie_library_service", service)
+    monkeypatch.setattr(movies_local_library, "_probe_video_metadata", lambda path: {})
+    config = {"enabled": True, "roots": [], "debounce_seconds": 0.05, "max_delay_seconds": 1.0, "scrape": False}
+
+    async def wait_for(predicate):
+        for _attempt in range(100):
+            records = await service.load_records()
+            if predicate(records):
+                break
+            await asyncio.sleep(0.05)
+        return json.loads(json.dumps(records))
+
+    async def exercise():
+        request = movies_local_library.LocalLibraryScanRequest(directory=str(library_dir), scrape=False)
+        await movies_local_library.scan_local_library(request)
+        watcher = library_watcher_module.LocalLibraryWatcher(lambda: dict(config))
+        await watcher.startup()
+        status = watcher.status()
+        (library_dir / "ABP-002.mp4").write_bytes(b"video")
+        (library_dir / "ABP-003").mkdir()
+        (library_dir / "ABP-003" / "ABP-003.mkv").write_bytes(b"video")
+        (library_dir / "ABP-001.mp4").unlink()
+        (library_dir / "ABP-001.nfo").write_text("<movie/>", encoding="utf-8")
+        records = await wait_for(lambda records: sorted(records) == ["ABP-002", "ABP-003"])
+        await watcher.shutdown()
+
+        polling = library_watcher_module.LocalLibraryWatcher(lambda: {**config, "force_polling": True})
+        await polling.startup()
+        polling_backend = polling.backend
+        (library_dir / "ABP-003" / "ABP-003.mkv").unlink()
+        polling._queue_overflow(None)
+        results = await polling.flush()
+        idle = await polling.flush()
+        await polling.shutdown()
+        return status, records, polling_backend, results, idle, await service.load_records()
+
+    status, records, polling_backend, results, idle, final_records = asyncio.run(exercise())
+
+    assert status["backend"] == "inotify"
+    assert status["roots"] == [str(library_dir.resolve())]
+    assert sorted(records) == ["ABP-002", "ABP-003"]
+    assert records["ABP-003"]["files"][0]["relative_path"] == os.path.join("ABP-003", "ABP-003.mkv")
+    assert polling_backend == "polling"
+    assert [result["removed_file_count"] for result in results] == [1]
+    assert idle == []
+    assert sorted(final_records) == ["ABP-002"]
+
+
+def test_watcher_filesystem_type_matches_longest_mount_point(tmp_path, monkeypatch):
+    mounts = tmp_path / "mounts"
+    mounts.write_text(
+        "/dev/sda1 / ext4 rw 0 0\n"
+        "nas:/volume1 /mnt/nas nfs4 rw 0 0\n"
+        "//nas/share /mnt/my\\040share cifs rw 0 0\n"
+        "rclone: /mnt/cloud fuse.rclone rw 0 0\n"
+        "/dev/sdb1 /mnt/nas/local ext4 rw 0 0\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(library_watcher_module.os.path, "realpath", lambda path: path)
+
+    assert library_watcher_module.filesystem_type("/mnt/nas/movies", str(mounts)) == "nfs4"
+    assert library_watcher_module.filesystem_type("/mnt/nas/local/movies", str(mounts)) == "ext4"
+    assert library_watcher_module.filesystem_type("/mnt/nasx", str(mounts)) == "ext4"
+    assert library_watcher_module.is_network_filesystem("/mnt/my share/movies", str(mounts))
+    assert library_watcher_module.is_network_filesystem("/mnt/cloud", str(mounts))
+    assert not library_watcher_module.is_network_filesystem("/home/movies", str(mounts))
+    assert library_watcher_module.filesystem_type("/mnt/nas", str(tmp_path / "missing")) == ""
+
+
+@pytest.mark.skipif(not library_watcher_module.InotifyWatcher.available(), reason="inotify 仅在 Linux 可用")
+def test_local_library_watcher_skips_inotify_on_network_roots(tmp_path, monkeypatch):
+    local_root = tmp_path / "local"
+    nas_root = tmp_path / "nas"
+    local_root.mkdir()
+    nas_root.mkdir()
+    config = {"enabled": True, "roots": [str(local_root), str(nas_root)], "poll_interval_seconds": 3600}
+    monkeypatch.setattr(library_watcher_module, "is_network_filesystem", lambda path: path == str(nas_root.resolve()))
+
+    async def exercise():
+        watcher = library_watcher_module.LocalLibraryWatcher(lambda: dict(config))
+        await watcher.startup()
+        status = watcher.status()
+        watched = sorted(directory for _root, directory in watcher._inotify._watches.values())
+        await watcher.shutdown()
+        return status, watched
+
+    status, watched = asyncio.run(exercise())
+
+    assert status["backend"] == "inotify"
+    assert status["polled_roots"] == [str(nas_root.resolve())]
+    assert watched == [str(local_root.resolve())]
+
+
+def test_inotify_watcher_ignores_file_create_until_write_closes():
+    changes = []
+    watcher = library_watcher_module.InotifyWatcher(
+        lambda root, path, is_dir: changes.append((path, is_dir)), lambda root: None
+    )
+    watcher._watches[1] = ("/library", "/library")
+
+    watcher._handle_event(1, library_watcher_module.IN_CREATE, "ABP-001.mp4")
+    assert changes == []
+    for mask in (
+        library_watcher_module.IN_CLOSE_WRITE,
+        library_watcher_module.IN_MOVED_TO,
+        library_watcher_module.IN_DELETE,
+        library_watcher_module.IN_MOVED_FROM,
+    ):
+        watcher._handle_event(1, mask, "ABP-001.mp4")
+    watcher._handle_event(1, library_watcher_module.IN_CLOSE_WRITE, "ABP-001.nfo")
+
+    assert changes == [(os.path.join("/library", "ABP-001.mp4"), False)] * 4
+
+
+def test_video_probe_service_runs_pool_and_caches_by_fingerprint(tmp_path):
+    videos = []
+    for index in range(6):
+        video = tmp_path / f"ABP-{index:03d}.mp4"
+        video.write_bytes(b"video")
+        videos.append(video)
+    calls = []
+    active = {"now": 0, "peak": 0}
+    guard = threading.Lock()
+
+    def fake_runner(path):
+        with guard:
+            calls.append(path.name)
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with guard:
+            active["now"] -= 1
+        if path.name == "ABP-005.mp4":
+            return None
+        return {"width": 1920, "height": 1080, "resolution_pixels": 1920 * 1080}
+
+    cache_path = tmp_path / "probe_cache.json"
+    service = media_probe.VideoProbeService(str(cache_path), workers=3, runner=fake_runner)
+    first = asyncio.run(service.probe_many(videos))
+    first_calls = sorted(calls)
+    calls.clear()
+    second = asyncio.run(service.probe_many(videos))
+    second_calls = sorted(calls)
+
+    videos[1].write_bytes(b"re-encoded video")
+    calls.clear()
+    reloaded = media_probe.VideoProbeService(str(cache_path), workers=3, runner=fake_runner)
+    third = asyncio.run(reloaded.probe_many(videos))
+
+    assert len(first_calls) == 6 and active["peak"] == 3
+    assert first[os.path.abspath(videos[0])]["width"] == 1920
+    # 暂时性失败保留为 None，不写入缓存
+    assert first[os.path.abspath(videos[5])] is None
+    assert second_calls == ["ABP-005.mp4"]
+    assert second == first
+    assert sorted(calls) == ["ABP-001.mp4", "ABP-005.mp4"]
+    assert third[os.path.abspath(videos[1])]["height"] == 1080
+    assert sorted(json.loads(cache_path.read_text(encoding="utf-8"))["entries"]) == sorted(
+        os.path.abspath(video) for video in videos[:5]
+    )
+
+
+def _mp4_box(box_type, payload):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _ebml_element(element_id, payload):
+    id_bytes = element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+    return id_bytes + (0x10000000 | len(payload)).to_bytes(4, "big") + payload
+
+
+def test_media_header_reader_matches_ffprobe_shape_without_spawning(tmp_path, monkeypatch):
+    sample_sizes = [4000, 6000, 5000]
+    visual_entry = bytes(6) + struct.pack(">H", 1) + bytes(16) + struct.pack(">HH", 1920, 1080) + bytes(50)
+    stbl = _mp4_box(
+        b"stbl",
+        _mp4_box(b"stsd", bytes(4) + struct.pack(">I", 1) + _mp4_box(b"avc1", visual_entry))
+        + _mp4_box(b"stsz", bytes(4) + struct.pack(">II", 0, 3) + struct.pack(">3I", *sample_sizes)),
+    )
+    mdia = _mp4_box(
+        b"mdia",
+        _mp4_box(b"mdhd", bytes(12) + struct.pack(">II", 1000, 3000) + bytes(4))
+        + _mp4_box(b"hdlr", bytes(8) + b"vide" + bytes(13))
+        + _mp4_box(b"minf", stbl),
+    )
+    tkhd = _mp4_box(b"tkhd", bytes(76) + struct.pack(">II", 1280 << 16, 720 << 16))
+    moov = _mp4_box(b"moov", _mp4_box(b"mvhd", bytes(100)) + _mp4_box(b"trak", tkhd + mdia))
+    mp4_path = tmp_path / "ABP-001.mp4"
+    mp4_path.write_bytes(_mp4_box(b"ftyp", b"isom" + bytes(4)) + _mp4_box(b"mdat", bytes(15000)) + moov)
+
+    video = _ebml_element(0xB0, (3840).to_bytes(2, "big")) + _ebml_element(0xBA, (2160).to_bytes(2, "big"))
+    tracks = _ebml_element(
+        0x1654AE6B,
+        _ebml_element(0xAE, _ebml_element(0x83, b"\x02") + _ebml_element(0x86, b"A_AAC"))
+        + _ebml_element(0xAE, _ebml_element(0x83, b"\x01") + _ebml_element(0x86, b"V_MPEGH/ISO/HEVC") + _ebml_element(0xE0, video)),
+    )
+    info = _ebml_element(0x1549A966, _ebml_element(0x2AD7B1, (1000000).to_bytes(3, "big")) + _ebml_element(0x4489, struct.pack(">d", 60000.0)))
+    segment = _ebml_element(0x18538067, info + tracks + _ebml_element(0x1F43B675, bytes(64)))
+    mkv_path = tmp_path / "ABP-002.mkv"
+    mkv_path.write_bytes(_ebml_element(0x1A45DFA3, _ebml_element(0x4282, b"matroska")) + segment)
+    broken_path = tmp_path / "ABP-003.mp4"
+    broken_path.write_bytes(_mp4_box(b"ftyp", b"isom" + bytes(4)) + _mp4_box(b"mdat", bytes(64)))
+    avi_path = tmp_path / "ABP-004.avi"
+    avi_path.write_bytes(b"RIFF" + bytes(64))
+
+    spawned = []
+    monkeypatch.setattr(media_probe, "run_ffprobe", lambda path: spawned.append(path.name) or {"codec": "ffprobe"})
+
+    assert media_probe.probe_media(mp4_path) == {
+        "width": 1920,
+        "height": 1080,
+        "resolution_pixels": 1920 * 1080,
+        "bitrate": sum(sample_sizes) * 8 // 3,
+        "codec": "h264",
+        "container": "mp4",
+        "duration_seconds": 3,
+    }
+    assert media_probe.probe_media(mkv_path) == {
+        "width": 3840,
+        "height": 2160,
+        "resolution_pixels": 3840 * 2160,
+        "bitrate": mkv_path.stat().st_size * 8 // 60,
+        "codec": "hevc",
+        "container": "matroska",
+        "duration_seconds": 60,
+    }
+    assert spawned == []
+    assert media_probe.probe_media(broken_path) == {"codec": "ffprobe"}
+    assert media_probe.probe_media(avi_path) == {"codec": "ffprobe"}
+    assert spawned == ["ABP-003.mp4", "ABP-004.avi"]
+
+
+def test_thumbnail_cache_serves_width_buckets_with_lru_cap(tmp_path, monkeypatch):
+    rendered = []
+
+    def fake_renderer(source, width, image_format):
+        rendered.append((width, image_format))
+        return bytes(width)
+
+    cache = image_thumbnails.ThumbnailCache(str(tmp_path / "thumbs"), max_bytes=700, renderer=fake_renderer)
+    poster = tmp_path / "ABP-123-poster.jpg"
+    poster.write_bytes(b"full size poster")
+
+    webp = cache.local_variant(poster, 300, "image/avif,image/webp,*/*")
+    again = cache.local_variant(poster, 310, "image/webp")
+    jpeg = cache.local_variant(poster, 150, "image/*")
+    assert (webp.path, webp.media_type) == (again.path, "image/webp")
+    assert jpeg.media_type == "image/jpeg" and jpeg.path.stat().st_size == 160
+    assert rendered == [(320, "webp"), (160, "jpeg")]
+    assert cache.local_variant(poster, None, "image/webp") is None
+
+    poster.write_bytes(b"re-downloaded poster")
+    os.utime(poster, ns=(1, 1))
+    cache.local_variant(poster, 480, "image/webp")
+    remaining = sorted(path.stat().st_size for path in (tmp_path / "thumbs").rglob("*.*"))
+    assert rendered[-1] == (480, "webp")
+    assert remaining == [480]
+
+    monkeypatch.setattr(movies_router, "thumbnail_cache", image_thumbnails.ThumbnailCache(str(tmp_path / "api"), renderer=fake_renderer))
+
+    async def fake_get_poster_path(movie_id):
+        return poster
+
+    monkeypatch.setattr(local_movie_library_service, "get_poster_path", fake_get_poster_path)
+    client = TestClient(main.app)
+    sized = client.get("/api/movies/local-library/poster/ABP-123?w=200", headers={"Accept": "image/webp"})
+    original = client.get("/api/movies/local-library/poster/ABP-123")
+
+    assert sized.status_code == 200
+    assert sized.headers["content-type"] == "image/webp"
+    assert len(sized.content) == 240
+    assert sized.headers["cache-control"] == image_thumbnails.LOCAL_IMAGE_CACHE_CONTROL
+    assert sized.headers["vary"] == "Accept"
+    assert original.content == b"re-downloaded poster"
+    assert original.headers["cache-control"] == "no-cache"
+
+    revalidated = client.get("/api/movies/local-library/poster/ABP-123", headers={"If-None-Match": original.headers["etag"]})
+    sized_revalidated = client.get(
+        "/api/movies/local-library/poster/ABP-123?w=200",
+        headers={"Accept": "image/webp", "If-None-Match": sized.headers["etag"]},
+    )
+    poster.write_bytes(b"replaced poster")
+    os.utime(poster, ns=(2, 2))
+    replaced = client.get("/api/movies/local-library/poster/ABP-123", headers={"If-None-Match": original.headers["etag"]})
+
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert sized_revalidated.status_code == 304
+    assert replaced.status_code == 200
+    assert replaced.content == b"replaced poster"
+    assert replaced.headers["etag"] != original.headers["etag"]
+
+
+def test_local_scrape_walker_streams_files_with_cached_stat(tmp_path):
+    root = tmp_path / "library"
+    (root / "a" / "b" / "c").mkdir(parents=True)
+    (root / "backdrops").mkdir()
+    (root / ".hidden").mkdir()
+    (root / "top.mp4").write_bytes(b"top")
+    (root / "a" / "one.mkv").write_bytes(b"one")
+    (root / "a" / "b" / "two.mp4").write_bytes(b"two")
+    (root / "a" / "b" / "c" / "deep.mp4").write_bytes(b"deep")
+    (root / "backdrops" / "skip.mp4").write_bytes(b"skip")
+    (root / ".hidden" / "skip.mp4").write_bytes(b"skip")
+    (root / "small.ts").write_bytes(bytes([0x47]) * 376)
+    (root / "empty.mp4").write_bytes(b"")
+    (root / "notes.txt").write_text("x", encoding="utf-8")
+    try:
+        (root / "link.mp4").symlink_to(root / "top.mp4")
+    except OSError:
+        pass
+
+    walked = asyncio.run(local_scrape._walk_video_files(root, True, 2))
+
+    assert [item.path.relative_to(root.resolve()).as_posix() for item in walked] == ["a/b/two.mp4", "a/one.mkv", "top.mp4"]
+    stat = (root / "a" / "one.mkv").stat()
+    assert walked[1].fingerprint == (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+    async def collect_streamed():
+        return [item.path.name async for item in local_scrape._stream_video_files(root, True, None, workers=2)]
+
+    assert sorted(asyncio.run(collect_streamed())) == ["deep.mp4", "one.mkv", "top.mp4", "two.mp4"]
+    assert [item.path.name for item in asyncio.run(local_scrape._walk_video_files(root, False, None))] == ["top.mp4"]
+
+
 def test_local_library_information_download_refreshes_video_media_metadata(tmp_path, monkeypatch):
     video = tmp_path / "ABP-123.mp4"
     video.write_bytes(b"video")
@@ -2875,9 +4270,11 @@ def test_local_library_clean_invalid_deletes_unprobeable_files_and_updates_index
     valid_video = tmp_path / "ABP-123.mp4"
     broken_video = tmp_path / "ABP-123-broken.mp4"
     only_broken_video = tmp_path / "IPX-456.mp4"
+    timed_out_video = tmp_path / "SSIS-789.mp4"
     valid_video.write_bytes(b"valid")
     broken_video.write_bytes(b"broken")
     only_broken_video.write_bytes(b"broken-only")
+    timed_out_video.write_bytes(b"slow-nas")
     service = local_movie_library_service.__class__(str(tmp_path / "library.json"))
 
     asyncio.run(
@@ -2911,11 +4308,22 @@ def test_local_library_clean_invalid_deletes_unprobeable_files_and_updates_index
                     "modified_at": "2024-01-01T00:00:00",
                     "extension": ".mp4",
                 },
+                {
+                    "movie_id": "SSIS-789",
+                    "path": str(timed_out_video),
+                    "relative_path": timed_out_video.name,
+                    "file_name": timed_out_video.name,
+                    "size": timed_out_video.stat().st_size,
+                    "modified_at": "2024-01-01T00:00:00",
+                    "extension": ".mp4",
+                },
             ],
         )
     )
 
     def fake_probe_video_metadata(path):
+        if Path(path).resolve() == timed_out_video.resolve():
+            return None
         return {
             "width": 1920,
             "height": 1080,
@@ -2931,13 +4339,16 @@ def test_local_library_clean_invalid_deletes_unprobeable_files_and_updates_index
     summary = asyncio.run(service.get_summary())
 
     assert payload["success"] is True
-    assert payload["checked_file_count"] == 3
+    assert payload["checked_file_count"] == 4
     assert payload["deleted_file_count"] == 2
     assert payload["removed_movie_count"] == 1
+    assert payload["skipped_file_count"] == 1
+    assert payload["skipped_files"][0]["error"] == "probe_unavailable"
     assert valid_video.exists()
+    assert timed_out_video.exists()
     assert not broken_video.exists()
     assert not only_broken_video.exists()
-    assert [record["movie_id"] for record in summary["records"]] == ["ABP-123"]
+    assert sorted(record["movie_id"] for record in summary["records"]) == ["ABP-123", "SSIS-789"]
     assert summary["records"][0]["file_count"] == 1
     assert summary["records"][0]["media_info"]["bitrate"] == 8_000_000
 
@@ -2950,7 +4361,15 @@ def test_docker_image_installs_ffmpeg_for_local_scrape_media_comparison():
     assert "ffmpeg" in dockerfile_text
 
 
-def test_local_scrape_apply_respects_per_item_conflict_resolution(tmp_path):
+def _use_tmp_local_library(tmp_path, monkeypatch):
+    """整理入库写到 tmp_path 下的影视库，不碰真实的 data/"""
+    service = local_movie_library_service.__class__(str(tmp_path / "library.json"))
+    monkeypatch.setattr(local_scrape, "local_movie_library_service", service)
+    return service
+
+
+def test_local_scrape_apply_respects_per_item_conflict_resolution(tmp_path, monkeypatch):
+    _use_tmp_local_library(tmp_path, monkeypatch)
     source_dir = tmp_path / "source"
     target_dir = tmp_path / "target"
     source_dir.mkdir()
@@ -3015,7 +4434,8 @@ def test_local_scrape_apply_respects_per_item_conflict_resolution(tmp_path):
     assert target_video.read_bytes() == b"source-video"
 
 
-def test_local_scrape_apply_supports_conflict_keep_skip_newer_older_and_larger(tmp_path):
+def test_local_scrape_apply_supports_conflict_keep_skip_newer_older_and_larger(tmp_path, monkeypatch):
+    _use_tmp_local_library(tmp_path, monkeypatch)
     source_dir = tmp_path / "source"
     target_dir = tmp_path / "target"
     source_dir.mkdir()
@@ -3082,6 +4502,7 @@ def test_local_scrape_apply_supports_conflict_keep_skip_newer_older_and_larger(t
 
 
 def test_local_scrape_apply_supports_conflict_resolution_and_bitrate_strategies(tmp_path, monkeypatch):
+    _use_tmp_local_library(tmp_path, monkeypatch)
     source_dir = tmp_path / "source"
     target_dir = tmp_path / "target"
     source_dir.mkdir()
@@ -3150,6 +4571,7 @@ def test_local_scrape_apply_supports_conflict_resolution_and_bitrate_strategies(
 
 
 def test_local_scrape_apply_supports_auto_best_conflict_resolution(tmp_path, monkeypatch):
+    _use_tmp_local_library(tmp_path, monkeypatch)
     source_dir = tmp_path / "source"
     target_dir = tmp_path / "target"
     source_dir.mkdir()
@@ -3167,7 +4589,10 @@ def test_local_scrape_apply_supports_auto_best_conflict_resolution(tmp_path, mon
         b"target-bitrate": {"bitrate": 2_000_000},
     }
 
+    probe_threads = []
+
     def fake_probe(path):
+        probe_threads.append(threading.get_ident())
         return media_by_content.get(Path(path).read_bytes(), {})
 
     monkeypatch.setattr(local_scrape, "_probe_video_metadata", fake_probe)
@@ -3221,9 +4646,12 @@ def test_local_scrape_apply_supports_auto_best_conflict_resolution(tmp_path, mon
     assert unresolved["results"][0]["kept"] == "target"
     assert source_video.exists()
     assert target_video.read_bytes() == b"same"
+    # 冲突比较与入库记录的探测都在 ffprobe 线程池中进行，不占用事件循环
+    assert probe_threads and threading.get_ident() not in probe_threads
 
 
-def test_local_scrape_apply_numbers_same_movie_duplicate_targets_by_size(tmp_path):
+def test_local_scrape_apply_numbers_same_movie_duplicate_targets_by_size(tmp_path, monkeypatch):
+    _use_tmp_local_library(tmp_path, monkeypatch)
     source_dir = tmp_path / "source"
     target_dir = tmp_path / "target"
     source_dir.mkdir()
@@ -3320,7 +4748,8 @@ def test_local_scrape_apply_rejects_duplicate_targets_for_different_movies(tmp_p
     assert not (target_dir / "movie.mp4").exists()
 
 
-def test_local_scrape_apply_numbers_vr_multi_file_targets_by_size(tmp_path):
+def test_local_scrape_apply_numbers_vr_multi_file_targets_by_size(tmp_path, monkeypatch):
+    _use_tmp_local_library(tmp_path, monkeypatch)
     source_dir = tmp_path / "source"
     target_dir = tmp_path / "target"
     source_dir.mkdir()
@@ -3400,9 +4829,11 @@ def test_local_scrape_downloads_images_with_browser_headers_and_keeps_going(tmp_
 
         def raise_for_status(self) -> None:
             if self.status_code >= 400:
-                raise local_scrape.httpx.HTTPStatusError("failed", request=None, response=self)
+                raise image_download.httpx.HTTPStatusError("failed", request=None, response=self)
 
     class FakeAsyncClient:
+        is_closed = False
+
         def __init__(self, **kwargs) -> None:
             self.kwargs = kwargs
 
@@ -3412,6 +4843,9 @@ def test_local_scrape_downloads_images_with_browser_headers_and_keeps_going(tmp_
         async def __aexit__(self, exc_type, exc, tb):
             return False
 
+        def stream(self, method, url, headers=None):
+            return _FakeImageStream(self.get(url, headers=headers))
+
         async def get(self, url, headers=None):
             requests.append((url, headers or {}))
             attempts[url] = attempts.get(url, 0) + 1
@@ -3421,7 +4855,9 @@ def test_local_scrape_downloads_images_with_browser_headers_and_keeps_going(tmp_
                 return FakeResponse(url, 403, b"forbidden")
             return FakeResponse(url, 200, f"image:{url}".encode("utf-8"))
 
-    monkeypatch.setattr(local_scrape.httpx, "AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr(image_download.httpx, "AsyncClient", FakeAsyncClient)
+    monkeypatch.setattr(image_download, "image_client_pool", image_download.ImageClientPool())
+    monkeypatch.setattr(image_download, "image_validator_store", image_download.ImageValidatorStore(str(tmp_path / "validators.json")))
 
     video = tmp_path / "ABP-123 Sample.mp4"
     metadata = {
@@ -3515,6 +4951,81 @@ def test_local_scrape_downloads_actor_avatars_and_list_thumbnail_options(tmp_pat
     ) in downloaded
 
 
+def test_local_scrape_apply_shares_image_downloads_across_items(tmp_path, monkeypatch):
+    downloaded = []
+    active = []
+    peak = []
+    library_updates = []
+
+    async def fake_download(url, target, overwrite):
+        active.append(url)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(url)
+        downloaded.append(url)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(f"image:{url}".encode("utf-8"))
+        return target.name
+
+    async def fake_update_from_scan(root, records, remove_missing=True):
+        library_updates.append((root, [record["movie_id"] for record in records]))
+        return {"success": True}
+
+    monkeypatch.setattr(local_scrape, "_download_image", fake_download)
+    monkeypatch.setattr(local_scrape, "_probe_video_metadata", lambda path: {})
+    monkeypatch.setattr(local_scrape, "LOCAL_SCRAPE_IMAGE_STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(scrape_images, "LOCAL_SCRAPE_IMAGE_CONCURRENCY", 2)
+    monkeypatch.setattr(local_scrape.local_movie_library_service, "update_from_scan", fake_update_from_scan)
+    target_dir = tmp_path / "library"
+    actor = {"id": "star-a", "name": "Actor One", "avatar": "https://img.example/actress/star-a.jpg"}
+
+    def apply(*movie_ids):
+        items = []
+        for movie_id in movie_ids:
+            video = tmp_path / f"{movie_id}.mp4"
+            video.write_bytes(b"video")
+            items.append(
+                {
+                    "source_path": str(video),
+                    "code": movie_id,
+                    "metadata": {
+                        "id": movie_id,
+                        "title": movie_id,
+                        "img": f"https://img.example/cover/{movie_id.lower()}_b.jpg",
+                        "stars": [actor],
+                    },
+                }
+            )
+        return asyncio.run(
+            local_scrape.apply_local_scrape(
+                local_scrape.LocalScrapeApplyRequest(
+                    items=items,
+                    target_directory=str(target_dir),
+                    naming_template="{code}",
+                    folder_template="{code}",
+                    write_nfo=False,
+                    download_actor_images=True,
+                )
+            )
+        )
+
+    first = apply("ABP-001", "ABP-002", "ABP-003")
+    first_downloads = list(downloaded)
+    second = apply("ABP-004")
+
+    assert first["success"] is True and second["success"] is True
+    assert [result["code"] for result in first["results"]] == ["ABP-001", "ABP-002", "ABP-003"]
+    assert first_downloads.count(actor["avatar"]) == 1
+    assert len(first_downloads) == 4
+    assert max(peak) == 2
+    assert downloaded[len(first_downloads):] == ["https://img.example/cover/abp-004_b.jpg"]
+    avatars = [target_dir / movie_id / "actors" / "Actor One.jpg" for movie_id in ("ABP-001", "ABP-002", "ABP-003", "ABP-004")]
+    assert all(path.read_bytes() == f"image:{actor['avatar']}".encode("utf-8") for path in avatars)
+    assert second["results"][0]["actor_images"] == [str(Path("actors") / "Actor One.jpg")]
+    assert len(list((tmp_path / "store").rglob("*.jpg"))) == 1
+    assert library_updates[0][1] == ["ABP-001", "ABP-002", "ABP-003"]
+
+
 def test_local_scrape_rebuilt_preview_metadata_keeps_actor_refs_for_avatar_download(tmp_path, monkeypatch):
     downloaded = []
     fetched_star_ids = []
@@ -3621,7 +5132,7 @@ def test_local_scrape_preview_uses_configured_metadata_scraper_chain(tmp_path, m
     video.write_bytes(b"video")
 
     class FakeMetadataScraperService:
-        async def get_movie_detail(self, movie_id):
+        async def get_movie_detail(self, movie_id, force_refresh=False):
             assert movie_id == "ABP-123"
             return {
                 "metadata": {
@@ -3770,6 +5281,63 @@ def test_local_library_summary_exposes_cover_and_local_poster(tmp_path):
     assert refreshed_record["thumbnail_url"] == "https://www.javbus.com/pics/thumb.jpg"
 
 
+def test_local_library_asset_index_serves_summary_and_checks_from_cached_listings(tmp_path, monkeypatch):
+    movie_dir = tmp_path / "ABP-123"
+    actor_dir = movie_dir / "actors"
+    actor_dir.mkdir(parents=True)
+    video = movie_dir / "ABP-123.mp4"
+    video.write_text("video", encoding="utf-8")
+    (movie_dir / "ABP-123-poster.jpg").write_bytes(b"poster")
+    (movie_dir / "ABP-123.nfo").write_text("<movie />", encoding="utf-8")
+    (actor_dir / "Actor One.jpg").write_bytes(b"avatar")
+    settled = os.stat(movie_dir).st_mtime - 60
+    for directory in (movie_dir, actor_dir):
+        os.utime(directory, (settled, settled))
+
+    stat_calls = []
+    real_stat = asset_index_module.os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        stat_calls.append(str(path))
+        return real_stat(path, *args, **kwargs)
+
+    async def exercise():
+        service = history_service_module.LocalMovieLibraryService(str(tmp_path / "library.json"), asset_revalidate_seconds=60)
+        await service.update_from_scan(
+            str(tmp_path),
+            [
+                {
+                    "movie_id": "ABP-123",
+                    "path": str(video),
+                    "size": 5,
+                    "metadata": {"id": "ABP-123", "title": "Sample", "cover_url": "https://example.test/cover.jpg"},
+                    "scrape_status": "found",
+                }
+            ],
+        )
+        monkeypatch.setattr(asset_index_module.os, "stat", counting_stat)
+        summary = await service.get_summary()
+        check = await service.get_information_check(["nfo", "poster_file"])
+        avatar = await service.get_actor_avatar_path("ABP-123", "Actor One")
+        (movie_dir / "ABP-123-thumb.jpg").write_bytes(b"thumb")
+        cached_summary = await service.get_summary()
+        cached_stats = list(stat_calls)
+        service.asset_index.invalidate(movie_dir)
+        refreshed_summary = await service.get_summary()
+        return summary, check, avatar, cached_summary, cached_stats, refreshed_summary, await service.get_movie_assets("ABP-123")
+
+    summary, check, avatar, cached_summary, cached_stats, refreshed_summary, assets = asyncio.run(exercise())
+
+    # 扫描时已列举目录，之后的摘要、信息检查只读缓存；只有头像接口会校验一次命中的文件
+    assert cached_stats == [str(actor_dir / "Actor One.jpg")]
+    assert summary["records"][0]["poster_url"] == "/api/movies/local-library/poster/ABP-123"
+    assert check["incomplete_count"] == 0
+    assert avatar == (actor_dir / "Actor One.jpg").resolve()
+    assert "thumbnail_url" not in cached_summary["records"][0]
+    assert refreshed_summary["records"][0]["thumbnail_url"] == "/api/movies/local-library/thumbnail/ABP-123"
+    assert assets["nfo"] is True and assets["actor_images"] == ["Actor One.jpg"]
+
+
 def test_local_library_play_file_path_comes_from_indexed_record(tmp_path):
     first_video = tmp_path / "ABP-123.mp4"
     second_video = tmp_path / "ABP-123-cd2.mkv"
@@ -3975,6 +5543,125 @@ def test_actor_library_indexes_movies_and_downloads_missing_avatar_once(tmp_path
     assert fetched_star_ids == ["star-a"]
 
 
+def test_actor_library_applies_movie_deltas_and_queues_avatars(tmp_path, monkeypatch):
+    downloads = []
+    active = []
+    peak = []
+
+    async def fake_download(url, target, overwrite):
+        active.append(url)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(url)
+        downloads.append(url)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(b"avatar")
+        return target.name
+
+    monkeypatch.setattr(history_service_module, "download_image", fake_download)
+    monkeypatch.setattr(history_service_module, "ACTOR_AVATAR_DOWNLOAD_CONCURRENCY", 2)
+
+    def movie(movie_id, *star_ids):
+        return {
+            "movie_id": movie_id,
+            "title": f"{movie_id} Sample",
+            "metadata": {
+                "actor_refs": [
+                    {"id": star_id, "name": star_id.title(), "avatar": f"https://img.example/{star_id}.jpg"}
+                    for star_id in star_ids
+                ],
+            },
+        }
+
+    async def exercise():
+        movie_service = local_movie_library_service.__class__(
+            str(tmp_path / "library.json"),
+            actor_library_service=local_actor_library_service.__class__(
+                str(tmp_path / "actors.json"),
+                str(tmp_path / "actor_images"),
+            ),
+        )
+        actor_service = movie_service.actor_library_service
+        await actor_service.sync_from_movie_records([movie("ABP-001", "star-a")], download_missing_avatars=False)
+        full_sync_calls = []
+        original_full_sync = actor_service.sync_from_movie_records
+
+        async def tracked_full_sync(*args, **kwargs):
+            full_sync_calls.append(args)
+            return await original_full_sync(*args, **kwargs)
+
+        actor_service.sync_from_movie_records = tracked_full_sync
+        movie_service._cache.update({"ABP-002": movie("ABP-002", "star-b")})
+        movie_service._loaded = True
+        changed = await actor_service.apply_movie_changes(
+            [movie("ABP-001", "star-b", "star-c"), movie("ABP-002", "star-b"), movie("ABP-003", "star-d")],
+        )
+        queued_keys = set(actor_service._avatar_pending)
+        await actor_service.wait_for_avatar_downloads()
+        await movie_service.delete_movie("ABP-002")
+        repeated = await actor_service.apply_movie_changes([movie("ABP-003", "star-d")])
+        summary = await actor_service.get_summary()
+        saved = json.loads((tmp_path / "actors.json").read_text(encoding="utf-8"))
+        return changed, queued_keys, repeated, summary, saved, full_sync_calls
+
+    changed, queued_keys, repeated, summary, saved, full_sync_calls = asyncio.run(exercise())
+
+    assert changed["removed_actor_count"] == 1
+    assert changed["queued_avatar_count"] == 3
+    assert queued_keys == {"star-b", "star-c", "star-d"}
+    assert max(peak) == 2
+    assert sorted(downloads) == [f"https://img.example/{key}.jpg" for key in ("star-b", "star-c", "star-d")]
+    assert repeated["queued_avatar_count"] == 0
+    assert full_sync_calls == []
+    actors = {actor["key"]: actor for actor in summary["actors"]}
+    assert sorted(actors) == ["star-b", "star-c", "star-d"]
+    assert actors["star-b"]["movie_ids"] == ["ABP-001"]
+    assert actors["star-d"]["avatar_url"] == "/api/movies/local-library/actors/star-d/avatar"
+    assert saved["actors"]["star-c"]["avatar_file"] == "star-c.jpg"
+    assert saved["actors"]["star-b"]["movie_count"] == 1
+
+
+def test_actor_library_stays_unbuilt_until_first_full_sync(tmp_path, monkeypatch):
+    actor_path = tmp_path / "actors.json"
+    started = asyncio.Event()
+
+    async def slow_download(url, target, overwrite):
+        started.set()
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(history_service_module, "download_image", slow_download)
+
+    def new_service():
+        return local_actor_library_service.__class__(str(actor_path), str(tmp_path / "actor_images"))
+
+    async def exercise():
+        interrupted = new_service()
+        needs_before = await interrupted.needs_full_sync()
+        file_before_sync = actor_path.exists()
+        # 首次完整重建前进程退出：下次启动仍需重建
+        restarted = new_service()
+        needs_after_restart = await restarted.needs_full_sync()
+        await restarted.sync_from_movie_records(
+            [{"movie_id": "ABP-001", "metadata": {"actor_refs": [{"id": "star-a", "name": "Star A"}]}}],
+            download_missing_avatars=False,
+        )
+        await restarted.apply_movie_changes(
+            [{"movie_id": "ABP-002", "metadata": {"actor_refs": [{"id": "star-b", "name": "Star B", "avatar": "https://img.example/b.jpg"}]}}],
+        )
+        await asyncio.wait_for(started.wait(), 1)
+        avatar_task = restarted._avatar_task
+        await restarted.shutdown()
+        return needs_before, file_before_sync, needs_after_restart, await new_service().needs_full_sync(), avatar_task
+
+    needs_before, file_before_sync, needs_after_restart, needs_after_build, avatar_task = asyncio.run(exercise())
+
+    assert needs_before is True
+    assert file_before_sync is False
+    assert needs_after_restart is True
+    assert needs_after_build is False
+    assert avatar_task.cancelled()
+
+
 def test_local_movie_library_syncs_actor_library_when_metadata_changes(tmp_path):
     video = tmp_path / "ABP-123.mp4"
     video.write_bytes(b"video")